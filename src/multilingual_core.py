@@ -10,50 +10,242 @@ Arquitectura revolucionaria que democratiza la programación a nivel mundial.
 import json
 import os
 import re
+import sys
+import time
+import marshal
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+def _trie_pattern(words) -> str:
+    """Alternancia en forma de trie: cada posición se prueba en O(longitud de palabra)
+
+    Las continuaciones más largas se intentan primero, así que con los `\\b`
+    de alrededor gana la palabra clave más larga que encaje.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def render(node) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+    
+    return render(trie)
+
+def _build_automaton(keywords) -> Tuple[List[Dict[str, int]], List[int], Dict[int, List[str]]]:
+    """Autómata de Aho–Corasick: transiciones, enlaces de fallo y salidas por estado
+
+    Solo usa listas, dicts, strings y enteros para poder guardarse con marshal.
+    """
+    goto: List[Dict[str, int]] = [{}]
+    outputs: Dict[int, List[str]] = {}
+    for keyword in keywords:
+        state = 0
+        for char in keyword:
+            next_state = goto[state].get(char)
+            if next_state is None:
+                next_state = len(goto)
+                goto[state][char] = next_state
+                goto.append({})
+            state = next_state
+        outputs.setdefault(state, []).append(keyword)
+    
+    fail = [0] * len(goto)
+    queue = list(goto[0].values())
+    for state in queue:
+        for char, next_state in goto[state].items():
+            queue.append(next_state)
+            fallback = fail[state]
+            while fallback and char not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[next_state] = goto[fallback].get(char, 0) if goto[fallback].get(char) != next_state else 0
+            inherited = outputs.get(fail[next_state])
+            if inherited:
+                outputs.setdefault(next_state, []).extend(inherited)
+    return goto, fail, outputs
+
+def _is_word(char: str) -> bool:
+    # Misma definición de carácter de palabra que \w en expresiones regulares
+    return char.isalnum() or char == '_'
+
+# Versión del formato del bundle de paquetes de idioma
+BUNDLE_FORMAT = 1
+
 class VaderMultilingualCore:
     """Sistema central multiidioma de Vader"""
     
-    def __init__(self):
-        self.languages_dir = Path(__file__).parent / "languages"
-        self.supported_languages = {}
+    def __init__(self, languages_dir: Optional[str] = None):
+        self.languages_dir = Path(languages_dir) if languages_dir else Path(__file__).parent / "languages"
+        # Igual que los .pyc: un bundle por versión de intérprete junto a los fuentes
+        self.bundle_path = self.languages_dir / "__pycache__" / f"languages.{sys.implementation.cache_tag}.bundle"
+        self._languages = {}
+        self._all_loaded = False
+        self.load_times = {}  # segundos de carga por idioma
         self.current_language = "es"  # Español por defecto
-        self.load_all_languages()
+        self._detector = None
+        self._translators = {}
+    
+    @property
+    def supported_languages(self) -> Dict:
+        """Idiomas soportados; los JSON se leen en el primer acceso"""
+        if not self._all_loaded:
+            self.load_all_languages()
+        return self._languages
     
     def load_all_languages(self):
-        """Carga todos los idiomas soportados"""
+        """Carga todos los idiomas soportados
+        
+        Usa el bundle precompilado si sus marcas de tiempo coinciden con los JSON;
+        si no, parsea los JSON y regenera el bundle.
+        """
         if not self.languages_dir.exists():
             self.languages_dir.mkdir(exist_ok=True)
         
+        start = time.perf_counter()
+        stamps = self._source_stamps()
+        bundle = self._read_bundle(stamps)
+        if bundle is not None:
+            self._languages = bundle['languages']
+            self._detector = bundle['detector']
+            self._all_loaded = True
+            self._translators = {}
+            self.load_times['bundle'] = time.perf_counter() - start
+            return
+        
         # Cargar idiomas desde archivos JSON
         for lang_file in self.languages_dir.glob("*.json"):
-            lang_code = lang_file.stem
+            self._load_language_file(lang_file)
+        self._all_loaded = True
+        self._detector = None
+        self._write_bundle(stamps)
+    
+    def _source_stamps(self) -> Dict[str, List[int]]:
+        """(mtime_ns, tamaño) de cada JSON, sin leerlos"""
+        stamps = {}
+        for lang_file in self.languages_dir.glob("*.json"):
+            stat = lang_file.stat()
+            stamps[lang_file.name] = [stat.st_mtime_ns, stat.st_size]
+        return stamps
+    
+    def _read_bundle(self, stamps: Dict[str, List[int]]) -> Optional[Dict]:
+        try:
+            with open(self.bundle_path, 'rb') as f:
+                bundle = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(bundle, dict) or bundle.get('format') != BUNDLE_FORMAT \
+                or bundle.get('sources') != stamps:
+            return None
+        return bundle
+    
+    def _write_bundle(self, stamps: Dict[str, List[int]]) -> bool:
+        """Guarda paquetes y tablas de detección; si no se puede escribir, se ignora"""
+        bundle = {
+            'format': BUNDLE_FORMAT,
+            'sources': stamps,
+            'languages': self._languages,
+            'detector': self._detector or self._build_detector(),
+        }
+        temporary = self.bundle_path.with_name(f"{self.bundle_path.name}.{os.getpid()}.tmp")
+        try:
+            self.bundle_path.parent.mkdir(exist_ok=True)
+            with open(temporary, 'wb') as f:
+                marshal.dump(bundle, f)
+            os.replace(temporary, self.bundle_path)
+        except (OSError, ValueError):
             try:
-                with open(lang_file, 'r', encoding='utf-8') as f:
-                    self.supported_languages[lang_code] = json.load(f)
-            except Exception as e:
-                print(f"Error cargando idioma {lang_code}: {e}")
+                os.unlink(temporary)
+            except OSError:
+                pass
+            return False
+        return True
     
-    def detect_language(self, code: str) -> str:
-        """Detecta automáticamente el idioma del código"""
-        # Contar palabras clave de cada idioma
-        language_scores = {}
-        
+    def build_bundle(self) -> Path:
+        """Paso de build: regenera el bundle desde los JSON"""
+        self._languages = {}
+        self._all_loaded = False
+        for lang_file in self.languages_dir.glob("*.json"):
+            self._load_language_file(lang_file)
+        self._all_loaded = True
+        self._detector = None
+        if not self._write_bundle(self._source_stamps()):
+            raise OSError(f"No se pudo escribir el bundle en {self.bundle_path}")
+        return self.bundle_path
+    
+    def _load_language_file(self, lang_file: Path) -> Optional[Dict]:
+        lang_code = lang_file.stem
+        if lang_code in self._languages:
+            return self._languages[lang_code]
+        start = time.perf_counter()
+        try:
+            with open(lang_file, 'r', encoding='utf-8') as f:
+                self._languages[lang_code] = json.load(f)
+        except Exception as e:
+            print(f"Error cargando idioma {lang_code}: {e}")
+            return None
+        self.load_times[lang_code] = time.perf_counter() - start
+        return self._languages[lang_code]
+    
+    def get_language(self, lang_code: str) -> Optional[Dict]:
+        """Carga solo el paquete de un idioma"""
+        if lang_code in self._languages or self._all_loaded:
+            return self._languages.get(lang_code)
+        lang_file = self.languages_dir / f"{lang_code}.json"
+        if not lang_file.is_file():
+            return None
+        return self._load_language_file(lang_file)
+    
+    def _build_detector(self):
+        """Autómata único con las palabras clave de todos los idiomas y su peso por idioma"""
+        weights: Dict[str, Dict[str, int]] = {}
         for lang_code, lang_data in self.supported_languages.items():
-            score = 0
-            keywords = lang_data.get('keywords', {})
-            
-            # Contar coincidencias de palabras clave
-            for category, words in keywords.items():
+            for words in lang_data.get('keywords', {}).values():
                 for word in words:
-                    # Usar regex para buscar palabras completas
-                    pattern = r'\b' + re.escape(word) + r'\b'
-                    matches = len(re.findall(pattern, code, re.IGNORECASE))
-                    score += matches
-            
-            language_scores[lang_code] = score
+                    counts = weights.setdefault(word.lower(), {})
+                    counts[lang_code] = counts.get(lang_code, 0) + 1
+        
+        goto, fail, outputs = _build_automaton(weights)
+        self._detector = (goto, fail, outputs, weights)
+        return self._detector
+    
+    def detect_language(self, code: str) -> str:
+        """Detecta automáticamente el idioma del código
+        
+        Un solo recorrido del texto con un autómata de Aho–Corasick de todas las
+        palabras clave; cada coincidencia entre límites de palabra suma los pesos
+        de los idiomas que la contienen (también las solapadas, como "igual"
+        dentro de "es igual a").
+        """
+        if not self._all_loaded:
+            self.load_all_languages()
+        goto, fail, outputs, weights = self._detector or self._build_detector()
+        language_scores = dict.fromkeys(self._languages, 0)
+        
+        text = code.lower()
+        length = len(text)
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if state not in outputs:
+                continue
+            end = position + 1
+            end_boundary = (end < length and _is_word(text[end])) != _is_word(char)
+            if not end_boundary:
+                continue
+            for keyword in outputs[state]:
+                start = end - len(keyword)
+                before = start > 0 and _is_word(text[start - 1])
+                if before != _is_word(text[start]):
+                    for lang_code, count in weights[keyword].items():
+                        language_scores[lang_code] += count
         
         # Retornar el idioma con mayor puntuación
         if language_scores:
@@ -63,39 +255,50 @@ class VaderMultilingualCore:
         
         return "es"  # Español por defecto
     
-    def translate_code(self, code: str, source_lang: str, target_lang: str) -> str:
-        """Traduce código de un idioma a otro"""
-        if source_lang == target_lang:
-            return code
-        
-        if source_lang not in self.supported_languages:
+    def _build_translator(self, source_lang: str, target_lang: str):
+        """Expresión única y tabla de reemplazos para un par de idiomas"""
+        source_data = self.get_language(source_lang)
+        if source_data is None:
             raise ValueError(f"Idioma fuente no soportado: {source_lang}")
         
-        if target_lang not in self.supported_languages:
+        target_data = self.get_language(target_lang)
+        if target_data is None:
             raise ValueError(f"Idioma objetivo no soportado: {target_lang}")
         
-        source_keywords = self.supported_languages[source_lang]['keywords']
-        target_keywords = self.supported_languages[target_lang]['keywords']
-        
-        translated_code = code
+        source_keywords = source_data['keywords']
+        target_keywords = target_data['keywords']
         
-        # Traducir por categorías de palabras clave
+        # Mapear palabras fuente a objetivo por categoría y posición; la primera gana
+        replacements = {}
         for category in source_keywords:
             if category in target_keywords:
-                source_words = source_keywords[category]
                 target_words = target_keywords[category]
-                
-                # Mapear palabras fuente a objetivo
-                for i, source_word in enumerate(source_words):
+                for i, source_word in enumerate(source_keywords[category]):
                     if i < len(target_words):
-                        target_word = target_words[i]
-                        # Reemplazar palabra completa
-                        pattern = r'\b' + re.escape(source_word) + r'\b'
-                        translated_code = re.sub(
-                            pattern, target_word, translated_code, flags=re.IGNORECASE
-                        )
+                        replacements.setdefault(source_word.lower(), target_words[i])
+        
+        if not replacements:
+            translator = (None, replacements)
+        else:
+            translator = (re.compile(r'\b(?:' + _trie_pattern(replacements) + r')\b', re.IGNORECASE),
+                          replacements)
+        self._translators[(source_lang, target_lang)] = translator
+        return translator
+    
+    def translate_code(self, code: str, source_lang: str, target_lang: str) -> str:
+        """Traduce código de un idioma a otro
+        
+        Todas las palabras clave se reescriben en una sola pasada; en cada posición
+        gana la más larga ("end if" antes que "if").
+        """
+        if source_lang == target_lang:
+            return code
         
-        return translated_code
+        pattern, replacements = self._translators.get((source_lang, target_lang)) or \
+            self._build_translator(source_lang, target_lang)
+        if pattern is None:
+            return code
+        return pattern.sub(lambda match: replacements[match.group(0).lower()], code)
     
     def normalize_to_spanish(self, code: str, source_lang: str = None) -> str:
         """Normaliza código de cualquier idioma a español (idioma base)"""
@@ -125,12 +328,12 @@ class VaderMultilingualCore:
         errors = []
         warnings = []
         
-        if lang not in self.supported_languages:
+        lang_data = self.get_language(lang)
+        if lang_data is None:
             errors.append(f"Idioma no soportado: {lang}")
             return errors, warnings
         
         # Validaciones básicas
-        lang_data = self.supported_languages[lang]
         keywords = lang_data.get('keywords', {})
         
         # Verificar estructura básica
@@ -152,7 +355,7 @@ class VaderMultilingualCore:
     
     def get_language_info(self, lang_code: str) -> Optional[Dict]:
         """Obtiene información detallada de un idioma"""
-        return self.supported_languages.get(lang_code)
+        return self.get_language(lang_code)
     
     def create_language_template(self, lang_code: str, lang_name: str, native_name: str) -> Dict:
         """Crea plantilla para nuevo idioma"""
@@ -183,3 +386,12 @@ class VaderMultilingualCore:
 
 # Instancia global del sistema multiidioma
 multilingual_system = VaderMultilingualCore()
+
+def build_language_bundle(languages_dir: Optional[str] = None) -> Path:
+    """Compila los paquetes de idioma en un único bundle binario"""
+    return VaderMultilingualCore(languages_dir).build_bundle()
+
+if __name__ == "__main__":
+    if '--build-bundle' in sys.argv:
+        path = build_language_bundle()
+        print(f"📦 Bundle de idiomas generado: {path}")
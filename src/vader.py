@@ -7,40 +7,79 @@ Vader no es un lenguaje de programación, Vader es LA PROGRAMACIÓN:
 libre, descentralizada y accesible a todos
 """
 
-import argparse
 import sys
+import time
+
+_STARTUP_START = time.perf_counter()
+
+def _install_import_profiler():
+    """Mide cada import nuevo al estilo de `python -X importtime` (self y acumulado, en µs)"""
+    import builtins
+    original_import = builtins.__import__
+    records = []
+    stack = [0.0]
+    
+    def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and name in sys.modules:
+            return original_import(name, globals, locals, fromlist, level)
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            children = stack.pop()
+            stack[-1] += cumulative
+            label = '.' * level + (name or ', '.join(fromlist or ()))
+            records.append((len(stack) - 1, label, cumulative - children, cumulative))
+    
+    builtins.__import__ = timed_import
+    return records
+
+# --startup-profile se procesa antes de cualquier otro import para poder medirlos
+_IMPORT_RECORDS = None
+if '--startup-profile' in sys.argv:
+    sys.argv.remove('--startup-profile')
+    _IMPORT_RECORDS = _install_import_profiler()
+
+import argparse
 import os
 from pathlib import Path
-try:
-    from conversational_integration import integrate_conversational_with_vader, detect_conversational_file
-except ImportError:
-    # Funciones de respaldo si el módulo no está disponible
-    def integrate_conversational_with_vader(code):
+
+def integrate_conversational_with_vader(code, verbose=False):
+    """Procesa sintaxis conversacional; el parser se importa solo si hace falta"""
+    try:
+        from conversational_integration import integrate_conversational_with_vader as integrate
+    except ImportError:
         return code
-    def detect_conversational_file(filepath):
+    return integrate(code, verbose=verbose)
+
+def detect_conversational_file(filepath):
+    try:
+        from conversational_integration import detect_conversational_file as detect
+    except ImportError:
         return False
+    return detect(filepath)
 
 # Agregar el directorio raíz al path para que encuentre el módulo transpilers
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-try:
-    from transpilers import python, javascript, java, csharp, go, rust, swift, kotlin, typescript, dart, php, ruby, solidity, html, css, gui_advanced, electron
-except ImportError as e:
-    print(f"Warning: Some transpilers could not be imported: {e}")
-    # Crear transpiladores de respaldo
-    class DummyTranspiler:
-        def transpile_to_python(self, code): return code
-        def transpile_to_javascript(self, code): return code
-        def transpilar(self, code): return code
-    python = javascript = java = csharp = go = rust = swift = kotlin = DummyTranspiler()
-    typescript = dart = php = ruby = solidity = html = css = gui_advanced = electron = DummyTranspiler()
+# Los backends se importan al usarse por primera vez (ver transpilers/__init__.py)
+from transpilers import LazyTranspiler
+python, javascript, java, csharp, go, rust, swift, kotlin, typescript, dart, php, ruby, solidity, \
+    html, css, gui_advanced, electron = (LazyTranspiler(name) for name in (
+        'python', 'javascript', 'java', 'csharp', 'go', 'rust', 'swift', 'kotlin', 'typescript',
+        'dart', 'php', 'ruby', 'solidity', 'html', 'css', 'gui_advanced', 'electron'))
 
-try:
-    from vader_interpreter import VaderNativeRuntime
-except ImportError:
-    class VaderNativeRuntime:
-        def __init__(self): pass
-        def execute(self, code): return code
+def load_native_runtime():
+    """Importa el intérprete nativo solo para --run/--interpret"""
+    try:
+        from vader_interpreter import VaderNativeRuntime
+    except ImportError:
+        class VaderNativeRuntime:
+            def __init__(self): pass
+            def execute(self, code): return code
+    return VaderNativeRuntime
 
 try:
     from multilingual_core import multilingual_system
@@ -51,6 +90,11 @@ except ImportError:
         def translate_code(self, code, source, target): return code
     multilingual_system = DummyMultilingual()
 
+try:
+    import vader_transpile_cache
+except ImportError:
+    vader_transpile_cache = None
+
 # Versión de Vader
 VADER_VERSION = "7.0.0"
 VADER_CODENAME = "UNIVERSAL"
@@ -217,12 +261,36 @@ def create_argument_parser():
         help='Interpretar el archivo .vdr nativamente'
     )
     
+    parser.add_argument(
+        '--native',
+        action='store_true',
+        help='Ejecutar el archivo .vdr compilando sus funciones numéricas a código nativo (C)'
+    )
+    
     parser.add_argument(
         '--debug',
         action='store_true',
         help='Activar modo debug para el intérprete nativo'
     )
     
+    parser.add_argument(
+        '--no-compile',
+        action='store_true',
+        help='Interpretar línea a línea sin compilar el programa (modo heredado)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='No usar la caché persistente de transpilación (~/.cache/vader)'
+    )
+    
+    parser.add_argument(
+        '--startup-profile',
+        action='store_true',
+        help='Muestra en stderr el tiempo de arranque e imports (al estilo de -X importtime)'
+    )
+    
     parser.add_argument(
         '--list-targets', '-l',
         action='store_true',
@@ -545,8 +613,51 @@ def detect_css_content(codigo):
     
     return False
 
-def transpile_code(codigo, target_lang, framework=None, verbose=False):
-    """Transpila el código Vader al lenguaje objetivo"""
+def transpile_code(codigo, target_lang, framework=None, verbose=False, use_cache=True,
+                   source_language=None):
+    """Transpila el código Vader al lenguaje objetivo
+    
+    Los resultados se guardan en una caché persistente indexada por el hash del
+    código, el idioma fuente, el lenguaje objetivo, el framework y la versión de
+    los transpiladores. El código en otro idioma se normaliza a español solo
+    cuando no está en la caché.
+    """
+    if source_language == 'es':
+        source_language = None
+    cache = None
+    if use_cache and vader_transpile_cache and not vader_transpile_cache.cache_disabled():
+        try:
+            cache = vader_transpile_cache.get_default_cache()
+            key = cache.make_key(codigo, target_lang, framework,
+                                 vader_transpile_cache.transpiler_fingerprint(VADER_VERSION),
+                                 source_language)
+            resultado = cache.get(key)
+        except Exception as e:
+            if verbose:
+                print(f"Advertencia: caché de transpilación no disponible: {e}")
+            cache = None
+        else:
+            if resultado is not None:
+                if verbose:
+                    print(f"Resultado obtenido de la caché ({key[:12]})")
+                return resultado
+    
+    if source_language:
+        if verbose:
+            print(f"🔄 Normalizando código de {source_language} a español para transpilación...")
+        codigo = multilingual_system.normalize_to_spanish(codigo, source_language)
+    resultado = _transpile_uncached(codigo, target_lang, framework, verbose)
+    
+    if cache is not None and resultado is not None:
+        try:
+            cache.put(key, target_lang, resultado)
+        except Exception as e:
+            if verbose:
+                print(f"Advertencia: no se pudo guardar en la caché: {e}")
+    return resultado
+
+def _transpile_uncached(codigo, target_lang, framework=None, verbose=False):
+    """Ejecuta el pipeline completo de transpilación"""
     if verbose:
         print(f"Transpilando a {SUPPORTED_LANGUAGES[target_lang]['description']}...")
         if framework:
@@ -931,8 +1042,230 @@ def handle_ai_optimize(codigo):
         print(f"❌ Error durante la optimización: {e}")
         return codigo
 
+def print_startup_profile(records, limit=25):
+    """Informe de arranque: imports más costosos y backends/idiomas cargados"""
+    total = time.perf_counter() - _STARTUP_START
+    out = sys.stderr
+    print("⏱️  Perfil de arranque de Vader", file=out)
+    print("import time: self [us] | cumulative | imported package", file=out)
+    for depth, name, own, cumulative in sorted(records, key=lambda r: r[3], reverse=True)[:limit]:
+        print(f"import time: {own * 1e6:9.0f} | {cumulative * 1e6:10.0f} | {'  ' * depth}{name}", file=out)
+    
+    import transpilers
+    for name, seconds in transpilers.load_times.items():
+        print(f"backend cargado: {name} ({seconds * 1000:.1f} ms)", file=out)
+    packs = dict(getattr(multilingual_system, 'load_times', {}))
+    bundle = packs.pop('bundle', None)
+    if bundle is not None:
+        print(f"bundle de idiomas: {bundle * 1000:.1f} ms", file=out)
+    if packs:
+        print(f"paquetes de idioma: {len(packs)} ({sum(packs.values()) * 1000:.1f} ms)", file=out)
+    top_level = sum(r[3] for r in records if r[0] == 0)
+    print(f"imports: {top_level * 1000:.1f} ms, total: {total * 1000:.1f} ms", file=out)
+
+def handle_cache_command(argv):
+    """Subcomando `vader cache stats|clear`"""
+    parser = argparse.ArgumentParser(prog='vader cache', description='Gestiona la caché de transpilación')
+    parser.add_argument('accion', choices=['stats', 'clear'], help='Mostrar estadísticas o vaciar la caché')
+    args = parser.parse_args(argv)
+    
+    if vader_transpile_cache is None:
+        print("❌ Error: Caché de transpilación no disponible")
+        return 1
+    
+    cache = vader_transpile_cache.get_default_cache()
+    if args.accion == 'stats':
+        vader_transpile_cache.print_stats(cache)
+    else:
+        cache.clear()
+        print(f"🧹 Caché vaciada: {cache.cache_dir}")
+    return 0
+
+def discover_vader_files(patterns):
+    """Encuentra archivos .vdr a partir de directorios o patrones glob"""
+    import glob
+    files = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = (str(path) for path in Path(pattern).rglob('*.vdr'))
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for match in sorted(matches):
+            resolved = os.path.abspath(match)
+            if os.path.isfile(resolved) and resolved not in seen:
+                seen.add(resolved)
+                files.append(match)
+    return files
+
+def _build_output_path(source, target_lang, output_dir=None, base_dir=None):
+    """Ruta de salida: junto al fuente o replicando la estructura en output_dir"""
+    extension = SUPPORTED_LANGUAGES[target_lang]['extension']
+    stem = os.path.splitext(source)[0]
+    if not output_dir:
+        return stem + extension
+    relative = os.path.relpath(stem, base_dir) if base_dir else os.path.basename(stem)
+    return os.path.join(output_dir, relative + extension)
+
+_build_options = {}
+
+def _build_worker_init(options):
+    """Inicializa un worker: guarda opciones y calienta transpiladores e intérprete"""
+    import io
+    from contextlib import redirect_stdout
+    _build_options.update(options)
+    with redirect_stdout(io.StringIO()):
+        try:
+            _transpile_uncached('mostrar "vader"\n', options['target'], options.get('framework'))
+        except Exception:
+            pass
+
+def _build_one(job):
+    """Transpila un archivo aislando sus errores del resto del build"""
+    import io
+    import time
+    from contextlib import redirect_stdout
+    source, output_path = job
+    options = _build_options
+    start = time.perf_counter()
+    messages = io.StringIO()
+    try:
+        with open(source, 'r', encoding='utf-8') as f:
+            codigo = f.read()
+        with redirect_stdout(messages):
+            if detect_conversational_file(source):
+                codigo = integrate_conversational_with_vader(codigo)
+            resultado = transpile_code(codigo, options['target'], framework=options.get('framework'),
+                                       use_cache=options.get('use_cache', True))
+        if resultado is None:
+            raise RuntimeError(messages.getvalue().strip() or 'la transpilación no produjo resultado')
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(resultado)
+        return {'source': source, 'output': output_path, 'ok': True,
+                'error': None, 'time': time.perf_counter() - start}
+    except Exception as e:
+        return {'source': source, 'output': output_path, 'ok': False,
+                'error': f"{type(e).__name__}: {e}", 'time': time.perf_counter() - start}
+
+def build_files(files, target_lang, jobs=None, framework=None, output_dir=None, base_dir=None,
+                use_cache=True):
+    """Transpila varios archivos en un pool de procesos y devuelve un resultado por archivo"""
+    from concurrent.futures import ProcessPoolExecutor
+    options = {'target': target_lang, 'framework': framework, 'use_cache': use_cache}
+    work = [(source, _build_output_path(source, target_lang, output_dir, base_dir)) for source in files]
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(work) or 1))
+    
+    if jobs == 1:
+        _build_worker_init(options)
+        return [_build_one(job) for job in work]
+    
+    # Lotes medianos: menos viajes entre procesos sin desequilibrar la carga
+    chunksize = max(1, len(work) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_build_worker_init,
+                             initargs=(options,)) as executor:
+        return list(executor.map(_build_one, work, chunksize=chunksize))
+
+def handle_build_command(argv):
+    """Subcomando `vader build <dir|glob>... --target X [--jobs N]`"""
+    import time
+    parser = argparse.ArgumentParser(prog='vader build',
+                                     description='Transpila en paralelo todos los .vdr de un directorio o patrón')
+    parser.add_argument('rutas', nargs='+', help='Directorios o patrones glob (p. ej. "src/**/*.vdr")')
+    parser.add_argument('--target', '-t', required=True, choices=list(SUPPORTED_LANGUAGES.keys()),
+                        help='Lenguaje objetivo para la transpilación')
+    parser.add_argument('--jobs', '-j', type=int, default=None,
+                        help='Número de procesos (por defecto, uno por CPU)')
+    parser.add_argument('--framework', '-f', help='Framework específico del lenguaje objetivo')
+    parser.add_argument('--output-dir', '-o', help='Directorio de salida (por defecto, junto a cada fuente)')
+    parser.add_argument('--no-cache', action='store_true', help='No usar la caché persistente de transpilación')
+    parser.add_argument('--verbose', action='store_true', help='Mostrar cada archivo procesado')
+    args = parser.parse_args(argv)
+    
+    files = discover_vader_files(args.rutas)
+    if not files:
+        print("❌ Error: No se encontraron archivos .vdr")
+        return 1
+    
+    # La estructura de directorios se replica a partir del directorio común
+    if len(args.rutas) == 1 and os.path.isdir(args.rutas[0]):
+        base_dir = args.rutas[0]
+    else:
+        base_dir = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files])
+    
+    print(f"🔨 Transpilando {len(files)} archivos a {args.target}...")
+    start = time.perf_counter()
+    results = build_files(files, args.target, jobs=args.jobs, framework=args.framework,
+                          output_dir=args.output_dir, base_dir=base_dir, use_cache=not args.no_cache)
+    elapsed = time.perf_counter() - start
+    
+    failures = [r for r in results if not r['ok']]
+    if args.verbose:
+        for r in results:
+            if r['ok']:
+                print(f"  ✅ {r['source']} -> {r['output']} ({r['time'] * 1000:.1f} ms)")
+    for r in failures:
+        print(f"  ❌ {r['source']}: {r['error']}")
+    
+    print("=" * 50)
+    print(f"📊 Resumen: {len(results) - len(failures)} correctos, {len(failures)} con errores, "
+          f"{elapsed:.2f}s en total")
+    return 1 if failures else 0
+
+def handle_watch_command(argv):
+    """Subcomando `vader watch <dir> --target X`: retranspila al guardar"""
+    parser = argparse.ArgumentParser(prog='vader watch',
+                                     description='Observa un directorio y retranspila los archivos cambiados y sus dependientes')
+    parser.add_argument('directorio', help='Directorio del proyecto Vader')
+    parser.add_argument('--target', '-t', required=True, choices=list(SUPPORTED_LANGUAGES.keys()),
+                        help='Lenguaje objetivo para la transpilación')
+    parser.add_argument('--framework', '-f', help='Framework específico del lenguaje objetivo')
+    parser.add_argument('--output-dir', '-o', help='Directorio de salida (por defecto, junto a cada fuente)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Procesos para el build inicial (por defecto 1)')
+    parser.add_argument('--poll', action='store_true', help='Forzar sondeo en lugar de inotify')
+    parser.add_argument('--interval', type=float, default=0.5, help='Intervalo de sondeo en segundos')
+    parser.add_argument('--no-cache', action='store_true', help='No usar la caché persistente de transpilación')
+    args = parser.parse_args(argv)
+    
+    if not os.path.isdir(args.directorio):
+        print(f"❌ Error: {args.directorio} no es un directorio")
+        return 1
+    
+    from vader_watch import watch
+    base_dir = os.path.abspath(args.directorio)
+    initial = [True]
+    
+    def build(paths):
+        # El build inicial puede usar el pool; los incrementales van en proceso
+        jobs = args.jobs if initial[0] else 1
+        initial[0] = False
+        return build_files(paths, args.target, jobs=jobs, framework=args.framework,
+                           output_dir=args.output_dir, base_dir=base_dir, use_cache=not args.no_cache)
+    
+    watch(args.directorio, build, polling=args.poll, interval=args.interval)
+    return 0
+
+# Subcomandos que se despachan antes del parser principal
+SUBCOMMANDS = {
+    'cache': handle_cache_command,
+    'build': handle_build_command,
+    'watch': handle_watch_command,
+}
+
 def main():
-    """Función principal del transpilador Vader"""
+    """Función principal del transpilador Vader (también la del script `vader` instalado)"""
+    try:
+        return run_cli()
+    finally:
+        if _IMPORT_RECORDS is not None:
+            print_startup_profile(_IMPORT_RECORDS)
+
+def run_cli():
+    """Procesa los subcomandos y argumentos de la línea de comandos"""
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+    
     parser = create_argument_parser()
     args = parser.parse_args()
     
@@ -961,6 +1294,20 @@ def main():
     if args.ai_generate:
         return handle_ai_generate(args)
     
+    # Funciones numéricas en C (.so cargada con ctypes), el resto por la ruta Python
+    if args.native:
+        if not args.archivo:
+            print("❌ Error: Se requiere especificar un archivo .vdr para ejecutar")
+            return 1
+        from vader_native import NativeFunction, execute_vader_file
+        namespace = execute_vader_file(args.archivo)
+        if args.debug:
+            for value in namespace.values():
+                if isinstance(value, NativeFunction):
+                    print(f"⚡ {value.__name__}: {value.native_calls} llamadas nativas, "
+                          f"{value.fallback_calls} en Python")
+        return 0
+    
     # NUEVO: Manejar intérprete nativo
     if args.run or args.interpret:
         if not args.archivo:
@@ -971,8 +1318,9 @@ def main():
         print(f"🚀 Ejecutando {args.archivo} con Vader Native Runtime...")
         
         # Crear runtime nativo
-        runtime = VaderNativeRuntime()
+        runtime = load_native_runtime()()
         runtime.debug_mode = args.debug
+        runtime.compiled_mode = not args.no_compile
         
         if args.debug:
             print(f"📁 Archivo: {args.archivo}")
@@ -1085,11 +1433,15 @@ def main():
         else:
             return 1
     
-    # Normalizar código a español (idioma base) para transpilación
-    if source_language and source_language != 'es':
+    # Normalizar código a español (idioma base): para transpilar lo hace transpile_code
+    # tras consultar la caché; IA y verificación de sintaxis lo necesitan ya normalizado
+    needs_spanish = (args.ai_analyze or args.ai_check_errors or args.ai_suggest
+                     or args.ai_optimize or args.check_syntax)
+    if source_language and source_language != 'es' and needs_spanish:
         if args.verbose:
             print(f"🔄 Normalizando código de {source_language} a español para transpilación...")
         codigo = multilingual_system.normalize_to_spanish(codigo, source_language)
+        source_language = 'es'
     
     # Manejar comandos de IA con archivo existente
     if args.ai_analyze:
@@ -1164,7 +1516,8 @@ def main():
             return 0
     
     # Transpilar el código
-    resultado = transpile_code(codigo, args.target, framework=args.framework, verbose=args.verbose)
+    resultado = transpile_code(codigo, args.target, framework=args.framework, verbose=args.verbose,
+                               use_cache=not args.no_cache, source_language=source_language)
     if resultado is None:
         return 1
     
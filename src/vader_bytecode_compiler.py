@@ -16,17 +16,38 @@ Versión: 8.0 Bytecode Native
 
 import ast
 import dis
+import os
+import sys
+import copy
+import json
 import time
 import struct
+import hashlib
 import logging
-from typing import Dict, List, Any, Optional, Union
-from dataclasses import dataclass
+import operator
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple, Union
+from dataclasses import dataclass, field, replace
 from enum import Enum
 
+try:
+    import vader_transpile_cache
+except ImportError:
+    vader_transpile_cache = None
+
+try:
+    import vader_native
+except ImportError:
+    vader_native = None
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+COMPILER_VERSION = "8.0"
+DEFAULT_CACHE_ENTRIES = 256
+
 class CompilationTarget(Enum):
     """Objetivos de compilación"""
     PYTHON_BYTECODE = "python_bytecode"
@@ -47,30 +68,901 @@ class CompilationResult:
     compilation_time: float
     instructions_count: int
     size_bytes: int
+    pass_stats: List['OptimizationPassStats'] = field(default_factory=list)
+
+class VaderCompilationCache:
+    """Caché LRU acotada de resultados de compilación, con nivel opcional en disco
+
+    La clave es un digest estable (no `hash()`, que cambia en cada proceso) del
+    código, el objetivo, los pases activos y las versiones del compilador y de
+    CPython. El nivel en disco usa VaderTranspileCache (SQLite en modo WAL), así
+    que varios procesos pueden compartirlo.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES, cache_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, CompilationResult]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.cache_dir = cache_dir
+        if cache_dir is not None and (vader_transpile_cache is None or vader_transpile_cache.cache_disabled()):
+            self.cache_dir = None
+        # sqlite3 no permite compartir una conexión entre hilos
+        self._local = threading.local()
+
+    @staticmethod
+    def make_key(source: str, target: 'CompilationTarget', level: int, passes: List[str]) -> str:
+        """Clave direccionada por contenido, estable entre procesos"""
+        version = COMPILER_VERSION
+        if vader_transpile_cache is not None:
+            # Incluye tamaño y mtime de los módulos: editar el compilador invalida el disco
+            version = vader_transpile_cache.transpiler_fingerprint(COMPILER_VERSION)
+        digest = hashlib.sha256()
+        for part in (version, sys.implementation.cache_tag or '', target.value,
+                     str(level), ','.join(passes), source):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def _disk(self):
+        disk = getattr(self._local, 'disk', None)
+        if disk is None and self.cache_dir is not None:
+            disk = self._local.disk = vader_transpile_cache.VaderTranspileCache(self.cache_dir)
+        return disk
+
+    def get(self, key: str, source: str) -> Optional['CompilationResult']:
+        """Busca en memoria y después en disco; actualiza el orden LRU"""
+        with self.lock:
+            result = self.entries.get(key)
+            if result is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return result
+        result = self._disk_get(key, source)
+        with self.lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, result)
+        return result
+
+    def put(self, key: str, result: 'CompilationResult'):
+        with self.lock:
+            self._store(key, result)
+        self._disk_put(key, result)
+
+    def _store(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_get(self, key, source):
+        disk = self._disk()
+        if disk is None:
+            return None
+        try:
+            payload = disk.get(key)
+        except Exception as e:
+            logger.warning(f"Caché de compilación en disco no disponible: {e}")
+            return None
+        return _result_from_json(payload, source) if payload is not None else None
+
+    def _disk_put(self, key, result):
+        disk = self._disk()
+        if disk is None:
+            return
+        try:
+            disk.put(key, f'bytecode:{result.target.value}', _result_to_json(result))
+        except Exception as e:
+            logger.warning(f"No se pudo guardar en la caché de compilación: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'disk': self.cache_dir,
+            }
+
+    def clear(self):
+        """Vacía el nivel en memoria (el de disco se gestiona con `vader cache clear`)"""
+        with self.lock:
+            self.entries.clear()
+
+def _result_to_json(result: 'CompilationResult') -> str:
+    return json.dumps({
+        'target': result.target.value,
+        'compiled_code': result.compiled_code,
+        'bytecode': result.bytecode.hex() if result.bytecode is not None else None,
+        'optimization_level': result.optimization_level,
+        'compilation_time': result.compilation_time,
+        'instructions_count': result.instructions_count,
+        'size_bytes': result.size_bytes,
+        'pass_stats': [[s.name, s.seconds, s.nodes_before, s.nodes_after] for s in result.pass_stats],
+    })
+
+def _result_from_json(payload: str, source: str) -> 'CompilationResult':
+    data = json.loads(payload)
+    return CompilationResult(
+        success=True,
+        target=CompilationTarget(data['target']),
+        source_code=source,
+        compiled_code=data['compiled_code'],
+        bytecode=bytes.fromhex(data['bytecode']) if data['bytecode'] is not None else None,
+        optimization_level=data['optimization_level'],
+        compilation_time=data['compilation_time'],
+        instructions_count=data['instructions_count'],
+        size_bytes=data['size_bytes'],
+        pass_stats=[OptimizationPassStats(*stats) for stats in data['pass_stats']]
+    )
+
+# ============================================================================
+# OPTIMIZADOR DE AST: PASES Y GESTOR DE PASES
+# ============================================================================
+#
+# Los pases suponen que el programa no manipula su propio espacio de nombres
+# (exec/eval/globals/locals/vars o `from x import *`); si lo hace, los pases
+# basados en flujo de datos dejan el árbol intacto. Los nombres declarados
+# `global`/`nonlocal` en cualquier punto nunca se consideran conocidos.
+
+UNROLL_MAX_TRIPS = 8
+UNROLL_MAX_STATEMENTS = 64
+MAX_FOLDED_SEQUENCE = 4096
+MAX_FOLDED_INT_BITS = 128
+
+# Pases por nivel, en orden de ejecución. El nivel 3 contiene todos los pases.
+OPTIMIZATION_PIPELINES = {
+    0: (),
+    1: ('constant_folding',),
+    2: ('constant_propagation', 'dead_code_elimination', 'common_subexpression_elimination',
+        'loop_invariant_code_motion', 'strength_reduction'),
+    3: ('constant_propagation', 'loop_unrolling', 'constant_folding', 'constant_propagation',
+        'dead_code_elimination', 'common_subexpression_elimination',
+        'loop_invariant_code_motion', 'strength_reduction'),
+}
+
+_SCOPE_BARRIERS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda,
+                   ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_NAMESPACE_CALLS = {'exec', 'eval', 'globals', 'locals', 'vars'}
+_LOOPS = (ast.For, ast.AsyncFor, ast.While)
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+    ast.Pow: operator.pow, ast.LShift: operator.lshift, ast.RShift: operator.rshift,
+    ast.BitAnd: operator.and_, ast.BitOr: operator.or_, ast.BitXor: operator.xor,
+}
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos, ast.USub: operator.neg, ast.Not: operator.not_, ast.Invert: operator.invert,
+}
+# `is` no se pliega: su resultado depende del interning de CPython
+_COMPARE_OPERATORS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b, ast.NotIn: lambda a, b: a not in b,
+}
+_FOLDABLE_TYPES = (int, float, complex, str, bytes, bool, tuple, type(None))
+
+# Operadores que, sobre int o float exactos, nunca lanzan excepción
+# (necesario para sacar expresiones de bucles que quizá no se ejecuten)
+_NON_RAISING_OPS = (ast.Add, ast.Sub, ast.Mult, ast.BitAnd, ast.BitOr, ast.BitXor,
+                    ast.UAdd, ast.USub, ast.Invert)
+_INT_OPS = (ast.Add, ast.Sub, ast.Mult, ast.FloorDiv, ast.Mod, ast.BitAnd, ast.BitOr,
+            ast.BitXor, ast.LShift, ast.RShift)
+_FLOAT_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod)
+_KIND_BUILTINS = {'len': 'int', 'int': 'int', 'float': 'float', 'abs': None}
+
+@dataclass
+class OptimizationPassStats:
+    """Tiempo y efecto de un pase de optimización"""
+    name: str
+    seconds: float
+    nodes_before: int
+    nodes_after: int
+
+    @property
+    def node_delta(self) -> int:
+        return self.nodes_after - self.nodes_before
+
+def _count_nodes(tree: ast.AST) -> int:
+    return sum(1 for _ in ast.walk(tree))
+
+def _stored_names(node: ast.AST) -> Set[str]:
+    """Nombres que `node` puede (re)asignar o borrar, en cualquier ámbito anidado"""
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            if not isinstance(child.ctx, ast.Load):
+                names.add(child.id)
+        elif isinstance(child, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split('.')[0] for alias in child.names)
+        elif isinstance(child, (ast.Global, ast.Nonlocal)):
+            names.update(child.names)
+        elif isinstance(getattr(child, 'name', None), str) and not isinstance(child, ast.alias):
+            # def, class, except ... as x, patrones de match
+            names.add(child.name)
+        if isinstance(getattr(child, 'rest', None), str):
+            names.add(child.rest)
+    return names
+
+def _walrus_names(node: ast.AST) -> Set[str]:
+    return {child.target.id for child in ast.walk(node) if isinstance(child, ast.NamedExpr)}
+
+def _pinned_names(tree: ast.AST) -> Set[str]:
+    """Nombres declarados global/nonlocal: otro ámbito puede cambiarlos"""
+    pinned = set()
+    for child in ast.walk(tree):
+        if isinstance(child, (ast.Global, ast.Nonlocal)):
+            pinned.update(child.names)
+    return pinned
+
+def _is_optimizable(tree: ast.AST) -> bool:
+    for child in ast.walk(tree):
+        if isinstance(child, ast.ImportFrom) and any(alias.name == '*' for alias in child.names):
+            return False
+        if (isinstance(child, ast.Call) and isinstance(child.func, ast.Name)
+                and child.func.id in _NAMESPACE_CALLS):
+            return False
+    return True
+
+def _is_range_call(node: ast.AST, rebound: Set[str]) -> bool:
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            and node.func.id == 'range' and 'range' not in rebound and not node.keywords)
+
+def _binds_scope(statements: List[ast.stmt]) -> bool:
+    """True si eliminar estas sentencias cambiaría el tipo o los ámbitos de la función"""
+    return any(isinstance(child, (ast.Yield, ast.YieldFrom, ast.Await, ast.Global, ast.Nonlocal))
+               for statement in statements for child in ast.walk(statement))
+
+def _exits_loop(statements: List[ast.stmt]) -> bool:
+    """True si hay un break/continue que pertenece al bucle que contiene estas sentencias"""
+    for statement in statements:
+        if isinstance(statement, (ast.Break, ast.Continue)):
+            return True
+        if isinstance(statement, _SCOPE_BARRIERS):
+            continue
+        if isinstance(statement, _LOOPS):
+            # dentro de un bucle anidado solo su `else` sigue perteneciendo al nuestro
+            if _exits_loop(statement.orelse):
+                return True
+            continue
+        for name in ('body', 'orelse', 'finalbody', 'handlers', 'cases'):
+            children = getattr(statement, name, None)
+            if isinstance(children, list) and children and isinstance(children[0], ast.stmt):
+                if _exits_loop(children):
+                    return True
+            elif isinstance(children, list) and any(_exits_loop(child.body) for child in children):
+                return True
+    return False
+
+def _fill_empty_bodies(tree: ast.AST):
+    """Los pases pueden vaciar bloques; Python exige al menos una sentencia"""
+    for node in ast.walk(tree):
+        body = getattr(node, 'body', None)
+        if isinstance(body, list) and not body and not isinstance(node, ast.Module):
+            node.body = [ast.Pass()]
+
+def _safe_to_fold(op: ast.operator, left: Any, right: Any) -> bool:
+    """Evita plegar constantes enormes (2 ** 10 ** 9, 'x' * 10 ** 9...)"""
+    if isinstance(op, ast.Pow) and isinstance(left, int) and isinstance(right, int):
+        return right < 0 or abs(left) <= 1 or left.bit_length() * right <= MAX_FOLDED_INT_BITS
+    if isinstance(op, ast.LShift) and isinstance(left, int) and isinstance(right, int):
+        return 0 <= right and left.bit_length() + right <= MAX_FOLDED_INT_BITS
+    if isinstance(op, ast.Mult):
+        for sequence, count in ((left, right), (right, left)):
+            if isinstance(sequence, (str, bytes, tuple)) and isinstance(count, int):
+                return len(sequence) * count <= MAX_FOLDED_SEQUENCE
+    if isinstance(op, ast.Add) and isinstance(left, (str, bytes, tuple)):
+        return len(left) + len(right) <= MAX_FOLDED_SEQUENCE
+    return True
+
+class _ExpressionTransformer(ast.NodeTransformer):
+    """Transformador que no entra en ámbitos anidados (lambdas, comprensiones, def)"""
+
+    def _skip(self, node):
+        return node
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = _skip
+    visit_Lambda = visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = _skip
+
+class _ConstantFolder(ast.NodeTransformer):
+    """Evalúa en compilación operaciones, comparaciones y lógica entre constantes"""
+
+    @staticmethod
+    def _constant(node):
+        return isinstance(node, ast.Constant) and isinstance(node.value, _FOLDABLE_TYPES)
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        function = _BINARY_OPERATORS.get(type(node.op))
+        if function is None or not (self._constant(node.left) and self._constant(node.right)):
+            return node
+        left, right = node.left.value, node.right.value
+        if not _safe_to_fold(node.op, left, right):
+            return node
+        try:
+            return ast.copy_location(ast.Constant(value=function(left, right)), node)
+        except (ArithmeticError, TypeError, ValueError):
+            return node  # el error debe producirse en ejecución
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if not self._constant(node.operand):
+            return node
+        try:
+            value = _UNARY_OPERATORS[type(node.op)](node.operand.value)
+        except (ArithmeticError, TypeError, ValueError):
+            return node
+        return ast.copy_location(ast.Constant(value=value), node)
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        operands = [node.left] + node.comparators
+        if not all(self._constant(operand) for operand in operands):
+            return node
+        if not all(type(op) in _COMPARE_OPERATORS for op in node.ops):
+            return node
+        try:
+            value = all(_COMPARE_OPERATORS[type(op)](a.value, b.value)
+                        for op, a, b in zip(node.ops, operands, operands[1:]))
+        except (ArithmeticError, TypeError, ValueError):
+            return node
+        return ast.copy_location(ast.Constant(value=value), node)
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        # `and` se detiene en el primer valor falso, `or` en el primero verdadero
+        stop = isinstance(node.op, ast.Or)
+        values = []
+        for index, value in enumerate(node.values):
+            if self._constant(value) and index < len(node.values) - 1:
+                if bool(value.value) == stop:
+                    values.append(value)
+                    break
+                continue  # constante que no corta: no afecta al resultado
+            values.append(value)
+        if len(values) == 1:
+            return values[0]
+        node.values = values
+        return node
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        if self._constant(node.test):
+            return node.body if node.test.value else node.orelse
+        return node
+
+class _DeadCodeEliminator(ast.NodeTransformer):
+    """Elimina ramas con condición constante y código tras return/raise/break/continue"""
+
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        for name in ('body', 'orelse', 'finalbody'):
+            statements = getattr(node, name, None)
+            if isinstance(statements, list):
+                setattr(node, name, self._prune(statements))
+        return node
+
+    @staticmethod
+    def _prune(statements):
+        for index, statement in enumerate(statements):
+            if isinstance(statement, (ast.Return, ast.Raise, ast.Break, ast.Continue)):
+                if not _binds_scope(statements[index + 1:]):
+                    return statements[:index + 1]
+                break
+        return statements
+
+    def visit_If(self, node):
+        self.generic_visit(node)
+        if isinstance(node.test, ast.Constant):
+            taken, dropped = (node.body, node.orelse) if node.test.value else (node.orelse, node.body)
+            if not _binds_scope(dropped):
+                return taken
+        return node
+
+    def visit_While(self, node):
+        self.generic_visit(node)
+        if isinstance(node.test, ast.Constant) and not node.test.value and not _binds_scope(node.body):
+            return node.orelse
+        return node
+
+class _ForwardScan:
+    """Recorrido hacia delante de los bloques con un entorno de hechos conocidos
+
+    Cada pase define qué se sabe tras una sentencia simple (`facts`) y cómo
+    reescribir sus expresiones (`rewrite`). En bifurcaciones se conserva la
+    intersección de ambas ramas; en bucles, try y match se descartan los
+    hechos sobre cualquier nombre asignado dentro. Los cuerpos de funciones
+    y clases empiezan con el entorno vacío.
+    """
+
+    def __init__(self, tree: ast.AST):
+        self.pinned = _pinned_names(tree)
+        self.rebound = _stored_names(tree)
+
+    def run(self, tree: ast.AST) -> ast.AST:
+        if isinstance(tree, ast.Module) and _is_optimizable(tree):
+            tree.body = self.block(tree.body, {})
+        return tree
+
+    # Puntos de extensión
+    def rewrite(self, expr: ast.expr, env: dict) -> ast.expr:
+        return expr
+
+    def facts(self, statement: ast.stmt, env: dict) -> dict:
+        return {}
+
+    def enter_loop(self, loop: ast.stmt, env: dict) -> List[ast.stmt]:
+        return []
+
+    def bind_target(self, loop: ast.stmt, env: dict):
+        pass
+
+    def kill(self, env: dict, names: Set[str]):
+        for name in names:
+            env.pop(name, None)
+
+    @staticmethod
+    def merge(first: dict, second: dict) -> dict:
+        return {key: value for key, value in first.items() if key in second and second[key] == value}
+
+    # Recorrido
+    def block(self, statements: List[ast.stmt], env: dict) -> List[ast.stmt]:
+        result = []
+        for statement in statements:
+            result.extend(self.statement(statement, env))
+        return result
+
+    def _rewrite_all(self, expressions, env):
+        return [self.rewrite(expr, env) if expr is not None else None for expr in expressions]
+
+    def statement(self, node: ast.stmt, env: dict) -> List[ast.stmt]:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            # Decoradores, valores por defecto y bases se evalúan al definir
+            node.decorator_list = self._rewrite_all(node.decorator_list, env)
+            if isinstance(node, ast.ClassDef):
+                node.bases = self._rewrite_all(node.bases, env)
+            else:
+                node.args.defaults = self._rewrite_all(node.args.defaults, env)
+                node.args.kw_defaults = self._rewrite_all(node.args.kw_defaults, env)
+            node.body = self.block(node.body, {})
+            self.kill(env, {node.name})
+            return [node]
+
+        if isinstance(node, ast.If):
+            self.kill(env, _walrus_names(node.test))
+            node.test = self.rewrite(node.test, env)
+            body_env, else_env = dict(env), dict(env)
+            node.body = self.block(node.body, body_env)
+            node.orelse = self.block(node.orelse, else_env)
+            env.clear()
+            env.update(self.merge(body_env, else_env))
+            return [node]
+
+        if isinstance(node, _LOOPS):
+            if not isinstance(node, ast.While):
+                self.kill(env, _walrus_names(node.iter))
+                node.iter = self.rewrite(node.iter, env)
+            prelude = self.enter_loop(node, env)
+            self.kill(env, _stored_names(node))
+            if isinstance(node, ast.While):
+                node.test = self.rewrite(node.test, env)
+            body_env = dict(env)
+            if not isinstance(node, ast.While):
+                self.bind_target(node, body_env)
+            node.body = self.block(node.body, body_env)
+            node.orelse = self.block(node.orelse, dict(env))
+            return prelude + [node]
+
+        if isinstance(node, (ast.With, ast.AsyncWith)):
+            for item in node.items:
+                self.kill(env, _walrus_names(item.context_expr))
+                item.context_expr = self.rewrite(item.context_expr, env)
+            node.body = self.block(node.body, dict(env))
+            self.kill(env, _stored_names(node))
+            return [node]
+
+        if isinstance(getattr(node, 'body', None), list):
+            # try, try*, match: cualquier parte puede ejecutarse tras una asignación parcial
+            self.kill(env, _stored_names(node))
+            for name in ('body', 'orelse', 'finalbody'):
+                if isinstance(getattr(node, name, None), list):
+                    setattr(node, name, self.block(getattr(node, name), dict(env)))
+            for child in getattr(node, 'handlers', []) + getattr(node, 'cases', []):
+                child.body = self.block(child.body, dict(env))
+            return [node]
+
+        return self.simple(node, env)
+
+    def simple(self, node: ast.stmt, env: dict) -> List[ast.stmt]:
+        self.kill(env, _walrus_names(node))
+        for name, value in ast.iter_fields(node):
+            if isinstance(value, ast.expr):
+                setattr(node, name, self.rewrite(value, env))
+            elif isinstance(value, list) and value and isinstance(value[0], ast.expr):
+                setattr(node, name, self._rewrite_all(value, env))
+        facts = self.facts(node, env)
+        self.kill(env, _stored_names(node))
+        env.update(facts)
+        return [node]
+
+def _assignment(node: ast.stmt) -> Tuple[List[str], Optional[ast.expr]]:
+    """(nombres simples asignados, valor) de `x = y = valor` o `x: T = valor`"""
+    if isinstance(node, ast.Assign):
+        return [t.id for t in node.targets if isinstance(t, ast.Name)], node.value
+    if isinstance(node, ast.AnnAssign) and node.value is not None and isinstance(node.target, ast.Name):
+        return [node.target.id], node.value
+    return [], None
+
+def _propagatable(value: Any) -> bool:
+    if type(value) in (int, float, complex, bool, type(None)):
+        return not isinstance(value, int) or value.bit_length() <= MAX_FOLDED_INT_BITS
+    return type(value) in (str, bytes) and len(value) <= 32
+
+class _NameSubstituter(_ExpressionTransformer):
+    def __init__(self, constants: dict):
+        self.constants = constants
+
+    def visit_Name(self, node):
+        fact = self.constants.get(node.id)
+        if isinstance(node.ctx, ast.Load) and fact is not None:
+            return ast.copy_location(ast.Constant(value=fact[2]), node)
+        return node
+
+class _ConstantPropagator(_ForwardScan):
+    """Sustituye lecturas de variables con valor constante conocido y pliega el resultado"""
+
+    def rewrite(self, expr, env):
+        if env:
+            expr = _NameSubstituter(env).visit(expr)
+        return _ConstantFolder().visit(expr)
+
+    def facts(self, node, env):
+        names, value = _assignment(node)
+        if not isinstance(value, ast.Constant) or not _propagatable(value.value):
+            return {}
+        # El repr distingue 0.0 de -0.0 al fusionar ramas
+        fact = (type(value.value), repr(value.value), value.value)
+        return {name: fact for name in names if name not in self.pinned}
+
+class _NumericScan(_ForwardScan):
+    """Inferencia de tipos numéricos exactos ('int' o 'float') para los pases aritméticos"""
+
+    def kind_of(self, node: ast.expr, env: dict) -> Optional[str]:
+        if isinstance(node, ast.Constant):
+            return {int: 'int', float: 'float'}.get(type(node.value))
+        if isinstance(node, ast.Name):
+            kind = env.get(node.id)
+            return kind if isinstance(kind, str) else None
+        if isinstance(node, ast.UnaryOp):
+            kind = self.kind_of(node.operand, env)
+            if isinstance(node.op, (ast.UAdd, ast.USub)) or (isinstance(node.op, ast.Invert) and kind == 'int'):
+                return kind
+            return None
+        if isinstance(node, ast.BinOp):
+            left, right = self.kind_of(node.left, env), self.kind_of(node.right, env)
+            if left is None or right is None:
+                return None
+            if left == right == 'int':
+                if isinstance(node.op, _INT_OPS):
+                    return 'int'
+                if isinstance(node.op, ast.Div):
+                    return 'float'
+                if (isinstance(node.op, ast.Pow) and isinstance(node.right, ast.Constant)
+                        and node.right.value >= 0):
+                    return 'int'
+                return None
+            return 'float' if isinstance(node.op, _FLOAT_OPS) else None
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in _KIND_BUILTINS and node.func.id not in self.rebound
+                and len(node.args) == 1 and not node.keywords
+                and not isinstance(node.args[0], ast.Starred)):
+            kind = _KIND_BUILTINS[node.func.id]
+            return kind if kind else self.kind_of(node.args[0], env)
+        return None
+
+    def facts(self, node, env):
+        names, value = _assignment(node)
+        if isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+            names = [node.target.id]
+            value = ast.BinOp(left=ast.Name(id=node.target.id, ctx=ast.Load()), op=node.op, right=node.value)
+        kind = self.kind_of(value, env) if value is not None else None
+        if kind is None:
+            return {}
+        return {name: kind for name in names if name not in self.pinned}
+
+    def bind_target(self, loop, env):
+        # range() siempre produce int exactos
+        if (_is_range_call(loop.iter, self.rebound) and isinstance(loop.target, ast.Name)
+                and loop.target.id not in self.pinned):
+            env[loop.target.id] = 'int'
+
+    def leaves(self, node: ast.expr) -> Optional[Set[str]]:
+        """Nombres leídos por una expresión aritmética pura, o None si no lo es"""
+        names = set()
+        for child in ast.walk(node):
+            if isinstance(child, ast.Name):
+                names.add(child.id)
+            elif not isinstance(child, (ast.BinOp, ast.UnaryOp, ast.Constant, ast.operator,
+                                        ast.unaryop, ast.expr_context)):
+                return None
+        return names
+
+class _SubexpressionReuser(_ExpressionTransformer):
+    def __init__(self, env: dict):
+        self.env = env
+
+    def _reuse(self, node):
+        self.generic_visit(node)
+        entry = self.env.get(('expr', ast.dump(node)))
+        if entry is not None:
+            return ast.copy_location(ast.Name(id=entry[0], ctx=ast.Load()), node)
+        return node
+
+    visit_BinOp = visit_UnaryOp = _reuse
+
+class _CommonSubexpressionEliminator(_NumericScan):
+    """Reutiliza la variable que ya contiene una expresión aritmética idéntica
+
+    Solo expresiones sobre int/float exactos: son inmutables y sin efectos,
+    así que reutilizar el valor no cambia el resultado ni crea alias.
+    """
+
+    def rewrite(self, expr, env):
+        return _SubexpressionReuser(env).visit(expr) if env else expr
+
+    def facts(self, node, env):
+        facts = super().facts(node, env)
+        names, value = _assignment(node)
+        if len(names) == 1 and isinstance(node, ast.Assign) and len(node.targets) == 1:
+            holder = names[0]
+            leaves = self.leaves(value) if isinstance(value, (ast.BinOp, ast.UnaryOp)) else None
+            if (leaves is not None and holder not in leaves and holder not in self.pinned
+                    and self.kind_of(value, env) is not None):
+                facts[('expr', ast.dump(value))] = (holder, frozenset(leaves))
+        return facts
+
+    def kill(self, env, names):
+        for key in list(env):
+            if isinstance(key, tuple):
+                holder, leaves = env[key]
+                if holder in names or leaves & names:
+                    del env[key]
+            elif key in names:
+                del env[key]
+
+class _InvariantHoister(_ExpressionTransformer):
+    def __init__(self, scan: '_LoopInvariantMover', env: dict, variant: Set[str]):
+        self.scan = scan
+        self.env = env
+        self.variant = variant
+        self.hoisted: Dict[str, Tuple[str, ast.expr, str]] = {}
+
+    def _invariant_kind(self, node) -> Optional[str]:
+        leaves = self.scan.leaves(node)
+        if not leaves or leaves & self.variant:
+            return None
+        kinds = set()
+        for child in ast.walk(node):
+            if isinstance(child, (ast.BinOp, ast.UnaryOp)) and not isinstance(child.op, _NON_RAISING_OPS):
+                return None
+            if isinstance(child, (ast.Name, ast.Constant)):
+                kinds.add(self.scan.kind_of(child, self.env))
+        # Mezclar int y float puede lanzar OverflowError con enteros enormes
+        return kinds.pop() if len(kinds) == 1 and None not in kinds else None
+
+    def _hoist(self, node):
+        kind = self._invariant_kind(node)
+        if kind is None:
+            return self.generic_visit(node)
+        key = ast.dump(node)
+        if key not in self.hoisted:
+            self.hoisted[key] = (self.scan.fresh_name('_vader_licm'), node, kind)
+        return ast.copy_location(ast.Name(id=self.hoisted[key][0], ctx=ast.Load()), node)
+
+    visit_BinOp = visit_UnaryOp = _hoist
+
+class _LoopInvariantMover(_NumericScan):
+    """Calcula una sola vez, antes del bucle, las expresiones que no cambian en él
+
+    Solo se mueven operaciones que no pueden lanzar excepciones, porque el
+    bucle podría no ejecutarse nunca.
+    """
+
+    def __init__(self, tree):
+        super().__init__(tree)
+        self.used_names = self.rebound | {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}
+        self.counter = 0
+
+    def fresh_name(self, prefix: str) -> str:
+        while True:
+            name = f'{prefix}_{self.counter}'
+            self.counter += 1
+            if name not in self.used_names:
+                self.used_names.add(name)
+                return name
+
+    def enter_loop(self, loop, env):
+        hoister = _InvariantHoister(self, env, _stored_names(loop))
+        loop.body = [hoister.visit(statement) for statement in loop.body]
+        if isinstance(loop, ast.While):
+            loop.test = hoister.visit(loop.test)
+        prelude = []
+        for name, expr, kind in hoister.hoisted.values():
+            prelude.append(ast.copy_location(
+                ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())], value=expr), loop))
+            env[name] = kind
+        return prelude
+
+class _OperatorReducer(_ExpressionTransformer):
+    def __init__(self, scan: '_StrengthReducer', env: dict):
+        self.scan = scan
+        self.env = env
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        # Con int exactos la suma y el producto son conmutativos: 2 * x -> x * 2
+        if (isinstance(node.op, (ast.Add, ast.Mult)) and isinstance(node.left, ast.Constant)
+                and self.scan.kind_of(node.right, self.env) == 'int'):
+            node = ast.copy_location(ast.BinOp(left=node.right, op=node.op, right=node.left), node)
+        if not isinstance(node.right, ast.Constant) or type(node.right.value) is not int:
+            return node
+        exponent, left = node.right.value, node.left
+        if self.scan.kind_of(left, self.env) != 'int':
+            return node
+        # Identidades: x + 0, x - 0, x * 1, x // 1 -> x; x * 0 -> 0 (solo nombres, sin efectos)
+        if ((exponent == 0 and isinstance(node.op, (ast.Add, ast.Sub)))
+                or (exponent == 1 and isinstance(node.op, (ast.Mult, ast.FloorDiv)))):
+            return left
+        if exponent == 0 and isinstance(node.op, ast.Mult) and isinstance(left, ast.Name):
+            return ast.copy_location(ast.Constant(value=0), node)
+        # x ** 2 -> x * x (solo nombres: evaluar dos veces un nombre no tiene efectos)
+        if isinstance(node.op, ast.Pow) and exponent in (2, 3) and isinstance(left, ast.Name):
+            product = ast.BinOp(left=copy.copy(left), op=ast.Mult(), right=copy.copy(left))
+            if exponent == 3:
+                product = ast.BinOp(left=product, op=ast.Mult(), right=copy.copy(left))
+            return ast.copy_location(product, node)
+        # x % 2**k -> x & (2**k - 1): idéntico para int de Python, también negativos
+        if isinstance(node.op, ast.Mod) and exponent > 1 and exponent & (exponent - 1) == 0:
+            mask = ast.Constant(value=exponent - 1)
+            return ast.copy_location(ast.BinOp(left=left, op=ast.BitAnd(), right=mask), node)
+        return node
+
+class _StrengthReducer(_NumericScan):
+    """Sustituye operaciones caras por equivalentes baratas sobre int exactos"""
+
+    def rewrite(self, expr, env):
+        return _OperatorReducer(self, env).visit(expr) if env else expr
+
+class _InductionSubstituter(_ExpressionTransformer):
+    def __init__(self, name: str, value: int):
+        self.name = name
+        self.value = value
+
+    def visit_Name(self, node):
+        if node.id == self.name and isinstance(node.ctx, ast.Load):
+            return ast.copy_location(ast.Constant(value=self.value), node)
+        return node
+
+class _LoopUnroller(ast.NodeTransformer):
+    """Desenrolla `for i in range(...)` cortos sustituyendo la variable de inducción"""
+
+    def __init__(self, tree: ast.AST, max_trips: int = UNROLL_MAX_TRIPS,
+                 max_statements: int = UNROLL_MAX_STATEMENTS):
+        self.rebound = _stored_names(tree)
+        self.pinned = _pinned_names(tree)
+        self.max_trips = max_trips
+        self.max_statements = max_statements
+
+    def _trip_values(self, node) -> Optional[range]:
+        if not _is_range_call(node.iter, self.rebound) or not 1 <= len(node.iter.args) <= 3:
+            return None
+        if not all(isinstance(a, ast.Constant) and type(a.value) is int for a in node.iter.args):
+            return None
+        values = range(*(a.value for a in node.iter.args))
+        return values if len(values) <= self.max_trips else None
+
+    def visit_For(self, node):
+        self.generic_visit(node)
+        values = self._trip_values(node)
+        if values is None or not isinstance(node.target, ast.Name):
+            return node
+        target = node.target.id
+        statements = sum(isinstance(n, ast.stmt) for s in node.body for n in ast.walk(s))
+        if (len(values) * statements > self.max_statements or target in self.pinned
+                or target in _stored_names(ast.Module(body=node.body, type_ignores=[]))
+                or _exits_loop(node.body)
+                or any(isinstance(n, _SCOPE_BARRIERS) for s in node.body for n in ast.walk(s))):
+            return node
+
+        unrolled = []
+        for value in values:
+            # La variable conserva su valor en cada iteración, como en el bucle original
+            unrolled.append(ast.copy_location(
+                ast.Assign(targets=[ast.Name(id=target, ctx=ast.Store())], value=ast.Constant(value=value)),
+                node))
+            substituter = _InductionSubstituter(target, value)
+            unrolled.extend(substituter.visit(copy.deepcopy(statement)) for statement in node.body)
+        # Sin break posible, el `else` siempre se ejecuta
+        return unrolled + node.orelse
+
+class VaderPassManager:
+    """Ejecuta una secuencia ordenada y configurable de pases sobre el AST"""
+
+    def __init__(self, passes: List[Tuple[str, Callable[[ast.AST], ast.AST]]]):
+        self.passes = list(passes)
+        self.stats: List[OptimizationPassStats] = []
+
+    def run(self, tree: ast.AST) -> ast.AST:
+        self.stats = []
+        for name, optimization in self.passes:
+            nodes_before = _count_nodes(tree)
+            start = time.perf_counter()
+            tree = optimization(tree)
+            _fill_empty_bodies(tree)
+            ast.fix_missing_locations(tree)
+            self.stats.append(OptimizationPassStats(
+                name=name,
+                seconds=time.perf_counter() - start,
+                nodes_before=nodes_before,
+                nodes_after=_count_nodes(tree)
+            ))
+        return tree
+
+    def report(self) -> str:
+        """Tabla de tiempos y variación de nodos por pase"""
+        lines = [f"{'Pase':<34} {'Tiempo':>10} {'Nodos':>14}"]
+        for stats in self.stats:
+            lines.append(f"{stats.name:<34} {stats.seconds * 1000:>8.3f}ms "
+                         f"{stats.nodes_after:>7} ({stats.node_delta:+d})")
+        return '\n'.join(lines)
 
 class VaderBytecodeCompiler:
     """Compilador de bytecode nativo de Vader"""
     
-    def __init__(self):
+    def __init__(self, cache_size: int = DEFAULT_CACHE_ENTRIES, cache_dir: Optional[str] = None):
         logger.info("⚡ Iniciando Compilador Bytecode Nativo...")
         
         # Optimizaciones disponibles
         self.optimizations = {
             'constant_folding': True,
+            'constant_propagation': True,
             'dead_code_elimination': True,
+            'common_subexpression_elimination': True,
+            'loop_invariant_code_motion': True,
+            'strength_reduction': True,
             'loop_unrolling': True,
             'inline_functions': True,
             'register_allocation': True,
             'instruction_scheduling': True
         }
         
-        # Cache de compilación
-        self.compilation_cache = {}
+        # Cache de compilación: LRU acotada en memoria + nivel compartido opcional en disco
+        # (cache_dir o VADER_BYTECODE_CACHE_DIR)
+        self.compilation_cache = VaderCompilationCache(
+            cache_size, cache_dir or os.environ.get('VADER_BYTECODE_CACHE_DIR'))
+        
+        # Estadísticas por pase de la última optimización
+        self.last_pass_stats: List[OptimizationPassStats] = []
         
         # Métricas de compilación
         self.metrics = {
             'total_compilations': 0,
             'cache_hits': 0,
+            'compiled': 0,
+            'total_compilation_time': 0.0,
             'avg_compilation_time': 0.0,
             'targets_used': set()
         }
@@ -191,98 +1083,55 @@ VaderRuntime.main();
         
         return '\n'.join(fixed_lines)
     
-    def optimize_ast(self, tree: ast.AST, level: int = 2) -> ast.AST:
-        """Optimizar AST según nivel"""
-        if level == 0:
-            return tree
-        
-        # Optimización nivel 1: Constant folding
-        if level >= 1:
-            tree = self.constant_folding(tree)
-        
-        # Optimización nivel 2: Dead code elimination
-        if level >= 2:
-            tree = self.dead_code_elimination(tree)
-        
-        # Optimización nivel 3: Loop unrolling
-        if level >= 3:
-            tree = self.loop_unrolling(tree)
-        
+    def build_pass_manager(self, level: int = 2, passes: Optional[List[str]] = None) -> VaderPassManager:
+        """Gestor de pases para un nivel (o una lista explícita de pases)
+
+        Los pases desactivados en `self.optimizations` se omiten.
+        """
+        if passes is None:
+            passes = OPTIMIZATION_PIPELINES[max(0, min(level, 3))]
+        unknown = [name for name in passes if name not in OPTIMIZATION_PIPELINES[3]]
+        if unknown:
+            raise ValueError(f"Pases de optimización desconocidos: {', '.join(unknown)}")
+        return VaderPassManager([(name, getattr(self, name)) for name in passes
+                                 if self.optimizations.get(name, True)])
+
+    def optimize_ast(self, tree: ast.AST, level: int = 2, passes: Optional[List[str]] = None) -> ast.AST:
+        """Optimizar AST según nivel; las estadísticas quedan en `last_pass_stats`"""
+        manager = self.build_pass_manager(level, passes)
+        tree = manager.run(tree)
+        self.last_pass_stats = manager.stats
         return tree
     
     def constant_folding(self, tree: ast.AST) -> ast.AST:
-        """Optimización: Constant folding"""
-        class ConstantFolder(ast.NodeTransformer):
-            def visit_BinOp(self, node):
-                self.generic_visit(node)
-                
-                # Si ambos operandos son constantes, evaluar
-                if isinstance(node.left, ast.Constant) and isinstance(node.right, ast.Constant):
-                    try:
-                        if isinstance(node.op, ast.Add):
-                            result = node.left.value + node.right.value
-                        elif isinstance(node.op, ast.Sub):
-                            result = node.left.value - node.right.value
-                        elif isinstance(node.op, ast.Mult):
-                            result = node.left.value * node.right.value
-                        elif isinstance(node.op, ast.Div):
-                            result = node.left.value / node.right.value
-                        else:
-                            return node
-                        
-                        return ast.Constant(value=result)
-                    except:
-                        return node
-                
-                return node
-        
-        return ConstantFolder().visit(tree)
+        """Optimización: Constant folding (aritmética, comparaciones, lógica booleana)"""
+        return _ConstantFolder().visit(tree)
+    
+    def constant_propagation(self, tree: ast.AST) -> ast.AST:
+        """Optimización: propagación de constantes (incluye el plegado resultante)"""
+        return _ConstantPropagator(tree).run(tree)
     
     def dead_code_elimination(self, tree: ast.AST) -> ast.AST:
         """Optimización: Eliminación de código muerto"""
-        class DeadCodeEliminator(ast.NodeTransformer):
-            def visit_If(self, node):
-                self.generic_visit(node)
-                
-                # Si la condición es una constante
-                if isinstance(node.test, ast.Constant):
-                    if node.test.value:
-                        # Condición siempre verdadera, retornar solo el cuerpo
-                        return node.body
-                    else:
-                        # Condición siempre falsa, retornar else o eliminar
-                        return node.orelse if node.orelse else []
-                
-                return node
-        
-        return DeadCodeEliminator().visit(tree)
+        return _DeadCodeEliminator().visit(tree)
+    
+    def common_subexpression_elimination(self, tree: ast.AST) -> ast.AST:
+        """Optimización: eliminación de subexpresiones comunes"""
+        return _CommonSubexpressionEliminator(tree).run(tree)
+    
+    def loop_invariant_code_motion(self, tree: ast.AST) -> ast.AST:
+        """Optimización: sacar de los bucles el cálculo invariante"""
+        return _LoopInvariantMover(tree).run(tree)
+    
+    def strength_reduction(self, tree: ast.AST) -> ast.AST:
+        """Optimización: reducción de fuerza (x ** 2 -> x * x, x % 8 -> x & 7)"""
+        return _StrengthReducer(tree).run(tree)
     
     def loop_unrolling(self, tree: ast.AST) -> ast.AST:
         """Optimización: Loop unrolling para loops pequeños"""
-        class LoopUnroller(ast.NodeTransformer):
-            def visit_For(self, node):
-                self.generic_visit(node)
-                
-                # Solo desenrollar loops con rango constante pequeño
-                if (isinstance(node.iter, ast.Call) and 
-                    isinstance(node.iter.func, ast.Name) and 
-                    node.iter.func.id == 'range' and
-                    len(node.iter.args) == 1 and
-                    isinstance(node.iter.args[0], ast.Constant) and
-                    node.iter.args[0].value <= 5):
-                    
-                    # Desenrollar el loop
-                    unrolled_body = []
-                    for i in range(node.iter.args[0].value):
-                        # Clonar el cuerpo del loop
-                        for stmt in node.body:
-                            unrolled_body.append(stmt)
-                    
-                    return unrolled_body
-                
-                return node
-        
-        return LoopUnroller().visit(tree)
+        if not _is_optimizable(tree):
+            return tree
+        return _LoopUnroller(tree).visit(tree)
     
     def compile_to_bytecode(self, tree: ast.AST) -> bytes:
         """Compilar AST a bytecode Python"""
@@ -303,6 +1152,12 @@ VaderRuntime.main();
         """Compilar AST a código C nativo"""
         c_code = self.native_templates['c_header']
         
+        # Funciones numéricas bajadas a C con la semántica de Python (vader_native)
+        if vader_native is not None and isinstance(tree, ast.Module):
+            functions_code, functions, _ = vader_native.lower_module(tree)
+            if functions:
+                c_code = vader_native.C_PRELUDE + '\n' + functions_code + '\n' + c_code
+        
         # Convertir AST a C
         class CCodeGenerator(ast.NodeVisitor):
             def __init__(self):
@@ -443,12 +1298,12 @@ VaderRuntime.main();
         self.metrics['targets_used'].add(target.value)
         
         # Verificar cache
-        cache_key = f"{hash(vader_code)}:{target.value}:{optimization_level}"
-        if cache_key in self.compilation_cache:
+        passes = [name for name, _ in self.build_pass_manager(optimization_level).passes]
+        cache_key = self.compilation_cache.make_key(vader_code, target, optimization_level, passes)
+        cached_result = self.compilation_cache.get(cache_key, vader_code)
+        if cached_result is not None:
             self.metrics['cache_hits'] += 1
-            cached_result = self.compilation_cache[cache_key]
-            cached_result.compilation_time = time.time() - start_time
-            return cached_result
+            return replace(cached_result, compilation_time=time.time() - start_time)
         
         try:
             # 1. Parsear código Vader
@@ -464,7 +1319,7 @@ VaderRuntime.main();
             if target == CompilationTarget.PYTHON_BYTECODE:
                 bytecode = self.compile_to_bytecode(optimized_tree)
                 compiled_code = f"# Python Bytecode ({len(bytecode)} bytes)\n"
-                compiled_code += dis.Bytecode.from_code(compile(optimized_tree, '<vader>', 'exec')).dis()
+                compiled_code += dis.Bytecode(compile(optimized_tree, '<vader>', 'exec')).dis()
                 
             elif target == CompilationTarget.C_NATIVE:
                 compiled_code = self.compile_to_c(optimized_tree)
@@ -497,15 +1352,17 @@ VaderRuntime.main();
                 optimization_level=optimization_level,
                 compilation_time=time.time() - start_time,
                 instructions_count=instructions_count,
-                size_bytes=size_bytes
+                size_bytes=size_bytes,
+                pass_stats=list(self.last_pass_stats)
             )
             
             # Guardar en cache
-            self.compilation_cache[cache_key] = result
+            self.compilation_cache.put(cache_key, result)
             
-            # Actualizar métricas
-            total_time = sum(r.compilation_time for r in self.compilation_cache.values())
-            self.metrics['avg_compilation_time'] = total_time / len(self.compilation_cache)
+            # Actualizar métricas (media acumulada, O(1))
+            self.metrics['compiled'] += 1
+            self.metrics['total_compilation_time'] += result.compilation_time
+            self.metrics['avg_compilation_time'] = self.metrics['total_compilation_time'] / self.metrics['compiled']
             
             return result
             
@@ -523,8 +1380,24 @@ VaderRuntime.main();
                 size_bytes=0
             )
     
+    def benchmark_levels(self, vader_code: str, levels: Tuple[int, ...] = (0, 1, 2, 3),
+                         repeat: int = 5) -> Dict[int, float]:
+        """Mejor tiempo de ejecución (segundos) del bytecode de cada nivel"""
+        timings = {}
+        for level in levels:
+            tree = self.optimize_ast(self.parse_vader_code(vader_code), level)
+            code = compile(tree, '<vader>', 'exec')
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                exec(code, {'__name__': '__vader__'})
+                best = min(best, time.perf_counter() - start)
+            timings[level] = best
+        return timings
+
     def get_compilation_metrics(self) -> Dict[str, Any]:
         """Obtener métricas de compilación"""
+        cache_stats = self.compilation_cache.stats()
         cache_hit_rate = (self.metrics['cache_hits'] / self.metrics['total_compilations']) * 100 if self.metrics['total_compilations'] > 0 else 0
         
         return {
@@ -533,7 +1406,10 @@ VaderRuntime.main();
             'cache_hit_rate': f"{cache_hit_rate:.1f}%",
             'avg_compilation_time': f"{self.metrics['avg_compilation_time']*1000:.2f}ms",
             'targets_used': list(self.metrics['targets_used']),
-            'cache_size': len(self.compilation_cache),
+            'cache_size': cache_stats['entries'],
+            'cache_misses': cache_stats['misses'],
+            'cache_disk_hits': cache_stats['disk_hits'],
+            'cache_evictions': cache_stats['evictions'],
             'optimizations_enabled': sum(1 for opt in self.optimizations.values() if opt)
         }
 
@@ -584,6 +1460,8 @@ para i en rango(3):
             print(f"📊 Instrucciones: {result.instructions_count}")
             print(f"💾 Tamaño: {result.size_bytes} bytes")
             print(f"🔧 Optimización: Nivel {result.optimization_level}")
+            for stats in result.pass_stats:
+                print(f"   • {stats.name}: {stats.seconds*1000:.3f}ms, {stats.node_delta:+d} nodos")
             print(f"📝 Muestra del código compilado:")
             print(result.compiled_code[:200] + "...")
         else:
@@ -18,16 +18,24 @@ Fecha: 2025
 """
 
 import os
+import re
+import sys
+import mmap
 import struct
+import marshal
 import hashlib
-import pickle
 import tempfile
-import subprocess
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, IntEnum
+from array import array
 from datetime import datetime
 
+try:
+    import vader_native
+except ImportError:
+    vader_native = None
+
 class CompilationTarget(Enum):
     """Objetivos de compilación"""
     VADER_BYTECODE = "vader_bytecode"
@@ -56,225 +64,906 @@ class CompilationResult:
     warnings: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
-class VaderOpcode(Enum):
-    """Opcodes de Vader"""
-    LOAD_CONST = 1
-    LOAD_NAME = 2
-    STORE_NAME = 3
-    BINARY_ADD = 10
-    VADER_PRINT = 50
-    RETURN_VALUE = 34
+class VaderOpcode(IntEnum):
+    """Opcodes de la VM de registros de Vader
+    
+    Cada instrucción ocupa cuatro enteros ``(opcode, a, b, c)`` en un
+    ``array('i')`` plano. Los operandos son registros del frame actual,
+    índices de constantes (``K``), slots de variables globales (``G``) o
+    direcciones expresadas en número de instrucción.
+    """
+    NOP = 0
+    LOADK = 1       # R[a] = K[b]
+    LOADG = 2       # R[a] = G[b]
+    STOREG = 3      # G[a] = R[b]
+    MOVE = 4        # R[a] = R[b]
+    ADD = 5         # R[a] = R[b] + R[c] (concatena si hay texto)
+    SUB = 6         # R[a] = R[b] - R[c]
+    MUL = 7         # R[a] = R[b] * R[c]
+    DIV = 8         # R[a] = R[b] / R[c]
+    EQ = 9          # R[a] = R[b] == R[c]
+    NE = 10         # R[a] = R[b] != R[c]
+    LT = 11         # R[a] = R[b] < R[c]
+    LE = 12         # R[a] = R[b] <= R[c]
+    GT = 13         # R[a] = R[b] > R[c]
+    GE = 14         # R[a] = R[b] >= R[c]
+    ADDK = 15       # R[a] = R[b] + K[c]
+    SUBK = 16       # R[a] = R[b] - K[c]
+    MULK = 17       # R[a] = R[b] * K[c]
+    DIVK = 18       # R[a] = R[b] / K[c]
+    EQK = 19        # R[a] = R[b] == K[c]
+    NEK = 20        # R[a] = R[b] != K[c]
+    LTK = 21        # R[a] = R[b] < K[c]
+    LEK = 22        # R[a] = R[b] <= K[c]
+    GTK = 23        # R[a] = R[b] > K[c]
+    GEK = 24        # R[a] = R[b] >= K[c]
+    NOT = 25        # R[a] = not R[b]
+    JMP = 26        # pc = a
+    JMPF = 27       # si not R[a]: pc = b
+    JMPT = 28       # si R[a]: pc = b
+    FORLOOP = 29    # R[a] -= 1; si R[a] >= 0: pc = b
+    CALL = 30       # llama a la función a
+    RET = 31        # vuelve al frame anterior
+    PRINT = 32      # muestra R[a]
+    INPUT = 33      # R[a] = input(K[b]) (b = -1 sin mensaje)
+    TONUM = 34      # R[a] = numero(R[b])
+    TOSTR = 35      # R[a] = texto(R[b])
+    HALT = 36
+
+INSTRUCTION_SIZE = 4
+
+_BINARY_OPCODES = {
+    '+': VaderOpcode.ADD, '-': VaderOpcode.SUB, '*': VaderOpcode.MUL, '/': VaderOpcode.DIV,
+    '==': VaderOpcode.EQ, '!=': VaderOpcode.NE, '<': VaderOpcode.LT, '<=': VaderOpcode.LE,
+    '>': VaderOpcode.GT, '>=': VaderOpcode.GE,
+}
+
+# Variante con operando constante de cada operación binaria
+_CONSTANT_OPCODES = {
+    VaderOpcode.ADD: VaderOpcode.ADDK, VaderOpcode.SUB: VaderOpcode.SUBK,
+    VaderOpcode.MUL: VaderOpcode.MULK, VaderOpcode.DIV: VaderOpcode.DIVK,
+    VaderOpcode.EQ: VaderOpcode.EQK, VaderOpcode.NE: VaderOpcode.NEK,
+    VaderOpcode.LT: VaderOpcode.LTK, VaderOpcode.LE: VaderOpcode.LEK,
+    VaderOpcode.GT: VaderOpcode.GTK, VaderOpcode.GE: VaderOpcode.GEK,
+}
+
+# Opcodes cuyo resultado se escribe en R[a]
+_VALUE_OPCODES = frozenset(list(_BINARY_OPCODES.values()) + list(_CONSTANT_OPCODES.values()) + [
+    VaderOpcode.LOADK, VaderOpcode.LOADG, VaderOpcode.MOVE, VaderOpcode.NOT,
+    VaderOpcode.INPUT, VaderOpcode.TONUM, VaderOpcode.TOSTR,
+])
+
+_PRECEDENCE = {'==': 1, '!=': 1, '<': 1, '<=': 1, '>': 1, '>=': 1, '+': 2, '-': 2, '*': 3, '/': 3}
+
+# Frases de comparación en español, de la más larga a la más corta
+_COMPARISON_PHRASES = [
+    (' es diferente de ', ' != '), (' es igual a ', ' == '), (' es mayor que ', ' > '),
+    (' es menor que ', ' < '), (' igual a ', ' == '), (' mayor que ', ' > '), (' menor que ', ' < '),
+]
+
+_EXPR_TOKEN_RE = re.compile(r'\s*(?:(\d+\.\d+|\d+)|("[^"]*")|(==|!=|<=|>=|[-+*/<>()])|([^\W\d]\w*))')
 
 @dataclass
 class VaderInstruction:
     """Instrucción de bytecode de Vader"""
     opcode: int
-    arg: Optional[int] = None
+    a: int = 0
+    b: int = 0
+    c: int = 0
     lineno: int = 1
 
+@dataclass
+class VaderProgram:
+    """Programa compilado para la VM de registros
+    
+    Las variables globales ocupan los primeros ``len(names)`` registros del
+    frame principal; las funciones las acceden con LOADG/STOREG.
+    """
+    code: array
+    constants: List[Any]
+    names: List[str]
+    functions: List[Tuple[str, int, int]]
+    lines: array
+    main_registers: int = 1
+    source_hash: bytes = b''
+
+class VaderCompileError(Exception):
+    """Error al compilar código Vader a bytecode"""
+
+class VaderBytecodeFormatError(Exception):
+    """Archivo .vbc inválido o de una versión no soportada"""
+
+# Contenedor .vbc: cabecera fija, tabla de secciones y secciones alineadas a 8 bytes.
+# Los enteros van en little-endian; CODE y LINES son int32 que se cargan sin copiar.
+# La cabecera guarda además la huella del compilador: un .vbc de otra versión de la VM
+# o de la tabla de opcodes se rechaza al cargarlo y se regenera al compilar.
+VBC_MAGIC = b'VBC\x00'
+VBC_VERSION = 2
+# Versión del generador de bytecode: subirla cuando cambie el código emitido
+COMPILER_VERSION = 1
+_VBC_HEADER = struct.Struct('<4sHH8s32s')   # magic, versión, nº de secciones, compilador, sha256 del fuente
+_VBC_SECTION = struct.Struct('<4sQQ')     # etiqueta, offset, longitud
+_VBC_ALIGNMENT = 8
+
+def _compiler_fingerprint() -> bytes:
+    """Huella de COMPILER_VERSION, el tamaño de instrucción y la tabla de opcodes"""
+    table = ','.join(f'{opcode.name}={opcode.value}' for opcode in VaderOpcode)
+    return hashlib.sha256(f'{COMPILER_VERSION}:{INSTRUCTION_SIZE}:{table}'.encode()).digest()[:8]
+
+VBC_COMPILER = _compiler_fingerprint()
+
+def _pack_sections(source_hash: bytes, sections: List[Tuple[bytes, bytes]]) -> bytes:
+    """Construye el contenedor .vbc en una sola pasada"""
+    offset = _VBC_HEADER.size + _VBC_SECTION.size * len(sections)
+    table = []
+    body = []
+    for tag, data in sections:
+        padding = -offset % _VBC_ALIGNMENT
+        if padding:
+            body.append(b'\x00' * padding)
+            offset += padding
+        table.append(_VBC_SECTION.pack(tag, offset, len(data)))
+        body.append(data)
+        offset += len(data)
+    header = _VBC_HEADER.pack(VBC_MAGIC, VBC_VERSION, len(sections), VBC_COMPILER,
+                              source_hash.ljust(32, b'\x00'))
+    return b''.join([header] + table + body)
+
+def _unpack_sections(buffer) -> Tuple[bytes, Dict[bytes, memoryview]]:
+    """Lee cabecera y tabla de secciones; devuelve vistas sin copiar"""
+    view = memoryview(buffer)
+    if len(view) < _VBC_HEADER.size:
+        raise VaderBytecodeFormatError("Archivo .vbc truncado")
+    magic, version, count, compiler, source_hash = _VBC_HEADER.unpack_from(view)
+    if magic != VBC_MAGIC:
+        raise VaderBytecodeFormatError("No es un archivo .vbc de Vader")
+    if version != VBC_VERSION:
+        raise VaderBytecodeFormatError(f"Versión de bytecode {version} no soportada (se esperaba {VBC_VERSION})")
+    if compiler != VBC_COMPILER:
+        raise VaderBytecodeFormatError("Archivo .vbc generado por otra versión del compilador; hay que recompilarlo")
+    
+    sections = {}
+    position = _VBC_HEADER.size
+    for _ in range(count):
+        if position + _VBC_SECTION.size > len(view):
+            raise VaderBytecodeFormatError("Tabla de secciones truncada")
+        tag, offset, length = _VBC_SECTION.unpack_from(view, position)
+        position += _VBC_SECTION.size
+        if offset > len(view) or length > len(view) - offset:
+            raise VaderBytecodeFormatError(f"Sección {tag.decode(errors='replace')} fuera de rango")
+        sections[tag] = view[offset:offset + length]
+    return source_hash, sections
+
+def _int32_view(data: memoryview):
+    """Vista int32 de una sección; solo copia en máquinas big-endian"""
+    if sys.byteorder == 'little' and array('i').itemsize == 4:
+        return data.cast('i')
+    values = array('i')
+    values.frombytes(data)
+    values.byteswap()
+    return values
+
+def _int32_bytes(values: array) -> bytes:
+    if sys.byteorder == 'little':
+        return values.tobytes()
+    swapped = array('i', values)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+def read_bytecode_hash(path: str) -> Optional[bytes]:
+    """Devuelve el hash del fuente guardado en un .vbc leyendo solo la cabecera
+    
+    None si el archivo no existe o lo generó otra versión del compilador.
+    """
+    try:
+        with open(path, 'rb') as f:
+            magic, version, _, compiler, source_hash = _VBC_HEADER.unpack(f.read(_VBC_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    if magic != VBC_MAGIC or version != VBC_VERSION or compiler != VBC_COMPILER:
+        return None
+    return source_hash
+
+def load_bytecode_file(path: str) -> VaderProgram:
+    """Carga un .vbc mapeándolo en memoria; el código no se copia"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise VaderBytecodeFormatError("Archivo .vbc vacío")
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return VaderBytecodeInterpreter._deserialize_bytecode(mapped)
+
+class _RegisterAllocator:
+    """Asignador de registros temporales en pila para un frame"""
+    
+    def __init__(self, base: int = 0):
+        self.base = base
+        self.next = base
+        self.max = max(base, 1)
+    
+    def alloc(self) -> int:
+        register = self.next
+        self.next += 1
+        self.max = max(self.max, self.next)
+        return register
+    
+    def release(self, mark: int):
+        self.next = max(mark, self.base)
+    
+    def is_temporary(self, register: int) -> bool:
+        return register >= self.base
+
 class VaderBytecodeGenerator:
-    """Generador de bytecode de Vader"""
+    """Generador de bytecode de registros a partir de código Vader
+    
+    Entiende la misma sintaxis que el intérprete nativo: mostrar, asignaciones,
+    preguntar/leer/convertir, si/sino si/sino/fin si, repetir N veces,
+    mientras y funcion/fin funcion.
+    """
     
     def __init__(self):
         self.instructions = []
         self.constants = []
         self.names = []
         self.current_line = 1
+        self.code = array('i')
+        self.lines = array('i')
+        self.functions = []
+        self.function_index = {}
+        self._constant_index = {}
+        self._name_index = {}
+        self._function_bodies = []
+        self.registers = _RegisterAllocator()
+        # En el frame principal las variables viven en registros propios
+        self.globals_in_registers = False
     
-    def emit(self, opcode: VaderOpcode, arg: Optional[int] = None):
-        """Emite una instrucción"""
-        instruction = VaderInstruction(
-            opcode=opcode.value,
-            arg=arg,
-            lineno=self.current_line
-        )
-        self.instructions.append(instruction)
-        return len(self.instructions) - 1
+    def emit(self, opcode: VaderOpcode, a: int = 0, b: int = 0, c: int = 0) -> int:
+        """Emite una instrucción y devuelve su dirección"""
+        address = len(self.lines)
+        self.code.extend((opcode, a, b, c))
+        self.lines.append(self.current_line)
+        self.instructions.append(VaderInstruction(int(opcode), a, b, c, self.current_line))
+        return address
+    
+    def patch(self, address: int, slot: int, value: int):
+        """Corrige un operando de una instrucción ya emitida"""
+        self.code[address * INSTRUCTION_SIZE + slot] = value
+        setattr(self.instructions[address], 'abc'[slot - 1], value)
+    
+    def truncate(self, size: int):
+        """Descarta las instrucciones emitidas a partir de `size`"""
+        del self.code[size * INSTRUCTION_SIZE:]
+        del self.lines[size:]
+        del self.instructions[size:]
+    
+    def here(self) -> int:
+        return len(self.lines)
     
     def add_constant(self, value: Any) -> int:
         """Añade una constante"""
-        if value not in self.constants:
+        key = (type(value), value)
+        if key not in self._constant_index:
+            self._constant_index[key] = len(self.constants)
             self.constants.append(value)
-        return self.constants.index(value)
+        return self._constant_index[key]
     
     def add_name(self, name: str) -> int:
-        """Añade un nombre"""
-        if name not in self.names:
+        """Añade un nombre de variable global"""
+        if name not in self._name_index:
+            if self.globals_in_registers:
+                raise VaderCompileError(f"Variable '{name}' no registrada en la primera pasada")
+            self._name_index[name] = len(self.names)
             self.names.append(name)
-        return self.names.index(name)
+        return self._name_index[name]
     
     def compile_vader_code(self, code: str) -> bytes:
-        """Compila código Vader a bytecode"""
-        lines = code.split('\n')
+        """Compila código Vader a bytecode serializado"""
+        return self._serialize_bytecode(self.compile_program(code))
+    
+    def compile_program(self, code: str) -> VaderProgram:
+        """Compila código Vader a un programa para la VM
         
-        for line_num, line in enumerate(lines, 1):
-            self.current_line = line_num
+        Una primera pasada descubre todas las variables; la segunda las asigna
+        a los registros iniciales del frame principal.
+        """
+        scout = VaderBytecodeGenerator()
+        scout._compile_all(code)
+        self.names = list(scout.names)
+        self._name_index = dict(scout._name_index)
+        self.globals_in_registers = True
+        program = self._compile_all(code)
+        program.source_hash = hashlib.sha256(code.encode('utf-8')).digest()
+        return program
+    
+    def _compile_all(self, code: str) -> VaderProgram:
+        self.source_lines = code.split('\n')
+        
+        # Registrar funciones para resolver llamadas antes de su definición
+        for line in self.source_lines:
             line = line.strip()
-            
+            if line.startswith('funcion '):
+                name = line[8:].strip()
+                if name not in self.function_index:
+                    self.function_index[name] = len(self.functions)
+                    self.functions.append([name, 0, 1])
+        
+        self.in_main = True
+        self.registers = _RegisterAllocator(len(self.names) if self.globals_in_registers else 0)
+        self._compile_block(0, ())
+        self.emit(VaderOpcode.HALT)
+        main_registers = self.registers.max
+        
+        self.in_main = False
+        for name, start in self._function_bodies:
+            self.registers = _RegisterAllocator()
+            index = self.function_index[name]
+            self.functions[index][1] = self.here()
+            self._compile_block(start, ('fin funcion',))
+            self.emit(VaderOpcode.RET)
+            self.functions[index][2] = self.registers.max
+        
+        return VaderProgram(
+            code=self.code,
+            constants=self.constants,
+            names=self.names,
+            functions=[tuple(function) for function in self.functions],
+            lines=self.lines,
+            main_registers=main_registers
+        )
+    
+    def _variable_register(self, name: str) -> Optional[int]:
+        """Registro de una variable en el frame principal, si aplica"""
+        if self.globals_in_registers and self.in_main:
+            return self.add_name(name)
+        return None
+    
+    def _load_variable(self, name: str) -> int:
+        register = self._variable_register(name)
+        if register is not None:
+            return register
+        register = self.registers.alloc()
+        self.emit(VaderOpcode.LOADG, register, self.add_name(name))
+        return register
+    
+    def _store_variable(self, name: str, register: int):
+        """Guarda un registro en una variable, reescribiendo el destino si es posible"""
+        target = self._variable_register(name)
+        if target is None:
+            self.emit(VaderOpcode.STOREG, self.add_name(name), register)
+            return
+        if target == register:
+            return
+        last = self.here() - 1
+        if (self.registers.is_temporary(register) and last >= 0
+                and self.instructions[last].opcode in _VALUE_OPCODES
+                and self.instructions[last].a == register):
+            self.patch(last, 1, target)
+        else:
+            self.emit(VaderOpcode.MOVE, target, register)
+    
+    def _compile_block(self, i: int, terminators) -> Tuple[int, Optional[str]]:
+        """Compila sentencias hasta una línea terminadora"""
+        lines = self.source_lines
+        while i < len(lines):
+            line = lines[i].strip()
             if not line or line.startswith('#'):
+                i += 1
                 continue
-            
-            if line.startswith('mostrar'):
-                self._compile_print(line)
-            elif '=' in line and not any(op in line for op in ['==', '!=']):
-                self._compile_assignment(line)
-            else:
-                self._compile_expression(line)
+            for terminator in terminators:
+                if line == terminator or (terminator.endswith(' ') and line.startswith(terminator)):
+                    return i, line
+            self.current_line = i + 1
+            i = self._compile_statement(line, i)
+        return i, None
+    
+    def _compile_statement(self, line: str, i: int) -> int:
+        """Compila una sentencia y devuelve el índice de la siguiente línea"""
+        mark = self.registers.next
         
-        # Añadir RETURN_VALUE al final
-        if not self.instructions or self.instructions[-1].opcode != VaderOpcode.RETURN_VALUE.value:
-            self.emit(VaderOpcode.RETURN_VALUE)
+        if line.startswith('mostrar '):
+            register = self._compile_expression(line[8:].strip())
+            self.emit(VaderOpcode.PRINT, register)
         
-        return self._serialize_bytecode()
-    
-    def _compile_print(self, line: str):
-        """Compila instrucción mostrar"""
-        content = line[7:].strip()
+        elif '=' in line and not any(op in line for op in ['==', '!=', '>=', '<=']):
+            self._compile_assignment(line)
         
-        if content.startswith('"') and content.endswith('"'):
-            const_idx = self.add_constant(content[1:-1])
-            self.emit(VaderOpcode.LOAD_CONST, const_idx)
-        else:
-            name_idx = self.add_name(content)
-            self.emit(VaderOpcode.LOAD_NAME, name_idx)
+        elif line.startswith('preguntar '):
+            match = re.match(r'preguntar "([^"]*)"(?:\s+guardar\s+(?:la\s+)?respuesta\s+en\s+(\w+))?', line)
+            if match:
+                register = self.registers.alloc()
+                self.emit(VaderOpcode.INPUT, register, self.add_constant(match.group(1) + ' '))
+                if match.group(2):
+                    self._store_variable(match.group(2), register)
+        
+        elif line.startswith('leer '):
+            register = self.registers.alloc()
+            self.emit(VaderOpcode.INPUT, register, -1)
+            self._store_variable(line[5:].strip(), register)
+        
+        elif line.startswith('convertir '):
+            match = re.match(r'convertir\s+(\w+)\s+a\s+(numero|texto)', line)
+            if match:
+                opcode = VaderOpcode.TONUM if match.group(2) == 'numero' else VaderOpcode.TOSTR
+                register = self._load_variable(match.group(1))
+                result = self.registers.alloc()
+                self.emit(opcode, result, register)
+                self._store_variable(match.group(1), result)
         
-        self.emit(VaderOpcode.VADER_PRINT)
+        elif line.startswith('si '):
+            i = self._compile_conditional(line, i)
+            self.registers.release(mark)
+            return i
+        
+        elif line.startswith('mientras '):
+            i = self._compile_while(line, i)
+            self.registers.release(mark)
+            return i
+        
+        elif line.startswith('repetir '):
+            i = self._compile_repeat(line, i)
+            self.registers.release(mark)
+            return i
+        
+        elif line.startswith('funcion '):
+            end = self._find_line(i + 1, 'fin funcion')
+            self._function_bodies.append((line[8:].strip(), i + 1))
+            return end + 1
+        
+        elif line in self.function_index:
+            self.emit(VaderOpcode.CALL, self.function_index[line])
+        
+        # Las líneas no reconocidas no generan código, igual que en el intérprete
+        self.registers.release(mark)
+        return i + 1
+    
+    def _find_line(self, i: int, text: str) -> int:
+        lines = self.source_lines
+        while i < len(lines) and lines[i].strip() != text:
+            i += 1
+        return i
     
     def _compile_assignment(self, line: str):
         """Compila asignación"""
-        parts = line.split('=', 1)
-        var_name = parts[0].strip()
-        value = parts[1].strip()
-        
-        if value.startswith('"') and value.endswith('"'):
-            const_idx = self.add_constant(value[1:-1])
-            self.emit(VaderOpcode.LOAD_CONST, const_idx)
-        elif value.isdigit():
-            const_idx = self.add_constant(int(value))
-            self.emit(VaderOpcode.LOAD_CONST, const_idx)
-        else:
-            name_idx = self.add_name(value)
-            self.emit(VaderOpcode.LOAD_NAME, name_idx)
+        var_name, value = (part.strip() for part in line.split('=', 1))
+        register = self._compile_expression(value)
+        self._store_variable(var_name, register)
+    
+    def _compile_conditional(self, line: str, i: int) -> int:
+        """Compila si / sino si / sino / fin si con saltos"""
+        end_jumps = []
+        condition = line[3:].strip()
         
-        var_idx = self.add_name(var_name)
-        self.emit(VaderOpcode.STORE_NAME, var_idx)
+        while True:
+            jump_false = None
+            if condition is not None:
+                mark = self.registers.next
+                register = self._compile_expression(condition)
+                jump_false = self.emit(VaderOpcode.JMPF, register)
+                self.registers.release(mark)
+            
+            i, terminator = self._compile_block(i + 1, ('fin si', 'sino si ', 'sino'))
+            more_branches = terminator not in (None, 'fin si') and condition is not None
+            if more_branches:
+                end_jumps.append(self.emit(VaderOpcode.JMP))
+            if jump_false is not None:
+                self.patch(jump_false, 2, self.here())
+            if not more_branches:
+                break
+            condition = None if terminator == 'sino' else terminator[8:].strip()
+            self.current_line = i + 1
+        
+        for address in end_jumps:
+            self.patch(address, 1, self.here())
+        return i + 1
+    
+    def _compile_while(self, line: str, i: int) -> int:
+        """Compila mientras / fin mientras"""
+        start = self.here()
+        mark = self.registers.next
+        register = self._compile_expression(line[9:].strip().rstrip(':'))
+        jump_false = self.emit(VaderOpcode.JMPF, register)
+        self.registers.release(mark)
+        i, _ = self._compile_block(i + 1, ('fin mientras',))
+        self.emit(VaderOpcode.JMP, start)
+        self.patch(jump_false, 2, self.here())
+        return i + 1
+    
+    def _compile_repeat(self, line: str, i: int) -> int:
+        """Compila repetir N veces / fin repetir con un contador en registro"""
+        match = re.match(r'repetir\s+(.+?)\s+veces', line)
+        if not match:
+            return i + 1
+        counter = self.registers.alloc()
+        self.emit(VaderOpcode.MOVE, counter, self._compile_expression(match.group(1)))
+        self.registers.release(counter + 1)
+        check = self.emit(VaderOpcode.JMP)
+        body = self.here()
+        i, _ = self._compile_block(i + 1, ('fin repetir',))
+        self.patch(check, 1, self.here())
+        self.emit(VaderOpcode.FORLOOP, counter, body)
+        return i + 1
     
-    def _compile_expression(self, line: str):
-        """Compila expresión general"""
+    def _compile_expression(self, text: str) -> int:
+        """Compila una expresión y devuelve el registro con el resultado"""
+        mark = self.registers.next
+        size = self.here()
         try:
-            value = int(line)
-            const_idx = self.add_constant(value)
-            self.emit(VaderOpcode.LOAD_CONST, const_idx)
-        except ValueError:
-            name_idx = self.add_name(line)
-            self.emit(VaderOpcode.LOAD_NAME, name_idx)
-    
-    def _serialize_bytecode(self) -> bytes:
-        """Serializa bytecode a bytes"""
-        header = struct.pack('!I', len(self.instructions))
-        header += struct.pack('!I', len(self.constants))
-        header += struct.pack('!I', len(self.names))
-        
-        constants_data = pickle.dumps(self.constants)
-        names_data = pickle.dumps(self.names)
-        
-        instructions_data = b''
-        for instr in self.instructions:
-            instructions_data += struct.pack('!I', instr.opcode)
-            instructions_data += struct.pack('!I', instr.arg or 0)
-            instructions_data += struct.pack('!I', instr.lineno)
-        
-        return header + constants_data + names_data + instructions_data
+            tokens = self._tokenize(text)
+            if tokens:
+                position, register = self._compile_binary(tokens, 0, 0)
+                if position == len(tokens):
+                    return register
+        except VaderCompileError:
+            pass
+        
+        # Igual que el intérprete: lo que no se puede evaluar queda como texto
+        self.truncate(size)
+        self.registers.release(mark)
+        register = self.registers.alloc()
+        self.emit(VaderOpcode.LOADK, register, self.add_constant(text))
+        return register
+    
+    def _tokenize(self, text: str) -> List[str]:
+        padded = f' {text} '
+        for phrase, operator in _COMPARISON_PHRASES:
+            padded = padded.replace(phrase, operator)
+        text = padded.strip()
+        tokens = []
+        position = 0
+        while position < len(text):
+            match = _EXPR_TOKEN_RE.match(text, position)
+            if not match or match.end() == position:
+                if text[position:].strip():
+                    raise VaderCompileError(f"Línea {self.current_line}: símbolo no válido en '{text}'")
+                break
+            tokens.append(match.group().strip())
+            position = match.end()
+        return tokens
+    
+    def _compile_binary(self, tokens: List[str], position: int, min_precedence: int) -> Tuple[int, int]:
+        """Precedence climbing sobre los tokens; el resultado queda en un registro"""
+        position, left = self._compile_operand(tokens, position)
+        while position < len(tokens) and _PRECEDENCE.get(tokens[position], -1) > min_precedence:
+            operator = tokens[position]
+            opcode = _BINARY_OPCODES[operator]
+            mark = self.registers.next
+            size = self.here()
+            position, right = self._compile_binary(tokens, position + 1, _PRECEDENCE[operator])
+            
+            # Un operando derecho constante se codifica directamente en la instrucción
+            operand = right
+            if self.here() == size + 1 and self.instructions[size].opcode == VaderOpcode.LOADK \
+                    and self.instructions[size].a == right:
+                operand = self.instructions[size].b
+                opcode = _CONSTANT_OPCODES[opcode]
+                self.truncate(size)
+            self.registers.release(mark)
+            
+            result = left if self.registers.is_temporary(left) else self.registers.alloc()
+            self.emit(opcode, result, left, operand)
+            left = result
+        return position, left
+    
+    def _compile_operand(self, tokens: List[str], position: int) -> Tuple[int, int]:
+        if position >= len(tokens):
+            raise VaderCompileError(f"Línea {self.current_line}: falta un operando")
+        token = tokens[position]
+        
+        if token == '(':
+            position, register = self._compile_binary(tokens, position + 1, 0)
+            if position >= len(tokens) or tokens[position] != ')':
+                raise VaderCompileError(f"Línea {self.current_line}: falta ')'")
+            return position + 1, register
+        if token == '-':
+            position, operand = self._compile_operand(tokens, position + 1)
+            result = self.registers.alloc()
+            self.emit(VaderOpcode.LOADK, result, self.add_constant(0))
+            self.emit(VaderOpcode.SUB, result, result, operand)
+            return position, result
+        if token[0].isalpha() or token[0] == '_':
+            if token in ('verdadero', 'falso'):
+                register = self.registers.alloc()
+                self.emit(VaderOpcode.LOADK, register, self.add_constant(token == 'verdadero'))
+                return position + 1, register
+            return position + 1, self._load_variable(token)
+        
+        register = self.registers.alloc()
+        if token.startswith('"'):
+            self.emit(VaderOpcode.LOADK, register, self.add_constant(token[1:-1]))
+        elif token[0].isdigit():
+            value = float(token) if '.' in token else int(token)
+            self.emit(VaderOpcode.LOADK, register, self.add_constant(value))
+        else:
+            raise VaderCompileError(f"Línea {self.current_line}: operando inesperado '{token}'")
+        return position + 1, register
+    
+    def _serialize_bytecode(self, program: VaderProgram) -> bytes:
+        """Serializa el programa en el contenedor .vbc versionado"""
+        return _pack_sections(program.source_hash, [
+            (b'CNST', marshal.dumps(program.constants)),
+            (b'NAME', marshal.dumps(program.names)),
+            (b'FUNC', marshal.dumps((program.functions, program.main_registers))),
+            (b'CODE', _int32_bytes(program.code)),
+            (b'LINE', _int32_bytes(program.lines)),
+        ])
 
 class VaderBytecodeInterpreter:
-    """Intérprete de bytecode de Vader"""
+    """VM de registros con despacho por tabla sobre un ``array('i')`` plano"""
     
     def __init__(self):
-        self.stack = []
         self.globals = {}
-        self.locals = {}
+        self.output = []
+        self.frames = []
         self.pc = 0
     
     def execute(self, bytecode: bytes) -> Any:
-        """Ejecuta bytecode"""
-        instructions, constants, names = self._deserialize_bytecode(bytecode)
+        """Ejecuta bytecode serializado"""
+        return self.run(self._deserialize_bytecode(bytecode))
+    
+    def run(self, program: VaderProgram) -> Any:
+        """Ejecuta un programa compilado"""
+        code = program.code
+        K = program.constants
+        functions = program.functions
+        output = self.output
+        frames = self.frames
         
-        self.pc = 0
+        # Las variables globales son los primeros registros del frame principal;
+        # las no definidas se evalúan a su propio nombre, como en el intérprete
+        R = [None] * max(program.main_registers, len(program.names))
+        for slot, name in enumerate(program.names):
+            R[slot] = self.globals.get(name, name)
+        G = R
         
-        while self.pc < len(instructions):
-            instr = instructions[self.pc]
-            opcode = VaderOpcode(instr.opcode)
-            
-            if opcode == VaderOpcode.LOAD_CONST:
-                self.stack.append(constants[instr.arg])
-            elif opcode == VaderOpcode.LOAD_NAME:
-                name = names[instr.arg]
-                if name in self.locals:
-                    self.stack.append(self.locals[name])
-                elif name in self.globals:
-                    self.stack.append(self.globals[name])
-                else:
-                    raise NameError(f"Nombre '{name}' no definido")
-            elif opcode == VaderOpcode.STORE_NAME:
-                name = names[instr.arg]
-                value = self.stack.pop()
-                self.locals[name] = value
-            elif opcode == VaderOpcode.VADER_PRINT:
-                value = self.stack.pop()
-                print(value)
-            elif opcode == VaderOpcode.RETURN_VALUE:
-                if self.stack:
-                    return self.stack.pop()
-                return None
-            
-            self.pc += 1
+        def op_nop(a, b, c, pc):
+            return pc
         
-        return None
-    
-    def _deserialize_bytecode(self, bytecode: bytes) -> Tuple[List[VaderInstruction], List[Any], List[str]]:
-        """Deserializa bytecode"""
-        offset = 0
+        def op_loadk(a, b, c, pc):
+            R[a] = K[b]
+            return pc
         
-        num_instructions = struct.unpack('!I', bytecode[offset:offset+4])[0]
-        offset += 4
-        num_constants = struct.unpack('!I', bytecode[offset:offset+4])[0]
-        offset += 4
-        num_names = struct.unpack('!I', bytecode[offset:offset+4])[0]
-        offset += 4
+        def op_loadg(a, b, c, pc):
+            R[a] = G[b]
+            return pc
         
-        # Encontrar límites de datos serializados
-        constants_end = offset + 1000  # Estimación
-        while constants_end <= len(bytecode):
-            try:
-                constants = pickle.loads(bytecode[offset:constants_end])
-                break
-            except:
-                constants_end += 1
+        def op_storeg(a, b, c, pc):
+            G[a] = R[b]
+            return pc
+        
+        def op_move(a, b, c, pc):
+            R[a] = R[b]
+            return pc
+        
+        def add(x, y):
+            # Concatenación de strings o suma matemática
+            if x.__class__ is str or y.__class__ is str:
+                return str(x) + str(y)
+            return x + y
+        
+        def op_add(a, b, c, pc):
+            R[a] = add(R[b], R[c])
+            return pc
+        
+        def op_sub(a, b, c, pc):
+            R[a] = R[b] - R[c]
+            return pc
+        
+        def op_mul(a, b, c, pc):
+            R[a] = R[b] * R[c]
+            return pc
+        
+        def op_div(a, b, c, pc):
+            R[a] = R[b] / R[c]
+            return pc
+        
+        def op_eq(a, b, c, pc):
+            R[a] = R[b] == R[c]
+            return pc
+        
+        def op_ne(a, b, c, pc):
+            R[a] = R[b] != R[c]
+            return pc
+        
+        def op_lt(a, b, c, pc):
+            R[a] = R[b] < R[c]
+            return pc
+        
+        def op_le(a, b, c, pc):
+            R[a] = R[b] <= R[c]
+            return pc
+        
+        def op_gt(a, b, c, pc):
+            R[a] = R[b] > R[c]
+            return pc
+        
+        def op_ge(a, b, c, pc):
+            R[a] = R[b] >= R[c]
+            return pc
+        
+        def op_addk(a, b, c, pc):
+            x = R[b]
+            y = K[c]
+            if x.__class__ is int and y.__class__ is int:
+                R[a] = x + y
+            else:
+                R[a] = add(x, y)
+            return pc
+        
+        def op_subk(a, b, c, pc):
+            R[a] = R[b] - K[c]
+            return pc
+        
+        def op_mulk(a, b, c, pc):
+            R[a] = R[b] * K[c]
+            return pc
+        
+        def op_divk(a, b, c, pc):
+            R[a] = R[b] / K[c]
+            return pc
+        
+        def op_eqk(a, b, c, pc):
+            R[a] = R[b] == K[c]
+            return pc
+        
+        def op_nek(a, b, c, pc):
+            R[a] = R[b] != K[c]
+            return pc
+        
+        def op_ltk(a, b, c, pc):
+            R[a] = R[b] < K[c]
+            return pc
+        
+        def op_lek(a, b, c, pc):
+            R[a] = R[b] <= K[c]
+            return pc
+        
+        def op_gtk(a, b, c, pc):
+            R[a] = R[b] > K[c]
+            return pc
+        
+        def op_gek(a, b, c, pc):
+            R[a] = R[b] >= K[c]
+            return pc
+        
+        def op_not(a, b, c, pc):
+            R[a] = not R[b]
+            return pc
+        
+        def op_jmp(a, b, c, pc):
+            return a
+        
+        def op_jmpf(a, b, c, pc):
+            return pc if R[a] else b
         
-        offset = constants_end
+        def op_jmpt(a, b, c, pc):
+            return b if R[a] else pc
         
-        names_end = offset + 1000
-        while names_end <= len(bytecode):
+        def op_forloop(a, b, c, pc):
+            counter = R[a] - 1
+            R[a] = counter
+            return b if counter >= 0 else pc
+        
+        def op_call(a, b, c, pc):
+            nonlocal R
+            name, entry, registers = functions[a]
+            frames.append((pc, R))
+            R = [None] * registers
+            return entry
+        
+        def op_ret(a, b, c, pc):
+            nonlocal R
+            return_pc, R = frames.pop()
+            return return_pc
+        
+        def op_print(a, b, c, pc):
+            value = R[a]
+            print(value)
+            output.append(str(value))
+            return pc
+        
+        def op_input(a, b, c, pc):
+            R[a] = input(K[b]) if b >= 0 else input()
+            return pc
+        
+        def op_tonum(a, b, c, pc):
+            value = R[b]
             try:
-                names = pickle.loads(bytecode[offset:names_end])
-                break
-            except:
-                names_end += 1
-        
-        offset = names_end
-        
-        instructions = []
-        for i in range(num_instructions):
-            opcode = struct.unpack('!I', bytecode[offset:offset+4])[0]
-            offset += 4
-            arg = struct.unpack('!I', bytecode[offset:offset+4])[0]
-            offset += 4
-            lineno = struct.unpack('!I', bytecode[offset:offset+4])[0]
-            offset += 4
-            
-            instructions.append(VaderInstruction(opcode, arg if arg != 0 else None, lineno))
+                number = float(value)
+                R[a] = int(number) if number.is_integer() else number
+            except (TypeError, ValueError):
+                print(f"❌ Error Vader: No se puede convertir '{value}' a número", file=sys.stderr)
+                R[a] = value
+            return pc
+        
+        def op_tostr(a, b, c, pc):
+            R[a] = str(R[b])
+            return pc
+        
+        def op_halt(a, b, c, pc):
+            return -1
+        
+        table = [op_nop, op_loadk, op_loadg, op_storeg, op_move, op_add, op_sub, op_mul,
+                 op_div, op_eq, op_ne, op_lt, op_le, op_gt, op_ge, op_addk, op_subk,
+                 op_mulk, op_divk, op_eqk, op_nek, op_ltk, op_lek, op_gtk, op_gek, op_not,
+                 op_jmp, op_jmpf, op_jmpt, op_forloop, op_call, op_ret, op_print, op_input,
+                 op_tonum, op_tostr, op_halt]
         
-        return instructions, constants, names
+        # Decodificar una vez el flujo plano: (handler, a, b, c) por instrucción
+        opcodes = code[::INSTRUCTION_SIZE]
+        if len(opcodes) and not 0 <= min(opcodes) <= max(opcodes) < len(table):
+            raise VaderBytecodeFormatError("Código de operación inválido")
+        try:
+            decoded = [(table[code[i]], code[i + 1], code[i + 2], code[i + 3])
+                       for i in range(0, len(code), INSTRUCTION_SIZE)]
+        except IndexError:
+            raise VaderBytecodeFormatError("Instrucción incompleta en la sección CODE") from None
+        
+        pc = 0
+        try:
+            while pc >= 0:
+                handler, a, b, c = decoded[pc]
+                pc = handler(a, b, c, pc + 1)
+        except Exception as e:
+            self.pc = pc
+            line = program.lines[pc] if pc < len(program.lines) else 0
+            raise RuntimeError(f"Error en línea {line}: {e}") from e
+        finally:
+            del frames[:]
+            self.globals.update(zip(program.names, G))
+        return None
+    
+    @staticmethod
+    def _deserialize_bytecode(bytecode) -> VaderProgram:
+        """Deserializa un contenedor .vbc (bytes, memoryview o mmap) en una pasada"""
+        source_hash, sections = _unpack_sections(bytecode)
+        try:
+            constants = marshal.loads(sections[b'CNST'])
+            names = marshal.loads(sections[b'NAME'])
+            functions, main_registers = marshal.loads(sections[b'FUNC'])
+            code = _int32_view(sections[b'CODE'])
+            lines = _int32_view(sections[b'LINE'])
+        except KeyError as e:
+            raise VaderBytecodeFormatError(f"Falta la sección {e.args[0].decode()}") from None
+        except (EOFError, ValueError, TypeError) as e:
+            raise VaderBytecodeFormatError(f"Sección corrupta: {e}") from None
+        if len(code) != len(lines) * INSTRUCTION_SIZE:
+            raise VaderBytecodeFormatError("Las secciones CODE y LINE no coinciden")
+        return VaderProgram(code, constants, names, [tuple(f) for f in functions], lines,
+                            main_registers, bytes(source_hash))
+
+def benchmark_vm(vader_code: str, repeat: int = 3) -> Dict[str, float]:
+    """Compara la VM de registros con VaderNativeRuntime sobre el mismo código
+    
+    Devuelve el mejor tiempo (segundos) de cada motor y la aceleración relativa.
+    """
+    import io
+    import time
+    from contextlib import redirect_stdout
+    from vader_interpreter import VaderNativeRuntime
+    
+    def best_of(run):
+        times = []
+        for _ in range(repeat):
+            with redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - start)
+        return min(times)
+    
+    program = VaderBytecodeGenerator().compile_program(vader_code)
+    
+    def run_native(compiled):
+        runtime = VaderNativeRuntime()
+        runtime.compiled_mode = compiled
+        runtime.execute_code(vader_code)
+    
+    results = {
+        'vm': best_of(lambda: VaderBytecodeInterpreter().run(program)),
+        'native_compiled': best_of(lambda: run_native(True)),
+        'native_lines': best_of(lambda: run_native(False)),
+    }
+    results['speedup_vs_lines'] = results['native_lines'] / results['vm'] if results['vm'] else 0.0
+    results['speedup_vs_compiled'] = results['native_compiled'] / results['vm'] if results['vm'] else 0.0
+    return results
 
 class VaderCompilerSystem:
     """Sistema principal de compilación"""
@@ -330,6 +1019,14 @@ class VaderCompilerSystem:
     
     def _compile_to_vader_bytecode(self, source_code: str, result: CompilationResult) -> CompilationResult:
         """Compila a bytecode de Vader"""
+        # Reutilizar el .vbc existente si se generó desde el mismo fuente y con este compilador
+        source_hash = hashlib.sha256(source_code.encode('utf-8')).digest()
+        if read_bytecode_hash(result.output_file) == source_hash:
+            with open(result.output_file, 'rb') as f:
+                result.bytecode = f.read()
+            result.metadata['cached'] = True
+            return result
+        
         generator = VaderBytecodeGenerator()
         bytecode = generator.compile_vader_code(source_code)
         
@@ -362,24 +1059,22 @@ class VaderCompilerSystem:
         return result
     
     def _compile_to_native(self, source_code: str, result: CompilationResult) -> CompilationResult:
-        """Compila a código nativo"""
-        c_code = self._transpile_to_c(source_code)
+        """Compila a código nativo: funciones numéricas a una biblioteca .so (ctypes)"""
+        if vader_native is None:
+            raise RuntimeError("vader_native no disponible")
         
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.c', delete=False) as f:
-            f.write(c_code)
-            c_file = f.name
+        module = vader_native.compile_native_module(source_code, result.output_file)
+        result.metadata['c_code'] = module.c_source
+        result.metadata['native_functions'] = {
+            name: [lowered.signature for lowered in group] for name, group in module.functions.items()
+        }
+        result.metadata['fallbacks'] = module.fallbacks
         
-        try:
-            cmd = ['gcc', '-O2', '-o', result.output_file, c_file]
-            subprocess.run(cmd, check=True, capture_output=True)
-            result.metadata['c_code'] = c_code
-            
-        except subprocess.CalledProcessError as e:
-            result.errors.append(f"Error compilando C: {e.stderr.decode()}")
-        except FileNotFoundError:
-            result.errors.append("GCC no encontrado")
-        finally:
-            os.unlink(c_file)
+        # Lo que no se puede bajar a C se ejecuta por la ruta Python
+        for name, reason in module.fallbacks.items():
+            result.warnings.append(f"{name}: se ejecutará en Python ({reason})")
+        if module.library is None:
+            result.warnings.append("No hay funciones numéricas que compilar a código nativo")
         
         return result
     
@@ -415,27 +1110,6 @@ class VaderCompilerSystem:
         
         return '\n'.join(python_lines)
     
-    def _transpile_to_c(self, vader_code: str) -> str:
-        """Transpila Vader a C"""
-        c_code = """#include <stdio.h>
-#include <stdlib.h>
-
-int main() {
-"""
-        
-        for line in vader_code.split('\n'):
-            line = line.strip()
-            
-            if line.startswith('mostrar'):
-                content = line[7:].strip()
-                if content.startswith('"') and content.endswith('"'):
-                    c_code += f'    printf({content});\n'
-                    c_code += f'    printf("\\n");\n'
-        
-        c_code += """    return 0;
-}"""
-        return c_code
-    
     def _transpile_to_javascript(self, vader_code: str) -> str:
         """Transpila Vader a JavaScript"""
         js_lines = []
@@ -460,7 +1134,7 @@ int main() {
         extensions = {
             CompilationTarget.VADER_BYTECODE: '.vbc',
             CompilationTarget.PYTHON_BYTECODE: '.pyc',
-            CompilationTarget.NATIVE_CODE: '',
+            CompilationTarget.NATIVE_CODE: '.so',
             CompilationTarget.JAVASCRIPT: '.js'
         }
         
@@ -468,10 +1142,7 @@ int main() {
     
     def execute_bytecode(self, bytecode_file: str) -> Any:
         """Ejecuta archivo de bytecode"""
-        with open(bytecode_file, 'rb') as f:
-            bytecode = f.read()
-        
-        return self.interpreter.execute(bytecode)
+        return self.interpreter.run(load_bytecode_file(bytecode_file))
 
 def main():
     """Función principal para testing"""
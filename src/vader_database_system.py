@@ -25,14 +25,28 @@ import re
 import sqlite3
 import json
 import hashlib
-from typing import Dict, List, Any, Optional, Union, Type, Callable
+from typing import Dict, List, Any, Optional, Union, Type, Callable, Iterable, Iterator, Tuple
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from itertools import groupby
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, date
 import threading
-import queue
 import time
 
+# Plantillas de consulta parseadas que guarda cada ORM
+QUERY_CACHE_SIZE = 512
+
+# Literales que pasan a ser parámetros: cadenas entre comillas y números tras un operador, '(' o ','
+_LITERAL_PATTERN = re.compile(r"""'([^']*)'|"([^"]*)"|(?<=[=<>(,])(\s*)(-?\d+(?:\.\d+)?)(?![\w.])""")
+_LITERAL_TOKEN = re.compile(r'__vader_lit_(\d+)__')
+_PLACEHOLDER_OR_LITERAL = re.compile(r'\?|%s|__vader_lit_(\d+)__')
+
+# Formatos de fila de stream_vader_query
+ROW_FORMATS = ('dict', 'tuple', 'namedtuple')
+STREAM_BATCH_SIZE = 1000
+
 class DatabaseType(Enum):
     """Tipos de base de datos soportados"""
     SQLITE = "sqlite"
@@ -83,15 +97,40 @@ class DatabaseConnection:
     is_active: bool = False
     last_used: datetime = field(default_factory=datetime.now)
 
+@dataclass
+class PreparedQuery:
+    """Consulta Vader normalizada: forma parseada y SQL con los literales como parámetros"""
+    template: str
+    parsed: Dict[str, Any]
+    sql: str
+    bindings: List[Tuple[str, Any]]  # por marcador: ('literal', índice) o ('valor', constante)
+    hits: int = 0
+    
+    def bind(self, literals: List[Any]) -> List[Any]:
+        return [literals[value] if kind == 'literal' else value for kind, value in self.bindings]
+
 class VaderORM:
     """ORM transpirable para Vader"""
     
     def __init__(self, connection: DatabaseConnection):
         self.connection = connection
         self.tables: Dict[str, DatabaseTable] = {}
-        self.query_cache: Dict[str, Any] = {}
+        self.query_cache: OrderedDict = OrderedDict()
+        self._query_texts: OrderedDict = OrderedDict()  # texto exacto -> (plantilla, literales)
+        self.query_cache_size = QUERY_CACHE_SIZE
+        self.query_cache_stats = {'hits': 0, 'misses': 0, 'uncacheable': 0}
+        self._server_statements: Dict[str, Any] = {}
+        self._statement_counter = 0
         self.migration_history: List[str] = []
         
+        # Transacciones y lotes: dentro de ellos el commit se aplaza hasta el final
+        self._transaction_depth = 0
+        self._batch_size = 0
+        self._batch_interval = 0.0
+        self._pending_writes: List[tuple] = []
+        self._pending_since = 0.0
+        self.write_stats = {'statements': 0, 'batches': 0, 'commits': 0}
+        
         # Patrones de consulta en español
         self.query_patterns = {
             'select': r'seleccionar\s+([^de]+)\s+de\s+(\w+)(?:\s+donde\s+([^ordenar]+?))?(?:\s+ordenar\s+por\s+([^limitar]+?))?(?:\s+limitar\s+(\d+))?',
@@ -114,9 +153,11 @@ class VaderORM:
         try:
             if self.connection.db_type == DatabaseType.SQLITE:
                 import sqlite3
+                # sqlite3 reutiliza las sentencias compiladas por texto SQL
                 self.connection.connection = sqlite3.connect(
                     self.connection.connection_string,
-                    check_same_thread=False
+                    check_same_thread=False,
+                    cached_statements=QUERY_CACHE_SIZE
                 )
                 self.connection.connection.row_factory = sqlite3.Row
             
@@ -151,6 +192,7 @@ class VaderORM:
             
             self.connection.is_active = True
             self.connection.last_used = datetime.now()
+            self._server_statements.clear()
             
         except Exception as e:
             raise ConnectionError(f"Error conectando a la base de datos: {e}")
@@ -158,12 +200,28 @@ class VaderORM:
     def disconnect(self):
         """Desconecta de la base de datos"""
         if self.connection.connection:
+            self.flush()
+            self._server_statements.clear()
             self.connection.connection.close()
             self.connection.is_active = False
     
     def parse_vader_query(self, query: str) -> Dict[str, Any]:
         """Parsea una consulta en español de Vader"""
-        query = query.strip().lower()
+        original = query.strip()
+        query = original.lower()
+        
+        # INSERT múltiple: insertar muchos en tabla (a, b) valores (1, 'x'), (2, 'y')
+        if query.startswith('insertar muchos'):
+            match = re.match(r'insertar\s+muchos\s+en\s+(\w+)\s*\(([^)]+)\)(?:\s+valores\s*(.+))?$',
+                             original, re.IGNORECASE | re.DOTALL)
+            if match:
+                rows = re.findall(r'\(((?:[^()\'"]|\'[^\']*\'|"[^"]*")*)\)', match.group(3) or '')
+                return {
+                    'type': 'insert_many',
+                    'table': match.group(1).lower(),
+                    'fields': [f.strip().lower() for f in match.group(2).split(',')],
+                    'rows': [self._split_values(row) for row in rows]
+                }
         
         # SELECT - parsing manual más robusto
         if query.startswith('seleccionar'):
@@ -234,7 +292,7 @@ class VaderORM:
                     fields = [f.strip() for f in fields_str.split(',')]
                     
                     # Extraer valores entre paréntesis después de 'valores'
-                    values_start = query.find('(', valores_idx)
+                    values_start = query.find('(', query.find('valores', fields_end))
                     values_end = query.find(')', values_start)
                     if values_start != -1 and values_end != -1:
                         values_str = query[values_start + 1:values_end]
@@ -336,17 +394,26 @@ class VaderORM:
         
         return {'type': 'unknown', 'query': query}
     
-    def execute_vader_query(self, query: str) -> Any:
-        """Ejecuta una consulta en español de Vader"""
+    def execute_vader_query(self, query: str, filas: Optional[Iterable] = None) -> Any:
+        """Ejecuta una consulta en español de Vader
+        
+        `filas` da los valores de `insertar muchos en tabla (campos)` sin escribirlos en la consulta.
+        """
         if not self.connection.is_active:
             self.connect()
         
+        prepared, literals = self.prepare_vader_query(query)
+        if prepared is not None:
+            return self._execute_prepared(prepared, prepared.bind(literals))
+        
         parsed = self.parse_vader_query(query)
         
         if parsed['type'] == 'select':
             return self._execute_select(parsed)
         elif parsed['type'] == 'insert':
             return self._execute_insert(parsed)
+        elif parsed['type'] == 'insert_many':
+            return self.insert_many(parsed['table'], parsed['fields'], filas if filas is not None else parsed['rows'])
         elif parsed['type'] == 'update':
             return self._execute_update(parsed)
         elif parsed['type'] == 'delete':
@@ -356,9 +423,154 @@ class VaderORM:
         else:
             raise ValueError(f"Tipo de consulta no soportado: {parsed['type']}")
     
-    def _execute_select(self, parsed: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Ejecuta consulta SELECT"""
-        # Construir SQL
+    def prepare_vader_query(self, query: str) -> Tuple[Optional[PreparedQuery], List[Any]]:
+        """Normaliza la consulta a una plantilla y devuelve su forma preparada (cacheada) y los literales
+        
+        Devuelve (None, literales) si la consulta no se puede cachear (DDL,
+        inserción masiva o literales fuera de valores y condiciones).
+        """
+        known = self._query_texts.get(query)
+        if known is not None:
+            template, literals = known
+            prepared = self.query_cache.get(template)
+            if prepared is not None:
+                self.query_cache_stats['hits'] += 1
+                prepared.hits += 1
+                return prepared, literals
+        
+        literals = []
+        
+        def lift(match):
+            if match.group(4) is not None:
+                number = match.group(4)
+                literals.append(float(number) if '.' in number else int(number))
+                prefix = match.group(3)
+            else:
+                literals.append(match.group(1) if match.group(1) is not None else match.group(2))
+                prefix = ''
+            return f"{prefix}__vader_lit_{len(literals) - 1}__"
+        
+        template = _LITERAL_PATTERN.sub(lift, query.strip())
+        prepared = self.query_cache.get(template)
+        if prepared is not None:
+            self.query_cache.move_to_end(template)
+            self.query_cache_stats['hits'] += 1
+            prepared.hits += 1
+            self._remember_text(query, template, literals)
+            return prepared, literals
+        
+        prepared = self._compile_template(template, len(literals))
+        if prepared is None:
+            self.query_cache_stats['uncacheable'] += 1
+            return None, literals
+        
+        self.query_cache_stats['misses'] += 1
+        self.query_cache[template] = prepared
+        while len(self.query_cache) > self.query_cache_size:
+            self.query_cache.popitem(last=False)
+        self._remember_text(query, template, literals)
+        return prepared, literals
+    
+    def _remember_text(self, query: str, template: str, literals: List[Any]):
+        self._query_texts[query] = (template, tuple(literals))
+        while len(self._query_texts) > self.query_cache_size:
+            self._query_texts.popitem(last=False)
+    
+    def query_cache_info(self) -> Dict[str, Any]:
+        """Estadísticas de la caché de consultas"""
+        total = self.query_cache_stats['hits'] + self.query_cache_stats['misses']
+        return {
+            'entries': len(self.query_cache),
+            **self.query_cache_stats,
+            'hit_rate': self.query_cache_stats['hits'] / total if total else 0.0,
+            'server_statements': len(self._server_statements),
+        }
+    
+    def _compile_template(self, template: str, literal_count: int) -> Optional[PreparedQuery]:
+        """Parsea una plantilla y genera su SQL con un marcador por literal"""
+        parsed = self.parse_vader_query(template)
+        builders = {'select': self._select_sql, 'insert': self._insert_sql,
+                    'update': self._update_sql, 'delete': self._delete_sql}
+        if parsed['type'] not in builders:
+            return None
+        
+        # Un literal en tabla, campos u orden no es un valor: no se puede parametrizar
+        names = [parsed['table'], *parsed.get('fields', []), parsed.get('order_by') or '',
+                 *parsed.get('assignments', {}).keys()]
+        if any(_LITERAL_TOKEN.search(name) for name in names):
+            return None
+        
+        sql, params = builders[parsed['type']](parsed)
+        bindings: List[Tuple[str, Any]] = []
+        placeholder = '?' if self.connection.db_type == DatabaseType.SQLITE else '%s'
+        params = iter(params)
+        
+        def bind(match):
+            token = match.group(1) if match.group(1) is not None else None
+            if token is None:
+                value = next(params)
+                literal = _LITERAL_TOKEN.fullmatch(value) if isinstance(value, str) else None
+                if literal is None and isinstance(value, str) and _LITERAL_TOKEN.search(value):
+                    raise ValueError(value)
+                token = literal.group(1) if literal else None
+                if token is None:
+                    bindings.append(('valor', value))
+                    return placeholder
+            bindings.append(('literal', int(token)))
+            return placeholder
+        
+        try:
+            sql = _PLACEHOLDER_OR_LITERAL.sub(bind, sql)
+        except ValueError:
+            return None  # literal mezclado con otro texto dentro de un parámetro
+        
+        # Todos los literales deben llegar al SQL como parámetros
+        if {value for kind, value in bindings if kind == 'literal'} != set(range(literal_count)):
+            return None
+        return PreparedQuery(template, parsed, sql, bindings)
+    
+    def _execute_prepared(self, prepared: PreparedQuery, params: List[Any]) -> Any:
+        """Ejecuta una consulta de la caché"""
+        kind = prepared.parsed['type']
+        if kind == 'select':
+            return self._run_select(prepared.sql, params, prepared)
+        cursor = self._write(prepared.sql, params, prepared)
+        if cursor is None:
+            return None  # encolada en el lote actual
+        if kind == 'insert':
+            return cursor.lastrowid if hasattr(cursor, 'lastrowid') else cursor.rowcount
+        return cursor.rowcount
+    
+    def _execute_sql(self, sql: str, params: List[Any], prepared: Optional[PreparedQuery] = None) -> Any:
+        """Ejecuta SQL; las consultas de la caché usan sentencias preparadas en el servidor si el driver las admite"""
+        conn = self.connection.connection
+        if prepared is not None and self.connection.db_type == DatabaseType.POSTGRESQL:
+            cursor = conn.cursor()
+            name = self._server_statements.get(sql)
+            if name is None:
+                self._statement_counter += 1
+                name = f"vader_q{self._statement_counter}"
+                numbers = iter(range(1, len(params) + 1))
+                cursor.execute(f"PREPARE {name} AS " + re.sub(r'%s', lambda m: f"${next(numbers)}", sql))
+                self._server_statements[sql] = name
+            arguments = f" ({', '.join(['%s'] * len(params))})" if params else ''
+            cursor.execute(f"EXECUTE {name}{arguments}", params)
+            return cursor
+        
+        if prepared is not None and self.connection.db_type == DatabaseType.MYSQL:
+            # El cursor preparado de mysql-connector reutiliza la sentencia si el SQL no cambia
+            cursor = self._server_statements.get(sql)
+            if cursor is None:
+                cursor = self._server_statements[sql] = conn.cursor(prepared=True)
+            cursor.execute(sql, params)
+            return cursor
+        
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        return cursor
+    
+    def _select_sql(self, parsed: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Genera el SQL de una consulta SELECT"""
         fields_sql = ', '.join(parsed['fields']) if parsed['fields'][0] != '*' else '*'
         sql = f"SELECT {fields_sql} FROM {parsed['table']}"
         
@@ -374,29 +586,17 @@ class VaderORM:
         if parsed['limit']:
             sql += f" LIMIT {parsed['limit']}"
         
-        cursor = self.connection.connection.cursor()
-        cursor.execute(sql, params)
-        
-        if self.connection.db_type == DatabaseType.SQLITE:
-            return [dict(row) for row in cursor.fetchall()]
-        else:
-            return cursor.fetchall()
+        return sql, params
     
-    def _execute_insert(self, parsed: Dict[str, Any]) -> int:
-        """Ejecuta consulta INSERT"""
+    def _insert_sql(self, parsed: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Genera el SQL de una consulta INSERT"""
         fields = ', '.join(parsed['fields'])
         placeholders = ', '.join(['?' if self.connection.db_type == DatabaseType.SQLITE else '%s'] * len(parsed['values']))
         
-        sql = f"INSERT INTO {parsed['table']} ({fields}) VALUES ({placeholders})"
-        
-        cursor = self.connection.connection.cursor()
-        cursor.execute(sql, parsed['values'])
-        self.connection.connection.commit()
-        
-        return cursor.lastrowid if hasattr(cursor, 'lastrowid') else cursor.rowcount
+        return f"INSERT INTO {parsed['table']} ({fields}) VALUES ({placeholders})", list(parsed['values'])
     
-    def _execute_update(self, parsed: Dict[str, Any]) -> int:
-        """Ejecuta consulta UPDATE"""
+    def _update_sql(self, parsed: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Genera el SQL de una consulta UPDATE"""
         assignments = []
         params = []
         
@@ -412,14 +612,10 @@ class VaderORM:
             sql += f" WHERE {where_sql}"
             params.extend(where_params)
         
-        cursor = self.connection.connection.cursor()
-        cursor.execute(sql, params)
-        self.connection.connection.commit()
-        
-        return cursor.rowcount
+        return sql, params
     
-    def _execute_delete(self, parsed: Dict[str, Any]) -> int:
-        """Ejecuta consulta DELETE"""
+    def _delete_sql(self, parsed: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        """Genera el SQL de una consulta DELETE"""
         sql = f"DELETE FROM {parsed['table']}"
         params = []
         
@@ -428,11 +624,100 @@ class VaderORM:
             sql += f" WHERE {where_sql}"
             params.extend(where_params)
         
-        cursor = self.connection.connection.cursor()
-        cursor.execute(sql, params)
-        self.connection.connection.commit()
+        return sql, params
+    
+    def stream_vader_query(self, query: str, batch_size: int = STREAM_BATCH_SIZE,
+                           row_format: str = 'dict') -> Iterator[Any]:
+        """Recorre un SELECT sin cargarlo entero: las filas llegan en lotes de fetchmany
         
-        return cursor.rowcount
+        `row_format` puede ser 'dict', 'tuple' o 'namedtuple' (las dos últimas
+        evitan crear un diccionario por fila). En PostgreSQL se usa un cursor
+        de servidor y en MySQL un cursor sin buffer.
+        """
+        if row_format not in ROW_FORMATS:
+            raise ValueError(f"Formato de fila no soportado: {row_format} (usar {', '.join(ROW_FORMATS)})")
+        if not self.connection.is_active:
+            self.connect()
+        
+        prepared, literals = self.prepare_vader_query(query)
+        if prepared is not None:
+            parsed, sql, params = prepared.parsed, prepared.sql, prepared.bind(literals)
+        else:
+            parsed = self.parse_vader_query(query)
+            sql, params = self._select_sql(parsed) if parsed['type'] == 'select' else (None, None)
+        if parsed['type'] != 'select':
+            raise ValueError(f"Solo se pueden recorrer consultas 'seleccionar': {parsed['type']}")
+        
+        return self._stream_rows(sql, params, max(1, batch_size), row_format)
+    
+    def _stream_rows(self, sql: str, params: List[Any], batch_size: int, row_format: str) -> Iterator[Any]:
+        self.flush()
+        conn = self.connection.connection
+        if self.connection.db_type == DatabaseType.POSTGRESQL:
+            # Cursor con nombre: el servidor entrega las filas de `itersize` en `itersize`
+            self._statement_counter += 1
+            factory = None
+            if row_format != 'dict':
+                from psycopg2.extensions import cursor as factory
+            cursor = conn.cursor(name=f"vader_stream_{self._statement_counter}", cursor_factory=factory)
+            cursor.itersize = batch_size
+        elif self.connection.db_type == DatabaseType.MYSQL:
+            cursor = conn.cursor(buffered=False)
+        else:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # tuplas: sin sqlite3.Row intermedio
+        
+        try:
+            cursor.execute(sql, params)
+            names = [column[0] for column in cursor.description]
+            make_row = None
+            if row_format == 'namedtuple':
+                make_row = namedtuple('Fila', names, rename=True)._make
+            elif row_format == 'dict' and self.connection.db_type != DatabaseType.POSTGRESQL:
+                make_row = lambda row: dict(zip(names, row))
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if make_row is None:
+                    yield from rows
+                else:
+                    yield from map(make_row, rows)
+        finally:
+            cursor.close()
+    
+    def _run_select(self, sql: str, params: List[Any], prepared: Optional[PreparedQuery] = None) -> List[Dict[str, Any]]:
+        # Las escrituras encoladas se aplican antes de leer
+        self.flush()
+        cursor = self._execute_sql(sql, params, prepared)
+        
+        if self.connection.db_type == DatabaseType.SQLITE:
+            return [dict(row) for row in cursor.fetchall()]
+        else:
+            return cursor.fetchall()
+    
+    def _execute_select(self, parsed: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Ejecuta consulta SELECT"""
+        return self._run_select(*self._select_sql(parsed))
+    
+    def _execute_insert(self, parsed: Dict[str, Any]) -> int:
+        """Ejecuta consulta INSERT"""
+        cursor = self._write(*self._insert_sql(parsed))
+        if cursor is None:
+            return None  # encolada en el lote actual
+        
+        return cursor.lastrowid if hasattr(cursor, 'lastrowid') else cursor.rowcount
+    
+    def _execute_update(self, parsed: Dict[str, Any]) -> int:
+        """Ejecuta consulta UPDATE"""
+        cursor = self._write(*self._update_sql(parsed))
+        return cursor.rowcount if cursor is not None else None
+    
+    def _execute_delete(self, parsed: Dict[str, Any]) -> int:
+        """Ejecuta consulta DELETE"""
+        cursor = self._write(*self._delete_sql(parsed))
+        return cursor.rowcount if cursor is not None else None
     
     def _execute_create_table(self, parsed: Dict[str, Any]) -> bool:
         """Ejecuta consulta CREATE TABLE"""
@@ -447,12 +732,134 @@ class VaderORM:
         
         sql = f"CREATE TABLE IF NOT EXISTS {parsed['table']} ({', '.join(field_definitions)})"
         
+        self.flush()
         cursor = self.connection.connection.cursor()
         cursor.execute(sql)
-        self.connection.connection.commit()
+        self._commit()
         
         return True
     
+    def insert_many(self, table: str, fields: List[str], rows: Iterable) -> int:
+        """Inserta muchas filas con un solo executemany y un solo commit"""
+        if not self.connection.is_active:
+            self.connect()
+        placeholder = '?' if self.connection.db_type == DatabaseType.SQLITE else '%s'
+        sql = f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({', '.join([placeholder] * len(fields))})"
+        
+        self.flush()
+        cursor = self.connection.connection.cursor()
+        try:
+            cursor.executemany(sql, rows)
+            self._commit()
+        except Exception:
+            if self._transaction_depth == 0:
+                self.connection.connection.rollback()
+            raise
+        self.write_stats['batches'] += 1
+        self.write_stats['statements'] += max(cursor.rowcount, 0)
+        return cursor.rowcount
+    
+    @contextmanager
+    def transaccion(self):
+        """Transacción: un solo commit al salir del bloque y rollback si hay una excepción
+        
+        Las transacciones anidadas usan SAVEPOINT, así que un error interno
+        solo deshace su propio bloque.
+        """
+        if not self.connection.is_active:
+            self.connect()
+        self.flush()
+        conn = self.connection.connection
+        depth = self._transaction_depth
+        savepoint = f"vader_sp_{depth}"
+        if depth:
+            conn.cursor().execute(f"SAVEPOINT {savepoint}")
+        elif self.connection.db_type == DatabaseType.SQLITE and not conn.in_transaction:
+            # BEGIN explícito: sqlite3 solo abre transacción antes de un DML
+            conn.cursor().execute("BEGIN")
+        self._transaction_depth += 1
+        try:
+            yield self
+            self.flush()
+        except BaseException:
+            self._transaction_depth -= 1
+            self._pending_writes.clear()
+            if depth:
+                conn.cursor().execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                conn.cursor().execute(f"RELEASE SAVEPOINT {savepoint}")
+            else:
+                conn.rollback()
+            raise
+        else:
+            self._transaction_depth -= 1
+            if depth:
+                conn.cursor().execute(f"RELEASE SAVEPOINT {savepoint}")
+            else:
+                self._commit()
+    
+    @contextmanager
+    def auto_batch(self, size: int = 1000, interval: float = 1.0):
+        """Agrupa las escrituras del bloque y las vuelca cada `size` sentencias o `interval` segundos
+        
+        El volcado se comprueba en cada escritura; las lecturas, las
+        transacciones y el final del bloque vuelcan lo pendiente antes.
+        """
+        previous = (self._batch_size, self._batch_interval)
+        self._batch_size, self._batch_interval = max(1, size), interval
+        try:
+            yield self
+        finally:
+            try:
+                self.flush()
+            finally:
+                self._batch_size, self._batch_interval = previous
+    
+    def flush(self) -> int:
+        """Ejecuta las escrituras encoladas con executemany y las confirma con un commit"""
+        if not self._pending_writes:
+            return 0
+        pending, self._pending_writes = self._pending_writes, []
+        cursor = self.connection.connection.cursor()
+        try:
+            for sql, group in groupby(pending, key=lambda write: write[0]):
+                cursor.executemany(sql, [params for _, params in group])
+            self._commit()
+        except Exception:
+            if self._transaction_depth == 0:
+                self.connection.connection.rollback()
+            raise
+        self.write_stats['batches'] += 1
+        self.write_stats['statements'] += len(pending)
+        return len(pending)
+    
+    def _write(self, sql: str, params: List[Any], prepared: Optional[PreparedQuery] = None) -> Any:
+        """Ejecuta una escritura, o la encola si hay lotes activos (devuelve None)"""
+        if self._batch_size:
+            if not self._pending_writes:
+                self._pending_since = time.monotonic()
+            self._pending_writes.append((sql, params))
+            if (len(self._pending_writes) >= self._batch_size
+                    or time.monotonic() - self._pending_since >= self._batch_interval):
+                self.flush()
+            return None
+        
+        cursor = self._execute_sql(sql, params, prepared)
+        self.write_stats['statements'] += 1
+        self._commit()
+        return cursor
+    
+    def _commit(self):
+        """Confirma, salvo dentro de una transacción (se confirma al salir de ella)"""
+        if self._transaction_depth == 0:
+            self.connection.connection.commit()
+            self.write_stats['commits'] += 1
+    
+    @staticmethod
+    def _split_values(values: str) -> List[str]:
+        """Separa los valores de una fila respetando las comas entre comillas"""
+        tokens = re.findall(r"\s*('[^']*'|\"[^\"]*\"|[^,]+?)\s*(?:,|$)", values)
+        return [token.strip().strip('"\'') for token in tokens]
+    
     def _field_to_sql(self, field: DatabaseField) -> str:
         """Convierte un campo Vader a SQL"""
         type_mapping = {
@@ -550,56 +957,237 @@ class VaderORM:
         VaderModel.__name__ = f"{table_name.capitalize()}Model"
         return VaderModel
 
+class PoolTimeoutError(TimeoutError):
+    """No quedó ninguna conexión libre dentro del tiempo de espera del pool"""
+
 class VaderDatabasePool:
-    """Pool de conexiones para Vader"""
+    """Pool de conexiones para Vader
+    
+    Seguro entre hilos: las conexiones se validan antes de entregarse
+    (pre-ping), se reciclan al superar `max_lifetime` o al quedar inactivas
+    más de `max_idle`, y al devolverse se deshace cualquier transacción
+    abierta. Con SQLite, cada hilo recibe preferentemente la conexión que
+    usó la última vez.
+    """
     
-    def __init__(self, db_type: DatabaseType, connection_string: str, max_connections: int = 10):
+    def __init__(self, db_type: DatabaseType, connection_string: str, max_connections: int = 10,
+                 timeout: float = 30.0, max_idle: float = 300.0, max_lifetime: float = 3600.0,
+                 min_connections: int = 3, pre_ping: bool = True):
         self.db_type = db_type
         self.connection_string = connection_string
         self.max_connections = max_connections
-        self.connections: queue.Queue = queue.Queue(maxsize=max_connections)
-        self.active_connections = 0
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.min_connections = min(min_connections, max_connections)
+        self.pre_ping = pre_ping
+        
+        self.idle: List[VaderORM] = []
+        self.active_connections = 0  # abiertas, libres o en uso
+        self.in_use = 0
+        self.closed = False
         self.lock = threading.Lock()
+        self.available = threading.Condition(self.lock)
+        # id(orm) -> [creada, última devolución, hilo que la usó]
+        self._info: Dict[int, list] = {}
+        self.stats = {'checkouts': 0, 'created': 0, 'recycled': 0, 'stale': 0, 'reaped': 0,
+                      'timeouts': 0, 'rollbacks': 0, 'wait_time': 0.0, 'max_wait': 0.0}
         
         # Crear conexiones iniciales
         self._create_initial_connections()
     
     def _create_initial_connections(self):
         """Crea conexiones iniciales"""
-        for _ in range(min(3, self.max_connections)):  # Crear 3 conexiones iniciales
-            conn = DatabaseConnection(self.db_type, self.connection_string)
-            orm = VaderORM(conn)
-            orm.connect()
-            self.connections.put(orm)
-            self.active_connections += 1
-    
-    def get_connection(self) -> VaderORM:
-        """Obtiene una conexión del pool"""
-        try:
-            # Intentar obtener conexión existente
-            orm = self.connections.get_nowait()
-            orm.connection.last_used = datetime.now()
-            return orm
-        except queue.Empty:
-            # Crear nueva conexión si no se alcanzó el límite
+        for _ in range(self.min_connections):
+            orm = self._open()
             with self.lock:
+                self.active_connections += 1
+                self.idle.append(orm)
+    
+    def _open(self) -> VaderORM:
+        orm = VaderORM(DatabaseConnection(self.db_type, self.connection_string))
+        orm.connect()
+        now = time.monotonic()
+        with self.lock:
+            self._info[id(orm)] = [now, now, None]
+            self.stats['created'] += 1
+        return orm
+    
+    def _close(self, orm: VaderORM):
+        self._info.pop(id(orm), None)
+        try:
+            orm.disconnect()
+        except Exception:
+            pass
+    
+    def _is_alive(self, orm: VaderORM) -> bool:
+        """Pre-ping: una consulta mínima para detectar conexiones caídas"""
+        try:
+            if self.db_type == DatabaseType.MONGODB:
+                orm.connection.connection.admin.command('ping')
+            else:
+                cursor = orm.connection.connection.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            return True
+        except Exception:
+            return False
+    
+    def _expired(self, orm: VaderORM, now: float) -> bool:
+        created = self._info.get(id(orm), [now])[0]
+        return self.max_lifetime is not None and now - created >= self.max_lifetime
+    
+    def _take_idle(self) -> VaderORM:
+        """Saca una conexión libre (con el lock): la del mismo hilo en SQLite, si no la más reciente"""
+        if self.db_type == DatabaseType.SQLITE:
+            thread = threading.get_ident()
+            for index in range(len(self.idle) - 1, -1, -1):
+                if self._info.get(id(self.idle[index]), [0, 0, None])[2] == thread:
+                    return self.idle.pop(index)
+        return self.idle.pop()
+    
+    def reap_idle(self) -> int:
+        """Cierra las conexiones inactivas más de `max_idle` segundos (conserva `min_connections`)"""
+        now = time.monotonic()
+        with self.lock:
+            reaped = [orm for orm in self.idle
+                      if now - self._info.get(id(orm), [now, now])[1] >= self.max_idle]
+            reaped = reaped[:max(0, self.active_connections - self.min_connections)]
+            for orm in reaped:
+                self.idle.remove(orm)
+            self.active_connections -= len(reaped)
+            self.stats['reaped'] += len(reaped)
+            if reaped:
+                self.available.notify(len(reaped))
+        for orm in reaped:
+            self._close(orm)
+        return len(reaped)
+    
+    def get_connection(self, timeout: Optional[float] = None) -> VaderORM:
+        """Obtiene una conexión del pool; lanza PoolTimeoutError si no hay ninguna libre a tiempo"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        self.reap_idle()
+        
+        orm = None
+        with self.available:
+            while True:
+                if self.closed:
+                    raise ConnectionError("El pool de conexiones está cerrado")
+                if self.idle:
+                    orm = self._take_idle()
+                    break
                 if self.active_connections < self.max_connections:
-                    conn = DatabaseConnection(self.db_type, self.connection_string)
-                    orm = VaderORM(conn)
-                    orm.connect()
                     self.active_connections += 1
-                    return orm
-                else:
-                    # Esperar por una conexión disponible
-                    return self.connections.get(timeout=30)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    raise PoolTimeoutError(
+                        f"Sin conexiones libres tras {timeout:.1f}s "
+                        f"({self.in_use}/{self.max_connections} en uso)")
+                # notify() despierta a un solo hilo por conexión devuelta
+                self.available.wait(remaining)
+            self.in_use += 1
+        
+        # La validación y la apertura se hacen fuera del lock
+        if orm is not None:
+            reason = ('recycled' if self._expired(orm, time.monotonic())
+                      else 'stale' if self.pre_ping and not self._is_alive(orm) else None)
+            if reason:
+                with self.lock:
+                    self.stats[reason] += 1
+                self._close(orm)
+                orm = None
+        if orm is None:
+            try:
+                orm = self._open()
+            except Exception:
+                with self.available:
+                    self.active_connections -= 1
+                    self.in_use -= 1
+                    self.available.notify()
+                raise
+        
+        waited = time.monotonic() - start
+        with self.lock:
+            self.stats['checkouts'] += 1
+            self.stats['wait_time'] += waited
+            self.stats['max_wait'] = max(self.stats['max_wait'], waited)
+        self._info[id(orm)][2] = threading.get_ident()
+        orm.connection.last_used = datetime.now()
+        return orm
     
     def return_connection(self, orm: VaderORM):
-        """Devuelve una conexión al pool"""
-        if orm.connection.is_active:
-            self.connections.put(orm)
-        else:
-            with self.lock:
+        """Devuelve una conexión al pool, deshaciendo lo que no se haya confirmado"""
+        healthy = orm.connection.is_active
+        try:
+            if healthy and (orm._pending_writes or orm._transaction_depth or self._in_transaction(orm)):
+                orm._pending_writes.clear()
+                orm._transaction_depth = 0
+                with self.lock:
+                    self.stats['rollbacks'] += 1
+                orm.connection.connection.rollback()
+        except Exception:
+            healthy = False
+        
+        now = time.monotonic()
+        keep = healthy and not self.closed and not self._expired(orm, now)
+        with self.available:
+            self.in_use -= 1
+            if keep:
+                self._info.setdefault(id(orm), [now, now, None])[1] = now
+                self.idle.append(orm)
+            else:
                 self.active_connections -= 1
+            self.available.notify()
+        if not keep:
+            self._close(orm)
+    
+    def _in_transaction(self, orm: VaderORM) -> bool:
+        if self.db_type == DatabaseType.MONGODB:
+            return False
+        # sqlite3 sabe si hay una transacción abierta; en el resto se hace rollback siempre
+        return getattr(orm.connection.connection, 'in_transaction', True)
+    
+    @contextmanager
+    def conexion(self, timeout: Optional[float] = None):
+        """`with pool.conexion() as orm:` obtiene una conexión y la devuelve al salir"""
+        orm = self.get_connection(timeout)
+        try:
+            yield orm
+        finally:
+            self.return_connection(orm)
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Métricas del pool: esperas, checkouts y conexiones en uso"""
+        with self.lock:
+            checkouts = self.stats['checkouts']
+            return {
+                **self.stats,
+                'avg_wait': self.stats['wait_time'] / checkouts if checkouts else 0.0,
+                'in_use': self.in_use,
+                'idle': len(self.idle),
+                'total': self.active_connections,
+                'max_connections': self.max_connections,
+            }
+    
+    def close(self):
+        """Cierra las conexiones libres; las que están en uso se cierran al devolverse"""
+        with self.available:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.active_connections -= len(idle)
+            self.available.notify_all()
+        for orm in idle:
+            self._close(orm)
+
+def conectar(tipo: str = 'sqlite', cadena: str = ':memory:') -> VaderORM:
+    """Crea y conecta un ORM; los programas Vader lo usan como `vader_db = conectar(...)`"""
+    orm = VaderORM(DatabaseConnection(DatabaseType(tipo), cadena))
+    orm.connect()
+    return orm
 
 def main():
     """Función principal para testing"""
@@ -688,10 +1276,10 @@ def main():
     print("\n🏊 Probando pool de conexiones...")
     pool = VaderDatabasePool(DatabaseType.SQLITE, ":memory:", max_connections=5)
     
-    test_orm = pool.get_connection()
-    print(f"   Conexión obtenida del pool: {test_orm.connection.is_active}")
-    pool.return_connection(test_orm)
-    print("   Conexión devuelta al pool")
+    with pool.conexion() as test_orm:
+        print(f"   Conexión obtenida del pool: {test_orm.connection.is_active}")
+    print(f"   Conexión devuelta al pool: {pool.metrics()['idle']} libres")
+    pool.close()
     
     orm.disconnect()
     
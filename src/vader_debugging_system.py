@@ -27,9 +27,10 @@ import inspect
 import threading
 import time
 import gc
-import psutil
 import os
-from typing import Dict, List, Any, Optional, Callable, Union
+import dis
+from types import CodeType
+from typing import Dict, List, Any, Optional, Callable, Union, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import json
@@ -37,6 +38,18 @@ import logging
 from datetime import datetime
 import linecache
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# PEP 669 (Python 3.12+): eventos activados sólo donde hacen falta.
+# Sin sys.monitoring se usa sys.settrace.
+MONITORING_AVAILABLE = hasattr(sys, 'monitoring')
+DEFAULT_TRACE_BACKEND = 'monitoring' if MONITORING_AVAILABLE else 'settrace'
+
+_NOT_PLANNED = object()
+
 class DebugLevel(Enum):
     """Niveles de debugging"""
     TRACE = "trace"
@@ -90,7 +103,14 @@ class VaderBreakpoint:
         # Verificar función
         if self.function_name and frame.f_code.co_name != self.function_name:
             return False
-        
+
+        return self.check_condition(frame)
+
+    def check_condition(self, frame) -> bool:
+        """Comprueba la condición de un breakpoint cuya ubicación ya coincide"""
+        if not self.enabled:
+            return False
+
         # Verificar condición
         if self.condition:
             try:
@@ -128,14 +148,32 @@ class DebugSession:
 class VaderDebugger:
     """Debugger principal de Vader"""
     
-    def __init__(self):
+    def __init__(self, backend: str = None):
         self.sessions: Dict[str, DebugSession] = {}
         self.current_session: Optional[DebugSession] = None
         self.original_trace_function = None
         self.is_debugging = False
         self.step_depth = 0
         self.performance_data = {}
-        
+
+        # Backend de trazado: 'monitoring' (sys.monitoring) o 'settrace'
+        self.backend = backend or DEFAULT_TRACE_BACKEND
+        if self.backend == 'monitoring' and not MONITORING_AVAILABLE:
+            self.backend = 'settrace'
+        self.tool_id = sys.monitoring.DEBUGGER_ID if MONITORING_AVAILABLE else None
+
+        # Índices de breakpoints: (archivo, línea) y nombre de función
+        self._line_breakpoints: Dict[Tuple[str, int], List[VaderBreakpoint]] = {}
+        self._function_breakpoints: Dict[str, List[VaderBreakpoint]] = {}
+        self._breakpoint_lines: Dict[str, Set[int]] = {}
+
+        # Por code object: None si sus líneas no necesitan comprobaciones,
+        # o (archivo, watchpoints que le afectan)
+        self._code_plans: Dict[CodeType, Optional[Tuple[str, list]]] = {}
+        self._instrumented: Set[CodeType] = set()
+        self._file_keys: Dict[str, str] = {}
+        self._callback_state = threading.local()
+
         # Configurar logging
         self.logger = self._setup_logging()
         
@@ -192,12 +230,13 @@ class VaderDebugger:
         self.sessions[session_id] = session
         self.current_session = session
         
-        # Instalar trace function
-        self.original_trace_function = sys.gettrace()
-        sys.settrace(self._trace_function)
-        self.is_debugging = True
+        # Instalar backend de trazado
+        if not self.is_debugging:
+            self._install_tracing()
+            self.is_debugging = True
+        self._rebuild_indexes()
         
-        self.logger.info(f"Sesión de debugging iniciada: {session_id}")
+        self.logger.info(f"Sesión de debugging iniciada: {session_id} ({self.backend})")
         return session
     
     def stop_debug_session(self, session_id: str = None):
@@ -211,7 +250,8 @@ class VaderDebugger:
             session.is_active = False
             
             # Restaurar trace function original
-            sys.settrace(self.original_trace_function)
+            if self.is_debugging:
+                self._uninstall_tracing()
             self.is_debugging = False
             
             self.logger.info(f"Sesión de debugging terminada: {session.session_id}")
@@ -234,11 +274,13 @@ class VaderDebugger:
         )
         
         self.current_session.breakpoints[breakpoint_id] = breakpoint
+        self._rebuild_indexes()
         self.logger.info(f"Breakpoint añadido: {file_path}:{line_number}")
         
         return breakpoint_id
     
-    def add_function_breakpoint(self, function_name: str, condition: str = None) -> str:
+    def add_function_breakpoint(self, function_name: str, condition: str = None,
+                                temporary: bool = False) -> str:
         """Añade un breakpoint en función"""
         if not self.current_session:
             raise RuntimeError("No hay sesión de debugging activa")
@@ -250,16 +292,23 @@ class VaderDebugger:
             breakpoint_type=BreakpointType.FUNCTION,
             file_path="",
             function_name=function_name,
-            condition=condition
+            condition=condition,
+            temporary=temporary
         )
         
         self.current_session.breakpoints[breakpoint_id] = breakpoint
+        self._rebuild_indexes()
         self.logger.info(f"Function breakpoint añadido: {function_name}")
         
         return breakpoint_id
     
-    def add_watchpoint(self, variable_name: str, condition: str = None) -> str:
-        """Añade un watchpoint para una variable"""
+    def add_watchpoint(self, variable_name: str, condition: str = None,
+                       scope: str = None) -> str:
+        """Añade un watchpoint para una variable
+        
+        Sólo se evalúa en las líneas de funciones que usan la variable;
+        `scope` lo limita además a las funciones con ese nombre.
+        """
         if not self.current_session:
             raise RuntimeError("No hay sesión de debugging activa")
         
@@ -268,10 +317,12 @@ class VaderDebugger:
         self.current_session.watchpoints[watchpoint_id] = {
             'variable': variable_name,
             'condition': condition,
+            'scope': scope,
             'last_value': None,
             'hit_count': 0
         }
         
+        self._rebuild_indexes()
         self.logger.info(f"Watchpoint añadido: {variable_name}")
         return watchpoint_id
     
@@ -279,33 +330,295 @@ class VaderDebugger:
         """Elimina un breakpoint"""
         if self.current_session and breakpoint_id in self.current_session.breakpoints:
             del self.current_session.breakpoints[breakpoint_id]
+            self._rebuild_indexes()
             self.logger.info(f"Breakpoint eliminado: {breakpoint_id}")
     
     def set_step_mode(self, mode: StepMode):
         """Establece el modo de ejecución paso a paso"""
         if self.current_session:
             self.current_session.step_mode = mode
+            if self.is_debugging:
+                self._update_step_tracing()
             self.logger.debug(f"Modo de paso establecido: {mode.value}")
     
-    def _trace_function(self, frame, event, arg):
-        """Función de trazado principal"""
-        if not self.current_session or not self.current_session.is_active:
+    def _file_key(self, file_path: str) -> str:
+        """Ruta normalizada con la que se indexan los breakpoints"""
+        key = self._file_keys.get(file_path)
+        if key is None:
+            try:
+                key = os.path.normcase(os.path.abspath(file_path))
+            except OSError:
+                # Directorio actual borrado: rutas relativas tal cual
+                key = os.path.normcase(file_path)
+            self._file_keys[file_path] = key
+        return key
+    
+    def _rebuild_indexes(self):
+        """Reconstruye los índices tras cambiar breakpoints o watchpoints"""
+        self._line_breakpoints = {}
+        self._function_breakpoints = {}
+        
+        if self.current_session:
+            for breakpoint in self.current_session.breakpoints.values():
+                if breakpoint.function_name:
+                    self._function_breakpoints.setdefault(breakpoint.function_name, []).append(breakpoint)
+                elif breakpoint.file_path and breakpoint.line_number:
+                    key = (self._file_key(breakpoint.file_path), breakpoint.line_number)
+                    self._line_breakpoints.setdefault(key, []).append(breakpoint)
+        
+        self._breakpoint_lines = {}
+        for file_key, line_number in self._line_breakpoints:
+            self._breakpoint_lines.setdefault(file_key, set()).add(line_number)
+        self._code_plans.clear()
+        
+        if self.is_debugging:
+            self._reinstrument()
+    
+    def _code_plan(self, code: CodeType) -> Optional[Tuple[str, list]]:
+        """Qué hay que comprobar en las líneas de un code object (None: nada)"""
+        plan = self._code_plans.get(code, _NOT_PLANNED)
+        if plan is _NOT_PLANNED:
+            file_key = self._file_key(code.co_filename)
+            names = set(code.co_varnames) | set(code.co_cellvars) | set(code.co_freevars) | set(code.co_names)
+            watchpoints = [
+                (wp_id, watchpoint)
+                for wp_id, watchpoint in self.current_session.watchpoints.items()
+                if watchpoint['variable'] in names
+                and watchpoint.get('scope') in (None, code.co_name)
+            ]
+            # Sólo los code objects que contienen la línea de algún breakpoint
+            breakpoint_lines = self._breakpoint_lines.get(file_key)
+            has_breakpoints = bool(breakpoint_lines) and any(
+                line in breakpoint_lines for _, line in dis.findlinestarts(code))
+            if has_breakpoints or watchpoints:
+                plan = (file_key, watchpoints)
+            else:
+                plan = None
+            self._code_plans[code] = plan
+        return plan
+    
+    def _is_stepping(self) -> bool:
+        return self.current_session is not None and self.current_session.step_mode != StepMode.CONTINUE
+    
+    def _on_call(self, frame) -> bool:
+        """Evento de llamada; devuelve si el frame necesita eventos de línea"""
+        function_breakpoints = self._function_breakpoints.get(frame.f_code.co_name)
+        if function_breakpoints:
+            for breakpoint in function_breakpoints:
+                if breakpoint.check_condition(frame):
+                    self._handle_breakpoint(frame, breakpoint)
+                    break
+        
+        return self._code_plan(frame.f_code) is not None
+    
+    def _on_line(self, frame):
+        """Evento de línea: breakpoints de (archivo, línea) y watchpoints del code object"""
+        plan = self._code_plan(frame.f_code)
+        if plan is None:
             return
+        file_key, watchpoints = plan
         
-        # Verificar breakpoints
-        for breakpoint in self.current_session.breakpoints.values():
-            if breakpoint.should_break(frame, event, arg):
-                self._handle_breakpoint(frame, breakpoint)
-                break
+        breakpoints = self._line_breakpoints.get((file_key, frame.f_lineno))
+        if breakpoints:
+            for breakpoint in breakpoints:
+                if breakpoint.check_condition(frame):
+                    self._handle_breakpoint(frame, breakpoint)
+                    break
+        
+        if watchpoints:
+            self._check_watchpoints(frame, watchpoints)
+    
+    def _session_active(self) -> bool:
+        return self.current_session is not None and self.current_session.is_active
+    
+    def _stack_frames(self):
+        """Frames en ejecución del hilo actual, fuera del propio debugger"""
+        frame = sys._getframe(1)
+        while frame is not None:
+            if frame.f_code.co_filename != __file__:
+                yield frame
+            frame = frame.f_back
+    
+    # ---- Backend sys.settrace ----
+    
+    def _trace_function(self, frame, event, arg):
+        """Función de trazado global: sólo recibe eventos 'call'"""
+        if not self._session_active():
+            return None
         
-        # Verificar watchpoints
-        self._check_watchpoints(frame)
+        # El modo se lee antes: un breakpoint de este evento puede cambiarlo
+        stepping = self._is_stepping()
+        needs_lines = self._on_call(frame)
         
         # Manejar modo paso a paso
-        if self.current_session.step_mode != StepMode.CONTINUE:
+        if stepping:
             self._handle_step_mode(frame, event)
+            return self._trace_local
         
-        return self._trace_function
+        # Sin trazador local el frame no genera eventos de línea
+        return self._trace_local if needs_lines else None
+    
+    def _trace_local(self, frame, event, arg):
+        """Función de trazado local de los frames que la necesitan"""
+        if not self._session_active():
+            return None
+        
+        stepping = self._is_stepping()
+        if event == 'line':
+            self._on_line(frame)
+        
+        if stepping:
+            self._handle_step_mode(frame, event)
+        
+        return self._trace_local
+    
+    # ---- Backend sys.monitoring (PEP 669) ----
+    
+    def _monitor_enter(self) -> bool:
+        # Los callbacks no se reentran (p. ej. por el código del modo interactivo)
+        if getattr(self._callback_state, 'active', False) or not self._session_active():
+            return False
+        self._callback_state.active = True
+        return True
+    
+    def _monitor_exit(self):
+        self._callback_state.active = False
+    
+    def _monitor_start(self, code, instruction_offset):
+        """PY_START: breakpoints de función y activación de eventos de línea"""
+        if not self._monitor_enter():
+            return None
+        try:
+            frame = sys._getframe(1)
+            stepping = self._is_stepping()
+            needs_lines = self._on_call(frame)
+            if stepping:
+                self._handle_step_mode(frame, 'call')
+        finally:
+            self._monitor_exit()
+        
+        monitoring = sys.monitoring
+        if needs_lines and code not in self._instrumented:
+            monitoring.set_local_events(self.tool_id, code, monitoring.events.LINE)
+            self._instrumented.add(code)
+        
+        if self._is_stepping() or code.co_name in self._function_breakpoints:
+            return None
+        # Ya se decidió para este code object: sus llamadas dejan de notificarse
+        return monitoring.DISABLE
+    
+    def _monitor_line(self, code, line_number):
+        """LINE: sólo en code objects instrumentados o paso a paso"""
+        if not self._monitor_enter():
+            return None
+        try:
+            frame = sys._getframe(1)
+            stepping = self._is_stepping()
+            plan = self._code_plans.get(code) if code in self._instrumented else None
+            if plan is not None:
+                self._on_line(frame)
+            if stepping:
+                self._handle_step_mode(frame, 'line')
+        finally:
+            self._monitor_exit()
+        
+        # Sin watchpoints, las líneas sin breakpoint no vuelven a notificarse
+        if (plan is not None and not plan[1] and not stepping
+                and (plan[0], line_number) not in self._line_breakpoints):
+            return sys.monitoring.DISABLE
+        return None
+    
+    def _monitor_return(self, code, instruction_offset, retval):
+        """PY_RETURN y PY_UNWIND: sólo se activan paso a paso"""
+        if not self._monitor_enter():
+            return None
+        try:
+            if self._is_stepping():
+                self._handle_step_mode(sys._getframe(1), 'return')
+        finally:
+            self._monitor_exit()
+        return None
+    
+    def _monitoring_events(self) -> int:
+        """Eventos globales: llamadas si hay algo que comprobar; todo paso a paso"""
+        events = sys.monitoring.events
+        if self._is_stepping():
+            return events.PY_START | events.LINE | events.PY_RETURN | events.PY_UNWIND
+        if self._line_breakpoints or self._function_breakpoints or (
+                self.current_session and self.current_session.watchpoints):
+            return events.PY_START
+        return events.NO_EVENTS
+    
+    # ---- Instalación de los backends ----
+    
+    def _install_tracing(self):
+        """Instala el backend de trazado elegido"""
+        if self.backend == 'monitoring':
+            monitoring = sys.monitoring
+            try:
+                monitoring.use_tool_id(self.tool_id, 'vader-debugger')
+            except ValueError:
+                # Otro depurador ocupa el identificador: se usa settrace
+                self.logger.warning("sys.monitoring ocupado, usando sys.settrace")
+                self.backend = 'settrace'
+            else:
+                events = monitoring.events
+                monitoring.register_callback(self.tool_id, events.PY_START, self._monitor_start)
+                monitoring.register_callback(self.tool_id, events.LINE, self._monitor_line)
+                monitoring.register_callback(self.tool_id, events.PY_RETURN, self._monitor_return)
+                monitoring.register_callback(self.tool_id, events.PY_UNWIND, self._monitor_return)
+                return
+        
+        self.original_trace_function = sys.gettrace()
+        sys.settrace(self._trace_function)
+    
+    def _uninstall_tracing(self):
+        """Restaura el estado anterior a la sesión"""
+        if self.backend == 'monitoring':
+            monitoring = sys.monitoring
+            monitoring.set_events(self.tool_id, monitoring.events.NO_EVENTS)
+            for code in self._instrumented:
+                monitoring.set_local_events(self.tool_id, code, monitoring.events.NO_EVENTS)
+            self._instrumented.clear()
+            events = monitoring.events
+            for event in (events.PY_START, events.LINE, events.PY_RETURN, events.PY_UNWIND):
+                monitoring.register_callback(self.tool_id, event, None)
+            monitoring.free_tool_id(self.tool_id)
+        else:
+            sys.settrace(self.original_trace_function)
+    
+    def _reinstrument(self):
+        """Aplica los índices nuevos, también a los frames ya en ejecución"""
+        if self.backend == 'monitoring':
+            monitoring = sys.monitoring
+            for code in self._instrumented:
+                monitoring.set_local_events(self.tool_id, code, monitoring.events.NO_EVENTS)
+            self._instrumented.clear()
+            monitoring.set_events(self.tool_id, self._monitoring_events())
+            # Vuelven a notificarse las llamadas desactivadas con DISABLE
+            monitoring.restart_events()
+        
+        if not self._session_active():
+            return
+        for frame in self._stack_frames():
+            if self._code_plan(frame.f_code) is None:
+                continue
+            if self.backend == 'monitoring':
+                monitoring.set_local_events(self.tool_id, frame.f_code, monitoring.events.LINE)
+                self._instrumented.add(frame.f_code)
+            elif frame.f_trace is None:
+                frame.f_trace = self._trace_local
+    
+    def _update_step_tracing(self):
+        """Activa o desactiva los eventos que necesita el modo paso a paso"""
+        if self.backend == 'monitoring':
+            sys.monitoring.set_events(self.tool_id, self._monitoring_events())
+            if self._is_stepping():
+                sys.monitoring.restart_events()
+        elif self._is_stepping():
+            for frame in self._stack_frames():
+                if frame.f_trace is None:
+                    frame.f_trace = self._trace_local
     
     def _handle_breakpoint(self, frame, breakpoint: VaderBreakpoint):
         """Maneja la activación de un breakpoint"""
@@ -325,9 +638,11 @@ class VaderDebugger:
         if breakpoint.temporary:
             self.remove_breakpoint(breakpoint.id)
     
-    def _check_watchpoints(self, frame):
-        """Verifica watchpoints"""
-        for wp_id, watchpoint in self.current_session.watchpoints.items():
+    def _check_watchpoints(self, frame, watchpoints=None):
+        """Verifica watchpoints (por defecto, todos los de la sesión)"""
+        if watchpoints is None:
+            watchpoints = self.current_session.watchpoints.items()
+        for wp_id, watchpoint in watchpoints:
             var_name = watchpoint['variable']
             
             # Buscar variable en locals o globals
@@ -511,18 +826,18 @@ class VaderDebugger:
     
     def _show_memory_info(self):
         """Muestra información de memoria"""
-        try:
-            process = psutil.Process()
-            memory_info = process.memory_info()
-            
-            print(f"\n💾 INFORMACIÓN DE MEMORIA:")
-            print(f"  RSS: {memory_info.rss / 1024 / 1024:.2f} MB")
-            print(f"  VMS: {memory_info.vms / 1024 / 1024:.2f} MB")
-            print(f"  Objetos Python: {len(gc.get_objects())}")
-            print(f"  Colecciones GC: {gc.get_count()}")
-            
-        except ImportError:
+        if psutil is None:
             print("psutil no disponible para información de memoria")
+            return
+        
+        process = psutil.Process()
+        memory_info = process.memory_info()
+        
+        print(f"\n💾 INFORMACIÓN DE MEMORIA:")
+        print(f"  RSS: {memory_info.rss / 1024 / 1024:.2f} MB")
+        print(f"  VMS: {memory_info.vms / 1024 / 1024:.2f} MB")
+        print(f"  Objetos Python: {len(gc.get_objects())}")
+        print(f"  Colecciones GC: {gc.get_count()}")
     
     def profile_function(self, func: Callable) -> Callable:
         """Decorador para profiling de funciones"""
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+VADER EXPRESSIONS - Evaluador de expresiones compartido
+Compila cada expresión una sola vez y la evalúa contra un diccionario de
+variables, sin sustituir texto y sin acceso a atributos ni a builtins.
+
+Lo usan el intérprete nativo (src/vader_interpreter.py) y los runtimes
+vader-cloud.py y vader-iot.py.
+"""
+
+import ast
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Mapping, Union
+
+# Expresiones compiladas recientemente (los scripts repiten las mismas)
+EXPRESSION_CACHE_SIZE = 1024
+
+# Límites contra expresiones que agotan memoria o CPU
+MAX_INTEGER_BITS = 100_000
+MAX_SEQUENCE_LENGTH = 10 ** 6
+
+_RAISE = object()
+
+
+class VaderExpressionError(ValueError):
+    """La expresión no es válida o usa operaciones no permitidas"""
+
+
+# Python 3.8 envuelve los subíndices en ast.Index/ast.ExtSlice (eliminados en 3.9)
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load,
+    ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.List, ast.Tuple, ast.Dict, ast.Set, ast.Subscript, ast.Slice,
+    ast.Call, ast.keyword,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub, ast.Not, ast.And, ast.Or,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+) + tuple(getattr(ast, name) for name in ('Index', 'ExtSlice') if hasattr(ast, name))
+
+
+def _vader_add(a, b):
+    # Concatenación de strings o suma matemática, como en el intérprete
+    if isinstance(a, str) or isinstance(b, str):
+        return str(a) + str(b)
+    return a + b
+
+
+def _vader_mul(a, b):
+    for sequence, times in ((a, b), (b, a)):
+        if isinstance(sequence, (str, list, tuple)) and isinstance(times, int):
+            if len(sequence) * times > MAX_SEQUENCE_LENGTH:
+                raise VaderExpressionError("Resultado demasiado grande")
+    if isinstance(a, int) and isinstance(b, int):
+        if a.bit_length() + b.bit_length() > MAX_INTEGER_BITS:
+            raise VaderExpressionError("Resultado demasiado grande")
+    return a * b
+
+
+def _vader_pow(a, b):
+    # Se acota el tamaño del resultado, no sólo el exponente: (9**1000)**1000
+    if isinstance(a, int) and isinstance(b, int) and b > 0 and abs(a) > 1:
+        if a.bit_length() * b > MAX_INTEGER_BITS:
+            raise VaderExpressionError("Resultado demasiado grande")
+    return a ** b
+
+
+def _vader_mod(a, b):
+    if isinstance(a, str):
+        raise VaderExpressionError("Formateo con % no permitido")
+    return a % b
+
+
+_HELPERS = {ast.Add: '_vader_add', ast.Mult: '_vader_mul', ast.Pow: '_vader_pow', ast.Mod: '_vader_mod'}
+
+SAFE_FUNCTIONS = {
+    'abs': abs, 'min': min, 'max': max, 'round': round, 'len': len, 'sum': sum,
+    'int': int, 'float': float, 'str': str, 'bool': bool, 'sorted': sorted,
+}
+
+# Globales de cada evaluación: sin builtins; las variables del entorno tienen prioridad
+_GLOBALS = {
+    '__builtins__': {},
+    'verdadero': True, 'falso': False, 'nulo': None,
+    '_vader_add': _vader_add, '_vader_mul': _vader_mul,
+    '_vader_pow': _vader_pow, '_vader_mod': _vader_mod,
+    **SAFE_FUNCTIONS,
+}
+
+
+class _GuardOperators(ast.NodeTransformer):
+    """Sustituye + * ** % por funciones con la semántica y los límites de Vader"""
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        helper = _HELPERS.get(type(node.op))
+        if helper is None:
+            return node
+        return ast.copy_location(
+            ast.Call(func=ast.Name(id=helper, ctx=ast.Load()), args=[node.left, node.right], keywords=[]),
+            node)
+
+
+def _validate(tree: ast.AST) -> None:
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise VaderExpressionError(f"Operación no permitida: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id.startswith('_'):
+            raise VaderExpressionError(f"Nombre no permitido: {node.id}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in SAFE_FUNCTIONS:
+                raise VaderExpressionError("Sólo se pueden llamar funciones básicas")
+            if any(keyword.arg is None for keyword in node.keywords):
+                raise VaderExpressionError("Argumentos ** no permitidos")
+
+
+@lru_cache(maxsize=EXPRESSION_CACHE_SIZE)
+def _compile(expr: str) -> Union[CodeType, VaderExpressionError]:
+    try:
+        tree = ast.parse(expr.strip(), mode='eval')
+    except (SyntaxError, ValueError):
+        return VaderExpressionError(f"Expresión no válida: {expr}")
+    try:
+        _validate(tree)
+    except VaderExpressionError as e:
+        return e
+    tree = ast.fix_missing_locations(_GuardOperators().visit(tree))
+    return compile(tree, '<vader-expresion>', 'eval')
+
+
+def compile_expression(expr: str) -> CodeType:
+    """Compila (con caché, también de los errores) una expresión segura"""
+    code = _compile(expr)
+    if isinstance(code, VaderExpressionError):
+        # Una instancia nueva: relanzar la cacheada acumularía tracebacks
+        raise VaderExpressionError(str(code))
+    return code
+
+
+def evaluate_code(code: CodeType, variables: Mapping[str, Any]) -> Any:
+    """Evalúa una expresión ya compilada con compile_expression"""
+    return eval(code, _GLOBALS, variables)
+
+
+def evaluate(expr: str, variables: Mapping[str, Any], default: Any = _RAISE) -> Any:
+    """Evalúa una expresión con las variables dadas
+
+    Si la expresión no se puede compilar se devuelve `default` (o se lanza
+    VaderExpressionError si no se indica). Los errores de ejecución, como
+    NameError o ZeroDivisionError, se propagan.
+    """
+    code = _compile(expr)
+    if isinstance(code, VaderExpressionError):
+        if default is _RAISE:
+            raise VaderExpressionError(str(code))
+        return default
+    return eval(code, _GLOBALS, variables)
+
+
+def cache_info():
+    """Estadísticas de la caché de expresiones compiladas"""
+    return _compile.cache_info()
@@ -14,9 +14,278 @@ import sys
 import os
 import re
 import json
-from typing import Dict, Any, List, Optional
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from pathlib import Path
 
+from vader_expressions import VaderExpressionError, compile_expression, evaluate_code
+
+_MISSING = object()
+
+# Operadores de comparación reconocidos por evaluate_condition, en orden
+_CONDITION_OPERATORS = [
+    (' es igual a ', lambda a, b: a == b),
+    (' es mayor que ', lambda a, b: a > b),
+    (' es menor que ', lambda a, b: a < b),
+]
+
+
+class VaderRuntimeError(Exception):
+    """Error de ejecución en una línea de un programa compilado"""
+    
+    def __init__(self, message: str, line: int):
+        super().__init__(message)
+        self.line = line
+
+
+class VaderProgramCompiler:
+    """Compila código Vader una sola vez en un árbol de closures
+    
+    Cada sentencia se convierte en una función ``op(runtime)`` y cada bloque
+    en una lista de tuplas ``(línea, op)``. Las expresiones se analizan en
+    tiempo de compilación; en ejecución sólo se consultan las variables.
+    """
+    
+    def compile(self, code: str) -> List[Tuple[int, Callable]]:
+        self.lines = code.split('\n')
+        ops, i, terminator = self.compile_block(0, ())
+        return ops
+    
+    def compile_block(self, i: int, terminators) -> Tuple[List[Tuple[int, Callable]], int, Optional[str]]:
+        """Compila sentencias hasta encontrar una línea terminadora"""
+        ops = []
+        lines = self.lines
+        while i < len(lines):
+            line = lines[i].strip()
+            if not line or line.startswith('#'):
+                i += 1
+                continue
+            for terminator in terminators:
+                if line == terminator or (terminator.endswith(' ') and line.startswith(terminator)):
+                    return ops, i, line
+            op, i = self.compile_statement(line, i)
+            if op is not None:
+                ops.append(op)
+        return ops, i, None
+    
+    def compile_statement(self, line: str, i: int) -> Tuple[Optional[Tuple[int, Callable]], int]:
+        """Compila una sentencia; devuelve el op y el índice de la siguiente línea"""
+        number = i + 1
+        
+        # MOSTRAR - Imprimir en pantalla
+        if line.startswith('mostrar '):
+            value = self.compile_expression(line[8:].strip())
+            def op(rt, value=value):
+                result = value(rt)
+                print(result)
+                rt.output_buffer.append(str(result))
+            return (number, op), i + 1
+        
+        # VARIABLE ASSIGNMENT - Asignación de variables
+        if '=' in line and not any(op in line for op in ['==', '!=', '>=', '<=']):
+            var_name, var_value = (part.strip() for part in line.split('=', 1))
+            value = self.compile_expression(var_value)
+            def op(rt, name=var_name, value=value):
+                rt.variables[name] = value(rt)
+            return (number, op), i + 1
+        
+        # PREGUNTAR - Input del usuario
+        if line.startswith('preguntar '):
+            prompt_match = re.match(r'preguntar "([^"]*)"(?:\s+guardar\s+(?:la\s+)?respuesta\s+en\s+(\w+))?', line)
+            if prompt_match:
+                def op(rt, prompt=prompt_match.group(1) + " ", name=prompt_match.group(2)):
+                    user_input = input(prompt)
+                    if name:
+                        rt.variables[name] = user_input
+                return (number, op), i + 1
+        
+        # LEER - Input simple
+        if line.startswith('leer '):
+            def op(rt, name=line[5:].strip()):
+                rt.variables[name] = input()
+            return (number, op), i + 1
+        
+        # CONVERTIR - Conversiones de tipo
+        if line.startswith('convertir '):
+            convert_match = re.match(r'convertir\s+(\w+)\s+a\s+(numero|texto)', line)
+            if convert_match:
+                def op(rt, name=convert_match.group(1), target_type=convert_match.group(2)):
+                    rt.convert_variable(name, target_type)
+                return (number, op), i + 1
+        
+        # SI - Condicionales
+        if line.startswith('si '):
+            return self.compile_conditional(line, i)
+        
+        # FUNCION - Definición de funciones
+        if line.startswith('funcion '):
+            body, end, _ = self.compile_block(i + 1, ('fin funcion',))
+            def op(rt, name=line[8:].strip(), body=body):
+                rt.functions[name] = body
+            return (number, op), end + 1
+        
+        # REPETIR - Bucles
+        if line.startswith('repetir '):
+            times_match = re.match(r'repetir\s+(\d+)\s+veces', line)
+            if times_match:
+                body, end, _ = self.compile_block(i + 1, ('fin repetir',))
+                def op(rt, times=int(times_match.group(1)), body=body):
+                    run = rt.run_compiled
+                    for _ in range(times):
+                        run(body)
+                return (number, op), end + 1
+            return None, i + 1
+        
+        # Llamada a función o línea no reconocida: se resuelve en ejecución
+        def op(rt, name=line):
+            body = rt.functions.get(name)
+            if body is not None:
+                rt.run_compiled(body)
+            elif rt.debug_mode:
+                print(f"[DEBUG] Línea no reconocida: {name}")
+        return (number, op), i + 1
+    
+    def compile_conditional(self, line: str, i: int):
+        """Compila si / sino si / sino / fin si en una cadena de ramas"""
+        number = i + 1
+        branches = []
+        condition = self.compile_condition(line[3:].strip())
+        else_body = None
+        
+        while True:
+            body, i, terminator = self.compile_block(i + 1, ('fin si', 'sino si ', 'sino'))
+            if else_body is None and condition is not None:
+                branches.append((condition, body))
+            else:
+                else_body = body
+            if terminator is None or terminator == 'fin si':
+                break
+            if terminator == 'sino':
+                condition = None
+                else_body = []
+            else:
+                condition = self.compile_condition(terminator[8:].strip())
+        
+        def op(rt, branches=tuple(branches), else_body=else_body):
+            for test, body in branches:
+                if test(rt):
+                    rt.run_compiled(body)
+                    return
+            if else_body:
+                rt.run_compiled(else_body)
+        return (number, op), i + 1
+    
+    def compile_condition(self, condition: str) -> Callable:
+        """Compila una condición booleana"""
+        condition = condition.strip()
+        for operator, compare in _CONDITION_OPERATORS:
+            if operator in condition:
+                parts = condition.split(operator)
+                left = self.compile_expression(parts[0].strip())
+                right = self.compile_expression(parts[1].strip())
+                return lambda rt: compare(left(rt), right(rt))
+        
+        # Condición simple (variable existe y es verdadera)
+        value = self.compile_expression(condition)
+        return lambda rt: bool(value(rt))
+    
+    def compile_expression(self, expr: str) -> Callable:
+        """Compila una expresión con la misma semántica que evaluate_expression"""
+        expr = expr.strip()
+        
+        # String literal
+        if _is_string_literal(expr):
+            constant = expr[1:-1]
+            return lambda rt: constant
+        
+        # Número
+        try:
+            constant = float(expr) if '.' in expr else int(expr)
+            return lambda rt: constant
+        except ValueError:
+            pass
+        
+        legacy = self.compile_legacy_expression(expr)
+        
+        # Expresión completa con el evaluador compartido; los nombres sin
+        # definir siguen la semántica Vader (se resuelven como texto)
+        try:
+            code = compile_expression(expr)
+        except VaderExpressionError:
+            return legacy
+        
+        def evaluate(rt, code=code, legacy=legacy):
+            try:
+                return evaluate_code(code, rt.variables)
+            except NameError:
+                return legacy(rt)
+        return evaluate
+    
+    def compile_legacy_expression(self, expr: str) -> Callable:
+        """Variables y operaciones de dos operandos sobre el texto de la expresión"""
+        # Operaciones matemáticas simples, resueltas si no es una variable
+        fallback = None
+        for symbol in ('+', '-', '*', '/'):
+            if symbol not in expr or (symbol == '-' and expr.startswith('-')):
+                continue
+            parts = expr.split(symbol)
+            if len(parts) == 2:
+                fallback = self.compile_binary(symbol, parts[0], parts[1])
+                break
+        
+        if fallback is None:
+            def load(rt, name=expr):
+                value = rt.variables.get(name, _MISSING)
+                return name if value is _MISSING else value
+            return load
+        
+        def load_or_compute(rt, name=expr, compute=fallback):
+            value = rt.variables.get(name, _MISSING)
+            return compute(rt) if value is _MISSING else value
+        return load_or_compute
+    
+    def compile_binary(self, symbol: str, left_text: str, right_text: str) -> Callable:
+        left = self.compile_expression(left_text.strip())
+        right = self.compile_expression(right_text.strip())
+        if symbol == '+':
+            def add(rt):
+                a = left(rt)
+                b = right(rt)
+                # Concatenación de strings o suma matemática
+                if isinstance(a, str) or isinstance(b, str):
+                    return str(a) + str(b)
+                return a + b
+            return add
+        if symbol == '-':
+            return lambda rt: left(rt) - right(rt)
+        if symbol == '*':
+            return lambda rt: left(rt) * right(rt)
+        return lambda rt: left(rt) / right(rt)
+
+
+def _is_string_literal(expr: str) -> bool:
+    """Una sola cadena entre comillas (sin comillas intermedias)"""
+    return len(expr) >= 2 and expr.startswith('"') and expr.endswith('"') and '"' not in expr[1:-1]
+
+
+_COMPILED_CACHE_SIZE = 64
+_compiled_cache = OrderedDict()
+
+
+def compile_program(code: str) -> List[Tuple[int, Callable]]:
+    """Compila código Vader reutilizando programas ya compilados"""
+    key = hashlib.sha256(code.encode('utf-8')).hexdigest()
+    program = _compiled_cache.get(key)
+    if program is None:
+        program = VaderProgramCompiler().compile(code)
+        _compiled_cache[key] = program
+        if len(_compiled_cache) > _COMPILED_CACHE_SIZE:
+            _compiled_cache.popitem(last=False)
+    else:
+        _compiled_cache.move_to_end(key)
+    return program
+
 class VaderNativeRuntime:
     """Runtime nativo de Vader - Ejecuta .vdr directamente"""
     
@@ -25,6 +294,8 @@ class VaderNativeRuntime:
         self.functions = {}
         self.output_buffer = []
         self.debug_mode = False
+        # Compilar el programa una vez en closures en lugar de re-parsear líneas
+        self.compiled_mode = True
         
     def execute_file(self, file_path: str) -> bool:
         """Ejecuta un archivo .vdr directamente"""
@@ -45,6 +316,8 @@ class VaderNativeRuntime:
     def execute_code(self, code: str, filename: str = "<string>") -> bool:
         """Ejecuta código Vader directamente"""
         try:
+            if self.compiled_mode:
+                return self.execute_compiled(code, filename)
             lines = code.split('\n')
             return self.execute_lines(lines, filename)
             
@@ -52,6 +325,30 @@ class VaderNativeRuntime:
             self.error(f"Error en {filename}: {str(e)}")
             return False
     
+    def execute_compiled(self, code: str, filename: str = "<string>") -> bool:
+        """Compila el código una vez y ejecuta el árbol de closures"""
+        program = compile_program(code)
+        try:
+            self.run_compiled(program)
+        except VaderRuntimeError as e:
+            self.error(f"Error en línea {e.line} de {filename}: {str(e)}")
+            lines = code.split('\n')
+            if 0 < e.line <= len(lines):
+                self.error(f"Línea: {lines[e.line - 1].strip()}")
+            return False
+        return True
+    
+    def run_compiled(self, ops: List[Tuple[int, Callable]]) -> None:
+        """Ejecuta un bloque compilado"""
+        line = 0
+        try:
+            for line, op in ops:
+                op(self)
+        except VaderRuntimeError:
+            raise
+        except Exception as e:
+            raise VaderRuntimeError(str(e), line) from e
+    
     def execute_lines(self, lines: List[str], filename: str) -> bool:
         """Ejecuta líneas de código Vader"""
         i = 0
@@ -122,16 +419,7 @@ class VaderNativeRuntime:
                 var_name = convert_match.group(1)
                 target_type = convert_match.group(2)
                 
-                if var_name in self.variables:
-                    if target_type == 'numero':
-                        try:
-                            self.variables[var_name] = float(self.variables[var_name])
-                            if self.variables[var_name].is_integer():
-                                self.variables[var_name] = int(self.variables[var_name])
-                        except ValueError:
-                            self.error(f"No se puede convertir '{self.variables[var_name]}' a número")
-                    elif target_type == 'texto':
-                        self.variables[var_name] = str(self.variables[var_name])
+                self.convert_variable(var_name, target_type)
                 return None
                 
         # SI - Condicionales
@@ -156,6 +444,19 @@ class VaderNativeRuntime:
             
         return None
     
+    def convert_variable(self, var_name: str, target_type: str) -> None:
+        """Convierte una variable a numero o texto"""
+        if var_name in self.variables:
+            if target_type == 'numero':
+                try:
+                    self.variables[var_name] = float(self.variables[var_name])
+                    if self.variables[var_name].is_integer():
+                        self.variables[var_name] = int(self.variables[var_name])
+                except ValueError:
+                    self.error(f"No se puede convertir '{self.variables[var_name]}' a número")
+            elif target_type == 'texto':
+                self.variables[var_name] = str(self.variables[var_name])
+    
     def execute_conditional(self, line: str, lines: List[str], current_line: int, filename: str) -> int:
         """Ejecuta condicionales (si/sino/fin si)"""
         condition = line[3:].strip()
@@ -251,7 +552,7 @@ class VaderNativeRuntime:
         expr = expr.strip()
         
         # String literal
-        if expr.startswith('"') and expr.endswith('"'):
+        if _is_string_literal(expr):
             return expr[1:-1]
             
         # Número
@@ -265,6 +566,17 @@ class VaderNativeRuntime:
         # Variable
         if expr in self.variables:
             return self.variables[expr]
+        
+        # Expresión completa con el evaluador compartido
+        try:
+            code = compile_expression(expr)
+        except VaderExpressionError:
+            code = None
+        if code is not None:
+            try:
+                return evaluate_code(code, self.variables)
+            except NameError:
+                pass
             
         # Operaciones matemáticas simples
         if '+' in expr:
@@ -349,7 +661,7 @@ class VaderNativeRuntime:
 def main():
     """Función principal del intérprete nativo"""
     if len(sys.argv) < 2:
-        print("❌ Uso: python3 vader_interpreter.py archivo.vdr [--debug]")
+        print("❌ Uso: python3 vader_interpreter.py archivo.vdr [--debug] [--no-compile]")
         sys.exit(1)
         
     file_path = sys.argv[1]
@@ -358,6 +670,7 @@ def main():
     # Crear runtime
     runtime = VaderNativeRuntime()
     runtime.debug_mode = debug_mode
+    runtime.compiled_mode = '--no-compile' not in sys.argv
     
     if debug_mode:
         print(f"🚀 Iniciando Vader Native Runtime")
@@ -210,6 +210,12 @@ class VaderModuleSystem:
         if not resolved_path:
             raise ImportError(f"No se pudo encontrar el módulo: {module_path}")
         
+        return self.load_module_file(resolved_path)
+    
+    def load_module_file(self, file_path: str) -> VaderModule:
+        """Carga un módulo a partir de la ruta de su archivo .vdr"""
+        resolved_path = str(Path(file_path).resolve())
+        
         # Verificar si ya está en cache y no ha cambiado
         if resolved_path in self.modules:
             module = self.modules[resolved_path]
@@ -236,12 +242,7 @@ class VaderModuleSystem:
         # Parsear imports y exports
         module.imports = {imp.module_path: imp for imp in self.parse_imports(content, resolved_path)}
         module.exports = self.parse_exports(content)
-        
-        # Extraer dependencias
-        for imp in module.imports.values():
-            dep_path = self.resolve_module_path(imp.module_path, resolved_path)
-            if dep_path:
-                module.dependencies.add(dep_path)
+        self._link_dependencies(module)
         
         # Guardar en cache
         self.modules[resolved_path] = module
@@ -249,6 +250,43 @@ class VaderModuleSystem:
         
         return module
     
+    def _link_dependencies(self, module: VaderModule):
+        """Resuelve las rutas de los imports de un módulo ya parseado"""
+        module.dependencies = set()
+        for imp in module.imports.values():
+            dep_path = self.resolve_module_path(imp.module_path, module.path)
+            if dep_path:
+                module.dependencies.add(str(Path(dep_path).resolve()))
+        self.dependency_graph[module.path] = module.dependencies
+    
+    def relink_dependencies(self):
+        """Vuelve a resolver los imports de todos los módulos (p. ej. tras crear o borrar archivos)"""
+        for module in self.modules.values():
+            self._link_dependencies(module)
+    
+    def remove_module(self, module_path: str):
+        """Elimina un módulo del cache y del grafo"""
+        resolved_path = str(Path(module_path).resolve())
+        self.modules.pop(resolved_path, None)
+        self.dependency_graph.pop(resolved_path, None)
+    
+    def get_dependents(self, module_path: str) -> Set[str]:
+        """Módulos que dependen, directa o transitivamente, del módulo dado"""
+        reverse: Dict[str, Set[str]] = {}
+        for path, dependencies in self.dependency_graph.items():
+            for dep in dependencies:
+                reverse.setdefault(dep, set()).add(path)
+        
+        target = str(Path(module_path).resolve())
+        dependents = set()
+        pending = [target]
+        while pending:
+            for dependent in reverse.get(pending.pop(), ()):
+                if dependent not in dependents and dependent != target:
+                    dependents.add(dependent)
+                    pending.append(dependent)
+        return dependents
+    
     def resolve_dependencies(self, module_path: str) -> List[str]:
         """Resuelve todas las dependencias de un módulo recursivamente"""
         visited = set()
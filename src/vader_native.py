@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+VADER - CÓDIGO NATIVO PARA FUNCIONES NUMÉRICAS
+==============================================
+Baja funciones numéricas de Vader a C, las compila con el `cc` local como
+biblioteca compartida (.so) y las carga con ctypes.
+
+- Las funciones se transpilan a Python y se bajan desde su AST: aritmética
+  entera (int64) y de coma flotante (double), comparaciones, lógica
+  booleana, si/sino, mientras, repetir y `para cada i en range(...)`.
+- Cada función se especializa según los tipos de los argumentos de la
+  llamada (int o float) y se compila una vez por especialización; las
+  bibliotecas se guardan en disco con el hash de su código C como nombre.
+- Se conserva la semántica de Python: división entera y módulo con
+  redondeo hacia abajo, potencia, comparaciones mixtas exactas... Si algo
+  no se puede expresar en C (cadenas, llamadas, variables globales) o en
+  ejecución ocurre un desbordamiento de int64 o un error (división por
+  cero), la llamada se repite con la función Python original.
+"""
+
+import os
+import sys
+import ast
+import ctypes
+import hashlib
+import tempfile
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import vader_transpile_cache
+except ImportError:
+    vader_transpile_cache = None
+
+# Banderas fijas para obtener los mismos resultados que Python: sin -ffast-math, sin FMA
+# y sin que gcc reescriba pow(x, 2.0) como x * x (CPython llama siempre a pow de libm)
+CFLAGS = ['-O2', '-std=gnu99', '-shared', '-fPIC', '-ffp-contract=off', '-fno-builtin-pow']
+
+STATUS_VALUE, STATUS_NONE, STATUS_FALLBACK = 0, 1, 2
+
+# Tipos de Vader: entero de 64 bits, double y booleano
+C_TYPES = {'i': 'long long', 'd': 'double', 'b': 'int', 'n': 'long long'}
+_CTYPES = {'i': ctypes.c_longlong, 'd': ctypes.c_double, 'b': ctypes.c_int, 'n': ctypes.c_longlong}
+_CONVERTERS = {'i': int, 'd': float, 'b': bool, 'n': lambda value: None}
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+_BUILTINS = {'abs', 'min', 'max', 'float', 'int'}
+
+C_PRELUDE = r'''
+#include <math.h>
+#include <limits.h>
+
+typedef long long vi;
+#define V_CHECK if (e) return 2
+#define V_EXACT 9007199254740992LL
+
+static inline vi vi_add(vi a, vi b, int *e) { vi r; if (__builtin_add_overflow(a, b, &r)) *e = 1; return r; }
+static inline vi vi_sub(vi a, vi b, int *e) { vi r; if (__builtin_sub_overflow(a, b, &r)) *e = 1; return r; }
+static inline vi vi_mul(vi a, vi b, int *e) { vi r; if (__builtin_mul_overflow(a, b, &r)) *e = 1; return r; }
+static inline vi vi_neg(vi a, int *e) { if (a == LLONG_MIN) { *e = 1; return 0; } return -a; }
+static inline vi vi_abs(vi a, int *e) { if (a == LLONG_MIN) { *e = 1; return 0; } return a < 0 ? -a : a; }
+static inline vi vi_floordiv(vi a, vi b, int *e) {
+    if (b == 0 || (a == LLONG_MIN && b == -1)) { *e = 1; return 0; }
+    vi q = a / b;
+    if (a % b != 0 && ((a < 0) != (b < 0))) q--;
+    return q;
+}
+static inline vi vi_mod(vi a, vi b, int *e) {
+    if (b == 0) { *e = 1; return 0; }
+    if (b == -1) return 0;
+    vi r = a % b;
+    if (r != 0 && ((r < 0) != (b < 0))) r += b;
+    return r;
+}
+static inline vi vi_pow(vi a, vi b, int *e) {
+    if (b < 0) { *e = 1; return 0; }
+    vi r = 1;
+    while (b) {
+        if (b & 1) r = vi_mul(r, a, e);
+        b >>= 1;
+        if (b) a = vi_mul(a, a, e);
+        if (*e) return 0;
+    }
+    return r;
+}
+static inline vi vi_lshift(vi a, vi b, int *e) {
+    if (b < 0 || (b >= 63 && a != 0)) { *e = 1; return 0; }
+    if (a == 0) return 0;
+    vi r = (vi)((unsigned long long)a << b);
+    if ((r >> b) != a) { *e = 1; return 0; }
+    return r;
+}
+static inline vi vi_rshift(vi a, vi b, int *e) {
+    if (b < 0) { *e = 1; return 0; }
+    if (b > 63) return a < 0 ? -1 : 0;
+    return a >> b;
+}
+/* Enteros que se convierten a double sin pérdida (comparaciones y / exactas) */
+static inline double vi_exact(vi a, int *e) {
+    if (a > V_EXACT || a < -V_EXACT) { *e = 1; return 0; }
+    return (double)a;
+}
+static inline double vi_truediv(vi a, vi b, int *e) {
+    if (b == 0) { *e = 1; return 0; }
+    return vi_exact(a, e) / vi_exact(b, e);
+}
+static inline vi vd_to_int(double a, int *e) {
+    if (!(a > -9223372036854775808.0 && a < 9223372036854775808.0)) { *e = 1; return 0; }
+    return (vi)a;
+}
+static inline double vd_div(double a, double b, int *e) {
+    if (b == 0.0) { *e = 1; return 0; }
+    return a / b;
+}
+/* Igual que float_rem y float_floor_div de CPython */
+static inline double vd_mod(double a, double b, int *e) {
+    if (b == 0.0) { *e = 1; return 0; }
+    double mod = fmod(a, b);
+    if (mod) { if ((b < 0) != (mod < 0)) mod += b; }
+    else mod = copysign(0.0, b);
+    return mod;
+}
+static inline double vd_floordiv(double a, double b, int *e) {
+    if (b == 0.0) { *e = 1; return 0; }
+    double mod = fmod(a, b);
+    double div = (a - mod) / b;
+    if (mod) { if ((b < 0) != (mod < 0)) div -= 1.0; }
+    double floordiv;
+    if (div) { floordiv = floor(div); if (div - floordiv > 0.5) floordiv += 1.0; }
+    else floordiv = copysign(0.0, a / b);
+    return floordiv;
+}
+/* Casos especiales (inf, nan, base negativa, desbordamiento) se delegan a Python */
+static inline double vd_pow(double a, double b, int *e) {
+    if (!isfinite(a) || !isfinite(b) || (a == 0.0 && b < 0) || (a < 0 && b != floor(b))) { *e = 1; return 0; }
+    double r = pow(a, b);
+    if (!isfinite(r)) { *e = 1; return 0; }
+    return r;
+}
+static inline vi vi_min(vi a, vi b) { return b < a ? b : a; }
+static inline vi vi_max(vi a, vi b) { return b > a ? b : a; }
+static inline double vd_min(double a, double b) { return b < a ? b : a; }
+static inline double vd_max(double a, double b) { return b > a ? b : a; }
+'''
+
+class NativeLoweringError(Exception):
+    """La función usa algo que la bajada a C no puede expresar"""
+
+class NativeBuildError(Exception):
+    """No se pudo compilar la biblioteca (sin `cc`, error del compilador...)"""
+
+@dataclass
+class LoweredFunction:
+    """Función bajada a C para una firma concreta"""
+    name: str
+    symbol: str
+    signature: str
+    return_kind: str
+    code: str
+
+def _mangle(name: str) -> str:
+    """Identificador C inyectivo para cualquier nombre Python (incluye ñ, á...)"""
+    return 'v_' + ''.join(c if c.isascii() and c.isalnum() else f'_{ord(c):x}_' for c in name)
+
+def _float_literal(value: float) -> str:
+    return f'({value.hex()})'
+
+class _FunctionLowerer:
+    """Traduce un ast.FunctionDef a C para una firma de tipos ('i'/'d' por parámetro)"""
+
+    _INT_HELPERS = {ast.Add: 'vi_add', ast.Sub: 'vi_sub', ast.Mult: 'vi_mul', ast.FloorDiv: 'vi_floordiv',
+                    ast.Mod: 'vi_mod', ast.Pow: 'vi_pow', ast.LShift: 'vi_lshift', ast.RShift: 'vi_rshift'}
+    _INT_BITWISE = {ast.BitAnd: '&', ast.BitOr: '|', ast.BitXor: '^'}
+    _FLOAT_INFIX = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*'}
+    _FLOAT_HELPERS = {ast.Div: 'vd_div', ast.FloorDiv: 'vd_floordiv', ast.Mod: 'vd_mod', ast.Pow: 'vd_pow'}
+    _COMPARISONS = {ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>='}
+
+    def __init__(self, function: ast.FunctionDef, signature: str, global_names: Set[str]):
+        arguments = function.args
+        if (arguments.vararg or arguments.kwarg or arguments.kwonlyargs or arguments.defaults
+                or getattr(arguments, 'posonlyargs', None) or function.decorator_list):
+            raise NativeLoweringError("solo se admiten parámetros posicionales simples")
+        self.function = function
+        self.params = [argument.arg for argument in arguments.args]
+        if len(signature) != len(self.params) or set(signature) - {'i', 'd'}:
+            raise NativeLoweringError(f"firma no admitida: {signature!r}")
+        self.signature = signature
+        self.kinds: Dict[str, str] = dict(zip(self.params, signature))
+        self.locals: List[str] = []
+        self.global_names = global_names
+        self.return_kind: Optional[str] = None
+        self.loop_depth = 0
+        self.temporaries = 0
+
+    def lower(self) -> LoweredFunction:
+        lines, _, _ = self.block(self.function.body, set(self.params), 1)
+        return_kind = self.return_kind or 'n'
+        symbol = f'vader_{_mangle(self.function.name)}_{self.signature}'
+        parameters = [f'{C_TYPES[kind]} {_mangle(name)}' for name, kind in zip(self.params, self.signature)]
+        parameters.append(f'{C_TYPES[return_kind]} *out')
+        code = [f'int {symbol}({", ".join(parameters)}) {{', '    int e = 0;']
+        code += [f'    {C_TYPES[self.kinds[name]]} {_mangle(name)} = 0;' for name in self.locals]
+        code += lines
+        code += ['    return 1;', '}']
+        return LoweredFunction(self.function.name, symbol, self.signature, return_kind, '\n'.join(code))
+
+    def temporary(self) -> str:
+        self.temporaries += 1
+        return f'_t{self.temporaries}'
+
+    # Sentencias
+    def block(self, statements, defined: Set[str], depth: int) -> Tuple[List[str], Set[str], bool]:
+        """(líneas C, variables asignadas con seguridad al salir, termina siempre)"""
+        lines = []
+        defined = set(defined)
+        for statement in statements:
+            new_lines, defined, terminates = self.statement(statement, defined, depth)
+            lines.extend(new_lines)
+            if terminates:
+                return lines, defined, True
+        return lines, defined, False
+
+    def statement(self, node, defined, depth):
+        pad = '    ' * depth
+        if isinstance(node, (ast.Assign, ast.AugAssign)):
+            if isinstance(node, ast.Assign):
+                if len(node.targets) != 1:
+                    raise NativeLoweringError("asignación múltiple")
+                target, value = node.targets[0], node.value
+            else:
+                target = node.target
+                value = ast.BinOp(left=ast.Name(id=getattr(target, 'id', ''), ctx=ast.Load()),
+                                  op=node.op, right=node.value)
+            if not isinstance(target, ast.Name):
+                raise NativeLoweringError("solo se asignan variables locales")
+            code, kind = self.expr(value, defined)
+            self.declare(target.id, kind)
+            return [f'{pad}{_mangle(target.id)} = {code}; V_CHECK;'], defined | {target.id}, False
+
+        if isinstance(node, ast.If):
+            condition = self.temporary()
+            body, body_defined, body_ends = self.block(node.body, defined, depth + 1)
+            orelse, else_defined, else_ends = self.block(node.orelse, defined, depth + 1)
+            lines = [f'{pad}{{ int {condition} = {self.truth(node.test, defined)}; V_CHECK;',
+                     f'{pad}if ({condition}) {{'] + body + [f'{pad}}} else {{'] + orelse + [f'{pad}}} }}']
+            if body_ends and else_ends:
+                return lines, defined, True
+            if body_ends:
+                return lines, else_defined, False
+            if else_ends:
+                return lines, body_defined, False
+            return lines, body_defined & else_defined, False
+
+        if isinstance(node, ast.While):
+            if node.orelse:
+                raise NativeLoweringError("mientras con sino")
+            condition = self.temporary()
+            self.loop_depth += 1
+            body, _, _ = self.block(node.body, defined, depth + 1)
+            self.loop_depth -= 1
+            lines = [f'{pad}for (;;) {{',
+                     f'{pad}    int {condition} = {self.truth(node.test, defined)}; V_CHECK;',
+                     f'{pad}    if (!{condition}) break;'] + body + [f'{pad}}}']
+            return lines, defined, False
+
+        if isinstance(node, ast.For):
+            return self.range_loop(node, defined, depth)
+
+        if isinstance(node, ast.Return):
+            if node.value is None:
+                self.returns('n')
+                return [f'{pad}return 1;'], defined, True
+            code, kind = self.expr(node.value, defined)
+            self.returns(kind)
+            return [f'{pad}*out = {code}; V_CHECK; return 0;'], defined, True
+
+        if isinstance(node, (ast.Break, ast.Continue)):
+            if not self.loop_depth:
+                raise NativeLoweringError("break/continue fuera de un bucle")
+            return [f'{pad}{"break" if isinstance(node, ast.Break) else "continue"};'], defined, True
+
+        if isinstance(node, ast.Pass):
+            return [], defined, False
+
+        if isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+            return [], defined, False  # docstring
+
+        raise NativeLoweringError(f"sentencia no admitida: {type(node).__name__}")
+
+    def range_loop(self, node, defined, depth):
+        pad = '    ' * depth
+        call = node.iter
+        if (node.orelse or not isinstance(node.target, ast.Name) or not isinstance(call, ast.Call)
+                or not isinstance(call.func, ast.Name) or call.func.id != 'range'
+                or 'range' in self.global_names or call.func.id in self.kinds
+                or call.keywords or not 1 <= len(call.args) <= 3):
+            raise NativeLoweringError("solo se admiten bucles `para cada ... en range(...)`")
+        bounds = []
+        for argument in call.args:
+            code, kind = self.expr(argument, defined)
+            if kind != 'i':
+                raise NativeLoweringError("range() necesita enteros")
+            bounds.append(code)
+        start, stop, step = ('0LL', bounds[0], '1LL') if len(bounds) == 1 else (bounds + ['1LL'])[:3]
+        self.declare(node.target.id, 'i')
+
+        s, t, p, n, k = (self.temporary() for _ in range(5))
+        # Número de vueltas como en range.__len__, en aritmética sin signo para no desbordar
+        lines = [
+            f'{pad}{{ vi {s} = {start}; vi {t} = {stop}; vi {p} = {step}; V_CHECK;',
+            f'{pad}if ({p} == 0) return 2;',
+            f'{pad}unsigned long long {n} = {p} > 0',
+            f'{pad}    ? ({s} < {t} ? ((unsigned long long){t} - (unsigned long long){s} - 1ULL) / (unsigned long long){p} + 1ULL : 0ULL)',
+            f'{pad}    : ({s} > {t} ? ((unsigned long long){s} - (unsigned long long){t} - 1ULL) / (0ULL - (unsigned long long){p}) + 1ULL : 0ULL);',
+            f'{pad}for (unsigned long long {k} = 0; {k} < {n}; {k}++) {{',
+            f'{pad}    {_mangle(node.target.id)} = (vi)((unsigned long long){s} + {k} * (unsigned long long){p});',
+        ]
+        self.loop_depth += 1
+        body, _, _ = self.block(node.body, defined | {node.target.id}, depth + 1)
+        self.loop_depth -= 1
+        return lines + body + [f'{pad}}} }}'], defined, False
+
+    def declare(self, name: str, kind: str):
+        if name in self.kinds:
+            if self.kinds[name] != kind:
+                raise NativeLoweringError(f"'{name}' cambia de tipo ({self.kinds[name]} -> {kind})")
+            return
+        self.kinds[name] = kind
+        self.locals.append(name)
+
+    def returns(self, kind: str):
+        if self.return_kind is not None and self.return_kind != kind:
+            raise NativeLoweringError(f"la función devuelve tipos distintos ({self.return_kind}, {kind})")
+        self.return_kind = kind
+
+    # Expresiones
+    def truth(self, node, defined) -> str:
+        code, kind = self.expr(node, defined)
+        return code if kind == 'b' else f'({code} != 0)'
+
+    def expr(self, node, defined) -> Tuple[str, str]:
+        if isinstance(node, ast.Constant):
+            value = node.value
+            if isinstance(value, bool):
+                return ('1' if value else '0'), 'b'
+            if isinstance(value, int) and -2 ** 63 < value < 2 ** 63:
+                return f'{value}LL', 'i'
+            if isinstance(value, float) and value == value and abs(value) != float('inf'):
+                return _float_literal(value), 'd'
+            raise NativeLoweringError(f"constante no numérica: {value!r}")
+
+        if isinstance(node, ast.Name):
+            if node.id not in defined:
+                raise NativeLoweringError(f"'{node.id}' no es una variable local asignada")
+            return _mangle(node.id), self.kinds[node.id]
+
+        if isinstance(node, ast.BinOp):
+            return self.binary(node, defined)
+
+        if isinstance(node, ast.UnaryOp):
+            if isinstance(node.op, ast.Not):
+                return f'(!{self.truth(node.operand, defined)})', 'b'
+            code, kind = self.expr(node.operand, defined)
+            if kind == 'b':
+                raise NativeLoweringError("aritmética con booleanos")
+            if isinstance(node.op, ast.UAdd):
+                return code, kind
+            if isinstance(node.op, ast.USub):
+                return (f'vi_neg({code}, &e)', 'i') if kind == 'i' else (f'(-{code})', 'd')
+            if kind == 'i':
+                return f'(~{code})', 'i'
+            raise NativeLoweringError("~ sobre un float")
+
+        if isinstance(node, ast.Compare):
+            parts = []
+            operands = [node.left] + node.comparators
+            for op, left, right in zip(node.ops, operands, operands[1:]):
+                if type(op) not in self._COMPARISONS:
+                    raise NativeLoweringError(f"comparación no admitida: {type(op).__name__}")
+                (a, a_kind), (b, b_kind) = self.expr(left, defined), self.expr(right, defined)
+                if (a_kind == 'b') != (b_kind == 'b') or (a_kind == 'b' and not isinstance(op, (ast.Eq, ast.NotEq))):
+                    raise NativeLoweringError("comparación entre booleanos y números")
+                # Python compara int y float de forma exacta
+                if a_kind != b_kind:
+                    a, b = (f'vi_exact({a}, &e)' if a_kind == 'i' else a), (f'vi_exact({b}, &e)' if b_kind == 'i' else b)
+                parts.append(f'({a} {self._COMPARISONS[type(op)]} {b})')
+            return f'({" && ".join(parts)})', 'b'
+
+        if isinstance(node, ast.BoolOp):
+            values = [self.expr(value, defined) for value in node.values]
+            # `and`/`or` en Python devuelven un operando: solo se admiten booleanos
+            if any(kind != 'b' for _, kind in values):
+                raise NativeLoweringError("y/o entre valores no booleanos")
+            joiner = ' && ' if isinstance(node.op, ast.And) else ' || '
+            return f'({joiner.join(code for code, _ in values)})', 'b'
+
+        if isinstance(node, ast.IfExp):
+            (body, body_kind), (orelse, else_kind) = self.expr(node.body, defined), self.expr(node.orelse, defined)
+            if body_kind != else_kind:
+                raise NativeLoweringError("ramas de tipos distintos")
+            return f'({self.truth(node.test, defined)} ? {body} : {orelse})', body_kind
+
+        if isinstance(node, ast.Call):
+            return self.call(node, defined)
+
+        raise NativeLoweringError(f"expresión no admitida: {type(node).__name__}")
+
+    def binary(self, node, defined):
+        (a, a_kind), (b, b_kind) = self.expr(node.left, defined), self.expr(node.right, defined)
+        if 'b' in (a_kind, b_kind):
+            raise NativeLoweringError("aritmética con booleanos")
+        op = type(node.op)
+        if a_kind == b_kind == 'i':
+            if op in self._INT_HELPERS:
+                return f'{self._INT_HELPERS[op]}({a}, {b}, &e)', 'i'
+            if op in self._INT_BITWISE:
+                return f'({a} {self._INT_BITWISE[op]} {b})', 'i'
+            if op is ast.Div:
+                return f'vi_truediv({a}, {b}, &e)', 'd'
+        else:
+            a = f'((double){a})' if a_kind == 'i' else a
+            b = f'((double){b})' if b_kind == 'i' else b
+            if op in self._FLOAT_INFIX:
+                return f'({a} {self._FLOAT_INFIX[op]} {b})', 'd'
+            if op in self._FLOAT_HELPERS:
+                return f'{self._FLOAT_HELPERS[op]}({a}, {b}, &e)', 'd'
+        raise NativeLoweringError(f"operador no admitido: {op.__name__}")
+
+    def call(self, node, defined):
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if (name not in _BUILTINS or name in self.global_names or name in self.kinds
+                or node.keywords or any(isinstance(a, ast.Starred) for a in node.args)):
+            raise NativeLoweringError(f"llamada no admitida: {ast.dump(node.func)}")
+        arguments = [self.expr(argument, defined) for argument in node.args]
+        kinds = {kind for _, kind in arguments}
+        if not arguments or 'b' in kinds:
+            raise NativeLoweringError(f"argumentos no admitidos para {name}()")
+        if name in ('min', 'max'):
+            if len(arguments) < 2 or len(kinds) != 1:
+                raise NativeLoweringError(f"{name}() necesita 2+ argumentos del mismo tipo")
+            kind = kinds.pop()
+            code = arguments[0][0]
+            for argument, _ in arguments[1:]:
+                code = f'v{kind}_{name}({code}, {argument})'
+            return code, kind
+        if len(arguments) != 1:
+            raise NativeLoweringError(f"{name}() con {len(arguments)} argumentos")
+        code, kind = arguments[0]
+        if name == 'abs':
+            return (f'vi_abs({code}, &e)', 'i') if kind == 'i' else (f'fabs({code})', 'd')
+        if name == 'float':
+            return (f'((double){code})' if kind == 'i' else code), 'd'
+        return (code if kind == 'i' else f'vd_to_int({code}, &e)'), 'i'
+
+def lower_function(function: ast.FunctionDef, signature: str,
+                   global_names: Optional[Set[str]] = None) -> LoweredFunction:
+    """Baja una función a C; lanza NativeLoweringError si no es expresable"""
+    return _FunctionLowerer(function, signature, global_names or set()).lower()
+
+# ============================================================================
+# COMPILACIÓN Y CARGA
+# ============================================================================
+
+def default_cache_dir() -> Path:
+    if os.environ.get('VADER_NATIVE_CACHE_DIR'):
+        return Path(os.environ['VADER_NATIVE_CACHE_DIR'])
+    if vader_transpile_cache is not None:
+        return vader_transpile_cache.default_cache_dir() / 'native'
+    return Path(os.path.expanduser('~')) / '.cache' / 'vader' / 'native'
+
+def build_shared_library(c_source: str, cache_dir: Optional[str] = None) -> Path:
+    """Compila el código C a una .so, reutilizando la existente si el hash coincide"""
+    compiler = os.environ.get('CC', 'cc')
+    directory = Path(cache_dir) if cache_dir else default_cache_dir()
+    digest = hashlib.sha256('\0'.join([compiler, *CFLAGS, c_source]).encode('utf-8')).hexdigest()
+    library = directory / f'vader_{digest[:32]}.so'
+    if library.exists():
+        return library
+    directory.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        source = Path(tmp) / 'vader.c'
+        output = Path(tmp) / 'vader.so'
+        source.write_text(c_source, encoding='utf-8')
+        try:
+            subprocess.run([compiler, *CFLAGS, '-o', str(output), str(source), '-lm'],
+                           check=True, capture_output=True, text=True)
+        except FileNotFoundError:
+            raise NativeBuildError(f"compilador C no encontrado: {compiler}")
+        except subprocess.CalledProcessError as e:
+            raise NativeBuildError(f"error compilando C: {e.stderr.strip()}")
+        # Renombrado atómico: varios procesos pueden compilar la misma biblioteca
+        os.replace(output, library)
+    return library
+
+_libraries: Dict[str, ctypes.CDLL] = {}
+
+def load_library(path: Path) -> ctypes.CDLL:
+    key = str(path)
+    if key not in _libraries:
+        _libraries[key] = ctypes.CDLL(key)
+    return _libraries[key]
+
+def bind_function(library: ctypes.CDLL, lowered: LoweredFunction):
+    """Función ctypes con los tipos de la firma"""
+    function = getattr(library, lowered.symbol)
+    function.restype = ctypes.c_int
+    function.argtypes = [_CTYPES[kind] for kind in lowered.signature] + [ctypes.POINTER(_CTYPES[lowered.return_kind])]
+    return function
+
+def _argument_kind(value) -> str:
+    """'i' para int exacto en int64 (ctypes truncaría el resto), 'd' para float"""
+    if type(value) is int:
+        return 'i' if _INT64_MIN <= value <= _INT64_MAX else '?'
+    return 'd' if type(value) is float else '?'
+
+class NativeFunction:
+    """Función Vader que se ejecuta en C cuando puede y en Python si no
+
+    Cada combinación de tipos de argumentos se baja y compila la primera vez
+    que se usa. Las llamadas con tipos no numéricos, argumentos con nombre o
+    firmas que no se pueden bajar usan la función Python.
+    """
+
+    def __init__(self, python_function: Callable, tree: ast.FunctionDef, cache_dir: Optional[str] = None):
+        self.python_function = python_function
+        self.tree = tree
+        self.cache_dir = cache_dir
+        self.specializations: Dict[str, Optional[tuple]] = {}
+        self.reasons: Dict[str, str] = {}
+        self.native_calls = 0
+        self.fallback_calls = 0
+        self.__name__ = getattr(python_function, '__name__', tree.name)
+        self.__doc__ = getattr(python_function, '__doc__', None)
+
+    def _specialize(self, signature: str) -> Optional[tuple]:
+        entry = None
+        try:
+            global_names = set(getattr(self.python_function, '__globals__', {}))
+            lowered = lower_function(self.tree, signature, global_names)
+            library = load_library(build_shared_library(C_PRELUDE + lowered.code, self.cache_dir))
+            entry = (bind_function(library, lowered), _CTYPES[lowered.return_kind],
+                     _CONVERTERS[lowered.return_kind])
+        except (NativeLoweringError, NativeBuildError, OSError) as e:
+            self.reasons[signature] = str(e)
+        self.specializations[signature] = entry
+        return entry
+
+    def __call__(self, *args, **kwargs):
+        if not kwargs:
+            signature = ''.join(_argument_kind(argument) for argument in args)
+            entry = self.specializations.get(signature, False)
+            if entry is False:
+                entry = self._specialize(signature) if '?' not in signature else None
+            if entry is not None:
+                function, result_type, convert = entry
+                result = result_type()
+                status = function(*args, ctypes.byref(result))
+                if status != STATUS_FALLBACK:
+                    self.native_calls += 1
+                    return convert(result.value) if status == STATUS_VALUE else None
+        self.fallback_calls += 1
+        return self.python_function(*args, **kwargs)
+
+    def __repr__(self):
+        native = sorted(s for s, entry in self.specializations.items() if entry is not None)
+        return f"<NativeFunction {self.__name__} nativas={native}>"
+
+# ============================================================================
+# INTEGRACIÓN CON PROGRAMAS VADER
+# ============================================================================
+
+def _transpile(vader_code: str) -> str:
+    from transpilers.python import transpile_to_python
+    return transpile_to_python(vader_code)
+
+def _uniform_signatures(function: ast.FunctionDef) -> List[str]:
+    count = len(function.args.args)
+    return ['i' * count, 'd' * count] if count else ['']
+
+def native_candidates(tree: ast.Module) -> Dict[str, ast.FunctionDef]:
+    """Funciones de primer nivel que se pueden bajar a C con alguna firma uniforme"""
+    candidates = {}
+    for statement in tree.body:
+        if not isinstance(statement, ast.FunctionDef):
+            continue
+        for signature in _uniform_signatures(statement):
+            try:
+                lower_function(statement, signature)
+            except NativeLoweringError:
+                continue
+            candidates[statement.name] = statement
+            break
+    return candidates
+
+def execute_vader(vader_code: str, namespace: Optional[Dict[str, Any]] = None,
+                  cache_dir: Optional[str] = None, filename: str = '<vader>') -> Dict[str, Any]:
+    """Ejecuta un programa Vader por la ruta Python con sus funciones numéricas en C"""
+    tree = ast.parse(_transpile(vader_code), filename)
+    candidates = native_candidates(tree)
+    body = []
+    for statement in tree.body:
+        body.append(statement)
+        if isinstance(statement, ast.FunctionDef) and statement.name in candidates:
+            # Tras cada `def`, el nombre pasa a apuntar a la versión nativa
+            body.append(ast.parse(f'{statement.name} = __vader_native__({statement.name!r}, {statement.name})').body[0])
+    tree.body = body
+    ast.fix_missing_locations(tree)
+
+    if namespace is None:
+        namespace = {'__name__': '__main__'}
+    namespace['__vader_native__'] = lambda name, function: NativeFunction(function, candidates[name], cache_dir)
+    exec(compile(tree, filename, 'exec'), namespace)
+    return namespace
+
+def execute_vader_file(path: str, cache_dir: Optional[str] = None) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return execute_vader(f.read(), cache_dir=cache_dir, filename=path)
+
+@dataclass
+class NativeModule:
+    """Resultado de compilar por adelantado las funciones de un programa"""
+    library: Optional[Path]
+    c_source: str
+    functions: Dict[str, List[LoweredFunction]]
+    fallbacks: Dict[str, str]
+
+def lower_module(tree: ast.Module) -> Tuple[str, Dict[str, List[LoweredFunction]], Dict[str, str]]:
+    """Baja todas las funciones de primer nivel con firmas uniformes (todo int, todo float)"""
+    functions, fallbacks = {}, {}
+    for statement in tree.body:
+        if not isinstance(statement, ast.FunctionDef):
+            continue
+        for signature in _uniform_signatures(statement):
+            try:
+                lowered = lower_function(statement, signature)
+            except NativeLoweringError as e:
+                fallbacks.setdefault(statement.name, str(e))
+                continue
+            functions.setdefault(statement.name, []).append(lowered)
+        if statement.name in functions:
+            fallbacks.pop(statement.name, None)
+    code = '\n\n'.join(lowered.code for group in functions.values() for lowered in group)
+    return code, functions, fallbacks
+
+def compile_native_module(vader_code: str, output_file: Optional[str] = None,
+                          cache_dir: Optional[str] = None) -> NativeModule:
+    """Compila a una .so las funciones numéricas de un programa Vader"""
+    code, functions, fallbacks = lower_module(ast.parse(_transpile(vader_code)))
+    c_source = C_PRELUDE + '\n' + code + '\n'
+    library = None
+    if functions:
+        library = build_shared_library(c_source, cache_dir)
+        if output_file:
+            with open(library, 'rb') as source, open(output_file, 'wb') as target:
+                target.write(source.read())
+            library = Path(output_file)
+    return NativeModule(library, c_source, functions, fallbacks)
@@ -20,11 +20,16 @@ Versión: 7.0.0 "Universal"
 Fecha: 2025
 """
 
+import gc
+import io
 import os
 import re
 import sys
 import time
 import json
+import platform
+import statistics
+import textwrap
 import traceback
 import subprocess
 from pathlib import Path
@@ -33,8 +38,23 @@ from dataclasses import dataclass, field
 from enum import Enum
 import unittest
 import threading
-from concurrent.futures import ThreadPoolExecutor
-import coverage
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+try:
+    import coverage
+except ImportError:
+    coverage = None
+
+# Duraciones de cada prueba en ejecuciones anteriores (reparto de carga con --jobs);
+# sin un archivo explícito sólo se usa, y se escribe, al repartir entre procesos
+DEFAULT_DURATIONS_FILE = '.vader_test_durations.json'
+
+# Harness de benchmarks: calentamiento, tiempo mínimo por ronda y número de rondas
+BENCHMARK_WARMUP = 0.1
+BENCHMARK_MIN_ROUND_TIME = 0.05
+BENCHMARK_ROUNDS = 7
+BENCHMARK_THRESHOLD = 0.10
 
 class TestStatus(Enum):
     """Estados de las pruebas"""
@@ -57,12 +77,50 @@ class TestResult:
     file_path: str = ""
     line_number: int = 0
 
+@dataclass
+class BenchmarkResult:
+    """Resultado de un bloque `benchmark` (tiempos por iteración, en segundos)"""
+    name: str
+    code: str = ""
+    file_path: str = ""
+    line_number: int = 0
+    status: TestStatus = TestStatus.PENDING
+    message: str = ""
+    iterations: int = 0
+    rounds: int = 0
+    median: float = 0.0
+    q1: float = 0.0
+    q3: float = 0.0
+    mean: float = 0.0
+    minimum: float = 0.0
+    
+    @property
+    def key(self) -> str:
+        return f"{self.file_path}::{self.name}"
+    
+    @property
+    def iqr(self) -> float:
+        return self.q3 - self.q1
+    
+    @property
+    def ops_per_second(self) -> float:
+        return 1.0 / self.median if self.median > 0 else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name, 'file': self.file_path, 'status': self.status.value,
+            'message': self.message, 'iterations': self.iterations, 'rounds': self.rounds,
+            'median': self.median, 'q1': self.q1, 'q3': self.q3, 'iqr': self.iqr,
+            'mean': self.mean, 'min': self.minimum, 'ops_per_second': self.ops_per_second,
+        }
+
 @dataclass
 class TestSuite:
     """Suite de pruebas"""
     name: str
     file_path: str
     tests: List[TestResult] = field(default_factory=list)
+    benchmarks: List[BenchmarkResult] = field(default_factory=list)
     setup_code: str = ""
     teardown_code: str = ""
     fixtures: Dict[str, Any] = field(default_factory=dict)
@@ -195,11 +253,12 @@ class VaderAssert:
 class VaderTestRunner:
     """Ejecutor de pruebas Vader"""
     
-    def __init__(self, coverage_enabled: bool = True):
-        self.coverage_enabled = coverage_enabled
+    def __init__(self, coverage_enabled: bool = True, durations_file: Optional[str] = None):
+        self.coverage_enabled = coverage_enabled and coverage is not None
         self.coverage = None
-        if coverage_enabled:
+        if self.coverage_enabled:
             self.coverage = coverage.Coverage()
+        self.durations_file = durations_file
         
         # Patrones de reconocimiento
         self.test_patterns = {
@@ -235,10 +294,29 @@ class VaderTestRunner:
         current_test = None
         current_function = []
         in_test = False
+        current_benchmark = None
         
         for line_num, line in enumerate(lines, 1):
             line_stripped = line.strip()
             
+            # Bloque benchmark
+            benchmark_match = re.match(self.test_patterns['benchmark'], line_stripped)
+            if benchmark_match and not in_test:
+                current_benchmark = BenchmarkResult(name=benchmark_match.group(1), file_path=file_path,
+                                                    line_number=line_num)
+                current_function = []
+                continue
+            
+            if current_benchmark:
+                if line_stripped.startswith('fin benchmark'):
+                    current_benchmark.code = '\n'.join(current_function)
+                    suite.benchmarks.append(current_benchmark)
+                    current_benchmark = None
+                    current_function = []
+                else:
+                    current_function.append(line)
+                continue
+            
             # Función de prueba
             test_match = re.match(self.test_patterns['test_function'], line_stripped)
             if test_match:
@@ -294,11 +372,13 @@ class VaderTestRunner:
     def execute_test(self, test: TestResult, suite: TestSuite, assert_instance: VaderAssert) -> TestResult:
         """Ejecuta una prueba individual"""
         start_time = time.time()
+        # Cada prueba tiene su propio espacio de nombres: sin estado compartido entre pruebas
+        namespace = {'__name__': f'vader_test_{suite.name}', 'assert_instance': assert_instance}
         
         try:
             # Ejecutar setup si existe
             if suite.setup_code:
-                exec(suite.setup_code)
+                exec(textwrap.dedent(suite.setup_code), namespace)
             
             # Ejecutar código de la prueba
             test_code = test.message
@@ -307,11 +387,11 @@ class VaderTestRunner:
             test_code = self._translate_vader_to_python(test_code, assert_instance)
             
             # Ejecutar prueba
-            exec(test_code)
+            exec(textwrap.dedent(test_code), namespace)
             
             # Ejecutar teardown si existe
             if suite.teardown_code:
-                exec(suite.teardown_code)
+                exec(textwrap.dedent(suite.teardown_code), namespace)
             
             test.status = TestStatus.PASSED
             test.assertions = assert_instance.assertion_count
@@ -382,16 +462,144 @@ class VaderTestRunner:
         
         return suite
     
-    def run_tests(self, test_files: List[str], parallel: bool = False) -> TestReport:
-        """Ejecuta todas las pruebas"""
-        start_time = time.time()
+    def execute_benchmark(self, benchmark: BenchmarkResult, suite: TestSuite,
+                          warmup: float = BENCHMARK_WARMUP,
+                          min_round_time: float = BENCHMARK_MIN_ROUND_TIME,
+                          rounds: int = BENCHMARK_ROUNDS) -> BenchmarkResult:
+        """Mide un bloque benchmark
         
-        if self.coverage_enabled and self.coverage:
-            self.coverage.start()
+        El cuerpo se compila una vez como función; el setup de la suite se
+        ejecuta una sola vez fuera de la medición. Tras el calentamiento, las
+        iteraciones se duplican hasta que una ronda dura al menos
+        `min_round_time` y luego se repiten `rounds` rondas con el recolector
+        de basura desactivado.
+        """
+        assert_instance = VaderAssert()
+        namespace = {'__name__': f'vader_benchmark_{suite.name}', 'assert_instance': assert_instance}
+        
+        try:
+            if suite.setup_code:
+                exec(textwrap.dedent(suite.setup_code), namespace)
+            body = textwrap.dedent(self._translate_vader_to_python(benchmark.code, assert_instance))
+            exec("def __vader_benchmark__():\n" + textwrap.indent(body.strip() or 'pass', '    '), namespace)
+            function = namespace['__vader_benchmark__']
+            
+            deadline = time.perf_counter() + warmup
+            while True:
+                function()
+                if time.perf_counter() >= deadline:
+                    break
+            
+            iterations = 1
+            while True:
+                elapsed = self._time_iterations(function, iterations)
+                if elapsed >= min_round_time:
+                    break
+                iterations *= 2
+            
+            samples = [self._time_iterations(function, iterations) / iterations for _ in range(max(rounds, 2))]
+            
+            if suite.teardown_code:
+                exec(textwrap.dedent(suite.teardown_code), namespace)
+        
+        except Exception as e:
+            benchmark.status = TestStatus.ERROR
+            benchmark.message = f"Error en benchmark: {e}"
+            return benchmark
+        
+        q1, _, q3 = statistics.quantiles(samples, n=4)
+        benchmark.status = TestStatus.PASSED
+        benchmark.iterations = iterations
+        benchmark.rounds = len(samples)
+        benchmark.median = statistics.median(samples)
+        benchmark.q1, benchmark.q3 = q1, q3
+        benchmark.mean = statistics.fmean(samples)
+        benchmark.minimum = min(samples)
+        return benchmark
+    
+    @staticmethod
+    def _time_iterations(function: Callable, iterations: int) -> float:
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                function()
+            return time.perf_counter() - start
+        finally:
+            if gc_enabled:
+                gc.enable()
+    
+    def run_benchmarks(self, test_files: List[str], **options) -> List[BenchmarkResult]:
+        """Ejecuta los bloques benchmark de los archivos (en serie, para no compartir CPU)"""
+        results = []
+        for test_file in test_files:
+            try:
+                suite = self.parse_test_file(test_file)
+            except Exception as e:
+                print(f"❌ Error procesando {test_file}: {e}")
+                continue
+            for benchmark in suite.benchmarks:
+                result = self.execute_benchmark(benchmark, suite, **options)
+                results.append(result)
+                if result.status == TestStatus.PASSED:
+                    print(f"⏱️ {result.key}: mediana {result.median * 1e6:.2f}µs "
+                          f"(IQR {result.iqr * 1e6:.2f}µs, {result.ops_per_second:,.0f} ops/s, "
+                          f"{result.iterations}x{result.rounds})")
+                else:
+                    print(f"❌ {result.key}: {result.message}")
+        return results
+    
+    def save_benchmark_results(self, results: List[BenchmarkResult], output_file: str):
+        """Guarda los resultados en JSON (sirve también como línea base para comparar)"""
+        data = {
+            'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'benchmarks': {result.key: result.to_dict() for result in results},
+        }
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+    
+    def compare_benchmarks(self, results: List[BenchmarkResult], baseline_file: str,
+                           threshold: float = BENCHMARK_THRESHOLD) -> List[Dict[str, Any]]:
+        """Compara las medianas con una línea base y devuelve las regresiones
+        
+        Hay regresión cuando la mediana actual supera a la de la línea base en
+        más de `threshold` (0.10 = 10%). Los benchmarks nuevos no cuentan.
+        """
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get('benchmarks', {})
+        
+        regressions = []
+        for result in results:
+            previous = baseline.get(result.key)
+            if result.status != TestStatus.PASSED or not previous or not previous.get('median'):
+                continue
+            change = result.median / previous['median'] - 1.0
+            if change > threshold:
+                regressions.append({'name': result.key, 'baseline': previous['median'],
+                                    'current': result.median, 'change': change})
+        return regressions
+    
+    def run_tests(self, test_files: List[str], parallel: bool = False, jobs: int = 1) -> TestReport:
+        """Ejecuta todas las pruebas
+        
+        Con `jobs` > 1 cada archivo se ejecuta en un proceso aparte (ver _run_tests_in_processes).
+        """
+        start_time = time.time()
         
         report = TestReport()
         report.timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         
+        if jobs > 1 and len(test_files) > 1:
+            self._run_tests_in_processes(test_files, jobs, report)
+            report.total_duration = time.time() - start_time
+            return report
+        
+        if self.coverage_enabled and self.coverage:
+            self.coverage.start()
+        
         for test_file in test_files:
             print(f"📁 Procesando: {test_file}")
             
@@ -416,9 +624,87 @@ class VaderTestRunner:
             # Generar reporte de coverage
             report.coverage_data = self._generate_coverage_report()
         
+        self._save_durations(report.suites, self.durations_file)
         report.total_duration = time.time() - start_time
         return report
     
+    def _run_tests_in_processes(self, test_files: List[str], jobs: int, report: TestReport):
+        """Reparte los archivos entre `jobs` procesos y recoge cada suite según termina
+        
+        Los archivos se encolan de mayor a menor duración histórica, así que
+        los más lentos empiezan primero y los cortos rellenan el final. Cada
+        proceso guarda su propio archivo de cobertura y aquí se combinan.
+        """
+        durations_file = self.durations_file or DEFAULT_DURATIONS_FILE
+        durations = self._load_durations(durations_file)
+        estimates = self._estimate_suite_durations(test_files, durations)
+        ordered = sorted(test_files, key=lambda path: estimates[path], reverse=True)
+        
+        coverage_file = None
+        if self.coverage_enabled and self.coverage:
+            coverage_file = os.path.abspath(self.coverage.config.data_file)
+        
+        finished: Dict[str, TestSuite] = {}
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(_run_suite_in_process, path, coverage_file): path for path in ordered}
+            for future in as_completed(futures):
+                test_file = futures[future]
+                try:
+                    suite, output = future.result()
+                except Exception as e:
+                    print(f"❌ Error procesando {test_file}: {e}")
+                    continue
+                finished[test_file] = suite
+                print(f"📁 {test_file}: ✅ {suite.passed_tests} ❌ {suite.failed_tests} "
+                      f"({sum(t.duration for t in suite.tests):.2f}s)")
+                # Salida capturada en el proceso: la de cada prueba, fallos incluidos
+                if output:
+                    print(output, end='' if output.endswith('\n') else '\n')
+        
+        # El reporte conserva el orden de entrada aunque las suites terminen desordenadas
+        report.suites.extend(finished[path] for path in test_files if path in finished)
+        
+        if coverage_file:
+            self.coverage.combine()
+            self.coverage.save()
+            report.coverage_data = self._generate_coverage_report()
+        
+        self._save_durations(report.suites, durations_file)
+    
+    def _load_durations(self, durations_file: Optional[str]) -> Dict[str, float]:
+        if not durations_file or not os.path.exists(durations_file):
+            return {}
+        try:
+            with open(durations_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_durations(self, suites: List[TestSuite], durations_file: Optional[str]):
+        """Guarda la duración de cada prueba (archivo::prueba) para repartir la próxima ejecución"""
+        if not durations_file or not suites:
+            return
+        durations = self._load_durations(durations_file)
+        for suite in suites:
+            for test in suite.tests:
+                durations[f"{suite.file_path}::{test.name}"] = round(test.duration, 6)
+        try:
+            with open(durations_file, 'w', encoding='utf-8') as f:
+                json.dump(durations, f, indent=1, sort_keys=True)
+        except OSError:
+            pass
+    
+    @staticmethod
+    def _estimate_suite_durations(test_files: List[str], durations: Dict[str, float]) -> Dict[str, float]:
+        """Duración estimada por archivo; los archivos sin historial usan la media de los conocidos"""
+        totals: Dict[str, float] = {}
+        for key, seconds in durations.items():
+            path = key.rsplit('::', 1)[0]
+            totals[path] = totals.get(path, 0.0) + seconds
+        known = [totals[path] for path in test_files if path in totals]
+        default = sum(known) / len(known) if known else 1.0
+        return {path: totals.get(path, default) for path in test_files}
+    
     def _generate_coverage_report(self) -> Dict[str, Any]:
         """Genera reporte de cobertura de código"""
         if not self.coverage:
@@ -573,6 +859,24 @@ class VaderTestRunner:
         
         print(f"📄 Reporte HTML generado: {output_file}")
 
+def _run_suite_in_process(file_path: str, coverage_file: Optional[str] = None) -> Tuple[TestSuite, str]:
+    """Ejecuta un archivo de pruebas en un proceso del pool de --jobs y devuelve la suite y su salida"""
+    measurement = None
+    if coverage_file and coverage is not None:
+        # data_suffix: un archivo de datos por proceso, combinados al final
+        measurement = coverage.Coverage(data_file=coverage_file, data_suffix=True)
+        measurement.start()
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            runner = VaderTestRunner(coverage_enabled=False, durations_file=None)
+            suite = runner.run_suite(runner.parse_test_file(file_path))
+    finally:
+        if measurement is not None:
+            measurement.stop()
+            measurement.save()
+    return suite, output.getvalue()
+
 def main():
     """Función principal del CLI de testing"""
     import argparse
@@ -581,8 +885,15 @@ def main():
     parser.add_argument('directory', nargs='?', default='.', help='Directorio de pruebas')
     parser.add_argument('--pattern', default='*.test.vdr', help='Patrón de archivos de prueba')
     parser.add_argument('--parallel', action='store_true', help='Ejecución paralela')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Procesos en paralelo: reparte los archivos según su duración histórica')
     parser.add_argument('--no-coverage', action='store_true', help='Deshabilitar cobertura')
     parser.add_argument('--html-report', help='Generar reporte HTML')
+    parser.add_argument('--benchmark', action='store_true', help='Ejecutar los bloques benchmark en lugar de las pruebas')
+    parser.add_argument('--benchmark-json', help='Guardar los resultados de los benchmarks en JSON')
+    parser.add_argument('--benchmark-compare', help='Línea base JSON: falla si algún benchmark empeora')
+    parser.add_argument('--benchmark-threshold', type=float, default=BENCHMARK_THRESHOLD * 100,
+                        help='Porcentaje de empeoramiento tolerado frente a la línea base')
     
     args = parser.parse_args()
     
@@ -599,8 +910,23 @@ def main():
     print(f"🔍 Encontrados {len(test_files)} archivos de prueba")
     print()
     
+    if args.benchmark:
+        results = runner.run_benchmarks(test_files)
+        if args.benchmark_json:
+            runner.save_benchmark_results(results, args.benchmark_json)
+            print(f"💾 Resultados guardados en {args.benchmark_json}")
+        regressions = []
+        if args.benchmark_compare:
+            regressions = runner.compare_benchmarks(results, args.benchmark_compare,
+                                                    args.benchmark_threshold / 100)
+            for regression in regressions:
+                print(f"📉 Regresión en {regression['name']}: {regression['change'] * 100:+.1f}% "
+                      f"({regression['baseline'] * 1e6:.2f}µs → {regression['current'] * 1e6:.2f}µs)")
+        failed = regressions or any(r.status != TestStatus.PASSED for r in results)
+        sys.exit(1 if failed else 0)
+    
     # Ejecutar pruebas
-    report = runner.run_tests(test_files, args.parallel)
+    report = runner.run_tests(test_files, args.parallel, jobs=args.jobs)
     
     # Mostrar resumen
     print("=" * 60)
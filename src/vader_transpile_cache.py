@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+VADER - CACHÉ PERSISTENTE DE TRANSPILACIÓN
+==========================================
+Caché en disco direccionada por contenido para `transpile_code`.
+
+La clave combina el hash del código fuente, el lenguaje objetivo, el
+framework y la versión de los transpiladores, de modo que cualquier
+cambio en el compilador invalida las entradas antiguas. Las entradas
+se guardan en SQLite con expulsión LRU acotada por tamaño total.
+
+Los aciertos solo leen: el orden LRU se actualiza como mucho una vez cada
+TOUCH_INTERVAL segundos por entrada y los contadores se escriben por lotes,
+así que los procesos de `vader build --jobs N` no se turnan el bloqueo de
+escritura de SQLite en cada acierto. El tamaño total se lleva en la fila
+'bytes' de la tabla stats en lugar de sumarlo en cada escritura.
+
+Variables de entorno:
+- VADER_CACHE_DIR: directorio de la caché (por defecto ~/.cache/vader)
+- VADER_CACHE_MAX_MB: tamaño máximo en MB (por defecto 256)
+- VADER_NO_CACHE: si está definida, desactiva la caché
+"""
+
+import os
+import sys
+import time
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional, Any
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Segundos antes de volver a escribir last_used de una entrada leída
+TOUCH_INTERVAL = 60.0
+# Aciertos/fallos acumulados en memoria antes de escribirlos en stats
+STATS_FLUSH_EVERY = 32
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    target TEXT NOT NULL,
+    output TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+'''
+
+def default_cache_dir() -> Path:
+    """Directorio de caché respetando VADER_CACHE_DIR y XDG_CACHE_HOME"""
+    if os.environ.get('VADER_CACHE_DIR'):
+        return Path(os.environ['VADER_CACHE_DIR'])
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'vader'
+
+def cache_disabled() -> bool:
+    return bool(os.environ.get('VADER_NO_CACHE'))
+
+_transpiler_fingerprint = None
+
+def transpiler_fingerprint(version: str) -> str:
+    """Versión efectiva de los transpiladores: versión de Vader + stat de sus módulos
+
+    Se calcula una vez por proceso a partir de tamaño y mtime, sin leer los archivos.
+    """
+    global _transpiler_fingerprint
+    if _transpiler_fingerprint is None:
+        root = Path(__file__).resolve().parent.parent
+        digest = hashlib.sha256()
+        for directory in (root / 'transpilers', Path(__file__).resolve().parent):
+            if not directory.is_dir():
+                continue
+            # Recursivo: los backends de --framework viven en transpilers/frameworks
+            for path in sorted(directory.rglob('*.py')):
+                stat = path.stat()
+                name = path.relative_to(directory).as_posix()
+                digest.update(f'{name}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+        _transpiler_fingerprint = digest.hexdigest()[:16]
+    return f'{version}+{_transpiler_fingerprint}'
+
+class VaderTranspileCache:
+    """Caché LRU persistente de resultados de transpilación"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        if max_bytes is None:
+            max_mb = os.environ.get('VADER_CACHE_MAX_MB')
+            max_bytes = int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+        self.db_path = self.cache_dir / 'transpile-cache.sqlite3'
+        self._connection = None
+        self._pending = {}
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            import sqlite3  # diferido: solo se paga al consultar la caché
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Varios procesos del mismo build pueden compartir la caché
+            self._connection = sqlite3.connect(str(self.db_path), timeout=30)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(_SCHEMA)
+            # Cachés creadas antes del total acumulado: se suma una sola vez
+            if self._connection.execute("SELECT 1 FROM stats WHERE name = 'bytes'").fetchone() is None:
+                with self._connection:
+                    self._connection.execute(
+                        "INSERT OR IGNORE INTO stats (name, value) "
+                        "SELECT 'bytes', COALESCE(SUM(size), 0) FROM entries"
+                    )
+        return self._connection
+
+    @staticmethod
+    def make_key(source: str, target: str, framework: Optional[str], version: str,
+                 language: Optional[str] = None) -> str:
+        """Clave direccionada por contenido (`language`: idioma del fuente si no es español)"""
+        digest = hashlib.sha256()
+        for part in (version, target, framework or '', language or '', source):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\x00')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Devuelve la salida cacheada o None; solo escribe si last_used quedó antiguo"""
+        connection = self.connection
+        row = connection.execute('SELECT output, last_used FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self._count('misses')
+            return None
+        now = time.time()
+        if now - row[1] > TOUCH_INTERVAL:
+            with connection:
+                connection.execute('UPDATE entries SET last_used = ? WHERE key = ?', (now, key))
+        self._count('hits')
+        return row[0]
+
+    def put(self, key: str, target: str, output: str):
+        """Guarda una salida y expulsa las entradas menos usadas si se supera el límite"""
+        size = len(output.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        connection = self.connection
+        with connection:
+            # Primero el total: la misma transacción ve el tamaño de la entrada reemplazada
+            connection.execute(
+                "UPDATE stats SET value = value + ? - COALESCE((SELECT size FROM entries WHERE key = ?), 0) "
+                "WHERE name = 'bytes'",
+                (size, key)
+            )
+            connection.execute(
+                'INSERT OR REPLACE INTO entries (key, target, output, size, last_used) VALUES (?, ?, ?, ?, ?)',
+                (key, target, output, size, time.time())
+            )
+            self._flush_stats(connection)
+            total = self._total_size(connection)
+            if total > self.max_bytes:
+                self._evict(connection, total)
+
+    def _evict(self, connection, total: int):
+        evicted = 0
+        start = total
+        for key, size in connection.execute('SELECT key, size FROM entries ORDER BY last_used').fetchall():
+            if total <= self.max_bytes:
+                break
+            connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+            evicted += 1
+        self._bump(connection, 'bytes', total - start)
+        self._bump(connection, 'evictions', evicted)
+
+    @staticmethod
+    def _total_size(connection) -> int:
+        row = connection.execute("SELECT value FROM stats WHERE name = 'bytes'").fetchone()
+        return row[0] if row else 0
+
+    def _count(self, name: str):
+        """Cuenta un acierto o fallo en memoria; se escriben cada STATS_FLUSH_EVERY"""
+        self._pending[name] = self._pending.get(name, 0) + 1
+        if sum(self._pending.values()) >= STATS_FLUSH_EVERY:
+            with self.connection:
+                self._flush_stats(self.connection)
+
+    def _flush_stats(self, connection):
+        pending, self._pending = self._pending, {}
+        for name, amount in pending.items():
+            self._bump(connection, name, amount)
+
+    @staticmethod
+    def _bump(connection, name: str, amount: int = 1):
+        connection.execute(
+            'INSERT INTO stats (name, value) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            (name, amount)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Estadísticas acumuladas de la caché"""
+        connection = self.connection
+        if self._pending:
+            with connection:
+                self._flush_stats(connection)
+        counters = dict(connection.execute('SELECT name, value FROM stats').fetchall())
+        entries = connection.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        size = counters.get('bytes', 0)
+        hits = counters.get('hits', 0)
+        misses = counters.get('misses', 0)
+        lookups = hits + misses
+        return {
+            'directory': str(self.cache_dir),
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'evictions': counters.get('evictions', 0),
+            'hit_rate': hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        """Vacía entradas y contadores"""
+        self._pending = {}
+        with self.connection:
+            self.connection.execute('DELETE FROM entries')
+            self.connection.execute('DELETE FROM stats')
+            self.connection.execute("INSERT INTO stats (name, value) VALUES ('bytes', 0)")
+
+    def close(self):
+        """Escribe los contadores pendientes y cierra la conexión"""
+        if self._connection is not None:
+            if self._pending:
+                with self._connection:
+                    self._flush_stats(self._connection)
+            self._connection.close()
+            self._connection = None
+
+_default_cache = None
+
+def get_default_cache() -> VaderTranspileCache:
+    """Instancia compartida por el proceso"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = VaderTranspileCache()
+        import atexit
+        atexit.register(_default_cache.close)
+        # Los workers de un pool terminan sin atexit; sí ejecutan los finalizadores de multiprocessing
+        if 'multiprocessing' in sys.modules:
+            from multiprocessing import util
+            util.Finalize(_default_cache, _default_cache.close, exitpriority=0)
+    return _default_cache
+
+def print_stats(cache: Optional[VaderTranspileCache] = None):
+    """Imprime las estadísticas de la caché"""
+    stats = (cache or get_default_cache()).stats()
+    print("📦 Caché de transpilación Vader")
+    print("=" * 40)
+    print(f"Directorio: {stats['directory']}")
+    print(f"Entradas:   {stats['entries']}")
+    print(f"Tamaño:     {stats['size_bytes'] / 1024:.1f} KB de {stats['max_bytes'] / (1024 * 1024):.0f} MB")
+    print(f"Aciertos:   {stats['hits']}")
+    print(f"Fallos:     {stats['misses']}")
+    print(f"Expulsadas: {stats['evictions']}")
+    print(f"Tasa de aciertos: {stats['hit_rate']:.1%}")
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+VADER - MODO WATCH INCREMENTAL
+==============================
+Observa un directorio y retranspila solo los archivos .vdr modificados
+y los módulos que dependen de ellos.
+
+- Usa inotify (Linux, vía ctypes) cuando está disponible y, si no,
+  sondea mtime/tamaño de los archivos.
+- Mantiene en memoria el grafo de módulos de VaderModuleSystem
+  (sentencias `importar ... desde`) y compara el hash del contenido
+  para ignorar guardados sin cambios.
+"""
+
+import os
+import sys
+import time
+import select
+import struct
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from vader_module_system import VaderModuleSystem
+
+VADER_EXTENSION = '.vdr'
+
+def _scan_vader_files(root: Path) -> Dict[str, Tuple[int, int]]:
+    """Mapa ruta -> (mtime_ns, tamaño) de todos los .vdr bajo root"""
+    snapshot = {}
+    for directory, _, files in os.walk(root):
+        for name in files:
+            if name.endswith(VADER_EXTENSION):
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+class PollingWatcher:
+    """Detecta cambios comparando instantáneas de mtime y tamaño"""
+
+    name = 'polling'
+
+    def __init__(self, root: str, interval: float = 0.5):
+        self.root = Path(root).resolve()
+        self.interval = interval
+        self.snapshot = _scan_vader_files(self.root)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Espera hasta `timeout` segundos y devuelve las rutas cambiadas"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = self.poll()
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            remaining = self.interval if deadline is None else min(self.interval, deadline - time.monotonic())
+            time.sleep(max(0.0, remaining))
+
+    def poll(self) -> Set[str]:
+        current = _scan_vader_files(self.root)
+        changed = {path for path, state in current.items() if self.snapshot.get(path) != state}
+        changed.update(path for path in self.snapshot if path not in current)
+        self.snapshot = current
+        return changed
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    """Observador basado en inotify de Linux, sin dependencias externas"""
+
+    name = 'inotify'
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_ISDIR = 0x40000000
+    IN_IGNORED = 0x00008000
+
+    _EVENT = struct.Struct('iIII')
+    _MASK = IN_CLOSE_WRITE | IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+    def __init__(self, root: str):
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify solo está disponible en Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self.root = Path(root).resolve()
+        self.watches: Dict[int, str] = {}
+        self._add_tree(str(self.root))
+
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self._MASK)
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def _add_tree(self, directory: str) -> Set[str]:
+        """Observa un árbol y devuelve los .vdr que ya contiene"""
+        found = set()
+        for current, _, files in os.walk(directory):
+            self._add_watch(current)
+            found.update(os.path.join(current, name) for name in files if name.endswith(VADER_EXTENSION))
+        return found
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        """Espera hasta `timeout` segundos y devuelve las rutas cambiadas"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        return self._read_events()
+
+    def _read_events(self) -> Set[str]:
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self._EVENT.unpack_from(data, offset)
+                offset += self._EVENT.size
+                name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'surrogateescape')
+                offset += length
+                directory = self.watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & self.IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                path = os.path.join(directory, name)
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        changed.update(self._add_tree(path))
+                elif name.endswith(VADER_EXTENSION):
+                    changed.add(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+def create_watcher(root: str, polling: bool = False, interval: float = 0.5):
+    """inotify si está disponible; si no, sondeo periódico"""
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, interval)
+
+class VaderWatchSession:
+    """Mantiene el grafo de módulos y decide qué retranspilar en cada cambio
+
+    `build` recibe una lista de rutas .vdr y devuelve un resultado por archivo
+    (diccionarios con al menos 'source' y 'ok', como `vader.build_files`).
+    """
+
+    def __init__(self, root: str, build: Callable[[List[str]], List[dict]]):
+        self.root = Path(root).resolve()
+        self.build = build
+        self.modules = VaderModuleSystem(str(self.root))
+        self.hashes: Dict[str, str] = {}
+
+    def _load(self, path: str) -> bool:
+        """(Re)carga un módulo; devuelve True si su contenido cambió"""
+        previous = self.hashes.get(path)
+        self.modules.remove_module(path)
+        try:
+            module = self.modules.load_module_file(path)
+        except ImportError:
+            return False
+        self.hashes[path] = module.hash
+        return module.hash != previous
+
+    def initial_build(self) -> List[dict]:
+        """Carga todos los módulos y transpila el proyecto completo"""
+        paths = sorted(str(Path(p).resolve()) for p in _scan_vader_files(self.root))
+        for path in paths:
+            self._load(path)
+        self.modules.relink_dependencies()
+        return self.build(paths) if paths else []
+
+    def plan(self, changed: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Actualiza el grafo y devuelve (archivos modificados, dependientes a retranspilar)"""
+        modified, added, deleted = set(), set(), set()
+        for path in {str(Path(p).resolve()) for p in changed}:
+            if os.path.exists(path):
+                if path not in self.hashes:
+                    added.add(path)
+                if self._load(path):
+                    modified.add(path)
+            elif path in self.hashes:
+                del self.hashes[path]
+                deleted.add(path)
+
+        # Dependientes según el grafo anterior (incluye los que importaban archivos borrados)
+        dependents = set()
+        for path in modified | deleted:
+            dependents |= self.modules.get_dependents(path)
+
+        # Crear o borrar archivos puede cambiar cómo se resuelven los imports de otros módulos
+        if added or deleted:
+            for path in deleted:
+                self.modules.remove_module(path)
+            self.modules.relink_dependencies()
+            for path in added:
+                dependents |= self.modules.get_dependents(path)
+
+        rebuild = sorted(modified)
+        dependents = sorted(p for p in dependents - modified if p in self.hashes)
+        return rebuild, dependents
+
+    def handle(self, changed: Iterable[str]) -> Tuple[List[str], List[str], List[dict]]:
+        """Procesa un lote de cambios y retranspila lo necesario"""
+        rebuild, dependents = self.plan(changed)
+        paths = rebuild + dependents
+        return rebuild, dependents, (self.build(paths) if paths else [])
+
+def watch(root: str, build: Callable[[List[str]], List[dict]], polling: bool = False,
+          interval: float = 0.5, debounce: float = 0.1, report: Callable = print):
+    """Bucle principal del modo watch (termina con Ctrl+C)"""
+    session = VaderWatchSession(root, build)
+    watcher = create_watcher(root, polling=polling, interval=interval)
+    start = time.perf_counter()
+    results = session.initial_build()
+    failures = sum(1 for r in results if not r['ok'])
+    report(f"👀 Observando {session.root} ({watcher.name}): {len(results)} archivos, "
+           f"{failures} con errores, {(time.perf_counter() - start) * 1000:.0f} ms")
+    try:
+        while True:
+            changed = watcher.wait(None)
+            # Agrupar ráfagas de eventos de un mismo guardado
+            while True:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+            start = time.perf_counter()
+            rebuild, dependents, results = session.handle(changed)
+            if not results:
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            names = ', '.join(os.path.relpath(p, session.root) for p in rebuild) or '(eliminados)'
+            report(f"♻️  {names} + {len(dependents)} dependientes retranspilados en {elapsed:.0f} ms")
+            for result in results:
+                if not result['ok']:
+                    report(f"  ❌ {result['source']}: {result['error']}")
+    except KeyboardInterrupt:
+        report("👋 Modo watch detenido")
+    finally:
+        watcher.close()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests para el motor de reglas compiladas del parser conversacional
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from transpilers import conversational
+from transpilers.conversational import VaderConversationalParser, process_conversational_vader
+
+
+def test_rules_convert_line_by_line():
+    """Test de la conversión por línea, incluidas las reglas encadenadas"""
+    codigo = '''
+cuando llueva entonces decir "Lleva paraguas"
+    suma 10 más 5 y guárdalo en resultado
+pregunta "¿Cómo te llamas?" y guárdalo en nombre
+cuando hace frío entonces
+    muestra "abrígate"
+'''
+    convertido, info = process_conversational_vader(codigo)
+    assert convertido.split('\n') == [
+        'si llueva entonces',
+        'mostrar "Lleva paraguas"',
+        'resultado = 10 + 5',
+        'nombre = input("¿Cómo te llamas?")',
+        'si hace frío entonces',
+        'mostrar "abrígate"',
+    ]
+    assert info['is_conversational'] and info['converted'] and 'cuando' in info['indicators_found']
+
+    # Reglas del dominio detectado
+    convertido, info = process_conversational_vader("cuando haga calor entonces enciende el ventilador\n"
+                                                    "muestra el sensor")
+    assert info['detected_domain'] == 'iot' and 'encender(el ventilador)' in convertido
+    print("✅ Conversión por línea")
+
+
+def test_standard_code_untouched_and_parser_cheap():
+    """Test de que el código estándar no cambia y de que las reglas se comparten"""
+    estandar = 'si x > 3 entonces\n    mostrar "hola"\nfin si\n'
+    convertido, info = process_conversational_vader(estandar)
+    assert convertido == estandar and not info['converted']
+
+    parser = VaderConversationalParser()
+    assert parser.general_patterns is VaderConversationalParser().general_patterns
+    assert parser.convert_to_vader_standard('decir "hola"\ncuando x entonces muestra y') == \
+        'mostrar "hola"\nsi x entonces\nmostrar y'
+    print("✅ Código estándar y reglas compartidas")
+
+
+def test_repeated_lines_hit_memo():
+    """Test de la memoria de líneas: las frases repetidas no se vuelven a convertir"""
+    conversational._convert_line.cache_clear()
+    tutorial = 'cuando x entonces muestra "paso"\nsuma a más b y guárdalo en c\n' * 200
+    convertido, _ = process_conversational_vader(tutorial)
+    cache = conversational._convert_line.cache_info()
+    assert cache.misses == 2 and cache.hits == 398
+    assert convertido.count('c = a + b') == 200
+    print("✅ Memoria de líneas repetidas")
+
+
+if __name__ == '__main__':
+    test_rules_convert_line_by_line()
+    test_standard_code_untouched_and_parser_cheap()
+    test_repeated_lines_hit_memo()
@@ -120,6 +120,47 @@ def test_syntax_validation():
         
         print()
 
+def test_detection_single_scan_counts_overlaps():
+    """Prueba que el autómata cuenta palabras clave solapadas y multi-palabra"""
+    goto, fail, outputs, weights = multilingual_system._build_detector()
+    assert 'fin si' in weights and len(fail) == len(goto)
+    assert multilingual_system.detect_language('say "hi"\nif x then\n    show x\nend if') == 'en'
+    assert multilingual_system.detect_language('decir "hola"\nguardar nombre = "Ana"\nrepetir 3 veces\nfin repetir') == 'es'
+    assert multilingual_system.detect_language('12345') == 'es'
+
+def test_translation_single_pass():
+    """Prueba que la traducción reescribe todo en una pasada, priorizando frases largas"""
+    code = 'si x es igual a 1\n    mostrar "si"\nfin si'
+    translated = multilingual_system.translate_code(code, 'es', 'en')
+    assert translated.splitlines()[-1] == 'end if', translated
+    assert 'show' in translated
+    # La traducción del resultado no se vuelve a traducir
+    assert multilingual_system.translate_code('if x then\nend if', 'en', 'es').splitlines()[-1] == 'fin si'
+
+def test_language_bundle_invalidated_by_mtime():
+    """Prueba que el bundle precompilado se usa y se invalida al cambiar un JSON"""
+    import shutil
+    import tempfile
+    from multilingual_core import VaderMultilingualCore
+
+    source_dir = Path(__file__).parent / "src" / "languages"
+    with tempfile.TemporaryDirectory() as tmp:
+        for code in ('es', 'en'):
+            shutil.copy(source_dir / f"{code}.json", tmp)
+
+        first = VaderMultilingualCore(tmp)
+        assert first.detect_language('say "hi"\nend if') == 'en'
+        assert first.bundle_path.exists() and 'bundle' not in first.load_times
+
+        second = VaderMultilingualCore(tmp)
+        assert second.detect_language('say "hi"\nend if') == 'en'
+        assert 'bundle' in second.load_times and sorted(second.supported_languages) == ['en', 'es']
+
+        os.utime(Path(tmp) / "en.json", ns=(0, 0))
+        third = VaderMultilingualCore(tmp)
+        third.load_all_languages()
+        assert 'bundle' not in third.load_times
+
 def main():
     """Función principal de pruebas"""
     print("🌍 VADER MULTILINGUAL SYSTEM - PRUEBAS COMPLETAS")
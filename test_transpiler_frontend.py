@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Tests para el frontend compartido de los transpiladores (lexer + parser + AST)
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from transpilers import frontend
+from transpilers.python import PythonTranspiler
+from transpilers.javascript import JavaScriptTranspiler
+from transpilers.go import GoTranspiler
+from transpilers.rust import RustTranspiler
+from transpilers.java import JavaTranspiler
+
+CODIGO = '''# Programa de prueba
+nombre = "Juan"
+si edad mayor que 18 entonces
+    mostrar "Soy mayor # de edad"  # comentario
+sino
+    mostrar "Soy menor"
+fin si
+repetir 3 veces
+    decir texto(verdadero)
+fin repetir
+funcion saludar con nombre y saludo
+    devolver saludo + nombre
+fin funcion
+saludar con "Ana", "Hola"
+'''
+
+CODIGO_CLASES = '''clase Persona:
+    atributo nombre tipo texto
+    constructor con nombre tipo texto:
+        this.nombre = nombre
+    fin
+    metodo saludar que devuelve texto:
+        devolver "Hola " + this.nombre
+    fin
+fin clase
+crear lista amigos
+agregar "Ana" a amigos
+intentar:
+    lanzar "fallo"
+capturar error:
+    mostrar "capturado"
+finalmente:
+    mostrar "fin"
+fin
+'''
+
+
+def test_tokenize_strings_and_comments():
+    """Test que el lexer respeta strings y comentarios"""
+    tokens = frontend.tokenize('mostrar "a # b" # fin')
+    kinds = [t.kind for t in tokens]
+    assert kinds == ['NAME', 'STRING', 'COMMENT'], kinds
+    assert tokens[1].value == '"a # b"'
+
+    tokens = frontend.tokenize('si x es mayor que 3')
+    assert tokens[2].kind == 'CMP' and tokens[2].value == '>'
+    print("✅ Lexer funcional")
+
+
+def test_parse_builds_tree():
+    """Test que el parser construye bloques anidados"""
+    frontend.clear_cache()
+    program = frontend.parse(CODIGO)
+
+    kinds = [type(node).__name__ for node in program.body]
+    assert kinds == ['Comment', 'Assign', 'If', 'Repeat', 'FunctionDef', 'Call', 'Blank'], kinds
+
+    condicional = program.body[2]
+    assert condicional.closed
+    assert len(condicional.body) == 1 and len(condicional.orelse) == 1
+    assert condicional.body[0].comment == '# comentario'
+
+    funcion = program.body[4]
+    assert funcion.name == 'saludar'
+    assert funcion.params == ['nombre', 'saludo']
+    print("✅ AST construido correctamente")
+
+
+def test_function_params_split_on_y():
+    """Test de 'y' en los parámetros: separador entre nombres, o nombre tras una coma"""
+    for codigo, esperado in [('funcion punto con x, y', ['x', 'y']),
+                             ('funcion f con a y b', ['a', 'b']),
+                             ('funcion f con a, b y c', ['a', 'b', 'c'])]:
+        assert frontend.parse(codigo).body[0].params == esperado, codigo
+
+    python_code = PythonTranspiler().transpile('funcion punto con x, y\n    devolver x * 10 + y\nfin funcion')
+    assert 'def punto(x, y):' in python_code
+    namespace = {}
+    exec(python_code, namespace)
+    assert namespace['punto'](1, 2) == 12
+    print("✅ Parámetros separados por 'y'")
+
+
+def test_parse_classes_and_try():
+    """Test de clases, declaraciones e intentar/capturar/finalmente en el AST"""
+    program = frontend.parse(CODIGO_CLASES)
+    kinds = [type(node).__name__ for node in program.body]
+    assert kinds == ['ClassDef', 'Declare', 'Append', 'Try', 'Blank'], kinds
+
+    clase = program.body[0]
+    miembros = [type(node).__name__ for node in clase.body]
+    assert miembros == ['Attribute', 'Constructor', 'Method'], miembros
+    assert clase.body[1].params == ['nombre'] and clase.body[1].param_types == {'nombre': 'texto'}
+    assert clase.body[2].name == 'saludar' and clase.body[2].returns == 'texto'
+
+    intento = program.body[3]
+    assert [type(n).__name__ for n in intento.body] == ['Raise']
+    assert intento.handlers[0].name == 'error' and len(intento.finalbody) == 1
+
+    funcion = frontend.parse('funcion sumar(a: numero, b) -> numero:\n    devolver a + b\nfin').body[0]
+    assert funcion.params == ['a', 'b'] and funcion.returns == 'numero'
+
+    python_code = PythonTranspiler().transpile(CODIGO_CLASES)
+    assert 'def __init__(self, nombre):' in python_code
+    assert 'except Exception as error:' in python_code
+    salida = []
+    namespace = {'print': salida.append}
+    exec(python_code, namespace)
+    assert salida == ['capturado', 'fin']
+    assert namespace['Persona']('Ana').saludar() == 'Hola Ana'
+    assert namespace['amigos'] == ['Ana']
+    print("✅ Clases e intentar en el AST")
+
+
+def test_compiled_backends_share_ast():
+    """Test que Go, Rust y Java recorren el mismo AST que Python y JavaScript"""
+    frontend.clear_cache()
+    go_code = GoTranspiler().transpile(CODIGO_CLASES)
+    rust_code = RustTranspiler().transpile(CODIGO_CLASES)
+    java_code = JavaTranspiler().transpile(CODIGO_CLASES)
+    info = frontend.cache_info()
+    assert info['misses'] == 1 and info['hits'] == 2, info
+
+    assert 'func NewPersona(nombre string) *Persona {' in go_code
+    assert 'func (this *Persona) saludar() string {' in go_code
+    assert 'amigos = append(amigos, "Ana")' in go_code
+    assert 'if error := recover(); error != nil {' in go_code
+
+    assert 'pub fn new(nombre: String) -> Self {' in rust_code
+    assert 'pub fn saludar(&self) -> String {' in rust_code
+    assert 'return "Hola " + self.nombre;' in rust_code
+    assert 'amigos.push("Ana".to_string());' in rust_code
+
+    assert 'public Persona(String nombre) {' in java_code
+    assert 'public String saludar() {' in java_code
+    assert '} catch (Exception e) {' in java_code
+    assert 'throw new RuntimeException("fallo");' in java_code
+
+    for code in (go_code, rust_code, java_code):
+        assert code.count('{') == code.count('}')
+    print("✅ Backends Go, Rust y Java sobre el AST")
+
+
+def test_parse_cache_shared_between_backends():
+    """Test que varios backends reutilizan el mismo AST"""
+    frontend.clear_cache()
+    PythonTranspiler().transpile(CODIGO)
+    JavaScriptTranspiler().transpile(CODIGO)
+    info = frontend.cache_info()
+    assert info['misses'] == 1, info
+    assert info['hits'] == 1, info
+    print("✅ Caché de AST compartida")
+
+
+def test_python_visitor_output():
+    """Test de la salida Python generada por el visitante"""
+    python_code = PythonTranspiler().transpile(CODIGO)
+    assert 'if edad > 18:' in python_code
+    assert '    print("Soy mayor # de edad")  # comentario' in python_code
+    assert 'else:' in python_code
+    assert 'for _ in range(3):' in python_code
+    assert '    print(str(True))' in python_code
+    assert 'def saludar(nombre, saludo):' in python_code
+    assert 'saludar("Ana", "Hola")' in python_code
+    compile(python_code, '<vader>', 'exec')
+    print("✅ Salida Python válida")
+
+
+def test_javascript_visitor_output():
+    """Test de la salida JavaScript generada por el visitante"""
+    js_code = JavaScriptTranspiler().transpile(CODIGO)
+    assert '//  Programa de prueba' not in js_code
+    assert '// Programa de prueba' in js_code
+    assert 'let nombre = "Juan";' in js_code
+    assert 'if (edad > 18) {' in js_code
+    assert '} else {' in js_code
+    assert 'console.log(String(true));' in js_code
+    assert 'function saludar(nombre, saludo) {' in js_code
+    assert js_code.count('{') == js_code.count('}')
+
+    bloque = JavaScriptTranspiler().transpile('enlaces.forEach(anchor => {\n    mostrar anchor\n});')
+    assert 'enlaces.forEach(anchor => {\n' in bloque and '{;' not in bloque
+    print("✅ Salida JavaScript válida")
+
+
+if __name__ == '__main__':
+    test_tokenize_strings_and_comments()
+    test_parse_builds_tree()
+    test_function_params_split_on_y()
+    test_parse_classes_and_try()
+    test_compiled_backends_share_ast()
+    test_parse_cache_shared_between_backends()
+    test_python_visitor_output()
+    test_javascript_visitor_output()
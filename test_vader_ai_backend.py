@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Tests para el backend de IA asíncrono contra un proveedor simulado local
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from aiohttp import test_utils, web
+
+
+def _load_backend():
+    path = os.path.join(os.path.dirname(__file__), 'vader-ai-backend.py')
+    spec = importlib.util.spec_from_file_location('vader_ai_backend', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    for provider in ('openai', 'anthropic', 'google'):
+        module.AI_PROVIDERS[provider]['api_key'] = None
+    return module
+
+
+class ProveedorFalso:
+    """Proveedor con las APIs de Ollama y OpenAI que cuenta llamadas y conexiones"""
+
+    TOKENS = ['mostrar ', '"hola', ' mundo"']
+
+    def __init__(self):
+        self.calls = {'tags': 0, 'generate': 0, 'chat': 0}
+        self.connections = set()
+        self.contexts = []
+        self.app = web.Application()
+        self.app.router.add_get('/api/tags', self.tags)
+        self.app.router.add_post('/api/generate', self.generate)
+        self.app.router.add_post('/v1/chat/completions', self.chat)
+
+    async def tags(self, request):
+        self.calls['tags'] += 1
+        return web.json_response({'models': []})
+
+    async def generate(self, request):
+        self.calls['generate'] += 1
+        self.connections.add(request.transport.get_extra_info('peername'))
+        data = await request.json()
+        if not data['stream']:
+            return web.json_response({'response': ''.join(self.TOKENS), 'done': True})
+
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        for token in self.TOKENS:
+            await response.write(json.dumps({'response': token, 'done': False}).encode() + b'\n')
+            await asyncio.sleep(0.01)
+        await response.write(json.dumps({'response': '', 'done': True}).encode() + b'\n')
+        await response.write_eof()
+        return response
+
+    async def chat(self, request):
+        self.calls['chat'] += 1
+        data = await request.json()
+        self.contexts.append(len(data['messages']))
+        return web.json_response({'choices': [{'message': {'content': f"respuesta {self.calls['chat']}"}}]})
+
+
+async def _start(module, proveedor):
+    servidor = test_utils.TestServer(proveedor.app)
+    await servidor.start_server()
+    module.AI_PROVIDERS['ollama']['base_url'] = str(servidor.make_url('/api'))
+    module.AI_PROVIDERS['openai']['base_url'] = str(servidor.make_url('/v1'))
+
+    backend = module.VaderAIBackend()
+    cliente = test_utils.TestClient(test_utils.TestServer(backend.app))
+    await cliente.start_server()
+    return backend, cliente, servidor
+
+
+async def _stop(cliente, servidor):
+    await cliente.close()
+    await servidor.close()
+
+
+def _sse(texto):
+    eventos = []
+    for bloque in texto.strip().split('\n\n'):
+        campos = dict(linea.split(': ', 1) for linea in bloque.split('\n'))
+        eventos.append((campos.get('event'), json.loads(campos['data'])))
+    return eventos
+
+
+def test_responses_cached_and_provider_session_reused():
+    """Test de la caché de respuestas y de la sesión HTTP compartida con el proveedor"""
+    module = _load_backend()
+    proveedor = ProveedorFalso()
+
+    async def escenario():
+        backend, cliente, servidor = await _start(module, proveedor)
+        assert backend.active_provider == 'ollama'
+
+        respuestas = []
+        for mensaje in ['hola', 'hola', 'adiós', 'hola']:
+            r = await cliente.post('/ai/chat', json={'message': mensaje, 'action_type': 'explain'})
+            assert r.status == 200 and r.headers['Access-Control-Allow-Origin'] == '*'
+            respuestas.append(await r.json())
+
+        # Peticiones simultáneas de varios usuarios en el mismo bucle
+        await asyncio.gather(*(cliente.post('/ai/chat', json={'message': f'm{i}'}) for i in range(20)))
+        stats = await (await cliente.get('/ai/stats')).json()
+        await _stop(cliente, servidor)
+        return backend, respuestas, stats
+
+    backend, respuestas, stats = asyncio.run(escenario())
+    assert [r['cached'] for r in respuestas] == [False, True, False, True]
+    assert respuestas[0]['response'] == respuestas[1]['response'] == 'mostrar "hola mundo"'
+    assert proveedor.calls['generate'] == 22
+    assert stats['response_cache']['hits'] == 2 and stats['response_cache']['size'] == 22
+    assert stats['open_sessions'] == ['ollama'] and not backend._sessions
+    assert len(proveedor.connections) <= module.PROVIDER_POOL_SIZE
+    print("✅ Caché de respuestas y sesión compartida")
+
+
+def test_tokens_streamed_over_sse():
+    """Test del streaming SSE: tokens en orden, evento final y respuesta guardada en caché"""
+    module = _load_backend()
+    proveedor = ProveedorFalso()
+
+    async def escenario():
+        backend, cliente, servidor = await _start(module, proveedor)
+        r = await cliente.post('/ai/chat/stream', json={'message': 'genera un saludo', 'action_type': 'generate'})
+        assert r.headers['Content-Type'].startswith('text/event-stream')
+        eventos = _sse(await r.text())
+
+        repetida = await cliente.post('/ai/chat', json={'message': 'genera un saludo', 'action_type': 'generate'})
+        repetida = await repetida.json()
+        en_cache = _sse(await (await cliente.post('/ai/chat/stream', json={
+            'message': 'genera un saludo', 'action_type': 'generate'})).text())
+        await _stop(cliente, servidor)
+        return eventos, repetida, en_cache
+
+    eventos, repetida, en_cache = asyncio.run(escenario())
+    assert [data['token'] for event, data in eventos[:-1]] == ProveedorFalso.TOKENS
+    assert eventos[-1] == ('done', {'provider': 'ollama', 'cached': False})
+    assert repetida['cached'] and repetida['response'] == 'mostrar "hola mundo"'
+    assert en_cache[-1][1]['cached'] and proveedor.calls['generate'] == 1
+    print("✅ Streaming SSE")
+
+
+def test_health_checks_cached_with_ttl():
+    """Test de los chequeos de salud: uno por TTL aunque lleguen muchas peticiones"""
+    module = _load_backend()
+    proveedor = ProveedorFalso()
+
+    async def escenario():
+        backend, cliente, servidor = await _start(module, proveedor)
+        for _ in range(5):
+            r = await (await cliente.get('/ai/providers')).json()
+            assert r == {'available_providers': ['ollama'], 'active_provider': 'ollama'}
+        llamadas = proveedor.calls['tags']
+
+        module.HEALTH_CHECK_TTL = 0
+        await asyncio.gather(*(backend.check_provider_health('ollama') for _ in range(10)))
+        await _stop(cliente, servidor)
+        return llamadas
+
+    assert asyncio.run(escenario()) == 1
+    assert proveedor.calls['tags'] == 2
+    print("✅ Chequeos de salud con TTL")
+
+
+def test_cache_key_includes_session_history():
+    """Test de OpenAI: la clave de caché incluye el historial que se envía al proveedor"""
+    module = _load_backend()
+    module.AI_PROVIDERS['openai']['api_key'] = 'sk-test'
+    proveedor = ProveedorFalso()
+
+    async def escenario():
+        backend, cliente, servidor = await _start(module, proveedor)
+        respuestas = []
+        for sesion in ['a', 'a', 'b']:
+            r = await cliente.post('/ai/chat', json={'message': 'hola', 'session_id': sesion})
+            respuestas.append(await r.json())
+        await _stop(cliente, servidor)
+        return backend, respuestas
+
+    backend, respuestas = asyncio.run(escenario())
+    assert [(r['response'], r['cached']) for r in respuestas] == [
+        ('respuesta 1', False), ('respuesta 2', False), ('respuesta 1', True)]
+    assert proveedor.contexts == [2, 4]
+    assert len(backend.conversation_history['b']) == 2
+    print("✅ Caché por contexto de sesión")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-q'])
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests para el modo de transpilación por lotes `vader build`
+"""
+
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import vader
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def test_build_directory_in_parallel():
+    """Test que build transpila todos los archivos y replica la estructura"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source_dir = os.path.join(tmp, 'src')
+        for i in range(6):
+            write(os.path.join(source_dir, f'modulo{i}.vdr'), f'x = {i}\nmostrar x\n')
+        write(os.path.join(source_dir, 'sub', 'otro.vdr'), 'mostrar "hola"\n')
+
+        files = vader.discover_vader_files([source_dir])
+        assert len(files) == 7
+        output_dir = os.path.join(tmp, 'out')
+        results = vader.build_files(files, 'python', jobs=2, output_dir=output_dir,
+                                    base_dir=source_dir, use_cache=False)
+        assert all(r['ok'] for r in results), results
+        with open(os.path.join(output_dir, 'sub', 'otro.py'), encoding='utf-8') as f:
+            assert 'print("hola")' in f.read()
+        assert os.path.exists(os.path.join(output_dir, 'modulo5.py'))
+    print("✅ Build paralelo de un directorio")
+
+
+def test_build_isolates_errors():
+    """Test que un archivo con error no detiene el resto del build"""
+    with tempfile.TemporaryDirectory() as tmp:
+        write(os.path.join(tmp, 'bueno.vdr'), 'mostrar 1\n')
+        write(os.path.join(tmp, 'malo.vdr'), 'mostrar 2\n')
+        os.makedirs(os.path.join(tmp, 'malo.py'))  # la salida no se puede escribir
+
+        buffer = io.StringIO()
+        with redirect_stdout(buffer):
+            code = vader.handle_build_command([os.path.join(tmp, '*.vdr'), '--target', 'python',
+                                               '--jobs', '1', '--no-cache'])
+        assert code == 1
+        output = buffer.getvalue()
+        assert 'malo.vdr' in output and '1 correctos, 1 con errores' in output, output
+        assert os.path.exists(os.path.join(tmp, 'bueno.py'))
+    print("✅ Errores aislados por archivo")
+
+
+if __name__ == '__main__':
+    test_build_directory_in_parallel()
+    test_build_isolates_errors()
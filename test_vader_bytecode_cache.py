@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests para la caché de compilación del compilador de bytecode
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_bytecode_compiler import VaderBytecodeCompiler, CompilationTarget
+
+
+def test_bounded_lru_and_metrics():
+    """Test de la LRU acotada, sus contadores y las métricas O(1)"""
+    compiler = VaderBytecodeCompiler(cache_size=2)
+    target = CompilationTarget.PYTHON_BYTECODE
+    first = compiler.compile('x = 1\n', target)
+    compiler.compile('x = 2\n', target)
+    again = compiler.compile('x = 1\n', target)
+    assert again.bytecode == first.bytecode and again is not first
+    compiler.compile('x = 3\n', target)  # expulsa 'x = 2'
+    compiler.compile('x = 2\n', target)
+
+    stats = compiler.compilation_cache.stats()
+    assert stats['entries'] == 2, stats
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 4, 2), stats
+    metrics = compiler.get_compilation_metrics()
+    assert metrics['cache_hits'] == 1 and metrics['cache_evictions'] == 2
+    assert compiler.metrics['compiled'] == 4
+
+    # El nivel de optimización y los pases activos forman parte de la clave
+    compiler.compile('x = 1\n', target, optimization_level=3)
+    assert compiler.compilation_cache.stats()['misses'] == 5
+    print("✅ LRU acotada y contadores")
+
+
+def test_disk_tier_shared_between_processes():
+    """Test del nivel en disco reutilizado por otro proceso (claves estables)"""
+    code = 'total = 0\nfor i in range(10):\n    total = total + i ** 2\n'
+    with tempfile.TemporaryDirectory() as tmp:
+        compiler = VaderBytecodeCompiler(cache_dir=tmp)
+        original = compiler.compile(code, CompilationTarget.PYTHON_BYTECODE)
+        assert original.success
+
+        script = (
+            "import sys; sys.path.insert(0, 'src')\n"
+            "from vader_bytecode_compiler import VaderBytecodeCompiler, CompilationTarget\n"
+            f"c = VaderBytecodeCompiler(cache_dir={tmp!r})\n"
+            f"r = c.compile({code!r}, CompilationTarget.PYTHON_BYTECODE)\n"
+            "s = c.compilation_cache.stats()\n"
+            "print(s['disk_hits'], s['misses'], r.bytecode.hex(), len(r.pass_stats))\n"
+        )
+        env = dict(os.environ, PYTHONHASHSEED='123')
+        env.pop('VADER_NO_CACHE', None)
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), env=env, check=True).stdout
+        disk_hits, misses, bytecode, passes = output.split()
+        assert (disk_hits, misses) == ('1', '0'), output
+        assert bytecode == original.bytecode.hex()
+        assert int(passes) == len(original.pass_stats)
+    print("✅ Nivel en disco compartido")
+
+
+if __name__ == '__main__':
+    test_bounded_lru_and_metrics()
+    test_disk_tier_shared_between_processes()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests para el gestor de pases de optimización del compilador de bytecode
+"""
+
+import ast
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_bytecode_compiler import (
+    VaderBytecodeCompiler, CompilationTarget, OPTIMIZATION_PIPELINES
+)
+
+PROGRAMAS = [
+    '''
+total = 0
+escala = 3
+base = 7
+for i in range(200):
+    total = total + i ** 2 + escala * base + i % 16
+print(total)
+''',
+    '''
+lista = []
+for i in range(4):
+    lista.append(i * 10)
+    for j in range(2):
+        lista.append(i + j)
+else:
+    lista.append('fin')
+print(lista, i)
+''',
+    '''
+a = 4
+b = 5
+x = a * b + 1
+y = a * b + 1
+a = 6
+z = a * b + 1
+print(x, y, z, 1 < 2 < 3, 2 and 0, 0 or '' or 7, 1 if 2 > 1 else 3)
+''',
+    '''
+x = 1
+def cambiar():
+    global x
+    x = 5
+cambiar()
+print(x + 1)
+n = 0
+for i in range(0):
+    n = n * 3
+for i in range(3):
+    if i == 1:
+        continue
+    print(i, n)
+''',
+]
+
+
+def _run(tree):
+    salida = io.StringIO()
+    with redirect_stdout(salida):
+        exec(compile(tree, '<vader>', 'exec'), {})
+    return salida.getvalue()
+
+
+def _same(a, b):
+    # Como comparar ast.dump, pero los campos ausentes (type_comment, kind en 3.8) valen None
+    if isinstance(a, ast.AST):
+        return type(a) is type(b) and all(_same(getattr(a, f, None), getattr(b, f, None)) for f in a._fields)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(map(_same, a, b))
+    return a == b
+
+
+def _contains(tree, fragment):
+    """Indica si el árbol contiene el nodo de `fragment` (ast.unparse no existe en 3.8)"""
+    node = ast.parse(fragment).body[0]
+    expected = node.value if isinstance(node, ast.Expr) else node
+    return any(_same(child, expected) for child in ast.walk(tree))
+
+
+def test_levels_preserve_behaviour():
+    """Test de que todos los niveles producen la misma salida"""
+    compiler = VaderBytecodeCompiler()
+    for programa in PROGRAMAS:
+        outputs = {_run(compiler.optimize_ast(ast.parse(programa), level)) for level in range(4)}
+        assert len(outputs) == 1, (programa, outputs)
+    print("✅ Niveles 0-3 equivalentes")
+
+
+def test_unrolling_substitutes_induction_variable():
+    """Test del desenrollado con sustitución de la variable de inducción"""
+    compiler = VaderBytecodeCompiler()
+    tree = compiler.optimize_ast(ast.parse(PROGRAMAS[1]), 3)
+    assert not any(isinstance(node, ast.For) for node in ast.walk(tree))
+    assert _run(tree) == "[0, 0, 1, 10, 1, 2, 20, 2, 3, 30, 3, 4, 'fin'] 3\n"
+
+    # Con break no se desenrolla
+    tree = compiler.optimize_ast(ast.parse('for i in range(3):\n    if i:\n        break\n'), 3)
+    assert any(isinstance(node, ast.For) for node in ast.walk(tree))
+    print("✅ Desenrollado correcto")
+
+
+def test_arithmetic_passes():
+    """Test de propagación, CSE, LICM y reducción de fuerza"""
+    compiler = VaderBytecodeCompiler()
+    code = ('k = int(valor)\nm = k * 2 + 1\nn = k * 2 + 1\ntotal = 0\n'
+            'for i in range(limite):\n    total = total + i ** 2 + k * 3 + i % 8\n')
+    optimized = compiler.optimize_ast(ast.parse(code), 2)
+    dump = ast.dump(optimized)
+    assert _contains(optimized, 'n = m'), dump
+    assert _contains(optimized, '_vader_licm_0 = k * 3'), dump
+    assert _contains(optimized, 'i * i') and _contains(optimized, 'i & 7'), dump
+
+    folded = compiler.optimize_ast(ast.parse('a = 3\nb = a * 2 > 5 and not a == 4\nprint(b)'), 2)
+    assert _contains(folded, 'print(True)'), ast.dump(folded)
+    print("✅ Pases aritméticos")
+
+
+def test_pass_stats_and_configuration():
+    """Test de estadísticas por pase y pases configurables"""
+    compiler = VaderBytecodeCompiler()
+    result = compiler.compile('x = 2\ny = x * 3\n', CompilationTarget.PYTHON_BYTECODE, optimization_level=3)
+    assert result.success
+    assert [s.name for s in result.pass_stats] == list(OPTIMIZATION_PIPELINES[3])
+    assert all(s.seconds >= 0 for s in result.pass_stats)
+    assert result.pass_stats[0].node_delta < 0
+
+    compiler.optimizations['strength_reduction'] = False
+    manager = compiler.build_pass_manager(2)
+    assert 'strength_reduction' not in [name for name, _ in manager.passes]
+    manager = compiler.build_pass_manager(passes=['constant_folding'])
+    manager.run(ast.parse('x = 1 + 2'))
+    assert 'constant_folding' in manager.report()
+    try:
+        compiler.build_pass_manager(passes=['inexistente'])
+    except ValueError:
+        pass
+    else:
+        assert False, "Se esperaba ValueError"
+    print("✅ Estadísticas por pase")
+
+
+if __name__ == '__main__':
+    test_levels_preserve_behaviour()
+    test_unrolling_substitutes_induction_variable()
+    test_arithmetic_passes()
+    test_pass_stats_and_configuration()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests para el modo contenedor caliente del runtime serverless de Vader
+"""
+
+import importlib.util
+import json
+import os
+
+import pytest
+
+pytest.importorskip('aiohttp')
+pytest.importorskip('boto3')
+
+
+class Boto3Falso:
+    """Cuenta los clientes creados sin tocar AWS"""
+
+    def __init__(self):
+        self.created = 0
+
+    def client(self, name):
+        self.created += 1
+        return object()
+
+    resource = client
+
+
+def _load_cloud(monkeypatch, warm=True):
+    monkeypatch.setenv('VADER_WARM_START', 'true' if warm else 'false')
+    path = os.path.join(os.path.dirname(__file__), 'vader-cloud.py')
+    spec = importlib.util.spec_from_file_location('vader_cloud', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.boto3 = Boto3Falso()
+    return module
+
+
+def test_container_state_reused_between_invocations(monkeypatch):
+    """Test de que la segunda invocación reutiliza clientes, bucle y programa parseado"""
+    cloud = _load_cloud(monkeypatch)
+    programa = 'mostrar "hola"\ncontador = 2 + 3'
+
+    primera = cloud.lambda_handler({'vader_code': programa}, None)
+    loop = cloud._event_loop
+    segunda = cloud.lambda_handler({'vader_code': 'mostrar "otra"'}, None)
+    tercera = cloud.lambda_handler({'vader_code': programa}, None)
+
+    assert [r['headers']['X-Vader-Start'] for r in (primera, segunda, tercera)] == ['cold', 'warm', 'warm']
+    assert 'total;dur=' in tercera['headers']['Server-Timing']
+    assert cloud.boto3.created == 5 and cloud._event_loop is loop and not loop.is_closed()
+
+    # Las variables de una invocación no pasan a la siguiente
+    assert json.loads(primera['body'])['result']['variables'] == {'contador': 5}
+    assert json.loads(segunda['body'])['result']['variables'] == {}
+
+    stats = cloud.container_stats()
+    assert stats['invocations'] == 3 and stats['cold_starts'] == 1 and stats['warm_p50_ms'] is not None
+    assert stats['program_cache']['hits'] == 1
+    print("✅ Contenedor caliente")
+
+
+def test_http_session_pooled_per_loop(monkeypatch):
+    """Test de la sesión HTTP compartida mientras no cambie el bucle"""
+    cloud = _load_cloud(monkeypatch)
+    runtime, cold = cloud.get_runtime('aws')
+    assert cold and cloud.get_runtime('aws') == (runtime, False)
+
+    loop = cloud._get_event_loop()
+    primera = loop.run_until_complete(runtime.get_http_session())
+    assert loop.run_until_complete(runtime.get_http_session()) is primera
+    loop.run_until_complete(runtime.close())
+    assert primera.closed
+    print("✅ Sesión HTTP reutilizada")
+
+
+def test_warm_start_can_be_disabled(monkeypatch):
+    """Test de VADER_WARM_START=false: cada invocación arranca en frío, como antes"""
+    cloud = _load_cloud(monkeypatch, warm=False)
+    for _ in range(2):
+        resultado = cloud.lambda_handler({'vader_code': 'mostrar "hola"'}, None)
+        assert resultado['headers']['X-Vader-Start'] == 'cold'
+    assert cloud.boto3.created == 10 and cloud._event_loop.is_closed()
+    print("✅ Modo frío")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-q'])
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests para transacciones, inserciones masivas y lotes automáticos del ORM
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_database_system import VaderORM, DatabaseConnection, DatabaseType
+
+
+def _orm(path=':memory:'):
+    orm = VaderORM(DatabaseConnection(DatabaseType.SQLITE, path))
+    orm.connect()
+    orm.execute_vader_query("crear tabla usuarios (id entero clave_primaria, nombre texto, edad entero)")
+    return orm
+
+
+def test_transaction_commits_once_and_rolls_back():
+    """Test de la transacción: un commit al final, rollback y SAVEPOINT anidado"""
+    with tempfile.TemporaryDirectory() as tmp:
+        orm = _orm(os.path.join(tmp, 'datos.db'))
+        commits = orm.write_stats['commits']
+        with orm.transaccion():
+            for i in range(50):
+                orm.execute_vader_query(f"insertar en usuarios (nombre, edad) valores ('u{i}', {i})")
+            orm.execute_vader_query("actualizar usuarios establecer edad = 99 donde nombre = 'u1'")
+        assert orm.write_stats['commits'] == commits + 1
+        assert len(orm.execute_vader_query("seleccionar * de usuarios")) == 50
+
+        try:
+            with orm.transaccion():
+                orm.execute_vader_query("eliminar de usuarios")
+                raise RuntimeError("fallo")
+        except RuntimeError:
+            pass
+        assert len(orm.execute_vader_query("seleccionar * de usuarios")) == 50
+
+        with orm.transaccion():
+            orm.execute_vader_query("insertar en usuarios (nombre, edad) valores ('externo', 1)")
+            try:
+                with orm.transaccion():
+                    orm.execute_vader_query("insertar en usuarios (nombre, edad) valores ('interno', 2)")
+                    raise ValueError
+            except ValueError:
+                pass
+        nombres = {fila['nombre'] for fila in orm.execute_vader_query("seleccionar nombre de usuarios")}
+        assert 'externo' in nombres and 'interno' not in nombres
+        orm.disconnect()
+
+        # Lo confirmado está en disco para otra conexión
+        assert len(_orm(os.path.join(tmp, 'datos.db')).execute_vader_query("seleccionar * de usuarios")) == 51
+    print("✅ Transacciones")
+
+
+def test_insert_many():
+    """Test de `insertar muchos` con executemany"""
+    orm = _orm()
+    count = orm.execute_vader_query(
+        "insertar muchos en usuarios (nombre, edad) valores ('Ana, María', 30), ('Luis', 25)")
+    assert count == 2
+    filas = [(f'n{i}', 100 + i) for i in range(1000)]
+    assert orm.execute_vader_query("insertar muchos en usuarios (nombre, edad)", filas) == 1000
+    assert orm.write_stats['batches'] == 2
+    resultado = orm.execute_vader_query("seleccionar nombre de usuarios donde edad = 30")
+    assert resultado == [{'nombre': 'Ana, María'}]
+    print("✅ Inserción masiva")
+
+
+def test_auto_batch_flushes_by_size_and_before_reads():
+    """Test de los lotes automáticos: volcado por tamaño, por tiempo y antes de leer"""
+    orm = _orm()
+    with orm.auto_batch(size=10, interval=60):
+        for i in range(25):
+            assert orm.execute_vader_query(f"insertar en usuarios (nombre, edad) valores ('u{i}', {i})") is None
+        assert orm.write_stats['batches'] == 2 and len(orm._pending_writes) == 5
+        assert len(orm.execute_vader_query("seleccionar * de usuarios")) == 25
+        orm.execute_vader_query("eliminar de usuarios donde nombre = 'u0'")
+    assert not orm._pending_writes
+    assert len(orm.execute_vader_query("seleccionar * de usuarios")) == 24
+
+    with orm.auto_batch(size=1000, interval=0):
+        orm.execute_vader_query("insertar en usuarios (nombre, edad) valores ('x', 1)")
+        assert not orm._pending_writes
+    print("✅ Lotes automáticos")
+
+
+if __name__ == '__main__':
+    test_transaction_commits_once_and_rolls_back()
+    test_insert_many()
+    test_auto_batch_flushes_by_size_and_before_reads()
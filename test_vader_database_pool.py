@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests para el pool de conexiones del sistema de bases de datos
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_database_system import VaderDatabasePool, DatabaseType, PoolTimeoutError
+
+
+def _pool(tmp, **opciones):
+    pool = VaderDatabasePool(DatabaseType.SQLITE, os.path.join(tmp, 'datos.db'), **opciones)
+    with pool.conexion() as orm:
+        orm.execute_vader_query("crear tabla cuentas (id entero clave_primaria, saldo entero)")
+    return pool
+
+
+def test_threads_share_bounded_pool():
+    """Test de muchos hilos sobre un pool acotado: sin superar el máximo y con métricas"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _pool(tmp, max_connections=4)
+        pico, errores = [0], []
+
+        def trabajador(n):
+            try:
+                for _ in range(20):
+                    with pool.conexion() as orm:
+                        pico[0] = max(pico[0], pool.in_use)
+                        orm.execute_vader_query(f"insertar en cuentas (saldo) valores ({n})")
+            except Exception as e:
+                errores.append(e)
+
+        hilos = [threading.Thread(target=trabajador, args=(n,)) for n in range(12)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert not errores, errores
+        metricas = pool.metrics()
+        assert pico[0] <= 4 and metricas['total'] <= 4 and metricas['in_use'] == 0
+        assert metricas['checkouts'] == 12 * 20 + 1 and metricas['avg_wait'] >= 0
+        with pool.conexion() as orm:
+            assert len(orm.execute_vader_query("seleccionar * de cuentas")) == 240
+        pool.close()
+    print("✅ Pool compartido entre hilos")
+
+
+def test_timeout_rollback_and_stale_connections():
+    """Test de la espera acotada, el rollback al devolver y el pre-ping"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _pool(tmp, max_connections=1, min_connections=1)
+        orm = pool.get_connection()
+        inicio = time.monotonic()
+        try:
+            pool.get_connection(timeout=0.2)
+        except PoolTimeoutError as e:
+            assert 'en uso' in str(e)
+        else:
+            assert False, "Se esperaba PoolTimeoutError"
+        assert 0.15 < time.monotonic() - inicio < 5 and pool.metrics()['timeouts'] == 1
+
+        # Transacción sin confirmar: se deshace al devolver la conexión
+        orm.connection.connection.execute("INSERT INTO cuentas (saldo) VALUES (1)")
+        pool.return_connection(orm)
+        with pool.conexion() as orm:
+            assert orm.execute_vader_query("seleccionar * de cuentas") == []
+        orm.connection.connection.close()  # conexión caída mientras estaba libre
+        with pool.conexion() as nueva:
+            assert nueva is not orm and nueva.execute_vader_query("seleccionar * de cuentas") == []
+        assert pool.metrics()['rollbacks'] == 1 and pool.metrics()['stale'] == 1
+        pool.close()
+    print("✅ Timeout, rollback y pre-ping")
+
+
+def test_idle_reaping_lifetime_and_thread_affinity():
+    """Test del cierre por inactividad, el reciclado por edad y la afinidad por hilo en SQLite"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = _pool(tmp, max_connections=4, min_connections=1, max_idle=0.05)
+        conexiones = [pool.get_connection() for _ in range(3)]
+        for orm in conexiones:
+            pool.return_connection(orm)
+        time.sleep(0.1)
+        assert pool.reap_idle() == 2 and pool.metrics()['total'] == 1
+
+        pool.max_idle = 60
+        primera, segunda = pool.get_connection(), pool.get_connection()
+        pool.return_connection(primera)
+        pool.return_connection(segunda)
+        usadas, turno_principal, turno_hilo = [], threading.Event(), threading.Event()
+
+        def otro_hilo():
+            for _ in range(2):
+                with pool.conexion() as orm:
+                    usadas.append(orm)
+                turno_principal.set()
+                turno_hilo.wait()
+
+        hilo = threading.Thread(target=otro_hilo)
+        hilo.start()
+        turno_principal.wait()
+        # La más reciente es ahora la del otro hilo, pero este hilo recupera la suya
+        with pool.conexion() as orm:
+            assert orm is primera
+        turno_hilo.set()
+        hilo.join()
+        assert usadas == [segunda, segunda]
+
+        pool.max_lifetime = 0
+        nueva = pool.get_connection()
+        assert nueva not in (primera, segunda) and pool.metrics()['recycled'] == 1
+        pool.return_connection(nueva)
+        pool.close()
+    print("✅ Inactividad, edad máxima y afinidad")
+
+
+if __name__ == '__main__':
+    test_threads_share_bounded_pool()
+    test_timeout_rollback_and_stale_connections()
+    test_idle_reaping_lifetime_and_thread_affinity()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests para la caché de consultas parseadas del ORM
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_database_system import VaderORM, DatabaseConnection, DatabaseType
+
+
+def _orm():
+    orm = VaderORM(DatabaseConnection(DatabaseType.SQLITE, ':memory:'))
+    orm.connect()
+    orm.execute_vader_query("crear tabla usuarios (id entero clave_primaria, nombre texto, edad entero)")
+    return orm
+
+
+def test_literals_lifted_into_one_template():
+    """Test de que consultas con distintos literales comparten plantilla y SQL"""
+    orm = _orm()
+    for i, nombre in enumerate(["Ana", "Luis, hijo", "Eva"]):
+        orm.execute_vader_query(f"insertar en usuarios (nombre, edad) valores ('{nombre}', {20 + i})")
+    assert orm.query_cache_info()['entries'] == 1
+
+    prepared, literals = orm.prepare_vader_query("seleccionar nombre de usuarios donde edad < 22 ordenar por edad")
+    assert prepared.sql == "SELECT nombre FROM usuarios WHERE edad < ? ORDER BY edad" and literals == [22]
+
+    # Las mayúsculas y las comas dentro de las cadenas se conservan
+    assert orm.execute_vader_query("seleccionar nombre de usuarios donde edad < 22 ordenar por edad") == [
+        {'nombre': 'Ana'}, {'nombre': 'Luis, hijo'}]
+    assert orm.execute_vader_query("seleccionar edad de usuarios donde nombre = 'Luis, hijo'") == [{'edad': 21}]
+    orm.execute_vader_query("actualizar usuarios establecer edad = 30 donde nombre = 'Ana'")
+    assert orm.execute_vader_query("seleccionar edad de usuarios donde nombre = 'Ana'") == [{'edad': 30}]
+
+    info = orm.query_cache_info()
+    assert info['hits'] >= 3 and info['uncacheable'] == 1  # el `crear tabla`
+    print("✅ Plantillas con literales como parámetros")
+
+
+def test_limits_and_identifiers_stay_in_template():
+    """Test de que LIMIT, columnas y DDL no se parametrizan"""
+    orm = _orm()
+    first, _ = orm.prepare_vader_query("seleccionar * de usuarios limitar 2")
+    second, _ = orm.prepare_vader_query("seleccionar * de usuarios limitar 3")
+    assert first is not second and second.sql.endswith("LIMIT 3")
+    constant, literals = orm.prepare_vader_query("seleccionar 1, nombre de usuarios")
+    assert constant.sql == "SELECT 1, nombre FROM usuarios" and literals == []
+    assert orm.prepare_vader_query("crear tabla x (a entero)")[0] is None
+
+    orm.query_cache_size = 2
+    for limite in range(5):
+        orm.prepare_vader_query(f"seleccionar * de usuarios limitar {limite + 1}")
+    assert len(orm.query_cache) == 2
+    print("✅ Identificadores y caché acotada")
+
+
+if __name__ == '__main__':
+    test_literals_lifted_into_one_template()
+    test_limits_and_identifiers_stay_in_template()
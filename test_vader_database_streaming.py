@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests para el recorrido por lotes de consultas SELECT grandes
+"""
+
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from vader_database_system import conectar
+from transpilers.python import transpile_to_python
+
+
+def _orm(filas=5000):
+    orm = conectar('sqlite', ':memory:')
+    orm.execute_vader_query("crear tabla medidas (id entero clave_primaria, sensor texto, valor decimal)")
+    orm.insert_many('medidas', ['sensor', 'valor'], ((f's{i % 7}', i * 0.5) for i in range(filas)))
+    return orm
+
+
+def test_stream_matches_select_in_every_format():
+    """Test de que el recorrido por lotes devuelve lo mismo que el SELECT completo"""
+    orm = _orm()
+    consulta = "seleccionar id, sensor, valor de medidas donde sensor = 's3' ordenar por id"
+    completo = orm.execute_vader_query(consulta)
+    assert list(orm.stream_vader_query(consulta, batch_size=64)) == completo
+
+    tuplas = list(orm.stream_vader_query(consulta, row_format='tuple'))
+    assert tuplas == [(f['id'], f['sensor'], f['valor']) for f in completo]
+    primera = next(orm.stream_vader_query(consulta, row_format='namedtuple'))
+    assert (primera.id, primera.sensor) == (completo[0]['id'], 's3')
+
+    with pytest.raises(ValueError):
+        orm.stream_vader_query("eliminar de medidas")
+    with pytest.raises(ValueError):
+        orm.stream_vader_query(consulta, row_format='lista')
+    print("✅ Recorrido equivalente al SELECT")
+
+
+def test_stream_memory_is_bounded():
+    """Test de que la memoria del recorrido no crece con el tamaño del resultado"""
+    orm = _orm(30000)
+    consulta = "seleccionar * de medidas"
+
+    def pico(funcion):
+        tracemalloc.start()
+        funcion()
+        maximo = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return maximo
+
+    completo = pico(lambda: sum(fila['valor'] for fila in orm.execute_vader_query(consulta)))
+    por_lotes = pico(lambda: sum(fila[2] for fila in orm.stream_vader_query(consulta, 500, 'tuple')))
+    assert por_lotes * 10 < completo, (por_lotes, completo)
+    print("✅ Memoria acotada")
+
+
+def test_para_cada_fila_en_seleccionar(tmp_path):
+    """Test de la sintaxis `para cada fila en seleccionar ...` en el backend Python"""
+    ruta = str(tmp_path / 'medidas.db')
+    orm = conectar('sqlite', ruta)
+    orm.execute_vader_query("crear tabla medidas (id entero clave_primaria, sensor texto, valor decimal)")
+    orm.insert_many('medidas', ['sensor', 'valor'], ((f's{i % 7}', i * 0.5) for i in range(700)))
+    orm.disconnect()
+
+    codigo = transpile_to_python(
+        f'conectar base_datos "{ruta}"\n'
+        "total = 0\n"
+        "para cada fila en seleccionar valor de medidas donde sensor = 's1'\n"
+        "    total = total + fila['valor']\n"
+        "fin\n")
+    assert "vader_db.stream_vader_query(" in codigo
+    espacio = {}
+    exec(codigo, espacio)
+    assert espacio['total'] == sum(i * 0.5 for i in range(700) if i % 7 == 1)
+
+    # Sin 'conectar base_datos' el programa usa la base en memoria por defecto
+    codigo = transpile_to_python("para cada fila en seleccionar * de medidas\n    mostrar fila\nfin\n")
+    assert "vader_db = conectar()" in codigo
+    compile(codigo, '<vader>', 'exec')
+    print("✅ para cada fila en seleccionar")
+
+if __name__ == '__main__':
+    test_stream_matches_select_in_every_format()
+    test_stream_memory_is_bounded()
+    import tempfile
+    from pathlib import Path
+    with tempfile.TemporaryDirectory() as directorio:
+        test_para_cada_fila_en_seleccionar(Path(directorio))
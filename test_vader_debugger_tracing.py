@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests para el trazado del debugger: breakpoints indexados, watchpoints por
+ámbito y backends sys.monitoring / sys.settrace
+"""
+
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_debugging_system import MONITORING_AVAILABLE, StepMode, VaderDebugger
+
+BACKENDS = ['settrace', pytest.param('monitoring', marks=pytest.mark.skipif(
+    not MONITORING_AVAILABLE, reason='sys.monitoring requiere Python 3.12+'))]
+
+
+def acumular(n):
+    total = 0
+    for i in range(n):
+        total += i
+    return total
+
+
+def otra_funcion():
+    total = 0
+    for i in range(10):
+        total -= i
+    return total
+
+
+LINEA_INICIO = acumular.__code__.co_firstlineno + 1
+LINEA_SUMA = acumular.__code__.co_firstlineno + 3
+
+# Código de otro "archivo", sin breakpoints
+_otro_modulo = {}
+exec(compile('def sin_breakpoints(n):\n'
+             '    x = 0\n'
+             '    for i in range(n):\n'
+             '        x += i\n'
+             '    return x\n', '<otro_modulo>', 'exec'), _otro_modulo)
+sin_breakpoints = _otro_modulo['sin_breakpoints']
+
+
+@pytest.fixture
+def crear_debugger(monkeypatch):
+    # Sin el vader_debug.log que el debugger crea en el directorio actual
+    monkeypatch.setattr(VaderDebugger, '_setup_logging',
+                        lambda self: logging.getLogger('vader_debugger_test'))
+    creados = []
+
+    def crear(backend):
+        debugger = VaderDebugger(backend)
+        debugger._enter_interactive_mode = lambda: None
+        creados.append(debugger)
+        return debugger
+
+    yield crear
+    for debugger in creados:
+        if debugger.is_debugging:
+            debugger.stop_debug_session()
+
+
+def _contar_lineas(debugger):
+    lineas = {}
+    original = debugger._on_line
+
+    def on_line(frame):
+        archivo = frame.f_code.co_filename
+        lineas[archivo] = lineas.get(archivo, 0) + 1
+        original(frame)
+
+    debugger._on_line = on_line
+    return lineas
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_line_breakpoints_only_trace_their_file(crear_debugger, backend):
+    """Test de breakpoints por (archivo, línea): el resto del código no recibe eventos de línea"""
+    debugger = crear_debugger(backend)
+    vistos = []
+    debugger._show_breakpoint_info = lambda frame, bp: vistos.append(frame)
+    lineas = _contar_lineas(debugger)
+
+    debugger.start_debug_session('lineas')
+    bp = debugger.add_breakpoint(__file__, LINEA_SUMA, condition='i == 7')
+    assert debugger.backend == backend
+    resultado = acumular(20)
+    sin_breakpoints(1000)
+    debugger.stop_debug_session()
+
+    assert resultado == sum(range(20))
+    assert debugger.current_session.breakpoints[bp].hit_count == 1
+    assert [(f.line_number, f.local_variables['total']) for f in vistos] == [(LINEA_SUMA, sum(range(7)))]
+    assert lineas.get(__file__, 0) > 0 and '<otro_modulo>' not in lineas
+    print(f"✅ Breakpoints indexados ({backend})")
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_watchpoints_scoped_and_function_breakpoints(crear_debugger, backend):
+    """Test de watchpoints evaluados sólo en su ámbito y de breakpoints de función por llamada"""
+    debugger = crear_debugger(backend)
+    debugger._show_watchpoint_info = lambda frame, name, value: None
+    debugger._show_breakpoint_info = lambda frame, bp: None
+
+    session = debugger.start_debug_session('watch')
+    wp = debugger.add_watchpoint('total', scope='acumular')
+    fbp = debugger.add_function_breakpoint('acumular')
+    assert debugger._code_plan(otra_funcion.__code__) is None
+    assert debugger._code_plan(sin_breakpoints.__code__) is None
+
+    acumular(5)
+    hits = session.watchpoints[wp]['hit_count']
+    otra_funcion()
+    acumular(3)
+    debugger.stop_debug_session()
+
+    assert hits > 0 and session.watchpoints[wp]['last_value'] == sum(range(3))
+    assert session.breakpoints[fbp].hit_count == 2
+    print(f"✅ Watchpoints por ámbito ({backend})")
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_step_into_after_breakpoint(crear_debugger, backend):
+    """Test del paso a paso: tras el breakpoint se para en la línea siguiente"""
+    debugger = crear_debugger(backend)
+    debugger._show_breakpoint_info = lambda frame, bp: None
+    pasos = []
+    debugger._show_step_info = lambda frame: pasos.append(frame.line_number)
+    acciones = [StepMode.STEP_INTO, StepMode.CONTINUE]
+    debugger._enter_interactive_mode = lambda: debugger.set_step_mode(acciones.pop(0))
+
+    debugger.start_debug_session('pasos')
+    debugger.add_breakpoint(__file__, LINEA_INICIO, temporary=True)
+    acumular(3)
+    acumular(3)
+    debugger.stop_debug_session()
+
+    assert pasos == [LINEA_INICIO + 1] and not acciones
+    assert not debugger.current_session.breakpoints
+    print(f"✅ Paso a paso ({backend})")
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-q'])
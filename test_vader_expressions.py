@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests para el evaluador de expresiones compartido (intérprete, cloud e IoT)
+"""
+
+import io
+import os
+import sys
+from contextlib import redirect_stdout
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_expressions import VaderExpressionError, cache_info, evaluate
+from vader_interpreter import VaderNativeRuntime
+
+
+def test_variables_resolved_without_text_substitution():
+    """Test de que los nombres con prefijo común no se corrompen"""
+    variables = {'total': 2, 'total_final': 40, 'nombre': 'Ana'}
+    assert evaluate('total_final - total', variables) == 38
+    assert evaluate('"Hola " + nombre + ", tienes " + total', variables) == 'Hola Ana, tienes 2'
+    assert evaluate('max(total, 3) ** 2 if verdadero else nulo', variables) == 9
+    assert evaluate('[total, total_final][1] // 3', variables) == 13
+    assert evaluate('lista[0] + lista[-1]', {'lista': [1, 2, 3]}) == 4
+    assert evaluate('lista[1:] + lista[:1]', {'lista': [1, 2, 3]}) == [2, 3, 1]
+    assert evaluate('nombre[::-1]', variables) == 'anA'
+
+    with pytest.raises(NameError):
+        evaluate('desconocida + 1', variables)
+    assert evaluate('hola mundo', variables, default='texto') == 'texto'
+
+    antes = cache_info().hits
+    for _ in range(10):
+        evaluate('total_final - total', variables)
+    assert cache_info().hits - antes == 10
+    print("✅ Variables desde el entorno")
+
+
+@pytest.mark.parametrize('expresion', [
+    '().__class__.__bases__',
+    '__import__("os").system("true")',
+    'open("/etc/passwd")',
+    '(lambda: 1)()',
+    '[x for x in "abc"]',
+    '_vader_add',
+    '9 ** 99999999',
+    '(9 ** 1000) ** 1000',
+    '((9 ** 1000) ** 1000) ** 100',
+    '(9 ** 1000) ** 20 * (9 ** 1000) ** 20',
+    '"a" * 10 ** 9',
+    '"%0999999999d" % 1',
+])
+def test_unsafe_expressions_rejected(expresion):
+    """Test de que atributos, builtins y operaciones desmedidas no se permiten"""
+    with pytest.raises(VaderExpressionError):
+        evaluate(expresion, {})
+
+
+def test_interpreter_uses_shared_evaluator():
+    """Test del intérprete: expresiones completas, y texto para nombres sin definir"""
+    programa = '\n'.join([
+        'a = 2',
+        'b = 3',
+        'c = a + b * 4 - 1',
+        'mostrar c',
+        'nombre = "Ana"',
+        'mostrar "Hola " + nombre + "!"',
+        'mostrar Bienvenido',
+        'mostrar "Sin " + definir',
+    ])
+    for compilado in (True, False):
+        runtime = VaderNativeRuntime()
+        runtime.compiled_mode = compilado
+        with redirect_stdout(io.StringIO()):
+            assert runtime.execute_code(programa)
+        assert runtime.output_buffer == ['13', 'Hola Ana!', 'Bienvenido', 'Sin definir'], compilado
+    print("✅ Intérprete con el evaluador compartido")
+
+
+if __name__ == '__main__':
+    test_variables_resolved_without_text_substitution()
+    test_interpreter_uses_shared_evaluator()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests para el intérprete nativo de Vader en modo compilado
+"""
+
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_interpreter import VaderNativeRuntime, VaderProgramCompiler
+
+PROGRAMA = '''nombre = "Ana"
+funcion saludar
+    mostrar "Hola " + nombre
+fin funcion
+repetir 2 veces
+    saludar
+fin repetir
+x = 7
+si x es igual a 0
+    mostrar "cero"
+sino si x es mayor que 5
+    mostrar "grande"
+    mostrar "muy grande"
+sino
+    mostrar "pequeño"
+fin si
+'''
+
+
+def run(code, compiled=True):
+    runtime = VaderNativeRuntime()
+    runtime.compiled_mode = compiled
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        ok = runtime.execute_code(code)
+    return runtime, ok, buffer.getvalue().splitlines()
+
+
+def test_compiled_program_output():
+    """Test de la ejecución compilada completa"""
+    runtime, ok, output = run(PROGRAMA)
+    assert ok
+    assert output == ['Hola Ana', 'Hola Ana', 'grande', 'muy grande'], output
+    assert 'saludar' in runtime.functions
+    print("✅ Programa compilado ejecutado correctamente")
+
+
+def test_expression_semantics_match_legacy():
+    """Test que las expresiones se evalúan igual que en el modo heredado"""
+    code = 'a = 2\nb = a * 3\nc = "n: " + b\nd = desconocido\nmostrar c\n'
+    compiled, _, out_compiled = run(code, compiled=True)
+    legacy, _, out_legacy = run(code, compiled=False)
+    assert compiled.variables == legacy.variables, (compiled.variables, legacy.variables)
+    assert out_compiled == out_legacy == ['n: 6']
+    print("✅ Semántica de expresiones equivalente")
+
+
+def test_loop_body_compiled_once():
+    """Test que el cuerpo del bucle no se re-tokeniza en cada iteración"""
+    code = 'contador = 0\nrepetir 20000 veces\n    contador = contador + 1\nfin repetir\n'
+    compiler = VaderProgramCompiler()
+    calls = []
+    original = compiler.compile_expression
+
+    def counting(expr):
+        calls.append(expr)
+        return original(expr)
+
+    compiler.compile_expression = counting
+    program = compiler.compile(code)
+    assert len(calls) < 10, calls
+
+    runtime = VaderNativeRuntime()
+    runtime.run_compiled(program)
+    assert runtime.variables['contador'] == 20000
+
+    start = time.perf_counter()
+    run(code, compiled=True)
+    compiled_time = time.perf_counter() - start
+    start = time.perf_counter()
+    run(code, compiled=False)
+    legacy_time = time.perf_counter() - start
+    print(f"⏱️  compilado: {compiled_time:.4f}s, línea a línea: {legacy_time:.4f}s")
+    assert compiled_time < legacy_time
+    print("✅ Bucle compilado una sola vez")
+
+
+def test_runtime_error_reports_line():
+    """Test que los errores indican la línea original"""
+    runtime = VaderNativeRuntime()
+    errors = io.StringIO()
+    sys_stderr = sys.stderr
+    sys.stderr = errors
+    try:
+        ok = runtime.execute_code('a = 1\nb = "x"\nc = a - b\n')
+    finally:
+        sys.stderr = sys_stderr
+    assert not ok
+    assert 'línea 3' in errors.getvalue(), errors.getvalue()
+    print("✅ Errores con número de línea")
+
+
+if __name__ == '__main__':
+    test_compiled_program_output()
+    test_expression_semantics_match_legacy()
+    test_loop_body_compiled_once()
+    test_runtime_error_reports_line()
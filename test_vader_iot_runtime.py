@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests para el bucle asyncio del runtime IoT: muestreo periódico, lotes MQTT y comandos desde paho
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import threading
+import zlib
+
+import pytest
+
+pytest.importorskip('paho.mqtt.client')
+pytest.importorskip('serial')
+pytest.importorskip('requests')
+
+
+def _load_runtime():
+    path = os.path.join(os.path.dirname(__file__), 'vader-iot.py')
+    spec = importlib.util.spec_from_file_location('vader_iot', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class BrokerFalso:
+    """Cliente MQTT que solo guarda lo publicado"""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, payload):
+        self.published.append((topic, payload))
+
+    def loop_stop(self):
+        pass
+
+    def disconnect(self):
+        pass
+
+
+def _runtime(**config):
+    runtime = _load_runtime().VaderIoTRuntime("vader-test")
+    runtime.mqtt_client = BrokerFalso()
+    runtime.iot_config.update(config)
+    return runtime
+
+
+def _readings(runtime):
+    readings = []
+    for topic, payload in runtime.mqtt_client.published:
+        if topic.endswith('/zlib'):
+            payload = zlib.decompress(payload)
+        readings.extend(json.loads(payload)['readings'])
+    return readings
+
+
+def test_sensors_polled_concurrently_and_batched():
+    """Test de 30 sensores muestreados por el bucle y publicados en pocos mensajes"""
+    runtime = _runtime(mqtt_batch_interval=0.1, mqtt_compress_min_bytes=10 ** 6)
+
+    async def escenario():
+        await runtime.start()
+        codigo = '\n'.join(f'configurar sensor "s{i}" pin={i} tipo="luz" cada=0.05' for i in range(30))
+        await runtime.execute_code(codigo)
+        await asyncio.sleep(0.52)
+        runtime.cleanup()
+
+    asyncio.run(escenario())
+    stats = runtime.iot_stats
+    assert stats['missed_samples'] == 0
+    assert 30 * 9 <= stats['samples'] <= 30 * 12
+    readings = _readings(runtime)
+    assert len(readings) == stats['samples'] == stats['published_readings']
+    assert stats['published_messages'] <= 8
+    assert {r['sensor'] for r in readings} == {f's{i}' for i in range(30)}
+    print("✅ Muestreo periódico por lotes")
+
+
+def test_large_batches_are_compressed():
+    """Test de la compresión de lotes grandes y del volcado por tamaño"""
+    runtime = _runtime(mqtt_batch_interval=60, mqtt_batch_size=50, mqtt_compress_min_bytes=256)
+
+    async def escenario():
+        for i in range(120):
+            await runtime.execute_line(f'leer sensor "s{i % 3}" pin=1 tipo="temperatura"')
+        await asyncio.sleep(0.01)
+        assert runtime.iot_stats['published_readings'] == 100
+        runtime.cleanup()
+
+    asyncio.run(escenario())
+    assert all(topic.endswith('/sensors/batch/zlib') for topic, _ in runtime.mqtt_client.published)
+    assert len(_readings(runtime)) == 120
+    print("✅ Lotes comprimidos")
+
+
+def test_mqtt_commands_handed_to_loop_thread_safely():
+    """Test de los comandos MQTT recibidos en otro hilo: se ejecutan en el bucle del runtime"""
+    runtime = _runtime()
+
+    class Mensaje:
+        payload = b'contador = 41 + 1'
+
+    async def escenario():
+        await runtime.start()
+        hilo = threading.Thread(target=runtime.on_mqtt_message, args=(None, None, Mensaje()))
+        hilo.start()
+        hilo.join()
+        for _ in range(100):
+            if 'contador' in runtime.variables:
+                break
+            await asyncio.sleep(0.01)
+        runtime.cleanup()
+
+    asyncio.run(escenario())
+    assert runtime.variables['contador'] == 42
+    print("✅ Comandos MQTT desde el hilo de paho")
+
+
+if __name__ == '__main__':
+    test_sensors_polled_concurrently_and_batched()
+    test_large_batches_are_compressed()
+    test_mqtt_commands_handed_to_loop_thread_safely()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests para la ruta nativa: funciones Vader -> C -> .so cargada con ctypes
+"""
+
+import ast
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_native import (
+    NativeLoweringError, compile_native_module, execute_vader, lower_function
+)
+
+pytestmark = pytest.mark.skipif(shutil.which(os.environ.get('CC', 'cc')) is None,
+                                reason="sin compilador C")
+
+KERNELS = '''funcion suma_cuadrados con n
+    total = 0
+    para cada i en range(n)
+        si i % 3 == 0 entonces
+            total = total + i * i
+        sino
+            total = total - i // 2
+        fin si
+    fin
+    devolver total
+fin funcion
+
+funcion collatz con n
+    pasos = 0
+    mientras n != 1
+        si n % 2 == 0 entonces
+            n = n // 2
+        sino
+            n = 3 * n + 1
+        fin si
+        pasos = pasos + 1
+    fin mientras
+    devolver pasos
+fin funcion
+
+funcion aritmetica con a, b
+    devolver a // b + a % b + a / b - a ** 2 + max(a, b) + abs(a)
+fin funcion
+
+funcion saludar con nombre
+    mostrar "Hola " + nombre
+    devolver 1
+fin funcion
+'''
+
+
+def test_kernels_match_python():
+    """Test de que las funciones nativas devuelven lo mismo que Python"""
+    with tempfile.TemporaryDirectory() as tmp:
+        namespace = execute_vader(KERNELS, cache_dir=tmp)
+        suma, collatz = namespace['suma_cuadrados'], namespace['collatz']
+        assert suma(10000) == suma.python_function(10000)
+        assert [collatz(n) for n in range(1, 50)] == [collatz.python_function(n) for n in range(1, 50)]
+        assert suma.native_calls == 1 and suma.fallback_calls == 0
+
+        # División entera, módulo y potencia con negativos y floats, como en Python
+        aritmetica = namespace['aritmetica']
+        for a in (-7, 7, -7.5, 2.25, 0):
+            for b in (3, -3, 0.5, -2.5):
+                native, expected = aritmetica(a, b), aritmetica.python_function(a, b)
+                assert native == expected and type(native) is type(expected), (a, b)
+        # max() con int y float no tiene un tipo fijo: esas firmas se quedan en Python
+        assert aritmetica.native_calls == 10 and 'id' in aritmetica.reasons
+    print("✅ Funciones nativas equivalentes a Python")
+
+
+def test_fallback_to_python():
+    """Test de la vuelta a Python: desbordamiento, errores y código no expresable en C"""
+    with tempfile.TemporaryDirectory() as tmp:
+        namespace = execute_vader(KERNELS, cache_dir=tmp)
+        aritmetica = namespace['aritmetica']
+        assert aritmetica(3 ** 30, 1) == aritmetica.python_function(3 ** 30, 1)  # a ** 2 desborda int64
+        assert aritmetica(2 ** 70, 1) == aritmetica.python_function(2 ** 70, 1)  # fuera de int64
+        with pytest.raises(ZeroDivisionError):
+            aritmetica(1, 0)
+        assert aritmetica.fallback_calls == 3 and aritmetica.native_calls == 0
+        assert aritmetica(5, 2) == aritmetica.python_function(5, 2) and aritmetica.native_calls == 1
+        assert namespace['suma_cuadrados'](True) == 0  # bool no es int exacto: ruta Python
+
+        # `mostrar` no se puede bajar: la función sigue siendo Python
+        assert 'saludar' in namespace and not hasattr(namespace['saludar'], 'native_calls')
+
+    function = ast.parse('def f(a):\n    if a:\n        b = 1\n    return b\n').body[0]
+    with pytest.raises(NativeLoweringError):
+        lower_function(function, 'i')
+    print("✅ Vuelta a Python")
+
+
+def test_library_cache_and_compiler_targets():
+    """Test de la caché de .so por hash y de los objetivos de compilación nativos"""
+    from vader_compiler_system import VaderCompilerSystem, CompilationTarget
+    from vader_bytecode_compiler import VaderBytecodeCompiler, CompilationTarget as BytecodeTarget
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first = compile_native_module(KERNELS, cache_dir=tmp)
+        second = compile_native_module(KERNELS, cache_dir=tmp)
+        assert first.library == second.library and len(os.listdir(tmp)) == 1
+        assert set(first.functions) == {'suma_cuadrados', 'collatz', 'aritmetica'}
+        assert 'saludar' in first.fallbacks
+
+        source = os.path.join(tmp, 'kernels.vdr')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(KERNELS)
+        result = VaderCompilerSystem().compile_file(source, CompilationTarget.NATIVE_CODE)
+        assert result.success and not result.errors, result.errors
+        assert result.output_file.endswith('.so') and result.file_size > 0
+        assert result.metadata['native_functions']['collatz'] == ['i', 'd']
+
+    c_code = VaderBytecodeCompiler().compile('def doble(x):\n    return x * 2\n', BytecodeTarget.C_NATIVE).compiled_code
+    assert 'vader_v_doble_i' in c_code and 'vi_mul' in c_code
+    print("✅ Caché de bibliotecas y objetivos nativos")
+
+
+if __name__ == '__main__':
+    test_kernels_match_python()
+    test_fallback_to_python()
+    test_library_cache_and_compiler_targets()
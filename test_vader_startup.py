@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests para el arranque perezoso del CLI de Vader
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+VADER = os.path.join(ROOT, 'src', 'vader.py')
+
+
+def run_python(code):
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+
+def test_import_does_not_load_backends():
+    """Test que importar el CLI no carga backends ni paquetes de idioma"""
+    loaded = run_python(
+        "import sys; sys.path.insert(0, 'src'); import vader; "
+        "print(sorted(m for m in sys.modules if m.startswith('transpilers.'))); "
+        "print(len(vader.multilingual_system.load_times))"
+    ).splitlines()
+    assert loaded == ['[]', '0'], loaded
+    print("✅ Arranque sin backends")
+
+
+def test_backend_loaded_on_demand():
+    """Test que solo se importa el backend seleccionado"""
+    output = run_python(
+        "import sys; sys.path.insert(0, 'src'); import vader; "
+        "print(vader.transpile_code('mostrar 1', 'python', use_cache=False).strip()); "
+        "print('transpilers.vader_html' in sys.modules, 'transpilers.electron' in sys.modules); "
+        "import transpilers; print(sorted(transpilers.load_times))"
+    ).splitlines()
+    assert output == ['print(1)', 'False False', "['python']"], output
+    print("✅ Backend cargado bajo demanda")
+
+
+def test_startup_profile_flag():
+    """Test que --startup-profile informa los tiempos en stderr"""
+    result = subprocess.run([sys.executable, VADER, '--version', '--startup-profile'],
+                            capture_output=True, text=True)
+    assert result.returncode == 0
+    assert 'Vader v' in result.stdout
+    assert 'import time:' in result.stderr and 'total:' in result.stderr, result.stderr
+    print("✅ Perfil de arranque disponible")
+
+
+def test_startup_profile_from_console_script():
+    """Test que el script `vader` instalado (src.vader:main) también imprime el perfil"""
+    code = ("import sys; sys.argv = ['vader', '--version', '--startup-profile']; "
+            "from src.vader import main; sys.exit(main())")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert 'import time:' in result.stderr and 'total:' in result.stderr, result.stderr
+    print("✅ Perfil de arranque desde el script instalado")
+
+
+if __name__ == '__main__':
+    test_import_does_not_load_backends()
+    test_backend_loaded_on_demand()
+    test_startup_profile_flag()
+    test_startup_profile_from_console_script()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests para los bloques benchmark del framework de testing
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_testing_framework import VaderTestRunner, TestStatus
+
+BENCHMARKS = '''antes_de_cada()
+    datos = list(range(200))
+fin antes_de_cada
+
+prueba ordena()
+    afirmar_igual(sorted(datos)[0], 0)
+fin prueba
+
+benchmark ordenar()
+    sorted(datos, reverse=verdadero)
+fin benchmark
+
+benchmark sumar()
+    total = 0
+    for x in datos:
+        total += x
+    afirmar_igual(total, 19900)
+fin benchmark
+
+benchmark roto()
+    no_existe()
+fin benchmark
+'''
+
+OPTIONS = {'warmup': 0.01, 'min_round_time': 0.005, 'rounds': 5}
+
+
+def _run(tmp):
+    path = os.path.join(tmp, 'rendimiento.test.vdr')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(BENCHMARKS)
+    runner = VaderTestRunner(coverage_enabled=False, durations_file=None)
+    return runner, path, runner.run_benchmarks([path], **OPTIONS)
+
+
+def test_benchmarks_measured_with_statistics():
+    """Test de la medición: iteraciones calibradas, mediana, IQR y ops/s"""
+    with tempfile.TemporaryDirectory() as tmp:
+        runner, path, results = _run(tmp)
+        assert [r.name for r in results] == ['ordenar', 'sumar', 'roto']
+        ordenar, sumar, roto = results
+        for result in (ordenar, sumar):
+            assert result.status == TestStatus.PASSED, result.message
+            assert result.rounds == 5 and result.iterations >= 1
+            assert result.q1 <= result.median <= result.q3 and result.minimum <= result.median
+            assert result.iterations * result.median > 0.001
+            assert abs(result.ops_per_second * result.median - 1) < 1e-9
+        assert roto.status == TestStatus.ERROR and 'no_existe' in roto.message
+
+        # Los benchmarks no se cuentan como pruebas
+        report = runner.run_tests([path])
+        assert report.total_tests == 1 and report.passed_tests == 1
+    print("✅ Benchmarks medidos")
+
+
+def test_json_results_and_baseline_comparison():
+    """Test de la salida JSON y de la detección de regresiones frente a una línea base"""
+    with tempfile.TemporaryDirectory() as tmp:
+        runner, path, results = _run(tmp)
+        baseline = os.path.join(tmp, 'base.json')
+        runner.save_benchmark_results(results, baseline)
+        with open(baseline, encoding='utf-8') as f:
+            data = json.load(f)
+        entry = data['benchmarks'][f'{path}::ordenar']
+        assert entry['status'] == 'passed' and entry['ops_per_second'] > 0 and 'iqr' in entry
+
+        assert runner.compare_benchmarks(results, baseline) == []
+
+        # Una línea base 3 veces más rápida convierte el resultado actual en regresión
+        data['benchmarks'][f'{path}::sumar']['median'] /= 3
+        with open(baseline, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        regressions = runner.compare_benchmarks(results, baseline, threshold=0.5)
+        assert [r['name'] for r in regressions] == [f'{path}::sumar']
+        assert abs(regressions[0]['change'] - 2.0) < 1e-6
+    print("✅ JSON y comparación con línea base")
+
+
+if __name__ == '__main__':
+    test_benchmarks_measured_with_statistics()
+    test_json_results_and_baseline_comparison()
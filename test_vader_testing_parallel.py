@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests para la ejecución de pruebas Vader en varios procesos (--jobs)
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import vader_testing_framework
+from vader_testing_framework import VaderTestRunner, TestStatus
+
+SUITE = '''antes_de_cada()
+    base = {n}
+fin antes_de_cada
+
+prueba suma()
+    compartido = base + 1
+    afirmar_igual(compartido, {n} + 1)
+fin prueba
+
+prueba aislada()
+    afirmar_falso('compartido' in dir())
+fin prueba
+
+prueba falla()
+    print('salida de la suite', base)
+    afirmar_igual(base, -1)
+fin prueba
+'''
+
+
+def _files(tmp, count=6):
+    paths = []
+    for n in range(count):
+        path = os.path.join(tmp, f'suite_{n}.test.vdr')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(SUITE.format(n=n))
+        paths.append(path)
+    return paths
+
+
+def _summary(report):
+    return [(s.name, [(t.name, t.status) for t in s.tests]) for s in report.suites]
+
+
+def test_jobs_match_serial_run():
+    """Test de que repartir entre procesos da el mismo resultado que la ejecución en serie"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _files(tmp)
+        durations = os.path.join(tmp, 'duraciones.json')
+        serial = VaderTestRunner(coverage_enabled=False, durations_file=durations).run_tests(files)
+        parallel = VaderTestRunner(coverage_enabled=False, durations_file=durations).run_tests(files, jobs=3)
+
+        assert _summary(parallel) == _summary(serial)
+        statuses = [t.status for t in parallel.suites[0].tests]
+        # Cada prueba tiene su propio espacio de nombres
+        assert statuses == [TestStatus.PASSED, TestStatus.PASSED, TestStatus.FAILED]
+        assert sum(s.passed_tests for s in parallel.suites) == 12
+    print("✅ --jobs equivalente a la ejecución en serie")
+
+
+def test_durations_recorded_and_used_for_balancing():
+    """Test del historial de duraciones y del orden de reparto (los más lentos primero)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _files(tmp, 3)
+        durations = os.path.join(tmp, 'duraciones.json')
+        runner = VaderTestRunner(coverage_enabled=False, durations_file=durations)
+        runner.run_tests(files, jobs=2)
+        with open(durations, encoding='utf-8') as f:
+            recorded = json.load(f)
+        assert f"{files[0]}::suma" in recorded and len(recorded) == 9
+
+        history = {f"{files[1]}::suma": 5.0, f"{files[2]}::suma": 1.0}
+        estimates = VaderTestRunner._estimate_suite_durations(files, history)
+        assert estimates == {files[0]: 3.0, files[1]: 5.0, files[2]: 1.0}
+    print("✅ Historial de duraciones")
+
+
+def test_default_durations_only_written_with_jobs():
+    """Test de que sólo --jobs escribe el historial por defecto y de que muestra la salida de cada proceso"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = _files(tmp, 2)
+        default = vader_testing_framework.DEFAULT_DURATIONS_FILE
+        vader_testing_framework.DEFAULT_DURATIONS_FILE = os.path.join(tmp, 'por_defecto.json')
+        try:
+            with redirect_stdout(io.StringIO()):
+                VaderTestRunner(coverage_enabled=False).run_tests(files)
+            assert not os.path.exists(vader_testing_framework.DEFAULT_DURATIONS_FILE)
+
+            salida = io.StringIO()
+            with redirect_stdout(salida):
+                VaderTestRunner(coverage_enabled=False).run_tests(files, jobs=2)
+            assert os.path.exists(vader_testing_framework.DEFAULT_DURATIONS_FILE)
+        finally:
+            vader_testing_framework.DEFAULT_DURATIONS_FILE = default
+        assert 'salida de la suite 0' in salida.getvalue()
+        assert 'salida de la suite 1' in salida.getvalue()
+    print("✅ Historial por defecto sólo con --jobs")
+
+
+if __name__ == '__main__':
+    test_jobs_match_serial_run()
+    test_durations_recorded_and_used_for_balancing()
+    test_default_durations_only_written_with_jobs()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests para la caché persistente de transpilación
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+import vader
+import vader_transpile_cache
+from vader_transpile_cache import VaderTranspileCache
+
+CODIGO = 'nombre = "Ana"\nmostrar nombre\n'
+
+
+def test_transpile_code_uses_cache():
+    """Test que transpile_code reutiliza resultados entre llamadas"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = VaderTranspileCache(tmp)
+        original = vader_transpile_cache._default_cache
+        vader_transpile_cache._default_cache = cache
+        calls = []
+        uncached = vader._transpile_uncached
+
+        def counting(*args, **kwargs):
+            calls.append(args)
+            return uncached(*args, **kwargs)
+
+        vader._transpile_uncached = counting
+        try:
+            first = vader.transpile_code(CODIGO, 'python')
+            second = vader.transpile_code(CODIGO, 'python')
+            other = vader.transpile_code(CODIGO, 'javascript')
+            vader.transpile_code(CODIGO, 'python', use_cache=False)
+        finally:
+            vader._transpile_uncached = uncached
+            vader_transpile_cache._default_cache = original
+
+        assert first == second and 'print(nombre)' in first
+        assert other != first
+        assert len(calls) == 3, calls
+        stats = cache.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 2, stats
+        assert stats['entries'] == 2
+        cache.close()
+    print("✅ Caché usada por transpile_code")
+
+
+def test_lru_eviction_by_size():
+    """Test que la caché expulsa las entradas menos usadas al superar el tamaño"""
+    interval = vader_transpile_cache.TOUCH_INTERVAL
+    vader_transpile_cache.TOUCH_INTERVAL = -1  # cada acierto actualiza el orden LRU
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = VaderTranspileCache(tmp, max_bytes=250)
+        keys = [cache.make_key(f'codigo {i}', 'python', None, '1') for i in range(3)]
+        try:
+            cache.put(keys[0], 'python', 'a' * 100)
+            cache.put(keys[1], 'python', 'b' * 100)
+            assert cache.get(keys[0]) == 'a' * 100
+            cache.put(keys[2], 'python', 'c' * 100)
+        finally:
+            vader_transpile_cache.TOUCH_INTERVAL = interval
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+        stats = cache.stats()
+        assert stats['evictions'] == 1 and stats['size_bytes'] <= 250, stats
+
+        # La versión del transpilador forma parte de la clave
+        assert cache.make_key('x', 'python', None, '1') != cache.make_key('x', 'python', None, '2')
+        assert cache.make_key('x', 'python', None, '1') != cache.make_key('x', 'python', None, '1', 'en')
+        cache.close()
+    print("✅ Expulsión LRU por tamaño")
+
+
+def test_hits_do_not_write():
+    """Test que los aciertos recientes no escriben y que el tamaño total se lleva acumulado"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = VaderTranspileCache(tmp, max_bytes=1000)
+        key = cache.make_key('codigo', 'python', None, '1')
+        cache.put(key, 'python', 'a' * 100)
+        cache.put(key, 'python', 'b' * 300)
+        cambios = cache.connection.total_changes
+        for _ in range(vader_transpile_cache.STATS_FLUSH_EVERY - 1):
+            assert cache.get(key) == 'b' * 300
+        assert cache.connection.total_changes == cambios
+
+        suma = cache.connection.execute('SELECT SUM(size) FROM entries').fetchone()[0]
+        stats = cache.stats()
+        assert stats['size_bytes'] == suma == 300, stats
+        assert stats['hits'] == vader_transpile_cache.STATS_FLUSH_EVERY - 1, stats
+        cache.close()
+
+        # Los contadores pendientes se escriben al cerrar
+        cache = VaderTranspileCache(tmp, max_bytes=1000)
+        cache.get(key)
+        cache.close()
+        cache = VaderTranspileCache(tmp)
+        assert cache.stats()['hits'] == vader_transpile_cache.STATS_FLUSH_EVERY
+        cache.close()
+    print("✅ Aciertos sin escrituras")
+
+
+def test_fingerprint_includes_framework_backends():
+    """Test que editar un backend de transpilers/frameworks invalida la caché"""
+    framework = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'transpilers', 'frameworks', 'react.py')
+    stat = os.stat(framework)
+    original = vader_transpile_cache._transpiler_fingerprint
+    try:
+        vader_transpile_cache._transpiler_fingerprint = None
+        antes = vader_transpile_cache.transpiler_fingerprint('1')
+        os.utime(framework, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        vader_transpile_cache._transpiler_fingerprint = None
+        despues = vader_transpile_cache.transpiler_fingerprint('1')
+    finally:
+        os.utime(framework, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        vader_transpile_cache._transpiler_fingerprint = original
+    assert antes != despues
+    print("✅ Huella de transpiladores con frameworks")
+
+
+if __name__ == '__main__':
+    test_transpile_code_uses_cache()
+    test_lru_eviction_by_size()
+    test_hits_do_not_write()
+    test_fingerprint_includes_framework_backends()
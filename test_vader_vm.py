@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Tests para la VM de registros de Vader
+"""
+
+import hashlib
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_compiler_system import (
+    VaderBytecodeGenerator, VaderBytecodeInterpreter, VaderOpcode, VaderBytecodeFormatError,
+    VaderCompilerSystem, CompilationTarget, benchmark_vm, load_bytecode_file, read_bytecode_hash,
+    INSTRUCTION_SIZE, VBC_MAGIC
+)
+import vader_compiler_system
+
+PROGRAMA = '''nombre = "Ana"
+funcion saludar
+    mostrar "hola " + nombre
+    visitas = visitas + 1
+fin funcion
+visitas = 0
+repetir 3 veces
+    saludar
+fin repetir
+x = 7
+si x es igual a 0
+    mostrar "cero"
+sino si x > 5
+    mostrar "grande"
+sino
+    mostrar "pequeño"
+fin si
+contador = 0
+mientras contador < 1000
+    contador = contador + 1
+fin mientras
+mostrar (contador - 1) * 2
+'''
+
+
+def run_vm(program):
+    vm = VaderBytecodeInterpreter()
+    with redirect_stdout(io.StringIO()):
+        vm.run(program)
+    return vm
+
+
+def test_program_output():
+    """Test de la ejecución de un programa completo en la VM"""
+    program = VaderBytecodeGenerator().compile_program(PROGRAMA)
+    vm = run_vm(program)
+    assert vm.output == ['hola Ana'] * 3 + ['grande', '1998'], vm.output
+    assert vm.globals['visitas'] == 3
+    assert vm.globals['contador'] == 1000
+    print("✅ Programa ejecutado en la VM")
+
+
+def test_flat_instruction_stream():
+    """Test que las instrucciones se codifican en un array plano con operandos constantes"""
+    program = VaderBytecodeGenerator().compile_program('a = 1\na = a + 2\nmostrar a\n')
+    assert len(program.code) == len(program.lines) * INSTRUCTION_SIZE
+    opcodes = program.code.tolist()[::INSTRUCTION_SIZE]
+    assert VaderOpcode.ADDK in opcodes, opcodes
+    assert VaderOpcode.STOREG not in opcodes, opcodes
+    assert run_vm(program).output == ['3']
+    print("✅ Bytecode plano con superinstrucciones")
+
+
+def test_serialization_round_trip():
+    """Test que el bytecode serializado se ejecuta igual"""
+    bytecode = VaderBytecodeGenerator().compile_vader_code(PROGRAMA)
+    vm = VaderBytecodeInterpreter()
+    with redirect_stdout(io.StringIO()):
+        vm.execute(bytecode)
+    assert vm.output[-1] == '1998'
+    print("✅ Serialización de bytecode")
+
+
+def test_vbc_container_loads_without_copy():
+    """Test del contenedor .vbc versionado cargado con mmap"""
+    bytecode = VaderBytecodeGenerator().compile_vader_code(PROGRAMA)
+    assert bytecode.startswith(VBC_MAGIC)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'programa.vbc')
+        with open(path, 'wb') as f:
+            f.write(bytecode)
+        assert read_bytecode_hash(path) == hashlib.sha256(PROGRAMA.encode('utf-8')).digest()
+        program = load_bytecode_file(path)
+        assert isinstance(program.code, memoryview)
+        assert run_vm(program).output[-1] == '1998'
+        del program
+
+    truncados = [bytecode[:size] for size in range(48, 53)]
+    for corrupt in [b'', b'XXXX' + bytecode[4:], bytecode[:4] + b'\x63\x00' + bytecode[6:], bytecode[:60]] + truncados:
+        try:
+            VaderBytecodeInterpreter._deserialize_bytecode(corrupt)
+        except VaderBytecodeFormatError:
+            pass
+        else:
+            assert False, "Se esperaba un error de formato"
+
+    # Opcode fuera de la tabla: error de formato al decodificar, no IndexError
+    program = VaderBytecodeGenerator().compile_program(PROGRAMA)
+    for opcode in (len(VaderOpcode) + 50, -1):
+        program.code[0] = opcode
+        try:
+            run_vm(program)
+        except VaderBytecodeFormatError:
+            pass
+        else:
+            assert False, "Se esperaba un error de formato"
+    print("✅ Contenedor .vbc validado")
+
+
+def test_compile_file_reuses_matching_bytecode():
+    """Test que compile_file reutiliza el .vbc si el hash del fuente coincide"""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'programa.vdr')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(PROGRAMA)
+        compiler = VaderCompilerSystem()
+        first = compiler.compile_file(source, CompilationTarget.VADER_BYTECODE)
+        second = compiler.compile_file(source, CompilationTarget.VADER_BYTECODE)
+        assert first.success and second.success
+        assert 'cached' not in first.metadata
+        assert second.metadata.get('cached') and second.bytecode == first.bytecode
+
+        # Un .vbc de otro compilador (otra tabla de opcodes) no se reutiliza ni se carga
+        compilador = vader_compiler_system.VBC_COMPILER
+        vader_compiler_system.VBC_COMPILER = b'\xff' * 8
+        try:
+            third = compiler.compile_file(source, CompilationTarget.VADER_BYTECODE)
+            assert third.success and 'cached' not in third.metadata
+        finally:
+            vader_compiler_system.VBC_COMPILER = compilador
+        try:
+            load_bytecode_file(third.output_file)
+        except VaderBytecodeFormatError:
+            pass
+        else:
+            assert False, "Se esperaba un error de versión del compilador"
+    print("✅ Bytecode reutilizado por hash")
+
+
+def test_runtime_error_reports_line():
+    """Test que los errores de ejecución indican la línea"""
+    program = VaderBytecodeGenerator().compile_program('a = 1\nb = "x"\nc = a - b\n')
+    try:
+        run_vm(program)
+    except RuntimeError as e:
+        assert 'línea 3' in str(e), e
+    else:
+        assert False, "Se esperaba un error"
+    print("✅ Errores con número de línea")
+
+
+def test_benchmark_vm():
+    """Test del benchmark frente al intérprete nativo"""
+    code = 'contador = 0\nrepetir 20000 veces\n    contador = contador + 1\nfin repetir\n'
+    with redirect_stdout(io.StringIO()):
+        results = benchmark_vm(code, repeat=1)
+    for key in ('vm', 'native_compiled', 'native_lines', 'speedup_vs_lines', 'speedup_vs_compiled'):
+        assert key in results, results
+    assert results['vm'] < results['native_lines'], results
+    print(f"⏱️  {results}")
+
+
+if __name__ == '__main__':
+    test_program_output()
+    test_flat_instruction_stream()
+    test_serialization_round_trip()
+    test_vbc_container_loads_without_copy()
+    test_compile_file_reuses_matching_bytecode()
+    test_runtime_error_reports_line()
+    test_benchmark_vm()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests para el modo watch incremental
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vader_watch import VaderWatchSession, PollingWatcher, create_watcher
+
+
+def write(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def make_project(tmp):
+    write(os.path.join(tmp, 'utilidades.vdr'), 'exportar saludar\nmostrar "util"\n')
+    write(os.path.join(tmp, 'servicio.vdr'), 'importar saludar desde ./utilidades\nmostrar "servicio"\n')
+    write(os.path.join(tmp, 'app.vdr'), 'importar iniciar desde ./servicio\nmostrar "app"\n')
+    write(os.path.join(tmp, 'suelto.vdr'), 'mostrar "sin dependencias"\n')
+    return {name: os.path.realpath(os.path.join(tmp, f'{name}.vdr'))
+            for name in ('utilidades', 'servicio', 'app', 'suelto')}
+
+
+def test_session_rebuilds_dependents_only():
+    """Test que un cambio retranspila el archivo y sus dependientes transitivos"""
+    built = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = make_project(tmp)
+        session = VaderWatchSession(tmp, lambda files: built.append(list(files)) or
+                                    [{'source': f, 'ok': True} for f in files])
+        session.initial_build()
+        assert len(built[0]) == 4
+
+        write(paths['utilidades'], 'exportar saludar\nmostrar "util v2"\n')
+        rebuild, dependents, _ = session.handle([paths['utilidades']])
+        assert rebuild == [paths['utilidades']]
+        assert dependents == sorted([paths['servicio'], paths['app']]), dependents
+
+        # Guardar sin cambios no retranspila nada
+        rebuild, dependents, results = session.handle([paths['suelto']])
+        assert (rebuild, dependents, results) == ([], [], [])
+
+        # Borrar un módulo obliga a retranspilar a quien lo importaba
+        os.remove(paths['servicio'])
+        rebuild, dependents, _ = session.handle([paths['servicio']])
+        assert rebuild == [] and dependents == [paths['app']], dependents
+
+        # Crearlo de nuevo vuelve a enlazar el import
+        write(paths['servicio'], 'mostrar "servicio nuevo"\n')
+        rebuild, dependents, _ = session.handle([paths['servicio']])
+        assert rebuild == [paths['servicio']] and dependents == [paths['app']], dependents
+    print("✅ Retranspilación incremental por dependencias")
+
+
+def test_watchers_detect_changes():
+    """Test que inotify (si existe) y el sondeo detectan archivos cambiados"""
+    with tempfile.TemporaryDirectory() as tmp:
+        target = os.path.join(tmp, 'sub', 'modulo.vdr')
+        os.makedirs(os.path.dirname(target))
+        write(target, 'mostrar 1\n')
+        polling = PollingWatcher(tmp, interval=0.01)
+        watcher = create_watcher(tmp)
+        try:
+            time.sleep(0.01)
+            write(target, 'mostrar 22\n')
+            write(os.path.join(tmp, 'notas.txt'), 'ignorado')
+            assert os.path.realpath(target) in {os.path.realpath(p) for p in watcher.wait(2.0)}
+            assert os.path.realpath(target) in {os.path.realpath(p) for p in polling.wait(2.0)}
+        finally:
+            watcher.close()
+    print(f"✅ Cambios detectados ({watcher.name})")
+
+
+if __name__ == '__main__':
+    test_session_rebuilds_dependents_only()
+    test_watchers_detect_changes()
@@ -1,67 +1,107 @@
 # Transpilers module for Vader
 # Provides transpilation to multiple target languages
 
+import importlib
+import time
+
 __version__ = "7.0.0"
 __author__ = "Vader Team"
 
-# Import all transpilers with error handling
-try:
-    from . import python
-    from . import javascript
-    from . import java
-    from . import csharp
-    from . import go
-    from . import rust
-    from . import swift
-    from . import kotlin
-    from . import typescript
-    from . import dart
-    from . import php
-    from . import ruby
-    from . import solidity
-    from . import vader_html as html  # Usar vader_html para evitar conflicto
-    from . import css
-    from . import gui_advanced
-    from . import electron
-except ImportError as e:
-    print(f"Warning: Some transpilers could not be imported: {e}")
-    # Crear módulos de respaldo
-    class DummyTranspiler:
-        def transpile_to_python(self, code): return code
-        def transpile_to_javascript(self, code): return code
-        def transpilar(self, code): return code
-    
-    python = javascript = java = csharp = go = rust = swift = kotlin = DummyTranspiler()
-    typescript = dart = php = ruby = solidity = html = css = gui_advanced = electron = DummyTranspiler()
+# Backends por nombre de atributo -> módulo real. Se importan solo al usarse
+# (PEP 562), así `from transpilers import python` no carga los otros 16.
+_BACKEND_MODULES = {
+    'python': 'python',
+    'javascript': 'javascript',
+    'java': 'java',
+    'csharp': 'csharp',
+    'go': 'go',
+    'rust': 'rust',
+    'swift': 'swift',
+    'kotlin': 'kotlin',
+    'typescript': 'typescript',
+    'dart': 'dart',
+    'php': 'php',
+    'ruby': 'ruby',
+    'solidity': 'solidity',
+    'html': 'vader_html',  # Usar vader_html para evitar conflicto
+    'css': 'css',
+    'gui_advanced': 'gui_advanced',
+    'electron': 'electron',
+}
+
+# Tiempos de importación de cada backend cargado (segundos), para --startup-profile
+load_times = {}
 
-# Available transpilers
-AVAILABLE_TRANSPILERS = {
-    'python': python,
-    'javascript': javascript,
-    'js': javascript,
-    'java': java,
-    'csharp': csharp,
-    'cs': csharp,
-    'go': go,
-    'rust': rust,
-    'swift': swift,
-    'kotlin': kotlin,
-    'typescript': typescript,
-    'ts': typescript,
-    'dart': dart,
-    'php': php,
-    'ruby': ruby,
-    'solidity': solidity,
-    'sol': solidity,
-    'html': html,
-    'css': css,
-    'gui': gui_advanced,
-    'electron': electron
+class DummyTranspiler:
+    """Transpilador de respaldo cuando un backend no se puede importar"""
+    def transpile_to_python(self, code): return code
+    def transpile_to_javascript(self, code): return code
+    def transpilar(self, code): return code
+
+def load_transpiler(name):
+    """Importa (una sola vez) el backend con ese nombre de atributo"""
+    module = globals().get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(f'.{_BACKEND_MODULES[name]}', __name__)
+    except ImportError as e:
+        print(f"Warning: transpiler {name} could not be imported: {e}")
+        module = DummyTranspiler()
+    load_times[name] = time.perf_counter() - start
+    globals()[name] = module
+    return module
+
+def __getattr__(name):
+    if name in _BACKEND_MODULES:
+        return load_transpiler(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class LazyTranspiler:
+    """Proxy que importa el backend en el primer acceso a uno de sus atributos"""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attribute):
+        return getattr(load_transpiler(self._name), attribute)
+
+    def __repr__(self):
+        state = 'cargado' if self._name in load_times else 'pendiente'
+        return f"<LazyTranspiler {self._name} ({state})>"
+
+_ALIASES = {
+    'python': 'python',
+    'javascript': 'javascript',
+    'js': 'javascript',
+    'java': 'java',
+    'csharp': 'csharp',
+    'cs': 'csharp',
+    'go': 'go',
+    'rust': 'rust',
+    'swift': 'swift',
+    'kotlin': 'kotlin',
+    'typescript': 'typescript',
+    'ts': 'typescript',
+    'dart': 'dart',
+    'php': 'php',
+    'ruby': 'ruby',
+    'solidity': 'solidity',
+    'sol': 'solidity',
+    'html': 'html',
+    'css': 'css',
+    'gui': 'gui_advanced',
+    'electron': 'electron'
 }
 
+# Available transpilers
+AVAILABLE_TRANSPILERS = {alias: LazyTranspiler(name) for alias, name in _ALIASES.items()}
+
 def get_transpiler(target_language):
     """Get transpiler for target language"""
-    return AVAILABLE_TRANSPILERS.get(target_language.lower())
+    name = _ALIASES.get(target_language.lower())
+    return load_transpiler(name) if name else None
 
 def list_available_languages():
     """List all available target languages"""
@@ -0,0 +1,819 @@
+# Frontend compartido para los transpiladores de Vader
+# Tokeniza y parsea el código fuente una sola vez en un AST tipado
+# que cada backend recorre como visitante
+
+import hashlib
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Union
+
+# Lexer de una sola pasada: una única expresión compilada para todas las líneas
+_TOKEN_RE = re.compile(r'''
+    (?P<STRING>"(?:[^"\\]|\\.)*"?|'(?:[^'\\]|\\.)*'?)
+  | (?P<COMMENT>\#.*)
+  | (?P<NUMBER>\d+(?:\.\d+)?)
+  | (?P<NAME>[^\W\d]\w*)
+  | (?P<OP>==|!=|>=|<=|\*\*|//|[-+*/%<>=(),.:;\[\]{}!&|^~@?$])
+  | (?P<WS>\s+)
+  | (?P<OTHER>.)
+''', re.VERBOSE)
+
+# Frases de comparación en español que el lexer reduce a un operador
+_COMPARISON_PHRASES = [
+    (('es', 'igual', 'a'), '=='),
+    (('es', 'mayor', 'que'), '>'),
+    (('es', 'menor', 'que'), '<'),
+    (('igual', 'a'), '=='),
+    (('mayor', 'que'), '>'),
+    (('menor', 'que'), '<'),
+]
+
+END_KEYWORDS = frozenset([
+    'fin si', 'fin', 'fin funcion', 'fin función', 'fin clase', 'fin mientras', 'fin repetir',
+    'fin metodo', 'fin método', 'fin constructor', 'fin intentar', 'fin struct'
+])
+
+ELSE_KEYWORDS = frozenset(['sino', 'si no'])
+
+CLASS_KEYWORDS = frozenset(['clase', 'struct'])
+
+METHOD_KEYWORDS = frozenset(['metodo', 'método'])
+
+DECLARE_KINDS = frozenset(['variable', 'lista', 'mapa', 'array'])
+
+INPUT_SEPARATORS = [('guardar', 'la', 'respuesta', 'en'), ('guárdalo', 'en')]
+
+
+# Sustituto de una llamada en Expr.render: nombre, plantilla o función
+CallReplacement = Union[str, Callable[[List[str]], str]]
+
+
+@dataclass
+class Token:
+    """Token léxico con su posición dentro de la línea"""
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+@dataclass
+class Expr:
+    """Fragmento de código conservado como texto y tokens"""
+    text: str
+    tokens: List[Token] = field(default_factory=list)
+
+    def render(self, names: Optional[Dict[str, str]] = None,
+               calls: Optional[Dict[str, CallReplacement]] = None,
+               ops: Optional[Dict[str, str]] = None) -> str:
+        """Reconstruye el texto sustituyendo nombres, llamadas y operadores
+
+        En `calls` una llamada se sustituye por otro nombre ('str'), por una
+        plantilla con sus argumentos ('math.Sqrt(float64({0}))') o por una
+        función que recibe la lista de argumentos ya traducidos.
+        """
+        return self._render(0, len(self.tokens), 0, len(self.text),
+                            names or {}, calls or {}, ops or {})
+
+    def _render(self, first, last, start, end, names, calls, ops):
+        parts = []
+        position = start
+        tokens = self.tokens
+        index = first
+        while index < last:
+            token = tokens[index]
+            parts.append(self.text[position:token.start])
+            position = token.end
+            value = token.value
+            if token.kind == 'NAME':
+                is_call = (index + 1 < last and tokens[index + 1].value == '('
+                           and tokens[index + 1].start == token.end)
+                replacement = calls.get(value) if is_call else None
+                if replacement is not None and (callable(replacement) or '{' in replacement):
+                    close = _closing_paren(tokens, index + 1, last)
+                    if close != -1:
+                        args = [self._render(a, b, tokens[a].start, tokens[b - 1].end, names, calls, ops)
+                                for a, b in _split_args(tokens, index + 2, close)]
+                        try:
+                            value = replacement(args) if callable(replacement) else replacement.format(*args)
+                        except IndexError:
+                            value = None
+                        if value is not None:
+                            parts.append(value)
+                            position = tokens[close].end
+                            index = close + 1
+                            continue
+                    value = token.value
+                elif replacement is not None:
+                    value = replacement
+                elif value in names:
+                    value = names[value]
+            elif token.kind == 'CMP':
+                value = ops.get(value, value)
+            parts.append(value)
+            index += 1
+        parts.append(self.text[position:end])
+        return ''.join(parts)
+
+    def __str__(self):
+        return self.text
+
+
+# Nodos del AST
+
+@dataclass
+class Node:
+    """Nodo base del AST de Vader"""
+    line: int = 0
+    comment: Optional[str] = None
+    source: Optional[Expr] = None
+
+
+@dataclass
+class Program(Node):
+    body: List[Node] = field(default_factory=list)
+    source_hash: str = ''
+
+
+@dataclass
+class Blank(Node):
+    pass
+
+
+@dataclass
+class Comment(Node):
+    text: str = ''
+
+
+@dataclass
+class Print(Node):
+    value: Expr = None
+
+
+@dataclass
+class Input(Node):
+    prompt: Expr = None
+    target: str = ''
+
+
+@dataclass
+class Return(Node):
+    value: Expr = None
+
+
+@dataclass
+class Call(Node):
+    func: str = ''
+    args: Expr = None
+
+
+@dataclass
+class Assign(Node):
+    target: str = ''
+    value: Expr = None
+
+
+@dataclass
+class ExprStatement(Node):
+    value: Expr = None
+
+
+@dataclass
+class End(Node):
+    """Cierre de bloque sin bloque abierto"""
+    text: str = ''
+
+
+@dataclass
+class Declare(Node):
+    """'crear variable|lista|mapa|array nombre [tipo T] [= valor]'"""
+    kind: str = ''
+    name: str = ''
+    type: str = ''
+    size: Optional[Expr] = None
+    value: Optional[Expr] = None
+
+
+@dataclass
+class Append(Node):
+    """'agregar valor a lista'"""
+    value: Expr = None
+    target: str = ''
+
+
+@dataclass
+class Attribute(Node):
+    """'atributo nombre [tipo T] [= valor]' dentro de una clase"""
+    name: str = ''
+    type: str = ''
+    value: Optional[Expr] = None
+
+
+@dataclass
+class Raise(Node):
+    value: Expr = None
+
+
+@dataclass
+class Handler(Node):
+    """Rama 'capturar [nombre] [tipo T]' de un 'intentar'"""
+    name: str = ''
+    type: str = ''
+    body: List[Node] = field(default_factory=list)
+
+
+@dataclass
+class Block(Node):
+    """Nodo con cuerpo; `orelse` se llena al encontrar 'sino'"""
+    body: List[Node] = field(default_factory=list)
+    orelse: Optional[List[Node]] = None
+    else_line: int = 0
+    else_comment: Optional[str] = None
+    closed: bool = False
+
+    def branch(self):
+        """Lista que recibe las siguientes sentencias del bloque"""
+        return self.body if self.orelse is None else self.orelse
+
+    def branches(self):
+        return [self.body] if self.orelse is None else [self.body, self.orelse]
+
+
+@dataclass
+class If(Block):
+    condition: Expr = None
+
+
+@dataclass
+class While(Block):
+    condition: Expr = None
+
+
+@dataclass
+class Repeat(Block):
+    times: Expr = None
+
+
+@dataclass
+class ForEach(Block):
+    var: str = ''
+    iterable: Expr = None
+
+
+@dataclass
+class FunctionDef(Block):
+    name: str = ''
+    params: List[str] = field(default_factory=list)
+    param_types: Dict[str, str] = field(default_factory=dict)
+    returns: str = ''
+
+
+@dataclass
+class Method(FunctionDef):
+    """'metodo' de una clase; el receptor (self) no cuenta como parámetro"""
+    pass
+
+
+@dataclass
+class Constructor(FunctionDef):
+    pass
+
+
+@dataclass
+class ClassDef(Block):
+    name: str = ''
+    base: str = ''
+
+
+@dataclass
+class Try(Block):
+    """'intentar' con sus ramas 'capturar' y 'finalmente'"""
+    handlers: List[Handler] = field(default_factory=list)
+    finalbody: Optional[List[Node]] = None
+    final_line: int = 0
+    final_comment: Optional[str] = None
+
+    def branch(self):
+        if self.finalbody is not None:
+            return self.finalbody
+        if self.handlers:
+            return self.handlers[-1].body
+        return self.body
+
+    def branches(self):
+        branches = [self.body] + [handler.body for handler in self.handlers]
+        if self.finalbody is not None:
+            branches.append(self.finalbody)
+        return branches
+
+
+@dataclass
+class Else(Block):
+    """'sino' fuera de un bloque o repetido dentro del mismo bloque"""
+    pass
+
+
+def tokenize(text):
+    """Divide una línea en tokens; las frases de comparación se vuelven CMP"""
+    raw = []
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == 'WS':
+            continue
+        raw.append(Token(kind, match.group(), match.start(), match.end()))
+
+    tokens = []
+    index = 0
+    while index < len(raw):
+        token = raw[index]
+        if token.kind == 'NAME':
+            for words, operator in _COMPARISON_PHRASES:
+                candidate = raw[index:index + len(words)]
+                if (len(candidate) == len(words)
+                        and all(t.kind == 'NAME' and t.value == w for t, w in zip(candidate, words))):
+                    tokens.append(Token('CMP', operator, token.start, candidate[-1].end))
+                    index += len(words)
+                    break
+            else:
+                tokens.append(token)
+                index += 1
+        else:
+            tokens.append(token)
+            index += 1
+    return tokens
+
+
+def _slice(code, tokens, first, last=None):
+    """Expresión formada por tokens[first:last] de la línea"""
+    selected = tokens[first:last]
+    if not selected:
+        return Expr('', [])
+    start = selected[0].start
+    end = selected[-1].end
+    return Expr(code[start:end],
+                [Token(t.kind, t.value, t.start - start, t.end - start) for t in selected])
+
+
+def _find_sequence(tokens, words, start=0):
+    """Índice donde aparece la secuencia de palabras, o -1"""
+    size = len(words)
+    for index in range(start, len(tokens) - size + 1):
+        if all(tokens[index + k].kind == 'NAME' and tokens[index + k].value == words[k]
+               for k in range(size)):
+            return index
+    return -1
+
+
+def _find_name(tokens, name, start=0):
+    for index in range(start, len(tokens)):
+        if tokens[index].kind == 'NAME' and tokens[index].value == name:
+            return index
+    return -1
+
+
+def _closing_paren(tokens, open_index, last=None):
+    """Índice del ')' que cierra el '(' de open_index, o -1"""
+    depth = 0
+    for index in range(open_index, len(tokens) if last is None else last):
+        value = tokens[index].value
+        if tokens[index].kind != 'OP':
+            continue
+        if value == '(':
+            depth += 1
+        elif value == ')':
+            depth -= 1
+            if depth == 0:
+                return index
+    return -1
+
+
+def _split_args(tokens, first, last, separator=','):
+    """Rangos (inicio, fin) de los argumentos separados por comas de primer nivel"""
+    ranges = []
+    depth = 0
+    start = first
+    for index in range(first, last):
+        token = tokens[index]
+        if token.kind != 'OP':
+            continue
+        if token.value in '([{':
+            depth += 1
+        elif token.value in ')]}':
+            depth -= 1
+        elif token.value == separator and depth == 0:
+            ranges.append((start, index))
+            start = index + 1
+    if start < last:
+        ranges.append((start, last))
+    return [(a, b) for a, b in ranges if a < b]
+
+
+def split_assignment(expr):
+    """Separa 'destino = valor' si la expresión es una asignación simple"""
+    for index, token in enumerate(expr.tokens):
+        if token.kind == 'OP' and token.value == '=':
+            if index > 0 and expr.text[token.start - 1:token.start] == ' ' \
+                    and expr.text[token.end:token.end + 1] == ' ':
+                return _slice(expr.text, expr.tokens, 0, index), _slice(expr.text, expr.tokens, index + 1)
+            return None
+    return None
+
+
+def split_expr(expr, separator):
+    """Partes de la expresión separadas por un operador de primer nivel ('+', ',')"""
+    return [_slice(expr.text, expr.tokens, a, b)
+            for a, b in _split_args(expr.tokens, 0, len(expr.tokens), separator)]
+
+
+def split_sections(program):
+    """Separa el programa en clases, funciones y código principal
+
+    Los comentarios y líneas en blanco que preceden a una clase o función
+    van con ella, para los backends que las declaran fuera de main.
+    """
+    classes, functions, main = [], [], []
+    pending = []
+    for node in program.body:
+        if isinstance(node, (Blank, Comment)):
+            pending.append(node)
+            continue
+        if isinstance(node, ClassDef):
+            target = classes
+        elif isinstance(node, FunctionDef):
+            target = functions
+        else:
+            target = main
+        target.extend(pending)
+        target.append(node)
+        pending = []
+    main.extend(pending)
+    return classes, functions, main
+
+
+def collapse_blank_lines(lines):
+    """Quita líneas en blanco repetidas y las pegadas a la apertura o cierre de un bloque"""
+    result = []
+    for line in lines:
+        if not line.strip():
+            if not result or not result[-1].strip() or result[-1].endswith('{'):
+                continue
+        elif line.strip().startswith('}') and result and not result[-1].strip():
+            result.pop()
+        result.append(line)
+    while result and not result[-1].strip():
+        result.pop()
+    return result
+
+
+class VaderParser:
+    """Parser de Vader: una pasada por línea, bloques cerrados con 'fin'"""
+
+    def parse(self, source):
+        program = Program(source_hash=source_hash(source))
+        stack = [program]
+        self._lines = source.split('\n')
+
+        for number, raw_line in enumerate(self._lines, 1):
+            line = raw_line.strip()
+            if not line:
+                self._append(stack, Blank(line=number))
+                continue
+            if line.startswith('#'):
+                self._append(stack, Comment(line=number, text=raw_line))
+                continue
+
+            tokens = tokenize(line)
+            comment = None
+            if tokens and tokens[-1].kind == 'COMMENT':
+                comment = tokens[-1].value
+                line = line[:tokens[-1].start].rstrip()
+                tokens = tokens[:-1]
+
+            if line in END_KEYWORDS:
+                if len(stack) > 1:
+                    block = stack.pop()
+                    block.closed = True
+                else:
+                    self._append(stack, End(line=number, comment=comment, text=line, source=Expr(line)))
+                continue
+
+            # 'sino', 'capturar' y 'finalmente' admiten los dos puntos finales
+            keyword = line[:-1].rstrip() if line.endswith(':') else line
+            current = stack[-1]
+            if keyword in ELSE_KEYWORDS:
+                in_try = isinstance(current, Try)
+                if len(stack) > 1 and current.orelse is None and not in_try:
+                    current.orelse = []
+                    current.else_line = number
+                    current.else_comment = comment
+                else:
+                    # Otro 'sino' en el mismo bloque: abre una rama hermana
+                    if len(stack) > 1 and not in_try:
+                        stack.pop()
+                    node = Else(line=number, comment=comment, source=Expr(line))
+                    self._append(stack, node)
+                    stack.append(node)
+                continue
+
+            if isinstance(current, Try) and current.finalbody is None:
+                if tokens[0].value == 'capturar':
+                    names = [t.value for t in tokens[1:] if t.value != ':']
+                    handler = Handler(line=number, comment=comment)
+                    if 'tipo' in names:
+                        position = names.index('tipo')
+                        handler.type = ' '.join(names[position + 1:])
+                        names = names[:position]
+                    handler.name = ' '.join(names)
+                    current.handlers.append(handler)
+                    continue
+                if keyword == 'finalmente':
+                    current.finalbody = []
+                    current.final_line = number
+                    current.final_comment = comment
+                    continue
+
+            node = self.parse_statement(line, tokens, number)
+            node.line = number
+            node.comment = comment
+            node.source = _slice(line, tokens, 0)
+            self._append(stack, node)
+            if isinstance(node, Block):
+                stack.append(node)
+
+        return program
+
+    def _append(self, stack, node):
+        current = stack[-1]
+        if isinstance(current, Block):
+            current.branch().append(node)
+        else:
+            current.body.append(node)
+
+    def _indented_body(self, number):
+        """Si la siguiente línea con contenido está más indentada que la línea `number`"""
+        raw = self._lines[number - 1]
+        indent = len(raw) - len(raw.lstrip())
+        for following in self._lines[number:]:
+            if following.strip():
+                return len(following) - len(following.lstrip()) > indent
+        return False
+
+    def parse_signature(self, line, tokens, node):
+        """Nombre, parámetros, tipos y retorno de la cabecera de una función
+
+        Admite 'nombre con a tipo numero y b que devuelve texto' y
+        'nombre(a: numero, b) -> texto'.
+        """
+        if tokens and tokens[-1].value == ':':
+            tokens = tokens[:-1]
+
+        position = _find_sequence(tokens, ('que', 'devuelve'))
+        if position == -1:
+            position = next((i for i in range(len(tokens) - 1)
+                             if tokens[i].value == '-' and tokens[i + 1].value == '>'
+                             and tokens[i + 1].start == tokens[i].end), -1)
+        if position != -1:
+            returns = [t for t in tokens[position + 2:] if t.kind == 'NAME']
+            node.returns = returns[0].value if returns else ''
+            tokens = tokens[:position]
+
+        con = _find_name(tokens, 'con')
+        paren = next((i for i, t in enumerate(tokens) if t.value == '('), -1)
+        if paren > 0 and (con == -1 or paren < con):
+            close = _closing_paren(tokens, paren)
+            close = len(tokens) if close == -1 else close
+            name_tokens = tokens[:paren]
+            groups = [tokens[a:b] for a, b in _split_args(tokens, paren + 1, close)]
+            rest = tokens[close + 1:]
+            if not node.returns and len(rest) > 1 and rest[0].value == ':' and rest[1].kind == 'NAME':
+                node.returns = rest[1].value
+        elif con != -1:
+            name_tokens = tokens[:con]
+            groups = []
+            current = []
+            params_expr = [t for t in tokens[con + 1:] if t.value != ':']
+            for index, token in enumerate(params_expr):
+                # 'y' separa sólo entre dos nombres sin coma ('con a y b');
+                # en 'con x, y' es el nombre de un parámetro
+                is_and = (token.kind == 'NAME' and token.value == 'y' and current
+                          and index + 1 < len(params_expr)
+                          and params_expr[index + 1].kind == 'NAME')
+                if token.value == ',' or is_and:
+                    if current:
+                        groups.append(current)
+                    current = []
+                else:
+                    current.append(token)
+            if current:
+                groups.append(current)
+        else:
+            name_tokens = [t for t in tokens if t.value != ':']
+            groups = []
+
+        if len(name_tokens) == 1 and name_tokens[0].kind == 'STRING':
+            node.name = name_tokens[0].value[1:-1]
+        else:
+            node.name = _slice(line, name_tokens, 0).text if name_tokens else ''
+
+        for group in groups:
+            # 'a tipo numero', 'a: numero' o 'a = valor'
+            split = next((i for i, t in enumerate(group)
+                          if (t.kind == 'NAME' and t.value == 'tipo') or t.value in (':', '=')), -1)
+            if split == -1:
+                node.params.append(_slice(line, group, 0).text)
+                continue
+            name = _slice(line, group, 0, split).text
+            node.params.append(name)
+            if group[split].value != '=':
+                types = [t for t in group[split + 1:] if t.kind == 'NAME']
+                if types:
+                    node.param_types[name] = types[0].value
+        if isinstance(node, Method) and node.params[:1] in (['self'], ['this']):
+            node.params = node.params[1:]
+        return node
+
+    def _split_type(self, line, tokens):
+        """'nombre [tipo T] [= valor]': devuelve (nombre, tipo, valor)"""
+        value = None
+        equals = next((i for i, t in enumerate(tokens) if t.value == '='), -1)
+        if equals != -1:
+            value = _slice(line, tokens, equals + 1)
+            tokens = tokens[:equals]
+        position = _find_name(tokens, 'tipo')
+        if position == -1:
+            return _slice(line, tokens, 0).text, '', value
+        types = [t for t in tokens[position + 1:] if t.kind == 'NAME']
+        return _slice(line, tokens, 0, position).text, types[0].value if types else '', value
+
+    def parse_statement(self, line, tokens, number=0):
+        """Clasifica una línea de código en un nodo del AST"""
+        # La palabra clave inicial sólo cuenta si va seguida de un espacio
+        first = ''
+        if len(tokens) > 1 and tokens[0].kind == 'NAME' and tokens[1].start > tokens[0].end:
+            first = tokens[0].value
+        has_name = {t.value for t in tokens if t.kind == 'NAME'}
+        head = tokens[0].value if tokens else ''
+        second = tokens[1].value if len(tokens) > 1 else ''
+
+        if first in ('mostrar', 'decir'):
+            return Print(value=_slice(line, tokens, 1))
+
+        if 'preguntar' in has_name and ('guardar' in has_name or 'guárdalo' in has_name):
+            for words in INPUT_SEPARATORS:
+                position = _find_sequence(tokens, words)
+                if position != -1:
+                    start = _find_name(tokens, 'preguntar') + 1
+                    return Input(prompt=_slice(line, tokens, start, position),
+                                 target=_slice(line, tokens, position + len(words)).text)
+
+        if first == 'si' and ('entonces' in has_name or line.endswith(':')):
+            condition = [t for t in tokens[1:]
+                         if not (t.kind == 'NAME' and t.value == 'entonces') and t.value != ':']
+            return If(condition=_slice(line, condition, 0) if condition else Expr(''))
+
+        if first == 'repetir' and 'veces' in has_name:
+            return Repeat(times=_slice(line, tokens, 1, _find_name(tokens, 'veces')))
+
+        foreach_start = -1
+        if _find_sequence(tokens, ('repetir', 'con', 'cada')) == 0:
+            foreach_start = 3
+        elif _find_sequence(tokens, ('para', 'cada')) == 0:
+            foreach_start = 2
+        if foreach_start != -1:
+            position = _find_name(tokens, 'en', foreach_start)
+            if position != -1:
+                return ForEach(var=_slice(line, tokens, foreach_start, position).text,
+                               iterable=_slice(line, tokens, position + 1))
+
+        if first == 'mientras':
+            condition = [t for t in tokens[1:] if t.value != ':']
+            return While(condition=_slice(line, condition, 0) if condition else Expr(''))
+
+        if first in ('funcion', 'función'):
+            return self.parse_signature(line, tokens[1:], FunctionDef())
+
+        # 'metodo' abre un bloque sólo con forma de cabecera o cuerpo indentado;
+        # en otros DSL es una propiedad ('metodo GET', 'metodo "iqr"')
+        if head in METHOD_KEYWORDS and len(tokens) > 1 and tokens[1].kind in ('NAME', 'STRING'):
+            if ('(' in [t.value for t in tokens] or line.endswith(':') or 'con' in has_name
+                    or _find_sequence(tokens, ('que', 'devuelve')) != -1 or self._indented_body(number)):
+                return self.parse_signature(line, tokens[1:], Method())
+
+        if head == 'constructor' and (len(tokens) == 1 or second in ('(', ':', 'con')):
+            node = Constructor()
+            self.parse_signature(line, tokens, node)
+            node.name = 'constructor'
+            return node
+
+        if head == 'intentar' and [t.value for t in tokens[1:]] in ([], [':']):
+            return Try()
+
+        if first in ('devolver', 'retornar'):
+            return Return(value=_slice(line, tokens, 1))
+
+        if first == 'lanzar':
+            return Raise(value=_slice(line, tokens, 1))
+
+        if first in CLASS_KEYWORDS:
+            name_tokens = [t for t in tokens[1:] if t.value != ':']
+            position = _find_sequence(name_tokens, ('hereda', 'de'))
+            if position != -1:
+                return ClassDef(name=_slice(line, name_tokens, 0, position).text,
+                                base=_slice(line, name_tokens, position + 2).text)
+            return ClassDef(name=_slice(line, name_tokens, 0).text if name_tokens else '')
+
+        if first == 'atributo':
+            name, type_name, value = self._split_type(line, tokens[1:])
+            return Attribute(name=name, type=type_name, value=value)
+
+        if first == 'crear' and second in DECLARE_KINDS and len(tokens) > 2:
+            rest = tokens[2:]
+            size = None
+            position = _find_sequence(rest, ('de', 'tamaño'))
+            if position != -1:
+                size = _slice(line, rest, position + 2)
+                rest = rest[:position]
+            elif len(rest) > 3 and rest[1].value == '[' and rest[-1].value == ']':
+                size = _slice(line, rest, 2, len(rest) - 1)
+                rest = rest[:1]
+            name, type_name, value = self._split_type(line, rest)
+            return Declare(kind=second, name=name, type=type_name, size=size, value=value)
+
+        if first == 'agregar':
+            position = next((i for i in range(2, len(tokens) - 1)
+                             if tokens[i].kind == 'NAME' and tokens[i].value in ('a', 'en')), -1)
+            if position != -1:
+                return Append(value=_slice(line, tokens, 1, position),
+                              target=_slice(line, tokens, position + 1).text)
+
+        position = _find_name(tokens, 'con')
+        if 0 < position < len(tokens) - 1:
+            return Call(func=_slice(line, tokens, 0, position).text,
+                        args=_slice(line, tokens, position + 1))
+
+        assignment = split_assignment(_slice(line, tokens, 0))
+        if assignment:
+            target, value = assignment
+            return Assign(target=target.text, value=value)
+
+        return ExprStatement(value=_slice(line, tokens, 0))
+
+
+class NodeVisitor:
+    """Recorre el AST despachando a visit_<Nodo>"""
+
+    def visit(self, node):
+        method = getattr(self, 'visit_' + type(node).__name__, self.generic_visit)
+        return method(node)
+
+    def generic_visit(self, node):
+        branches = node.branches() if isinstance(node, Block) else [getattr(node, 'body', [])]
+        for branch in branches:
+            for child in branch:
+                self.visit(child)
+
+
+def source_hash(source):
+    """Hash estable del código fuente"""
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+_AST_CACHE_SIZE = 128
+_ast_cache = OrderedDict()
+_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def parse(source):
+    """Parsea código Vader reutilizando el AST si ya se parseó antes"""
+    key = source_hash(source)
+    program = _ast_cache.get(key)
+    if program is not None:
+        _ast_cache.move_to_end(key)
+        _cache_stats['hits'] += 1
+        return program
+
+    _cache_stats['misses'] += 1
+    program = VaderParser().parse(source)
+    _ast_cache[key] = program
+    if len(_ast_cache) > _AST_CACHE_SIZE:
+        _ast_cache.popitem(last=False)
+    return program
+
+
+def parse_file(path):
+    """Parsea un archivo .vdr usando la caché de ASTs"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse(f.read())
+
+
+def cache_info():
+    """Estadísticas de la caché de ASTs"""
+    return {'hits': _cache_stats['hits'], 'misses': _cache_stats['misses'],
+            'size': len(_ast_cache), 'maxsize': _AST_CACHE_SIZE}
+
+
+def clear_cache():
+    _ast_cache.clear()
+    _cache_stats['hits'] = 0
+    _cache_stats['misses'] = 0
@@ -7,7 +7,46 @@ Versión: COMPLETA con todas las características avanzadas
 
 import re
 
-class JavaTranspiler:
+try:
+    from . import frontend
+except ImportError:
+    import frontend
+
+JAVA_TYPES = {
+    'numero': 'int', 'número': 'int', 'entero': 'int',
+    'decimal': 'double', 'flotante': 'double',
+    'texto': 'String', 'cadena': 'String',
+    'booleano': 'boolean', 'logico': 'boolean', 'lógico': 'boolean',
+}
+# Tipos de las colecciones genéricas (List<Integer>, no List<int>)
+JAVA_BOXED = {'int': 'Integer', 'double': 'Double', 'boolean': 'Boolean'}
+# Tipo de los parámetros del constructor sin 'tipo', según su nombre
+JAVA_PARAM_TYPES = {
+    'edad': 'int', 'numero': 'int', 'cantidad': 'int', 'id': 'int',
+    'precio': 'double', 'salario': 'double', 'peso': 'double', 'altura': 'double',
+    'activo': 'boolean', 'visible': 'boolean', 'habilitado': 'boolean',
+}
+JAVA_NAMES = {'verdadero': 'true', 'falso': 'false', 'nulo': 'null'}
+# En condiciones 'y', 'o' y 'no' son operadores lógicos
+JAVA_CONDITION_NAMES = dict(JAVA_NAMES, y='&&', o='||', no='!')
+JAVA_CALLS = {
+    'texto': 'String.valueOf({0})',
+    'numero': 'Integer.parseInt({0})',
+    'decimal': 'Double.parseDouble({0})',
+    'longitud': '{0}.length()',
+    'raiz': 'Math.sqrt({0})',
+    'potencia': 'Math.pow({0}, {1})',
+    'absoluto': 'Math.abs({0})',
+    'redondear': 'Math.round({0})',
+}
+# Tipos de 'capturar ... tipo T' que equivalen a cualquier excepción
+GENERIC_ERRORS = {'', 'error', 'excepcion', 'excepción'}
+
+_IDENTIFIER = re.compile(r'^[^\W\d]\w*$')
+_GET_ELEMENT = re.compile(r'^obtener elemento (.+?) de (\S+)$')
+
+
+class JavaTranspiler(frontend.NodeVisitor):
     def __init__(self):
         self.indent_level = 0
         self.class_name = "VaderProgram"
@@ -25,564 +64,292 @@ class JavaTranspiler:
         ])
         self.in_class = False
         self.current_class = None
-    
+        self.output = []
+        self.scopes = []
+        self.class_scope = None
+
     def transpile(self, vader_code):
         """Transpile Vader code to Java - VERSIÓN COMPLETA"""
-        lines = vader_code.split('\n')
-        java_lines = []
-        
+        self.declared_vars = set()
+        self.scopes = [self.declared_vars]
+        classes, functions, main = frontend.split_sections(frontend.parse(vader_code))
+
         # Agregar imports necesarios
-        for import_stmt in sorted(self.imports):
-            java_lines.append(f'import {import_stmt};')
-        java_lines.append('')
-        
+        self.output = [f'import {import_stmt};' for import_stmt in sorted(self.imports)]
+        self.output.append('')
+
         # Clase principal
-        java_lines.extend([
+        self.output.extend([
             f'public class {self.class_name} {{',
             '    private static Scanner scanner = new Scanner(System.in);',
             ''
         ])
-        
-        # Procesar líneas para detectar clases y funciones
+
+        # Funciones primero, después clases y main
         self.indent_level = 1
-        self.declared_vars = set()
-        
-        # Separar funciones, clases y código main
-        functions_code, classes_code, main_code = self.separate_code_sections(lines)
-        
-        # Generar funciones primero
-        if functions_code:
-            for line in functions_code:
-                if line.strip():  # Solo procesar líneas no vacías
-                    java_line = self.transpile_line(line.strip())
-                    if java_line is not None:
-                        if isinstance(java_line, list):
-                            java_lines.extend(java_line)
-                        else:
-                            java_lines.append(java_line)
-            java_lines.append('')
-        
-        # Generar clases
-        if classes_code:
-            for line in classes_code:
-                java_line = self.transpile_line(line.strip())
-                if java_line is not None:
-                    if isinstance(java_line, list):
-                        java_lines.extend(java_line)
-                    else:
-                        java_lines.append(java_line)
-            java_lines.append('')
-        
-        # Generar main
-        java_lines.append('    public static void main(String[] args) {')
+        for node in functions + classes:
+            self.visit(node)
+
+        self.output.append('    public static void main(String[] args) {')
         self.indent_level = 2
-        
-        for line in main_code:
-            line = line.strip()
-            
-            # Preservar líneas vacías y comentarios
-            if not line:
-                java_lines.append('')
-                continue
-            if line.startswith('#'):
-                java_lines.append(self.indent() + '//' + line[1:])
-                continue
-                
-            java_line = self.transpile_line(line)
-            if java_line is not None:
-                if isinstance(java_line, list):
-                    java_lines.extend(java_line)
-                else:
-                    java_lines.append(java_line)
-        
+        for node in main:
+            self.visit(node)
+
         # Cerrar main y clase
-        java_lines.extend([
+        self.output.extend([
             '        scanner.close();',
             '    }',
             '}'
         ])
-        
-        return '\n'.join(java_lines)
-    
-    def separate_code_sections(self, lines):
-        """Separa el código en funciones, clases y main basado en sintaxis Vader original"""
-        functions = []
-        classes = []
-        main_code = []
-        
-        in_function = False
-        in_class = False
-        current_block = []
-        
-        for line in lines:
-            stripped = line.strip()
-            
-            # Detectar inicio de función en sintaxis Vader
-            if stripped.startswith('funcion ') or stripped.startswith('función '):
-                if current_block:
-                    main_code.extend(current_block)
-                    current_block = []
-                in_function = True
-                in_class = False
-                current_block = [line]
-                continue
-            
-            # Detectar inicio de clase en sintaxis Vader
-            elif stripped.startswith('clase '):
-                if current_block:
-                    main_code.extend(current_block)
-                    current_block = []
-                in_class = True
-                in_function = False
-                current_block = [line]
-                continue
-            
-            # Detectar fin de bloques
-            elif stripped in ['fin', 'fin funcion', 'fin función']:
-                if in_function:
-                    current_block.append(line)
-                    functions.extend(current_block)
-                    functions.append('')
-                    in_function = False
-                    current_block = []
-                    continue
-            
-            elif stripped == 'fin clase':
-                if in_class:
-                    current_block.append(line)
-                    classes.extend(current_block)
-                    classes.append('')
-                    in_class = False
-                    current_block = []
-                    continue
-            
-            # Agregar líneas al bloque actual
-            if in_function or in_class:
-                current_block.append(line)
-            else:
-                current_block.append(line)
-        
-        # Agregar código restante a main
-        if current_block:
-            main_code.extend(current_block)
-        
-        return functions, classes, main_code
-
-    def transpile_line(self, line):
-        """Transpile a single line"""
-        # Remover comentarios inline
-        if '#' in line:
-            code_part = line.split('#')[0].strip()
-            comment_part = '//' + '#'.join(line.split('#')[1:])
-            if code_part:
-                return self.process_code_line(code_part) + '  ' + comment_part
-            else:
-                return self.indent() + '//' + line[1:]
-        
-        return self.process_code_line(line)
-    
-    def process_code_line(self, line):
-        """Procesa una línea de código - VERSIÓN COMPLETA"""
-        # Fin de bloque (funciones, clases, if, while, etc.)
-        if line in ['fin', 'fin funcion', 'fin función', 'fin clase', 'fin si', 'fin mientras']:
-            if self.indent_level > 1:
-                self.indent_level -= 1
-                return '    ' * (self.indent_level - 1) + '}'
-            return None
-        
-        current_indent = self.indent()
-        
-        # Conversiones de tipos y valores
-        line = line.replace('verdadero', 'true')
-        line = line.replace('falso', 'false')
-        line = line.replace('nulo', 'null')
-        
-        # Funciones de conversión avanzadas
-        line = re.sub(r'texto\(([^)]+)\)', r'String.valueOf(\1)', line)
-        line = re.sub(r'numero\(([^)]+)\)', r'Integer.parseInt(\1)', line)
-        line = re.sub(r'decimal\(([^)]+)\)', r'Double.parseDouble(\1)', line)
-        line = re.sub(r'longitud\(([^)]+)\)', r'\1.length()', line)
-        
-        # Operadores matemáticos avanzados
-        line = re.sub(r'raiz\(([^)]+)\)', r'Math.sqrt(\1)', line)
-        line = re.sub(r'potencia\(([^,]+),\s*([^)]+)\)', r'Math.pow(\1, \2)', line)
-        line = re.sub(r'absoluto\(([^)]+)\)', r'Math.abs(\1)', line)
-        line = re.sub(r'redondear\(([^)]+)\)', r'Math.round(\1)', line)
-        
-        # Estructuras de datos avanzadas
-        # Arrays y listas
-        if line.startswith('crear lista '):
-            var_name = line.replace('crear lista ', '').strip()
-            if var_name not in self.declared_vars:
-                self.declared_vars.add(var_name)
-                return current_indent + f'List<String> {var_name} = new ArrayList<>();'
-        
-        if line.startswith('crear array '):
-            parts = line.replace('crear array ', '').split(' de tamaño ')
-            var_name = parts[0].strip()
-            size = parts[1].strip() if len(parts) > 1 else '10'
-            if var_name not in self.declared_vars:
-                self.declared_vars.add(var_name)
-                return current_indent + f'String[] {var_name} = new String[{size}];'
-        
-        if line.startswith('crear mapa '):
-            var_name = line.replace('crear mapa ', '').strip()
-            if var_name not in self.declared_vars:
-                self.declared_vars.add(var_name)
-                return current_indent + f'Map<String, String> {var_name} = new HashMap<>();'
-        
-        # Operaciones con listas
-        if ' agregar ' in line and ' a ' in line:
-            parts = line.split(' agregar ')
-            if len(parts) == 2 and ' a ' in parts[1]:
-                item_and_list = parts[1].split(' a ')
-                item = item_and_list[0].strip()
-                list_name = item_and_list[1].strip()
-                return current_indent + f'{list_name}.add({item});'
-        
-        if ' obtener elemento ' in line and ' de ' in line:
-            parts = line.split(' obtener elemento ')
-            if len(parts) == 2 and ' de ' in parts[1]:
-                index_and_list = parts[1].split(' de ')
-                index = index_and_list[0].strip()
-                list_name = index_and_list[1].strip()
-                var_name = parts[0].strip() if parts[0].strip() else 'elemento'
-                if var_name not in self.declared_vars:
-                    self.declared_vars.add(var_name)
-                    return current_indent + f'String {var_name} = {list_name}.get({index});'
-                else:
-                    return current_indent + f'{var_name} = {list_name}.get({index});'
-        
-        # Print statements
-        if line.startswith('mostrar ') or line.startswith('decir '):
-            content = line.split(' ', 1)[1]
-            # Manejo de concatenación avanzada
-            if ' + ' in content:
-                return current_indent + f'System.out.println({content});'
-            else:
-                return current_indent + f'System.out.println({content});'
-        
-        # Input statements
-        if 'preguntar ' in line and 'guardar' in line:
-            if 'guardar la respuesta en' in line:
-                parts = line.split('guardar la respuesta en')
-                question = parts[0].replace('preguntar ', '').strip()
-                var_name = parts[1].strip()
-            elif 'guárdalo en' in line:
-                parts = line.split('guárdalo en')
-                question = parts[0].replace('preguntar ', '').strip()
-                var_name = parts[1].strip()
-            else:
-                return current_indent + line + ';'
-            
-            if var_name not in self.declared_vars:
-                self.declared_vars.add(var_name)
-                return current_indent + f'System.out.print({question}); String {var_name} = scanner.nextLine();'
-            else:
-                return current_indent + f'System.out.print({question}); {var_name} = scanner.nextLine();'
-        
-        # Condicionales
-        if line.startswith('si ') and ('entonces' in line or line.endswith(':')):
-            condition = line.replace('si ', '').replace(' entonces', '').replace(':', '').strip()
-            # Convertir operadores
-            condition = condition.replace(' es igual a ', ' == ')
-            condition = condition.replace(' es mayor que ', ' > ')
-            condition = condition.replace(' es menor que ', ' < ')
-            condition = condition.replace(' mayor que ', ' > ')
-            condition = condition.replace(' menor que ', ' < ')
-            condition = condition.replace(' igual a ', ' == ')
-            
-            self.indent_level += 1
-            return current_indent + f'if ({condition}) {{'
-        
-        # Else
-        if line == 'sino' or line == 'si no':
-            if self.indent_level > 2:
-                self.indent_level -= 1
-            else_indent = self.indent()
-            self.indent_level += 1
-            return else_indent + '} else {'
-        
-        # Bucles for
-        if line.startswith('repetir ') and ' veces' in line:
-            times = line.replace('repetir ', '').replace(' veces', '').strip()
-            self.indent_level += 1
-            return current_indent + f'for (int i = 0; i < {times}; i++) {{'
-        
-        # Bucles while
-        if line.startswith('mientras '):
-            condition = line.replace('mientras ', '').replace(':', '').strip()
-            condition = condition.replace(' es igual a ', ' == ')
-            condition = condition.replace(' es mayor que ', ' > ')
-            condition = condition.replace(' es menor que ', ' < ')
-            condition = condition.replace(' mayor que ', ' > ')
-            condition = condition.replace(' menor que ', ' < ')
-            condition = condition.replace(' igual a ', ' == ')
-            self.indent_level += 1
-            return current_indent + f'while ({condition}) {{'
-        
-        # Definición de funciones avanzadas con tipos
-        if line.startswith('funcion ') or line.startswith('función '):
-            func_def = line.replace('funcion ', '').replace('función ', '')
-            
-            # Detectar tipo de retorno
-            return_type = 'void'
-            if ' que devuelve ' in func_def:
-                parts = func_def.split(' que devuelve ')
-                func_def = parts[0]
-                return_type_str = parts[1].replace(':', '').strip()
-                if return_type_str in ['numero', 'entero']:
-                    return_type = 'int'
-                elif return_type_str in ['decimal', 'flotante']:
-                    return_type = 'double'
-                elif return_type_str in ['texto', 'cadena']:
-                    return_type = 'String'
-                elif return_type_str in ['booleano', 'logico']:
-                    return_type = 'boolean'
-            
-            if ' con ' in func_def:
-                name, params = func_def.split(' con ', 1)
-                name = name.strip()
-                params_str = params.replace(':', '').strip()
-                
-                # Procesar parámetros con tipos
-                typed_params = []
-                if params_str:
-                    param_list = [p.strip() for p in params_str.replace(' y ', ', ').split(',')]
-                    for param in param_list:
-                        if ' tipo ' in param:
-                            param_parts = param.split(' tipo ')
-                            param_name = param_parts[0].strip()
-                            param_type = param_parts[1].strip()
-                            if param_type in ['numero', 'entero']:
-                                typed_params.append(f'int {param_name}')
-                            elif param_type in ['decimal', 'flotante']:
-                                typed_params.append(f'double {param_name}')
-                            elif param_type in ['texto', 'cadena']:
-                                typed_params.append(f'String {param_name}')
-                            elif param_type in ['booleano', 'logico']:
-                                typed_params.append(f'boolean {param_name}')
-                            else:
-                                typed_params.append(f'String {param_name}')
-                        else:
-                            typed_params.append(f'String {param}')
-                
-                params_final = ', '.join(typed_params)
-                self.indent_level += 1
-                return current_indent + f'public static {return_type} {name}({params_final}) {{'
-            else:
-                name = func_def.replace(':', '').strip()
-                self.indent_level += 1
-                return current_indent + f'public static {return_type} {name}() {{'
-        
-        # Definición de clases avanzadas
-        if line.startswith('clase '):
-            class_def = line.replace('clase ', '').replace(':', '').strip()
-            
-            # Manejo de herencia
-            if ' hereda de ' in class_def:
-                parts = class_def.split(' hereda de ')
-                class_name = parts[0].strip()
-                parent_class = parts[1].strip()
-                self.in_class = True
-                self.current_class = class_name
-                self.indent_level += 1
-                return current_indent + f'public static class {class_name} extends {parent_class} {{'
-            else:
-                class_name = class_def
-                self.in_class = True
-                self.current_class = class_name
-                self.indent_level += 1
-                return current_indent + f'public static class {class_name} {{'
-        
-        # Atributos de clase
-        if line.startswith('atributo ') and self.in_class:
-            attr_def = line.replace('atributo ', '').strip()
-            if ' tipo ' in attr_def:
-                parts = attr_def.split(' tipo ')
-                attr_name = parts[0].strip()
-                attr_type = parts[1].strip()
-                if attr_type in ['numero', 'entero']:
-                    java_type = 'int'
-                elif attr_type in ['decimal', 'flotante']:
-                    java_type = 'double'
-                elif attr_type in ['texto', 'cadena']:
-                    java_type = 'String'
-                elif attr_type in ['booleano', 'logico']:
-                    java_type = 'boolean'
-                else:
-                    java_type = 'String'
-                return current_indent + f'private {java_type} {attr_name};'
-            else:
-                return current_indent + f'private String {attr_def};'
-        
-        # Constructor de clase
-        if line.startswith('constructor con '):
-            params = line.replace('constructor con ', '').replace(':', '').strip()
-            if params:
-                # Procesar parámetros con tipos explícitos
-                typed_params = []
-                param_list = [p.strip() for p in params.replace(' y ', ', ').split(',')]
-                for param in param_list:
-                    if ' tipo ' in param:
-                        param_parts = param.split(' tipo ')
-                        param_name = param_parts[0].strip()
-                        param_type = param_parts[1].strip()
-                        if param_type in ['numero', 'entero']:
-                            typed_params.append(f'int {param_name}')
-                        elif param_type in ['decimal', 'flotante']:
-                            typed_params.append(f'double {param_name}')
-                        elif param_type in ['texto', 'cadena']:
-                            typed_params.append(f'String {param_name}')
-                        elif param_type in ['booleano', 'logico']:
-                            typed_params.append(f'boolean {param_name}')
-                        else:
-                            typed_params.append(f'String {param_name}')
-                    else:
-                        # Inferir tipo basado en el nombre del parámetro
-                        if param in ['edad', 'numero', 'cantidad', 'id']:
-                            typed_params.append(f'int {param}')
-                        elif param in ['precio', 'salario', 'peso', 'altura']:
-                            typed_params.append(f'double {param}')
-                        elif param in ['activo', 'visible', 'habilitado']:
-                            typed_params.append(f'boolean {param}')
-                        else:
-                            typed_params.append(f'String {param}')
-                
-                params_final = ', '.join(typed_params)
-                self.indent_level += 1
-                return current_indent + f'public {self.current_class}({params_final}) {{'
-            else:
-                self.indent_level += 1
-                return current_indent + f'public {self.current_class}() {{'
-        
-        # Retorno de funciones
-        if line.startswith('retornar ') or line.startswith('devolver '):
-            value = line.replace('retornar ', '').replace('devolver ', '').strip()
-            # Si el valor contiene comillas, mantenerlas; si no, asumimos que es una expresión
-            if '"' in value or "'" in value:
-                return current_indent + f'return {value};'
-            else:
-                # Para expresiones o variables, mantener como está
-                return current_indent + f'return {value};'
-        
-        # Manejo de errores y excepciones
-        if line.startswith('intentar'):
-            self.indent_level += 1
-            return current_indent + 'try {'
-        
-        if line.startswith('capturar '):
-            exception_type = line.replace('capturar ', '').strip()
-            if self.indent_level > 1:
-                self.indent_level -= 1
-            catch_indent = self.indent()
-            self.indent_level += 1
-            if exception_type in ['error', 'excepcion', 'excepción']:
-                return catch_indent + '} catch (Exception e) {'
-            else:
-                return catch_indent + f'}} catch ({exception_type} e) {{'
-        
-        if line.startswith('finalmente'):
-            if self.indent_level > 1:
-                self.indent_level -= 1
-            finally_indent = self.indent()
-            self.indent_level += 1
-            return finally_indent + '} finally {'
-        
-        if line.startswith('lanzar '):
-            exception = line.replace('lanzar ', '').strip()
-            return current_indent + f'throw new Exception({exception});'
-        
-        # Asignación de variables con detección avanzada de tipos
-        if ' = ' in line and not any(line.startswith(kw) for kw in ['if', 'while', 'for', 'public', 'try', 'catch']):
-            # Convertir operadores en la asignación
-            line_converted = line
-            line_converted = line_converted.replace(' mayor que ', ' > ')
-            line_converted = line_converted.replace(' menor que ', ' < ')
-            line_converted = line_converted.replace(' igual a ', ' == ')
-            line_converted = line_converted.replace(' es mayor que ', ' > ')
-            line_converted = line_converted.replace(' es menor que ', ' < ')
-            line_converted = line_converted.replace(' es igual a ', ' == ')
-            
-            var_name = line_converted.split(' = ')[0].strip()
-            right_side = line_converted.split(' = ', 1)[1].strip()
-            
-            if var_name not in self.declared_vars:
-                self.declared_vars.add(var_name)
-                # Inferencia de tipos avanzada
-                var_type = self.infer_java_type(right_side)
-                return current_indent + f'{var_type} {line_converted};'
-            else:
-                return current_indent + line_converted + ';'
-        
-        # Creación explícita de variables con tipo
-        if line.startswith('crear variable '):
-            var_def = line.replace('crear variable ', '').strip()
-            if ' tipo ' in var_def:
-                parts = var_def.split(' tipo ')
-                var_name = parts[0].strip()
-                var_type_str = parts[1].strip()
-                
-                # Mapear tipos de Vader a Java
-                if var_type_str in ['numero', 'entero']:
-                    java_type = 'int'
-                elif var_type_str in ['decimal', 'flotante']:
-                    java_type = 'double'
-                elif var_type_str in ['texto', 'cadena']:
-                    java_type = 'String'
-                elif var_type_str in ['booleano', 'logico']:
-                    java_type = 'boolean'
-                elif var_type_str == 'lista':
-                    java_type = 'List<String>'
-                elif var_type_str == 'mapa':
-                    java_type = 'Map<String, String>'
-                else:
-                    java_type = 'String'
-                
-                if var_name not in self.declared_vars:
-                    self.declared_vars.add(var_name)
-                    if java_type == 'List<String>':
-                        return current_indent + f'{java_type} {var_name} = new ArrayList<>();'
-                    elif java_type == 'Map<String, String>':
-                        return current_indent + f'{java_type} {var_name} = new HashMap<>();'
-                    else:
-                        return current_indent + f'{java_type} {var_name};'
-            else:
-                # Variable sin tipo explícito
-                if var_def not in self.declared_vars:
-                    self.declared_vars.add(var_def)
-                    return current_indent + f'String {var_def};'
-        
+        return '\n'.join(frontend.collapse_blank_lines(self.output))
+
+    def expr(self, expr, names=JAVA_NAMES):
+        """Convierte una expresión Vader a Java"""
+        return expr.render(names, JAVA_CALLS)
+
+    def condition(self, expr):
+        return self.expr(expr, JAVA_CONDITION_NAMES)
+
+    def comment(self, text):
+        return '//' + text.strip()[1:]
+
+    def emit(self, node, code):
+        """Agrega una línea con la indentación actual y el comentario inline"""
+        line = self.indent() + code
+        if node.comment:
+            line += '  ' + self.comment(node.comment)
+        self.output.append(line)
+
+    def suite(self, body, names=()):
+        """Cuerpo de un bloque con su propio ámbito de variables"""
+        self.scopes.append(set(names))
+        self.indent_level += 1
+        for child in body:
+            self.visit(child)
+        self.indent_level -= 1
+        self.scopes.pop()
+
+    def block(self, node, header, names=()):
+        """Emite la cabecera de un bloque, su cuerpo, su rama 'sino' y el cierre"""
+        self.emit(node, header + ' {')
+        self.suite(node.body, names)
+        if node.orelse is not None:
+            self.output.append(self.indent() + '} else {')
+            self.suite(node.orelse)
+        self.output.append(self.indent() + '}')
+
+    def is_declared(self, name):
+        return any(name in scope for scope in self.scopes)
+
+    def declare(self, name):
+        self.scopes[-1].add(name)
+
+    def java_type(self, vader_type, default='String'):
+        """Tipo de Java para un tipo Vader ('numero', 'texto', 'Persona')"""
+        if not vader_type:
+            return default
+        return JAVA_TYPES.get(vader_type, vader_type)
+
+    def params(self, node, inferred=None):
+        params = []
+        for name in node.params:
+            default = (inferred or {}).get(name, 'String')
+            params.append(f'{self.java_type(node.param_types.get(name), default)} {name}')
+        return ', '.join(params)
+
+    def returns(self, node):
+        return self.java_type(node.returns, 'void')
+
+    def visit_Blank(self, node):
+        self.output.append('')
+
+    def visit_Comment(self, node):
+        self.output.append(self.indent() + self.comment(node.text))
+
+    def visit_End(self, node):
+        # 'fin' sin bloque abierto: no genera código
+        if node.comment:
+            self.output.append(self.indent() + self.comment(node.comment))
+
+    def visit_Print(self, node):
+        self.emit(node, f'System.out.println({self.expr(node.value)});')
+
+    def visit_Input(self, node):
+        var_name = node.target
+        self.emit(node, f'System.out.print({self.expr(node.prompt)});')
+        if self.is_declared(var_name):
+            return self.output.append(self.indent() + f'{var_name} = scanner.nextLine();')
+        self.declare(var_name)
+        self.output.append(self.indent() + f'String {var_name} = scanner.nextLine();')
+
+    def visit_If(self, node):
+        self.block(node, f'if ({self.condition(node.condition)})')
+
+    def visit_Else(self, node):
+        # 'sino' sin 'si' que lo abra: su cuerpo queda como bloque suelto
+        self.emit(node, '// sino')
+        self.output.append(self.indent() + '{')
+        self.suite(node.body)
+        self.output.append(self.indent() + '}')
+
+    def visit_Repeat(self, node):
+        self.block(node, f'for (int i = 0; i < {self.expr(node.times)}; i++)', ['i'])
+
+    def visit_ForEach(self, node):
+        self.block(node, f'for (var {node.var} : {self.expr(node.iterable)})', [node.var])
+
+    def visit_While(self, node):
+        self.block(node, f'while ({self.condition(node.condition)})')
+
+    def visit_FunctionDef(self, node):
+        if self.in_class:
+            return self.visit_Method(node)
+        self.declared_functions.add(node.name)
+        self.block(node, f'public static {self.returns(node)} {node.name}({self.params(node)})', node.params)
+        self.output.append('')
+
+    def visit_Method(self, node):
+        self.block(node, f'public {self.returns(node)} {node.name}({self.params(node)})', node.params)
+        self.output.append('')
+
+    def visit_Constructor(self, node):
+        name = self.current_class or self.class_name
+        self.block(node, f'public {name}({self.params(node, JAVA_PARAM_TYPES)})', node.params)
+        self.output.append('')
+
+    def visit_ClassDef(self, node):
+        self.declared_classes.add(node.name)
+        base = f' extends {node.base}' if node.base else ''
+        self.in_class = True
+        self.current_class = node.name
+        self.emit(node, f'public static class {node.name}{base} {{')
+        self.class_scope = set()
+        self.scopes.append(self.class_scope)
+        self.indent_level += 1
+        for child in node.body:
+            self.visit(child)
+        self.indent_level -= 1
+        self.scopes.pop()
+        self.class_scope = None
+        self.output.append(self.indent() + '}')
+        self.output.append('')
+        self.in_class = False
+        self.current_class = None
+
+    def visit_Attribute(self, node):
+        value = self.expr(node.value) if node.value is not None else ''
+        java_type = self.java_type(node.type, self.infer_java_type(value) if value else 'String')
+        self.emit(node, f'private {java_type} {node.name}' + (f' = {value};' if value else ';'))
+
+    def visit_Declare(self, node):
+        name = node.name
+        kind = node.kind
+        element = node.type
+        # 'crear variable x tipo lista' equivale a 'crear lista x'
+        if kind == 'variable' and element in ('lista', 'mapa'):
+            kind, element = element, ''
+        self.declare(name)
+        java_type = self.java_type(element)
+        boxed = JAVA_BOXED.get(java_type, java_type)
+        if kind == 'lista':
+            return self.emit(node, f'List<{boxed}> {name} = new ArrayList<>();')
+        if kind == 'mapa':
+            return self.emit(node, f'Map<String, {boxed}> {name} = new HashMap<>();')
+        if kind == 'array':
+            size = self.expr(node.size) if node.size else '10'
+            return self.emit(node, f'{java_type}[] {name} = new {java_type}[{size}];')
+        value = f' = {self.expr(node.value)}' if node.value is not None else ''
+        self.emit(node, f'{java_type} {name}{value};')
+
+    def visit_Append(self, node):
+        self.emit(node, f'{node.target}.add({self.expr(node.value)});')
+
+    def visit_Try(self, node):
+        self.emit(node, 'try {')
+        self.suite(node.body)
+        for handler in node.handlers:
+            # 'capturar error' captura cualquier excepción como 'e'
+            exception = 'Exception' if handler.type in GENERIC_ERRORS else handler.type
+            name = 'e' if handler.name in GENERIC_ERRORS else handler.name
+            line = self.indent() + f'}} catch ({exception} {name}) {{'
+            if handler.comment:
+                line += '  ' + self.comment(handler.comment)
+            self.output.append(line)
+            self.suite(handler.body, [name])
+        if node.finalbody is not None or not node.handlers:
+            self.output.append(self.indent() + '} finally {')
+            self.suite(node.finalbody or [])
+        self.output.append(self.indent() + '}')
+
+    def visit_Raise(self, node):
+        self.emit(node, f'throw new RuntimeException({self.expr(node.value)});')
+
+    def visit_Return(self, node):
+        value = self.expr(node.value)
+        self.emit(node, f'return {value};' if value else 'return;')
+
+    def visit_Call(self, node):
+        self.emit(node, f'{node.func}({self.expr(node.args)});')
+
+    def visit_Assign(self, node):
+        element = _get_element(node.value.text)
+        if element:
+            index, list_name = element
+            return self.assign(node, node.target, f'{list_name}.get({index})', 'String')
+        self.assign(node, node.target, self.expr(node.value))
+
+    def assign(self, node, var_name, right_side, var_type=None):
+        """Asignación; la primera de una variable local la declara con su tipo"""
+        if not _IDENTIFIER.match(var_name) or self.is_declared(var_name):
+            return self.emit(node, f'{var_name} = {right_side};')
+
+        var_type = var_type or self.infer_java_type(right_side)
+        if self.scopes[-1] is self.class_scope:
+            # Asignación en el cuerpo de la clase: un atributo con valor inicial
+            return self.emit(node, f'private {var_type} {var_name} = {right_side};')
+        self.declare(var_name)
+        self.emit(node, f'{var_type} {var_name} = {right_side};')
+
+    def visit_ExprStatement(self, node):
+        # 'x obtener elemento I de lista'
+        text = node.value.text
+        position = text.find('obtener elemento ')
+        element = _get_element(text[position:]) if position != -1 else None
+        if element:
+            index, list_name = element
+            target = text[:position].rstrip(' =') or 'elemento'
+            return self.assign(node, target, f'{list_name}.get({index})', 'String')
+
         # Llamadas a funciones o expresiones
-        if not line.endswith(';'):
-            return current_indent + line + ';'
-        else:
-            return current_indent + line
-    
+        code = self.expr(node.value)
+        if not code.endswith((';', '{', '}')):
+            code += ';'
+        self.emit(node, code)
+
     def infer_java_type(self, value):
         """Infiere el tipo de Java basado en el valor"""
         value = value.strip()
-        
+
         # Booleanos
         if value in ['true', 'false', 'verdadero', 'falso']:
             return 'boolean'
-        
+
         # Strings
         if (value.startswith('"') and value.endswith('"')) or (value.startswith("'") and value.endswith("'")):
             return 'String'
-        
+
         # Números enteros
         if value.isdigit() or (value.startswith('-') and value[1:].isdigit()):
             return 'int'
-        
+
         # Números decimales
         if '.' in value and value.replace('.', '').replace('-', '').isdigit():
             return 'double'
-        
+
         # Arrays o listas
         if value.startswith('[') and value.endswith(']'):
             return 'String[]'
-        
+
         # Llamadas a métodos que devuelven tipos específicos
         if 'new ArrayList' in value:
             return 'List<String>'
@@ -592,13 +359,19 @@ class JavaTranspiler:
             return 'int'
         elif 'Math.' in value:
             return 'double'
-        
+
         # Por defecto, String
         return 'String'
-    
+
     def indent(self):
         return '    ' * self.indent_level
 
+
+def _get_element(text):
+    """'obtener elemento I de lista': devuelve (I, lista) o None"""
+    match = _GET_ELEMENT.match(text)
+    return match.groups() if match else None
+
 def transpile_to_java(vader_code):
     transpiler = JavaTranspiler()
     return transpiler.transpile(vader_code)
@@ -1,195 +1,181 @@
 # JavaScript Transpiler for Vader - VERSIÓN CORREGIDA
 # Converts Vader syntax to JavaScript code
 
-import re
+try:
+    from . import frontend
+except ImportError:
+    import frontend
 
-class JavaScriptTranspiler:
+JS_NAMES = {'verdadero': 'true', 'falso': 'false', 'nulo': 'null'}
+JS_CALLS = {'texto': 'String'}
+JS_OPS = {'==': '==='}
+JS_DECLARE = {'lista': '[]', 'mapa': '{}'}
+
+
+class JavaScriptTranspiler(frontend.NodeVisitor):
     def __init__(self):
         self.indent_level = 0
         self.in_class = False
         self.in_function = False
+        self.output = []
     
     def transpile(self, vader_code):
         """Transpile Vader code to JavaScript"""
-        lines = vader_code.split('\n')
-        js_lines = []
-        
-        for line in lines:
-            original_line = line
-            line = line.strip()
-            
-            # Preservar líneas vacías y comentarios
-            if not line:
-                js_lines.append('')
-                continue
-            if line.startswith('#'):
-                js_lines.append('//' + line[1:])  # Convertir # a //
-                continue
-                
-            js_line = self.transpile_line(line)
-            if js_line is not None:
-                js_lines.append(js_line)
-        
-        return '\n'.join(js_lines)
-    
-    def transpile_line(self, line):
-        """Transpile a single line"""
-        # Remover comentarios inline
-        if '#' in line:
-            code_part = line.split('#')[0].strip()
-            comment_part = '//' + '#'.join(line.split('#')[1:])
-            if code_part:
-                return self.process_code_line(code_part) + '  ' + comment_part
-            else:
-                return '//' + line[1:]  # Solo comentario
-        
-        return self.process_code_line(line)
-    
-    def process_code_line(self, line):
-        """Procesa una línea de código"""
-        # Manejo de indentación para estructuras de control
-        if line in ['fin si', 'fin', 'fin funcion', 'fin función', 'fin clase', 'fin mientras', 'fin repetir']:
-            if self.indent_level > 0:
-                self.indent_level -= 1
-            return self.indent() + '}'
-        
-        current_indent = self.indent()
-        
-        # Variables booleanas
-        line = line.replace('verdadero', 'true')
-        line = line.replace('falso', 'false')
-        line = line.replace('nulo', 'null')
-        
-        # Función texto() para conversión a string
-        line = re.sub(r'texto\(([^)]+)\)', r'String(\1)', line)
-        
-        # Print statements
-        if line.startswith('mostrar ') or line.startswith('decir '):
-            content = line.split(' ', 1)[1]
-            return current_indent + f'console.log({content});'
-        
-        # Input statements
-        if 'preguntar ' in line and 'guardar' in line:
-            if 'guardar la respuesta en' in line:
-                parts = line.split('guardar la respuesta en')
-                question = parts[0].replace('preguntar ', '').strip()
-                var_name = parts[1].strip()
-            elif 'guárdalo en' in line:
-                parts = line.split('guárdalo en')
-                question = parts[0].replace('preguntar ', '').strip()
-                var_name = parts[1].strip()
-            else:
-                return current_indent + line + ';'  # No reconocido
-            return current_indent + f'let {var_name} = prompt({question});'
-        
-        # Condicionales
-        if line.startswith('si ') and ('entonces' in line or line.endswith(':')):
-            condition = line.replace('si ', '').replace(' entonces', '').replace(':', '').strip()
-            # Convertir operadores
-            condition = condition.replace(' es igual a ', ' === ')
-            condition = condition.replace(' es mayor que ', ' > ')
-            condition = condition.replace(' es menor que ', ' < ')
-            condition = condition.replace(' mayor que ', ' > ')
-            condition = condition.replace(' menor que ', ' < ')
-            condition = condition.replace(' igual a ', ' === ')
-            
-            self.indent_level += 1
-            return current_indent + f'if ({condition}) {{'
-        
-        # Else
-        if line == 'sino' or line == 'si no':
-            # Reducir indentación temporalmente para el else
-            if self.indent_level > 0:
-                self.indent_level -= 1
-            else_indent = self.indent()
-            self.indent_level += 1  # Restaurar para el contenido del else
-            return else_indent + '} else {'
-        
-        # Bucles for
-        if line.startswith('repetir ') and ' veces' in line:
-            times = line.replace('repetir ', '').replace(' veces', '').strip()
-            self.indent_level += 1
-            return current_indent + f'for (let i = 0; i < {times}; i++) {{'
-        
-        if 'repetir con cada' in line or 'para cada' in line:
-            # Formato: "repetir con cada X en Y" o "para cada X en Y"
-            line_clean = line.replace('repetir con cada ', '').replace('para cada ', '')
-            if ' en ' in line_clean:
-                parts = line_clean.split(' en ')
-                var_name = parts[0].strip()
-                iterable = parts[1].strip()
-                self.indent_level += 1
-                return current_indent + f'for (let {var_name} of {iterable}) {{'
-        
-        # Bucles while
-        if line.startswith('mientras '):
-            condition = line.replace('mientras ', '').replace(':', '').strip()
-            # Convertir operadores de comparación
-            condition = condition.replace(' es igual a ', ' === ')
-            condition = condition.replace(' es mayor que ', ' > ')
-            condition = condition.replace(' es menor que ', ' < ')
-            condition = condition.replace(' mayor que ', ' > ')
-            condition = condition.replace(' menor que ', ' < ')
-            condition = condition.replace(' igual a ', ' === ')
-            self.indent_level += 1
-            return current_indent + f'while ({condition}) {{'
-        
-        # Definición de funciones
-        if line.startswith('funcion ') or line.startswith('función '):
-            func_def = line.replace('funcion ', '').replace('función ', '')
-            if ' con ' in func_def:
-                name, params = func_def.split(' con ', 1)
-                name = name.strip()
-                params = params.replace(':', '').replace(' y ', ', ').strip()
-                self.indent_level += 1
-                self.in_function = True
-                return current_indent + f'function {name}({params}) {{'
-            else:
-                name = func_def.replace(':', '').strip()
-                self.indent_level += 1
-                self.in_function = True
-                return current_indent + f'function {name}() {{'
-        
-        # Return statements
-        if line.startswith('devolver ') or line.startswith('retornar '):
-            value = line.split(' ', 1)[1]
-            return current_indent + f'return {value};'
-        
-        # Definición de clases
-        if line.startswith('clase '):
-            class_name = line.replace('clase ', '').replace(':', '').strip()
-            self.in_class = True
-            self.indent_level += 1
-            return current_indent + f'class {class_name} {{'
-        
-        # Asignación de variables
-        if ' = ' in line and not any(line.startswith(kw) for kw in ['if', 'while', 'for', 'function', 'class']):
-            # Convertir operadores en la asignación también
-            line_converted = line
-            line_converted = line_converted.replace(' mayor que ', ' > ')
-            line_converted = line_converted.replace(' menor que ', ' < ')
-            line_converted = line_converted.replace(' igual a ', ' === ')
-            line_converted = line_converted.replace(' es mayor que ', ' > ')
-            line_converted = line_converted.replace(' es menor que ', ' < ')
-            line_converted = line_converted.replace(' es igual a ', ' === ')
-            
-            # Detectar si es primera declaración o reasignación
-            var_name = line_converted.split(' = ')[0].strip()
-            
+        self.indent_level = 0
+        self.output = []
+        self.visit(frontend.parse(vader_code))
+        return '\n'.join(self.output)
+    
+    def expr(self, expr):
+        """Convierte una expresión Vader a JavaScript"""
+        return expr.render(JS_NAMES, JS_CALLS, JS_OPS)
+    
+    def comment(self, text):
+        """Convierte un comentario # a //"""
+        return '//' + text[1:]
+    
+    def emit(self, node, code):
+        """Agrega una línea con la indentación actual y el comentario inline"""
+        line = self.indent() + code
+        if node.comment:
+            line += '  ' + self.comment(node.comment)
+        self.output.append(line)
+    
+    def block(self, node, header):
+        """Emite la cabecera de un bloque, su cuerpo, su rama 'sino' y el cierre"""
+        self.emit(node, header + ' {')
+        self.suite(node.body)
+        if node.orelse is not None:
+            self.clause('} else {', node.else_comment)
+            self.suite(node.orelse)
+        if node.closed:
+            self.output.append(self.indent() + '}')
+    
+    def suite(self, body):
+        self.indent_level += 1
+        for child in body:
+            self.visit(child)
+        self.indent_level -= 1
+    
+    def clause(self, header, comment=None):
+        """Rama de un bloque ya abierto ('} else {', '} catch (e) {')"""
+        line = self.indent() + header
+        if comment:
+            line += '  ' + self.comment(comment)
+        self.output.append(line)
+    
+    def statement(self, node):
+        """Asignación o expresión terminada en ';'"""
+        assignment = frontend.split_assignment(node.source)
+        if assignment:
+            target, value = assignment
+            var_name = target.text
+            right_side = self.expr(value)
             # Si la variable ya existe en el lado derecho, es una reasignación
-            right_side = line_converted.split(' = ', 1)[1]
             if var_name in right_side:
-                # Es una reasignación, no usar 'let'
-                return current_indent + line_converted + ';'
-            else:
-                # Es una nueva declaración
-                return current_indent + 'let ' + line_converted + ';'
-        
-        # Llamadas a funciones o expresiones
-        if not line.endswith(';'):
-            return current_indent + line + ';'
+                return self.emit(node, f'{var_name} = {right_side};')
+            return self.emit(node, f'let {var_name} = {right_side};')
+        
+        code = self.expr(node.source)
+        # Una línea que abre un bloque ('forEach(anchor => {') no lleva ';'
+        if not code.endswith((';', '{')):
+            code += ';'
+        self.emit(node, code)
+    
+    def visit_Program(self, node):
+        for child in node.body:
+            self.visit(child)
+    
+    def visit_Blank(self, node):
+        self.output.append('')
+    
+    def visit_Comment(self, node):
+        self.output.append(self.comment(node.text.strip()))
+    
+    def visit_End(self, node):
+        self.emit(node, '}')
+    
+    def visit_Print(self, node):
+        self.emit(node, f'console.log({self.expr(node.value)});')
+    
+    def visit_Input(self, node):
+        self.emit(node, f'let {node.target} = prompt({self.expr(node.prompt)});')
+    
+    def visit_If(self, node):
+        self.block(node, f'if ({self.expr(node.condition)})')
+    
+    def visit_Else(self, node):
+        self.block(node, '} else')
+    
+    def visit_Repeat(self, node):
+        self.block(node, f'for (let i = 0; i < {self.expr(node.times)}; i++)')
+    
+    def visit_ForEach(self, node):
+        self.block(node, f'for (let {node.var} of {self.expr(node.iterable)})')
+    
+    def visit_While(self, node):
+        self.block(node, f'while ({self.expr(node.condition)})')
+    
+    def visit_FunctionDef(self, node):
+        self.in_function = True
+        self.block(node, f'function {node.name}({", ".join(node.params)})')
+    
+    def visit_Method(self, node):
+        self.block(node, f'{node.name}({", ".join(node.params)})')
+    
+    def visit_Constructor(self, node):
+        self.block(node, f'constructor({", ".join(node.params)})')
+    
+    def visit_Try(self, node):
+        self.emit(node, 'try {')
+        self.suite(node.body)
+        for handler in node.handlers:
+            self.clause(f'}} catch ({handler.name or "error"}) {{', handler.comment)
+            self.suite(handler.body)
+        if node.finalbody is not None or not node.handlers:
+            self.clause('} finally {', node.final_comment)
+            self.suite(node.finalbody or [])
+        if node.closed:
+            self.output.append(self.indent() + '}')
+    
+    def visit_Raise(self, node):
+        self.emit(node, f'throw new Error({self.expr(node.value)});')
+    
+    def visit_Declare(self, node):
+        if node.value is not None:
+            self.emit(node, f'let {node.name} = {self.expr(node.value)};')
+        elif node.kind == 'array' and node.size:
+            self.emit(node, f'let {node.name} = new Array({self.expr(node.size)});')
+        elif node.kind in JS_DECLARE or node.kind == 'array':
+            self.emit(node, f'let {node.name} = {JS_DECLARE.get(node.kind, "[]")};')
         else:
-            return current_indent + line
+            self.emit(node, f'let {node.name};')
+    
+    def visit_Attribute(self, node):
+        value = f' = {self.expr(node.value)}' if node.value is not None else ''
+        self.emit(node, f'{node.name}{value};')
+    
+    def visit_Append(self, node):
+        self.emit(node, f'{node.target}.push({self.expr(node.value)});')
+    
+    def visit_Return(self, node):
+        self.emit(node, f'return {self.expr(node.value)};')
+    
+    def visit_ClassDef(self, node):
+        self.in_class = True
+        base = f' extends {node.base}' if node.base else ''
+        self.block(node, f'class {node.name}{base}')
+    
+    def visit_Call(self, node):
+        # JavaScript no traduce la forma 'funcion con argumentos'
+        self.statement(node)
+    
+    def visit_Assign(self, node):
+        self.statement(node)
+    
+    def visit_ExprStatement(self, node):
+        # Llamadas a funciones o expresiones
+        self.statement(node)
     
     def indent(self):
         """Return current indentation"""
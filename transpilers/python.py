@@ -3,187 +3,195 @@
 
 import re
 
-class PythonTranspiler:
+try:
+    from . import frontend
+except ImportError:
+    import frontend
+
+PYTHON_NAMES = {'verdadero': 'True', 'falso': 'False', 'nulo': 'None'}
+PYTHON_CALLS = {'texto': 'str'}
+PYTHON_DECLARE = {'variable': 'None', 'lista': '[]', 'mapa': '{}'}
+# Tipos de 'capturar ... tipo T' que equivalen a cualquier excepción
+GENERIC_ERRORS = {'', 'error', 'excepcion', 'excepción'}
+# conectar base_datos "ventas.db" | conectar base datos mysql "mi_bd" | ... tipo="mysql"
+_CONNECT = re.compile(r'^conectar\s+base[_ ]datos(?:\s+(\w+))?\s+"([^"]*)"(?:\s+tipo\s*=\s*"(\w+)")?$')
+# Los programas que consultan la base de datos importan el ORM de Vader
+PYTHON_DB_PRELUDE = [
+    'try:',
+    '    from vader_database_system import conectar',
+    'except ImportError:',
+    '    from src.vader_database_system import conectar',
+]
+
+
+class PythonTranspiler(frontend.NodeVisitor):
     def __init__(self):
         self.indent_level = 0
         self.in_class = False
         self.in_function = False
+        self.output = []
+        self.names = PYTHON_NAMES
     
     def transpile(self, vader_code):
         """Transpile Vader code to Python"""
-        lines = vader_code.split('\n')
-        python_lines = []
-        
-        for line in lines:
-            original_line = line
-            line = line.strip()
-            
-            # Preservar líneas vacías y comentarios
-            if not line:
-                python_lines.append('')
-                continue
-            if line.startswith('#'):
-                python_lines.append(original_line)
-                continue
-                
-            python_line = self.transpile_line(line)
-            if python_line is not None:
-                python_lines.append(python_line)
-        
-        return '\n'.join(python_lines)
-    
-    def transpile_line(self, line):
-        """Transpile a single line"""
-        # Remover comentarios inline
-        if '#' in line:
-            code_part = line.split('#')[0].strip()
-            comment_part = '#' + '#'.join(line.split('#')[1:])
-            if code_part:
-                return self.process_code_line(code_part) + '  ' + comment_part
-            else:
-                return line  # Solo comentario
-        
-        return self.process_code_line(line)
-    
-    def process_code_line(self, line):
-        """Procesa una línea de código"""
-        # Manejo de indentación para estructuras de control
-        if line in ['fin si', 'fin', 'fin funcion', 'fin función', 'fin clase', 'fin mientras', 'fin repetir']:
-            if self.indent_level > 0:
-                self.indent_level -= 1
-            return None  # No generar línea para 'fin'
-        
-        current_indent = self.indent()
-        
-        # Variables booleanas
-        line = line.replace('verdadero', 'True')
-        line = line.replace('falso', 'False')
-        line = line.replace('nulo', 'None')
-        
-        # Función texto() para conversión a string
-        line = re.sub(r'texto\(([^)]+)\)', r'str(\1)', line)
-        
-        # Print statements
-        if line.startswith('mostrar ') or line.startswith('decir '):
-            content = line.split(' ', 1)[1]
-            # Asegurar que las strings estén bien formateadas
-            if not (content.startswith('"') or content.startswith("'")):
-                # Si no es una string literal, podría ser una variable o expresión
-                pass
-            return current_indent + f'print({content})'
-        
-        # Input statements
-        if 'preguntar ' in line and 'guardar' in line:
-            if 'guardar la respuesta en' in line:
-                parts = line.split('guardar la respuesta en')
-                question = parts[0].replace('preguntar ', '').strip()
-                var_name = parts[1].strip()
-            elif 'guárdalo en' in line:
-                parts = line.split('guárdalo en')
-                question = parts[0].replace('preguntar ', '').strip()
-                var_name = parts[1].strip()
-            else:
-                return current_indent + line  # No reconocido
-            return current_indent + f'{var_name} = input({question})'
-        
-        # Condicionales
-        if line.startswith('si ') and ('entonces' in line or line.endswith(':')):
-            condition = line.replace('si ', '').replace(' entonces', '').replace(':', '').strip()
-            # Convertir operadores
-            condition = condition.replace(' es igual a ', ' == ')
-            condition = condition.replace(' es mayor que ', ' > ')
-            condition = condition.replace(' es menor que ', ' < ')
-            condition = condition.replace(' mayor que ', ' > ')
-            condition = condition.replace(' menor que ', ' < ')
-            condition = condition.replace(' igual a ', ' == ')
-            condition = condition.replace('>=', '>=')
-            condition = condition.replace('<=', '<=')
-            
-            self.indent_level += 1
-            return current_indent + f'if {condition}:'
-        
-        # Else
-        if line == 'sino' or line == 'si no':
-            # Reducir indentación temporalmente para el else
-            if self.indent_level > 0:
-                self.indent_level -= 1
-            else_indent = self.indent()
-            self.indent_level += 1  # Restaurar para el contenido del else
-            return else_indent + 'else:'
-        
-        # Bucles for
-        if line.startswith('repetir ') and ' veces' in line:
-            times = line.replace('repetir ', '').replace(' veces', '').strip()
-            self.indent_level += 1
-            return current_indent + f'for _ in range({times}):'
-        
-        if 'repetir con cada' in line or 'para cada' in line:
-            # Formato: "repetir con cada X en Y" o "para cada X en Y"
-            line_clean = line.replace('repetir con cada ', '').replace('para cada ', '')
-            if ' en ' in line_clean:
-                parts = line_clean.split(' en ')
-                var_name = parts[0].strip()
-                iterable = parts[1].strip()
-                self.indent_level += 1
-                return current_indent + f'for {var_name} in {iterable}:'
-        
-        # Bucles while
-        if line.startswith('mientras '):
-            condition = line.replace('mientras ', '').replace(':', '').strip()
-            condition = condition.replace(' es igual a ', ' == ')
-            condition = condition.replace(' es mayor que ', ' > ')
-            condition = condition.replace(' es menor que ', ' < ')
-            condition = condition.replace(' mayor que ', ' > ')
-            condition = condition.replace(' menor que ', ' < ')
-            condition = condition.replace(' igual a ', ' == ')
-            condition = condition.replace('>=', '>=')
-            condition = condition.replace('<=', '<=')
-            self.indent_level += 1
-            return current_indent + f'while {condition}:'
-        
-        # Definición de funciones
-        if line.startswith('funcion ') or line.startswith('función '):
-            func_def = line.replace('funcion ', '').replace('función ', '')
-            if ' con ' in func_def:
-                name, params = func_def.split(' con ', 1)
-                name = name.strip()
-                params = params.replace(':', '').replace(' y ', ', ').strip()
-                self.indent_level += 1
-                self.in_function = True
-                return current_indent + f'def {name}({params}):'
-            else:
-                name = func_def.replace(':', '').strip()
-                self.indent_level += 1
-                self.in_function = True
-                return current_indent + f'def {name}():'
-        
-        # Return statements
-        if line.startswith('devolver ') or line.startswith('retornar '):
-            value = line.split(' ', 1)[1]
-            return current_indent + f'return {value}'
-        
-        # Definición de clases
-        if line.startswith('clase '):
-            class_name = line.replace('clase ', '').replace(':', '').strip()
-            self.in_class = True
-            self.indent_level += 1
-            return current_indent + f'class {class_name}:'
-        
-        # Llamadas a funciones con 'con'
-        if ' con ' in line and not line.startswith('funcion ') and not line.startswith('función '):
-            # Formato: "nombre_funcion con parametro1, parametro2"
-            parts = line.split(' con ', 1)
-            func_name = parts[0].strip()
-            params = parts[1].strip()
-            # Si los parámetros están entre comillas, mantenerlos
-            return current_indent + f'{func_name}({params})'
-        
-        # Asignación de variables
-        if ' = ' in line and not any(line.startswith(kw) for kw in ['if', 'while', 'for', 'def', 'class']):
-            return current_indent + line
-        
+        self.indent_level = 0
+        self.output = []
+        self.uses_db = False
+        self.connected = False
+        self.visit(frontend.parse(vader_code))
+        if self.uses_db:
+            # Sin 'conectar base_datos' se usa la base SQLite en memoria por defecto
+            prelude = PYTHON_DB_PRELUDE + ([] if self.connected else ['vader_db = conectar()'])
+            self.output = prelude + [''] + self.output
+        return '\n'.join(self.output)
+    
+    def expr(self, expr):
+        """Convierte una expresión Vader a Python"""
+        return expr.render(self.names, PYTHON_CALLS)
+    
+    def emit(self, node, code):
+        """Agrega una línea con la indentación actual y el comentario inline"""
+        line = self.indent() + code
+        if node.comment:
+            line += '  ' + node.comment
+        self.output.append(line)
+    
+    def block(self, node, header):
+        """Emite la cabecera de un bloque, su cuerpo y su rama 'sino'"""
+        self.emit(node, header)
+        self.suite(node.body)
+        if node.orelse is not None:
+            self.clause('else:', node.else_comment)
+            self.suite(node.orelse)
+    
+    def suite(self, body):
+        """Cuerpo indentado; 'pass' si quedó vacío"""
+        self.indent_level += 1
+        for child in body:
+            self.visit(child)
+        if not any(not isinstance(child, (frontend.Blank, frontend.Comment)) for child in body):
+            self.output.append(self.indent() + 'pass')
+        self.indent_level -= 1
+    
+    def clause(self, header, comment=None):
+        """Rama de un bloque ya abierto ('else:', 'except ...:')"""
+        line = self.indent() + header
+        if comment:
+            line += '  ' + comment
+        self.output.append(line)
+    
+    def visit_Program(self, node):
+        for child in node.body:
+            self.visit(child)
+    
+    def visit_Blank(self, node):
+        self.output.append('')
+    
+    def visit_Comment(self, node):
+        # Preservar comentarios con su indentación original
+        self.output.append(node.text)
+    
+    def visit_End(self, node):
+        # 'fin' sin bloque abierto: no genera código
+        if node.comment:
+            self.output.append(self.indent() + node.comment)
+    
+    def visit_Print(self, node):
+        self.emit(node, f'print({self.expr(node.value)})')
+    
+    def visit_Input(self, node):
+        self.emit(node, f'{node.target} = input({self.expr(node.prompt)})')
+    
+    def visit_If(self, node):
+        self.block(node, f'if {self.expr(node.condition)}:')
+    
+    def visit_Else(self, node):
+        self.block(node, 'else:')
+    
+    def visit_Repeat(self, node):
+        self.block(node, f'for _ in range({self.expr(node.times)}):')
+    
+    def visit_ForEach(self, node):
+        # para cada fila en seleccionar ...: recorre la consulta por lotes con el ORM `vader_db`
+        query = node.iterable.text.rstrip(':').strip()
+        if query.split(None, 1)[0:1] == ['seleccionar']:
+            self.uses_db = True
+            self.block(node, f'for {node.var} in vader_db.stream_vader_query({query!r}):')
+            return
+        self.block(node, f'for {node.var} in {self.expr(node.iterable)}:')
+    
+    def visit_While(self, node):
+        self.block(node, f'while {self.expr(node.condition)}:')
+    
+    def visit_FunctionDef(self, node):
+        self.in_function = True
+        self.block(node, f'def {node.name}({", ".join(node.params)}):')
+    
+    def visit_Method(self, node, name=None):
+        # En los métodos 'this' es el receptor self
+        self.names = dict(PYTHON_NAMES, this='self')
+        self.block(node, f'def {name or node.name}({", ".join(["self"] + node.params)}):')
+        self.names = PYTHON_NAMES
+    
+    def visit_Constructor(self, node):
+        self.visit_Method(node, '__init__')
+    
+    def visit_Try(self, node):
+        self.emit(node, 'try:')
+        self.suite(node.body)
+        for handler in node.handlers:
+            error = 'Exception' if handler.type in GENERIC_ERRORS else handler.type
+            self.clause(f'except {error} as {handler.name or "error"}:', handler.comment)
+            self.suite(handler.body)
+        if node.finalbody is not None or not node.handlers:
+            self.clause('finally:', node.final_comment)
+            self.suite(node.finalbody or [])
+    
+    def visit_Raise(self, node):
+        self.emit(node, f'raise Exception({self.expr(node.value)})')
+    
+    def visit_Declare(self, node):
+        if node.value is not None:
+            value = self.expr(node.value)
+        elif node.kind == 'array':
+            value = f'[None] * {self.expr(node.size)}' if node.size else '[]'
+        else:
+            value = PYTHON_DECLARE[node.kind]
+        self.emit(node, f'{node.name} = {value}')
+    
+    def visit_Attribute(self, node):
+        value = self.expr(node.value) if node.value is not None else 'None'
+        self.emit(node, f'{node.name} = {value}')
+    
+    def visit_Append(self, node):
+        self.emit(node, f'{node.target}.append({self.expr(node.value)})')
+    
+    def visit_Return(self, node):
+        self.emit(node, f'return {self.expr(node.value)}')
+    
+    def visit_ClassDef(self, node):
+        self.in_class = True
+        base = f'({node.base})' if node.base else ''
+        self.block(node, f'class {node.name}{base}:')
+    
+    def visit_Call(self, node):
+        # Formato: "nombre_funcion con parametro1, parametro2"
+        self.emit(node, f'{node.func}({self.expr(node.args)})')
+    
+    def visit_Assign(self, node):
+        target = node.target
+        if self.names is not PYTHON_NAMES and target.startswith('this.'):
+            target = 'self.' + target[len('this.'):]
+        self.emit(node, f'{target} = {self.expr(node.value)}')
+    
+    def visit_ExprStatement(self, node):
+        connect = _CONNECT.match(node.value.text.strip())
+        if connect:
+            db_type, path, option = connect.groups()
+            self.uses_db = self.connected = True
+            return self.emit(node, f'vader_db = conectar({(option or db_type or "sqlite")!r}, {path!r})')
         # Llamadas a funciones o expresiones
-        return current_indent + line
+        self.emit(node, self.expr(node.value))
     
     def indent(self):
         """Return current indentation"""
@@ -6,17 +6,60 @@ Convierte código Vader en español natural a Rust válido y funcional
 
 import re
 
-class RustTranspiler:
+try:
+    from . import frontend
+except ImportError:
+    import frontend
+
+RUST_TYPES = {
+    'numero': 'i32', 'número': 'i32', 'entero': 'i32',
+    'decimal': 'f64', 'flotante': 'f64',
+    'texto': 'String', 'cadena': 'String',
+    'booleano': 'bool', 'logico': 'bool', 'lógico': 'bool',
+}
+# Tipo de los parámetros del constructor sin 'tipo', según su nombre
+RUST_PARAM_TYPES = {
+    'edad': 'i32', 'numero': 'i32', 'cantidad': 'i32', 'id': 'i32',
+    'precio': 'f64', 'salario': 'f64', 'peso': 'f64', 'altura': 'f64',
+    'activo': 'bool', 'visible': 'bool', 'habilitado': 'bool',
+}
+RUST_ZEROS = {'i32': '0', 'f64': '0.0', 'bool': 'false'}
+RUST_NAMES = {'verdadero': 'true', 'falso': 'false', 'nulo': 'None'}
+# En condiciones 'y', 'o' y 'no' son operadores lógicos
+RUST_CONDITION_NAMES = dict(RUST_NAMES, y='&&', o='||', no='!')
+
+_IDENTIFIER = re.compile(r'^[^\W\d]\w*$')
+
+
+def _to_string(args):
+    value = args[0] if args else ''
+    return f'{value}.to_string()' if _IDENTIFIER.match(value) else f'({value}).to_string()'
+
+
+RUST_CALLS = {
+    'raiz': '({0} as f64).sqrt()',
+    'potencia': '({0} as f64).powf({1} as f64)',
+    'absoluto': '({0}).abs()',
+    'redondear': '({0} as f64).round()',
+    'numero': '{0}.parse::<i32>().unwrap_or(0)',
+    'texto': _to_string,
+}
+
+
+class RustTranspiler(frontend.NodeVisitor):
     def __init__(self):
         self.indent_level = 0
         self.in_function = False
         self.in_impl = False
         self.declared_vars = set()
         self.current_struct = None
-        
+        self.output = []
+        self.scopes = []
+        self.names = RUST_NAMES
+
     def indent(self):
         return '    ' * self.indent_level
-    
+
     def infer_rust_type(self, value):
         """Infiere el tipo de Rust basado en el valor"""
         if value.strip() in ['true', 'false', 'verdadero', 'falso']:
@@ -29,477 +72,329 @@ class RustTranspiler:
             return 'i32'
         else:
             return ''
-    
+
+    def rust_type(self, vader_type, default='String'):
+        """Tipo de Rust para un tipo Vader ('numero', 'texto', 'Persona')"""
+        if not vader_type:
+            return default
+        return RUST_TYPES.get(vader_type, vader_type)
+
     def transpile(self, vader_code):
         """Transpila código Vader completo a Rust"""
-        lines = vader_code.split('\n')
-        rust_lines = [
+        self.indent_level = 0
+        self.declared_vars = set()
+        self.scopes = [self.declared_vars]
+        classes, functions, main = frontend.split_sections(frontend.parse(vader_code))
+
+        self.output = [
             'use std::io;',
             'use std::collections::HashMap;',
             'use std::collections::VecDeque;',
             ''
         ]
-        
-        # Separar funciones, structs y código main
-        functions_code, structs_code, main_code = self.separate_code_sections(lines)
-        
-        # Generar funciones primero
-        if functions_code:
-            for line in functions_code:
-                if line.strip():  # Solo procesar líneas no vacías
-                    rust_line = self.transpile_line(line.strip())
-                    if rust_line is not None:
-                        if isinstance(rust_line, list):
-                            rust_lines.extend(rust_line)
-                        else:
-                            rust_lines.append(rust_line)
-            rust_lines.append('')
-        
-        # Generar structs
-        if structs_code:
-            for line in structs_code:
-                if line.strip():  # Solo procesar líneas no vacías
-                    rust_line = self.transpile_line(line.strip())
-                    if rust_line is not None:
-                        if isinstance(rust_line, list):
-                            rust_lines.extend(rust_line)
-                        else:
-                            rust_lines.append(rust_line)
-            rust_lines.append('')
-        
-        # Generar main
-        rust_lines.append('fn main() {')
+        # Funciones primero, después structs y main
+        for node in functions + classes:
+            self.visit(node)
+
+        self.output.append('fn main() {')
         self.indent_level = 1
-        self.declared_vars = set()
-        
-        for line in main_code:
-            line = line.strip()
-            
-            if not line:
-                rust_lines.append('')
-                continue
-                
-            if line.startswith('#'):
-                rust_lines.append(self.indent() + '//' + line[1:])
-                continue
-                
-            rust_line = self.transpile_line(line)
-            if rust_line is not None:
-                if isinstance(rust_line, list):
-                    rust_lines.extend(rust_line)
-                else:
-                    rust_lines.append(rust_line)
-        
-        rust_lines.append('}')
-        return '\n'.join(rust_lines)
-    
-    def separate_code_sections(self, lines):
-        """Separa el código en funciones, structs y main basado en sintaxis Vader original"""
-        functions = []
-        structs = []
-        main_code = []
-        
-        in_function = False
-        in_struct = False
-        current_block = []
-        
-        for line in lines:
-            stripped = line.strip()
-            
-            # Detectar inicio de función en sintaxis Vader
-            if stripped.startswith('funcion ') or stripped.startswith('función '):
-                if current_block:
-                    main_code.extend(current_block)
-                    current_block = []
-                in_function = True
-                in_struct = False
-                current_block = [line]
-                continue
-            
-            # Detectar inicio de struct en sintaxis Vader
-            elif stripped.startswith('struct ') or stripped.startswith('clase '):
-                if current_block:
-                    main_code.extend(current_block)
-                    current_block = []
-                in_struct = True
-                in_function = False
-                current_block = [line]
-                continue
-            
-            # Detectar fin de bloques
-            elif stripped in ['fin', 'fin funcion', 'fin función']:
-                if in_function:
-                    current_block.append(line)
-                    functions.extend(current_block)
-                    functions.append('')
-                    in_function = False
-                    current_block = []
-                    continue
-            
-            elif stripped in ['fin struct', 'fin clase']:
-                if in_struct:
-                    current_block.append(line)
-                    structs.extend(current_block)
-                    structs.append('')
-                    in_struct = False
-                    current_block = []
-                    continue
-            
-            # Agregar líneas al bloque actual
-            if in_function or in_struct:
-                current_block.append(line)
-            else:
-                current_block.append(line)
-        
-        # Agregar código restante a main
-        if current_block:
-            main_code.extend(current_block)
-        
-        return functions, structs, main_code
-    
-    def transpile_line(self, line):
-        """Transpila una línea individual"""
-        if '#' in line:
-            code_part = line.split('#')[0].strip()
-            comment_part = '//' + '#'.join(line.split('#')[1:])
-            if code_part:
-                return self.process_code_line(code_part) + '  ' + comment_part
-            else:
-                return '//' + line[1:]
-        
-        return self.process_code_line(line)
-    
-    def process_code_line(self, line):
-        """Procesa una línea de código - VERSIÓN COMPLETA"""
-        # Fin de bloque (funciones, structs, if, while, etc.)
-        if line in ['fin', 'fin funcion', 'fin función', 'fin struct', 'fin clase', 'fin si', 'fin mientras']:
-            if self.indent_level > 1:
-                self.indent_level -= 1
-                return '    ' * (self.indent_level - 1) + '}'
-            return None
-        
-        current_indent = self.indent()
-        
-        # Variables booleanas
-        line = line.replace('verdadero', 'true')
-        line = line.replace('falso', 'false')
-        line = line.replace('nulo', 'None')
-        
-        # Operaciones matemáticas - mapeo correcto a funciones Rust
-        line = re.sub(r'raiz\(([^)]+)\)', r'(\1 as f64).sqrt()', line)
-        line = re.sub(r'potencia\(([^,]+),\s*([^)]+)\)', r'(\1 as f64).powf(\2 as f64)', line)
-        line = re.sub(r'absoluto\(([^)]+)\)', r'(\1).abs()', line)
-        line = re.sub(r'redondear\(([^)]+)\)', r'(\1 as f64).round()', line)
-        line = re.sub(r'numero\(([^)]+)\)', r'\1.parse::<i32>().unwrap_or(0)', line)
-        
-        # Función texto() para conversión a string
-        line = re.sub(r'texto\(([^)]+)\)', r'\1.to_string()', line)
-        
-        # Print statements
-        if line.startswith('mostrar ') or line.startswith('decir '):
-            content = line.split(' ', 1)[1]
-            # Convertir concatenación con + a format! macro
-            if ' + ' in content:
-                # Convertir concatenación a format!
-                parts = [p.strip() for p in content.split(' + ')]
-                format_str = ''
-                args = []
-                for part in parts:
-                    if part.startswith('"') and part.endswith('"'):
-                        format_str += part[1:-1]
-                    else:
-                        format_str += '{}'
-                        args.append(part)
-                
-                if args:
-                    args_str = ', '.join(args)
-                    return current_indent + f'println!("{format_str}", {args_str});'
-                else:
-                    return current_indent + f'println!("{format_str}");'
-            else:
-                if content.startswith('"') and content.endswith('"'):
-                    return current_indent + f'println!({content});'
-                else:
-                    return current_indent + f'println!("{{}}", {content});'
-        
-        # Input statements
-        if 'preguntar ' in line and ('guardar' in line or 'guárdalo' in line):
-            if 'guardar la respuesta en' in line:
-                parts = line.split('guardar la respuesta en')
-                question = parts[0].replace('preguntar ', '').strip()
-                var_name = parts[1].strip()
-            elif 'guárdalo en' in line:
-                parts = line.split('guárdalo en')
-                question = parts[0].replace('preguntar ', '').strip()
-                var_name = parts[1].strip()
-            else:
-                return current_indent + '// ' + line
-            
-            result = current_indent + f'println!({question});\n'
-            result += current_indent + f'let mut {var_name} = String::new();\n'
-            result += current_indent + f'io::stdin().read_line(&mut {var_name}).expect("Failed to read line");\n'
-            result += current_indent + f'{var_name} = {var_name}.trim().to_string();'
-            self.declared_vars.add(var_name)
-            return result
-        
-        # Asignación de variables
-        if '=' in line and not any(op in line for op in ['==', '!=', '<=', '>=']):
-            parts = line.split('=', 1)
-            var_name = parts[0].strip()
-            value = parts[1].strip()
-            
-            if var_name not in self.declared_vars:
-                rust_type = self.infer_rust_type(value)
-                self.declared_vars.add(var_name)
-                if rust_type:
-                    return current_indent + f'let mut {var_name}: {rust_type} = {value};'
-                else:
-                    return current_indent + f'let mut {var_name} = {value};'
-            else:
-                return current_indent + f'{var_name} = {value};'
-        
-        # Condicionales
-        if line.startswith('si ') and ('entonces' in line or line.endswith(':')):
-            condition = line.replace('si ', '').replace(' entonces', '').replace(':', '').strip()
-            condition = self.convert_operators(condition)
-            self.indent_level += 1
-            return current_indent + f'if {condition} {{'
-        
-        # Else
-        if line == 'sino' or line == 'si no':
-            if self.indent_level > 1:
-                self.indent_level -= 1
-            else_indent = self.indent()
-            self.indent_level += 1
-            return else_indent + '} else {'
-        
-        # Bucles for
-        if line.startswith('repetir ') and ' veces' in line:
-            times = line.replace('repetir ', '').replace(' veces', '').strip()
-            self.indent_level += 1
-            return current_indent + f'for _ in 0..{times} {{'
-        
-        if 'repetir con cada' in line or 'para cada' in line:
-            line_clean = line.replace('repetir con cada ', '').replace('para cada ', '')
-            if ' en ' in line_clean:
-                parts = line_clean.split(' en ')
-                var_name = parts[0].strip()
-                iterable = parts[1].strip()
-                self.indent_level += 1
-                return current_indent + f'for {var_name} in {iterable} {{'
-        
-        # Bucles while
-        if line.startswith('mientras '):
-            condition = line.replace('mientras ', '').replace(':', '').strip()
-            condition = self.convert_operators(condition)
-            self.indent_level += 1
-            return current_indent + f'while {condition} {{'
-        
-        # Definición de funciones avanzadas con tipos
-        if line.startswith('funcion ') or line.startswith('función '):
-            func_def = line.replace('funcion ', '').replace('función ', '')
-            
-            # Detectar tipo de retorno
-            return_type = ''
-            if ' que devuelve ' in func_def:
-                parts = func_def.split(' que devuelve ')
-                func_def = parts[0]
-                return_type_str = parts[1].replace(':', '').strip()
-                if return_type_str in ['numero', 'entero']:
-                    return_type = ' -> i32'
-                elif return_type_str in ['decimal', 'flotante']:
-                    return_type = ' -> f64'
-                elif return_type_str in ['texto', 'cadena']:
-                    return_type = ' -> String'
-                elif return_type_str in ['booleano', 'logico']:
-                    return_type = ' -> bool'
-            
-            if ' con ' in func_def:
-                name, params = func_def.split(' con ', 1)
-                name = name.strip()
-                params_str = params.replace(':', '').strip()
-                
-                # Procesar parámetros con tipos
-                typed_params = []
-                if params_str:
-                    param_list = [p.strip() for p in params_str.replace(' y ', ', ').split(',')]
-                    for param in param_list:
-                        if ' tipo ' in param:
-                            param_parts = param.split(' tipo ')
-                            param_name = param_parts[0].strip()
-                            param_type = param_parts[1].strip()
-                            if param_type in ['numero', 'entero']:
-                                typed_params.append(f'{param_name}: i32')
-                            elif param_type in ['decimal', 'flotante']:
-                                typed_params.append(f'{param_name}: f64')
-                            elif param_type in ['texto', 'cadena']:
-                                typed_params.append(f'{param_name}: String')
-                            elif param_type in ['booleano', 'logico']:
-                                typed_params.append(f'{param_name}: bool')
-                            else:
-                                typed_params.append(f'{param_name}: String')
-                        else:
-                            typed_params.append(f'{param}: String')
-                
-                params_final = ', '.join(typed_params)
-                self.indent_level += 1
-                return current_indent + f'fn {name}({params_final}){return_type} {{'
-            else:
-                name = func_def.replace(':', '').strip()
-                self.indent_level += 1
-                return current_indent + f'fn {name}(){return_type} {{'
-        
-        # Retorno de funciones
-        if line.startswith('retornar ') or line.startswith('devolver '):
-            value = line.replace('retornar ', '').replace('devolver ', '').strip()
-            # Si el valor contiene comillas, mantenerlas; si no, asumimos que es una expresión
-            if '"' in value or "'" in value:
-                return current_indent + f'{value}'
+        for node in main:
+            self.visit(node)
+        self.output.append('}')
+
+        lines = self.output
+        lines = frontend.collapse_blank_lines(lines)
+        return '\n'.join(lines)
+
+    def expr(self, expr, names=None):
+        """Convierte una expresión Vader a Rust"""
+        return expr.render(names or self.names, RUST_CALLS)
+
+    def value(self, expr):
+        """Expresión como valor: los literales de texto pasan a String"""
+        if len(expr.tokens) == 1 and expr.tokens[0].kind == 'STRING':
+            return f'{self.expr(expr)}.to_string()'
+        return self.expr(expr)
+
+    def condition(self, expr):
+        return self.expr(expr, dict(self.names, **RUST_CONDITION_NAMES))
+
+    def comment(self, text):
+        return '//' + text.strip()[1:]
+
+    def emit(self, node, code):
+        """Agrega una línea con la indentación actual y el comentario inline"""
+        line = self.indent() + code
+        if node.comment:
+            line += '  ' + self.comment(node.comment)
+        self.output.append(line)
+
+    def suite(self, body, names=()):
+        """Cuerpo de un bloque con su propio ámbito de variables"""
+        self.scopes.append(set(names))
+        self.indent_level += 1
+        for child in body:
+            self.visit(child)
+        self.indent_level -= 1
+        self.scopes.pop()
+
+    def block(self, node, header, names=()):
+        """Emite la cabecera de un bloque, su cuerpo, su rama 'sino' y el cierre"""
+        self.emit(node, header + ' {')
+        self.suite(node.body, names)
+        if node.orelse is not None:
+            self.output.append(self.indent() + '} else {')
+            self.suite(node.orelse)
+        self.output.append(self.indent() + '}')
+
+    def is_declared(self, name):
+        return any(name in scope for scope in self.scopes)
+
+    def declare(self, name):
+        self.scopes[-1].add(name)
+
+    def params(self, node, inferred=None):
+        params = []
+        for name in node.params:
+            default = (inferred or {}).get(name, 'String')
+            params.append(f'{name}: {self.rust_type(node.param_types.get(name), default)}')
+        return ', '.join(params)
+
+    def returns(self, node):
+        return ' -> ' + self.rust_type(node.returns) if node.returns else ''
+
+    def print_args(self, expr):
+        """Cadena de formato y argumentos de println! para una concatenación con +"""
+        format_str = ''
+        args = []
+        for part in frontend.split_expr(expr, '+'):
+            tokens = part.tokens
+            if len(tokens) == 1 and tokens[0].kind == 'STRING' and tokens[0].value.startswith('"'):
+                format_str += tokens[0].value[1:-1].replace('{', '{{').replace('}', '}}')
             else:
-                # Para expresiones o variables, mantener como está
-                return current_indent + f'{value}'
-        
-        # Definición de structs avanzados
-        if line.startswith('struct ') or line.startswith('clase '):
-            struct_name = line.replace('struct ', '').replace('clase ', '').replace(':', '').strip()
-            self.current_struct = struct_name
-            self.in_impl = True
-            self.indent_level += 1
-            return current_indent + f'struct {struct_name} {{'
-        
-        # Atributos de struct
-        if line.startswith('atributo ') and self.in_impl:
-            attr_def = line.replace('atributo ', '').strip()
-            if ' tipo ' in attr_def:
-                attr_parts = attr_def.split(' tipo ')
-                attr_name = attr_parts[0].strip()
-                attr_type = attr_parts[1].strip()
-                if attr_type in ['numero', 'entero']:
-                    return current_indent + f'{attr_name}: i32,'
-                elif attr_type in ['decimal', 'flotante']:
-                    return current_indent + f'{attr_name}: f64,'
-                elif attr_type in ['texto', 'cadena']:
-                    return current_indent + f'{attr_name}: String,'
-                elif attr_type in ['booleano', 'logico']:
-                    return current_indent + f'{attr_name}: bool,'
-                else:
-                    return current_indent + f'{attr_name}: String,'
+                format_str += '{}'
+                args.append(self.expr(part))
+        return ', '.join([f'"{format_str}"'] + args)
+
+    def visit_Blank(self, node):
+        self.output.append('')
+
+    def visit_Comment(self, node):
+        self.output.append(self.indent() + self.comment(node.text))
+
+    def visit_End(self, node):
+        # 'fin' sin bloque abierto: no genera código
+        if node.comment:
+            self.output.append(self.indent() + self.comment(node.comment))
+
+    def visit_Print(self, node):
+        self.emit(node, f'println!({self.print_args(node.value)});')
+
+    def visit_Input(self, node):
+        var_name = node.target
+        self.emit(node, f'println!({self.print_args(node.prompt)});')
+        if self.is_declared(var_name):
+            self.output.append(self.indent() + f'{var_name} = String::new();')
+        else:
+            self.declare(var_name)
+            self.output.append(self.indent() + f'let mut {var_name} = String::new();')
+        self.output.append(self.indent() + f'io::stdin().read_line(&mut {var_name}).expect("Failed to read line");')
+        self.output.append(self.indent() + f'{var_name} = {var_name}.trim().to_string();')
+
+    def visit_If(self, node):
+        self.block(node, f'if {self.condition(node.condition)}')
+
+    def visit_Else(self, node):
+        # 'sino' sin 'si' que lo abra: su cuerpo queda como bloque suelto
+        self.emit(node, '// sino')
+        self.output.append(self.indent() + '{')
+        self.suite(node.body)
+        self.output.append(self.indent() + '}')
+
+    def visit_Repeat(self, node):
+        self.block(node, f'for i in 0..{self.expr(node.times)}', ['i'])
+
+    def visit_ForEach(self, node):
+        self.block(node, f'for {node.var} in {self.expr(node.iterable)}', [node.var])
+
+    def visit_While(self, node):
+        self.block(node, f'while {self.condition(node.condition)}')
+
+    def visit_FunctionDef(self, node):
+        self.in_function = True
+        self.block(node, f'fn {node.name}({self.params(node)}){self.returns(node)}', node.params)
+        self.output.append('')
+        self.in_function = False
+
+    def visit_Method(self, node):
+        if not self.in_impl:
+            return self.visit_FunctionDef(node)
+        # En los métodos 'this' es el receptor self
+        receiver = '&mut self' if _assigns_self(node) else '&self'
+        params = ', '.join(filter(None, [receiver, self.params(node)]))
+        self.names = dict(RUST_NAMES, this='self')
+        self.block(node, f'pub fn {node.name}({params}){self.returns(node)}', node.params)
+        self.names = RUST_NAMES
+        self.output.append('')
+
+    def visit_Constructor(self, node, fields=()):
+        """Constructor: pub fn new que parte de Self con los valores por defecto"""
+        if not self.in_impl:
+            return self.visit_FunctionDef(node)
+        self.emit(node, f'pub fn new({self.params(node, RUST_PARAM_TYPES)}) -> Self {{')
+        self.indent_level += 1
+        values = []
+        for attribute in fields:
+            value = self.value(attribute.value) if attribute.value is not None else 'Default::default()'
+            values.append(f'{attribute.name}: {value}')
+        mutable = 'mut ' if node.body and _assigns_self(node) else ''
+        self.output.append(self.indent() + f'let {mutable}this = Self {{ {", ".join(values)} }};')
+        self.indent_level -= 1
+        self.suite(node.body, node.params)
+        self.indent_level += 1
+        self.output.append(self.indent() + 'this')
+        self.indent_level -= 1
+        self.output.append(self.indent() + '}')
+        self.output.append('')
+
+    def visit_ClassDef(self, node):
+        """Struct con sus campos y un bloque impl con el constructor y los métodos"""
+        self.current_struct = node.name
+        fields = []
+        members = []
+        pending = []
+        for child in node.body:
+            if isinstance(child, frontend.Attribute):
+                fields.extend(pending)
+                fields.append(child)
+            elif isinstance(child, (frontend.Comment, frontend.Blank)):
+                pending.append(child)
+                continue
             else:
-                return current_indent + f'{attr_def}: String,'
-        
-        # Constructor de struct (impl block)
-        if line.startswith('constructor con '):
-            params = line.replace('constructor con ', '').replace(':', '').strip()
-            if params:
-                # Procesar parámetros con tipos explícitos
-                typed_params = []
-                param_list = [p.strip() for p in params.replace(' y ', ', ').split(',')]
-                for param in param_list:
-                    if ' tipo ' in param:
-                        param_parts = param.split(' tipo ')
-                        param_name = param_parts[0].strip()
-                        param_type = param_parts[1].strip()
-                        if param_type in ['numero', 'entero']:
-                            typed_params.append(f'{param_name}: i32')
-                        elif param_type in ['decimal', 'flotante']:
-                            typed_params.append(f'{param_name}: f64')
-                        elif param_type in ['texto', 'cadena']:
-                            typed_params.append(f'{param_name}: String')
-                        elif param_type in ['booleano', 'logico']:
-                            typed_params.append(f'{param_name}: bool')
-                        else:
-                            typed_params.append(f'{param_name}: String')
-                    else:
-                        # Inferir tipo basado en el nombre del parámetro
-                        if param in ['edad', 'numero', 'cantidad', 'id']:
-                            typed_params.append(f'{param}: i32')
-                        elif param in ['precio', 'salario', 'peso', 'altura']:
-                            typed_params.append(f'{param}: f64')
-                        elif param in ['activo', 'visible', 'habilitado']:
-                            typed_params.append(f'{param}: bool')
-                        else:
-                            typed_params.append(f'{param}: String')
-                
-                params_final = ', '.join(typed_params)
-                # Generar impl block
-                impl_lines = [
-                    '}',
-                    '',
-                    f'impl {self.current_struct} {{',
-                    f'    pub fn new({params_final}) -> Self {{'
-                ]
-                self.indent_level += 2
-                return impl_lines
+                members.extend(pending)
+                members.append(child)
+            pending = []
+
+        self.emit(node, f'struct {node.name} {{')
+        self.indent_level += 1
+        if node.base:
+            self.output.append(self.indent() + f'// hereda de {node.base}')
+        for field in fields:
+            self.visit(field)
+        self.indent_level -= 1
+        self.output.append(self.indent() + '}')
+        self.output.append('')
+
+        attributes = [f for f in fields if isinstance(f, frontend.Attribute)]
+        if not members and not any(a.value is not None for a in attributes):
+            self.current_struct = None
+            return
+        self.output.append(self.indent() + f'impl {node.name} {{')
+        self.indent_level += 1
+        self.in_impl = True
+        if not any(isinstance(m, frontend.Constructor) for m in members):
+            self.visit_Constructor(frontend.Constructor(), attributes)
+        for member in members:
+            if isinstance(member, frontend.Constructor):
+                self.visit_Constructor(member, attributes)
+            elif isinstance(member, frontend.FunctionDef):
+                self.visit_Method(member)
+            elif isinstance(member, (frontend.Blank, frontend.Comment)):
+                self.visit(member)
             else:
-                # Constructor sin parámetros
-                impl_lines = [
-                    '}',
-                    '',
-                    f'impl {self.current_struct} {{',
-                    f'    pub fn new() -> Self {{'
-                ]
-                self.indent_level += 2
-                return impl_lines
-        
-        # Manejo de errores y excepciones
-        if line.startswith('intentar'):
-            self.indent_level += 1
-            return current_indent + 'match (|| -> Result<(), Box<dyn std::error::Error>> {'
-        
-        if line.startswith('capturar '):
-            exception_type = line.replace('capturar ', '').strip()
-            if self.indent_level > 1:
-                self.indent_level -= 1
-            catch_indent = self.indent()
-            self.indent_level += 1
-            return catch_indent + '    Ok(())\n})() {\n    Err(e) => {'
-        
-        if line.startswith('finalmente'):
-            if self.indent_level > 1:
-                self.indent_level -= 1
-            finally_indent = self.indent()
-            self.indent_level += 1
-            return finally_indent + '},\n    Ok(_) => {'
-        
-        if line.startswith('lanzar '):
-            exception = line.replace('lanzar ', '').strip()
-            return current_indent + f'return Err(Box::new(std::io::Error::new(std::io::ErrorKind::Other, {exception})));'
-        
-        # Crear listas/vectores
-        if line.startswith('crear lista '):
-            list_name = line.replace('crear lista ', '').strip()
-            return current_indent + f'let mut {list_name}: Vec<String> = Vec::new();'
-        
-        # Agregar elementos a listas
-        if line.startswith('agregar ') and ' a ' in line:
-            parts = line.replace('agregar ', '').split(' a ')
-            element = parts[0].strip()
-            list_name = parts[1].strip()
-            return current_indent + f'{list_name}.push({element}.to_string());'
-        
-        # Crear mapas
-        if line.startswith('crear mapa '):
-            map_name = line.replace('crear mapa ', '').strip()
-            return current_indent + f'let mut {map_name}: HashMap<String, String> = HashMap::new();'
-        
+                # Rust no admite sentencias dentro de un impl
+                self.output.append(self.indent() + '// ' + member.source.text)
+        self.in_impl = False
+        self.indent_level -= 1
+        self.output.append(self.indent() + '}')
+        self.output.append('')
+        self.current_struct = None
+
+    def visit_Attribute(self, node):
+        default = self.infer_rust_type(node.value.text) if node.value is not None else ''
+        self.emit(node, f'{node.name}: {self.rust_type(node.type, default or "String")},')
+
+    def visit_Declare(self, node):
+        name = node.name
+        self.declare(name)
+        element = self.rust_type(node.type)
+        if node.kind == 'lista':
+            return self.emit(node, f'let mut {name}: Vec<{element}> = Vec::new();')
+        if node.kind == 'mapa':
+            return self.emit(node, f'let mut {name}: HashMap<String, {element}> = HashMap::new();')
+        if node.kind == 'array':
+            element = self.rust_type(node.type, 'i32')
+            size = self.expr(node.size) if node.size else '0'
+            zero = RUST_ZEROS.get(element, 'Default::default()')
+            return self.emit(node, f'let mut {name}: [{element}; {size}] = [{zero}; {size}];')
+        value = self.value(node.value) if node.value is not None else 'Default::default()'
+        self.emit(node, f'let mut {name}: {element} = {value};')
+
+    def visit_Append(self, node):
+        self.emit(node, f'{node.target}.push({self.value(node.value)});')
+
+    def visit_Try(self, node):
+        """intentar/capturar con un closure que devuelve Result; finalmente va después"""
+        self.emit(node, 'match (|| -> Result<(), Box<dyn std::error::Error>> {')
+        self.suite(node.body)
+        self.indent_level += 1
+        self.output.append(self.indent() + 'Ok(())')
+        self.indent_level -= 1
+        self.output.append(self.indent() + '})() {')
+        self.indent_level += 1
+        name = node.handlers[0].name if node.handlers and node.handlers[0].name else '_'
+        self.output.append(self.indent() + f'Err({name}) => {{')
+        for handler in node.handlers:
+            self.suite(handler.body, [name])
+        self.output.append(self.indent() + '}')
+        self.output.append(self.indent() + 'Ok(_) => {}')
+        self.indent_level -= 1
+        self.output.append(self.indent() + '}')
+        for child in node.finalbody or []:
+            self.visit(child)
+
+    def visit_Raise(self, node):
+        self.emit(node, 'return Err(Box::new(std::io::Error::new(std::io::ErrorKind::Other, '
+                        f'{self.expr(node.value)})));')
+
+    def visit_Return(self, node):
+        value = self.expr(node.value)
+        self.emit(node, f'return {value};' if value else 'return;')
+
+    def visit_Call(self, node):
+        self.emit(node, f'{node.func}({self.expr(node.args)});')
+
+    def visit_Assign(self, node):
+        var_name = node.target
+        if self.names is not RUST_NAMES and var_name.startswith('this.'):
+            var_name = 'self.' + var_name[len('this.'):]
+        value = self.value(node.value)
+        if not _IDENTIFIER.match(var_name) or self.is_declared(var_name):
+            return self.emit(node, f'{var_name} = {value};')
+
+        self.declare(var_name)
+        rust_type = self.infer_rust_type(node.value.text)
+        if rust_type:
+            return self.emit(node, f'let mut {var_name}: {rust_type} = {value};')
+        self.emit(node, f'let mut {var_name} = {value};')
+
+    def visit_ExprStatement(self, node):
         # Línea de código general
-        if line.strip():
-            return current_indent + line + ';'
-        
-        return None
-    
-    def convert_operators(self, condition):
-        """Convierte operadores de Vader a Rust"""
-        condition = condition.replace(' es igual a ', ' == ')
-        condition = condition.replace(' es mayor que ', ' > ')
-        condition = condition.replace(' es menor que ', ' < ')
-        condition = condition.replace(' mayor que ', ' > ')
-        condition = condition.replace(' menor que ', ' < ')
-        condition = condition.replace(' igual a ', ' == ')
-        condition = condition.replace(' y ', ' && ')
-        condition = condition.replace(' o ', ' || ')
-        condition = condition.replace(' no ', ' ! ')
-        return condition
+        code = self.expr(node.value)
+        if not code.endswith((';', '{', '}')):
+            code += ';'
+        self.emit(node, code)
+
+
+def _assigns_self(node):
+    """Si el cuerpo del método asigna atributos del objeto"""
+    for branch in node.branches():
+        for child in branch:
+            if isinstance(child, frontend.Assign) and child.target.startswith(('this.', 'self.')):
+                return True
+            if isinstance(child, frontend.Block) and _assigns_self(child):
+                return True
+    return False
 
 def transpile_to_rust(vader_code):
     transpiler = RustTranspiler()
@@ -3,57 +3,148 @@
 🤖 VADER AI BACKEND - PRIMERA IMPLEMENTACIÓN MUNDIAL
 Backend de IA real para Vader con múltiples proveedores de IA
 Soporta OpenAI, Anthropic, Google, Ollama local y más
+
+Servidor asíncrono (aiohttp.web): todas las peticiones comparten un único
+bucle de eventos y una sesión HTTP por proveedor. Las respuestas se pueden
+recibir token a token por SSE (/ai/chat/stream) y las repetidas salen de
+una caché LRU.
 """
 
 import asyncio
+import hashlib
 import json
 import os
 import logging
-from typing import Dict, Any, Optional, List
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 from datetime import datetime
 import aiohttp
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from aiohttp import web
 
-# Configuración de proveedores de IA
+# Configuración de proveedores de IA (las URLs se pueden cambiar, p. ej. a un proveedor simulado)
 AI_PROVIDERS = {
     'openai': {
         'api_key': os.getenv('OPENAI_API_KEY'),
-        'base_url': 'https://api.openai.com/v1',
+        'base_url': os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1'),
         'model': 'gpt-4'
     },
     'anthropic': {
         'api_key': os.getenv('ANTHROPIC_API_KEY'),
-        'base_url': 'https://api.anthropic.com/v1',
+        'base_url': os.getenv('ANTHROPIC_BASE_URL', 'https://api.anthropic.com/v1'),
         'model': 'claude-3-sonnet-20240229'
     },
     'ollama': {
-        'base_url': 'http://localhost:11434/api',
+        'base_url': os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434/api'),
         'model': 'llama2'
     },
     'google': {
         'api_key': os.getenv('GOOGLE_AI_API_KEY'),
-        'base_url': 'https://generativelanguage.googleapis.com/v1beta',
+        'base_url': os.getenv('GOOGLE_AI_BASE_URL', 'https://generativelanguage.googleapis.com/v1beta'),
         'model': 'gemini-pro'
     }
 }
 
+# Respuestas guardadas (clave: proveedor, modelo, prompt y contexto de la sesión)
+RESPONSE_CACHE_SIZE = int(os.getenv('VADER_AI_CACHE_SIZE', '512'))
+
+# Segundos durante los que vale el último chequeo de salud de un proveedor
+HEALTH_CHECK_TTL = 30
+HEALTH_CHECK_TIMEOUT = 2
+
+# Límites de las sesiones HTTP con los proveedores
+PROVIDER_POOL_SIZE = 32
+REQUEST_TIMEOUT = 120
+
+# Historial por sesión: últimas 10 interacciones
+MAX_HISTORY_MESSAGES = 20
+
+# Proveedores que reciben el historial de la sesión en cada llamada
+HISTORY_PROVIDERS = {'openai'}
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+}
+
+
+class ResponseCache:
+    """Caché LRU de respuestas de IA"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(provider: str, model: Optional[str], prompt: str, context: List[Dict[str, str]]) -> str:
+        """Hash del prompt junto con todo lo que cambia la respuesta"""
+        payload = json.dumps([provider, model, prompt, context], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        response = self._entries.get(key)
+        if response is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return response
+
+    def put(self, key: str, response: str):
+        self._entries[key] = response
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+def sse_event(data: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    """Codificar un evento Server-Sent Events"""
+    header = f"event: {event}\n" if event else ''
+    return f"{header}data: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+
 class VaderAIBackend:
     """Backend de IA real para Vader"""
-    
+
     def __init__(self):
-        self.app = Flask(__name__)
-        CORS(self.app)
-        
+        self.app = web.Application()
+
         self.conversation_history = {}
         self.vader_context = self.load_vader_context()
-        self.active_provider = self.detect_available_provider()
-        
+        self.response_cache = ResponseCache(RESPONSE_CACHE_SIZE)
+
+        # Una sesión HTTP de larga duración por proveedor
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        # proveedor -> (instante del chequeo, disponible)
+        self._health: Dict[str, Tuple[float, bool]] = {}
+        self._health_checks: Dict[str, asyncio.Task] = {}
+
+        # Se confirma al arrancar el servidor, cuando se puede consultar Ollama
+        self.active_provider = 'mock'
+
         self.setup_logging()
         self.setup_routes()
-        
-        print(f"🤖 Vader AI Backend inicializado con {self.active_provider}")
-    
+        self.app.on_startup.append(self.on_startup)
+        self.app.on_cleanup.append(self.on_cleanup)
+        self.app.on_response_prepare.append(self.add_cors_headers)
+
     def setup_logging(self):
         """Configurar logging"""
         logging.basicConfig(
@@ -61,127 +152,228 @@ class VaderAIBackend:
             format='%(asctime)s - VaderAI - %(levelname)s - %(message)s'
         )
         self.logger = logging.getLogger(__name__)
-    
+
     def load_vader_context(self) -> str:
         """Cargar contexto sobre Vader para la IA"""
         return """
         Eres un asistente de IA especializado en el lenguaje de programación Vader.
-        
+
         SOBRE VADER:
         - Vader es el primer lenguaje universal ejecutable nativo en español
         - Permite programar en español natural sin barreras técnicas
         - Tiene runtimes nativos para CLI, Web, Móvil, Cloud, Gaming e IoT
         - Democratiza la programación para cualquier persona
-        
+
         SINTAXIS BÁSICA DE VADER:
         - mostrar "mensaje" - Mostrar texto
         - variable = valor - Asignar variable
         - si condicion entonces accion fin si - Condicional
         - repetir X veces accion fin repetir - Bucle
         - funcion nombre accion fin funcion - Definir función
-        
+
         COMANDOS ESPECIALIZADOS:
         - Web: crear boton "texto" al hacer click accion
         - Móvil: tomar foto, obtener ubicacion, vibrar
         - Gaming: crear sprite, detectar colision, reproducir sonido
         - IoT: leer sensor, activar actuador, enviar mqtt
         - Cloud: subir archivo, guardar en base, invocar funcion
-        
+
         RESPONDE SIEMPRE EN ESPAÑOL y ayuda con programación en Vader.
         """
-    
-    def detect_available_provider(self) -> str:
+
+    async def on_startup(self, app):
+        """Elegir proveedor al arrancar el servidor"""
+        self.active_provider = await self.detect_available_provider()
+        print(f"🤖 Vader AI Backend inicializado con {self.active_provider}")
+
+    async def on_cleanup(self, app):
+        """Cerrar las sesiones HTTP al parar el servidor"""
+        await self.close()
+
+    async def close(self):
+        """Cerrar las sesiones con los proveedores"""
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            await session.close()
+
+    async def get_session(self, provider: str) -> aiohttp.ClientSession:
+        """Sesión HTTP del proveedor, creada una vez y reutilizada en cada petición"""
+        session = self._sessions.get(provider)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=PROVIDER_POOL_SIZE),
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+            )
+            self._sessions[provider] = session
+        return session
+
+    async def detect_available_provider(self) -> str:
         """Detectar proveedor de IA disponible"""
         # Prioridad: OpenAI > Anthropic > Ollama local > Google
-        if AI_PROVIDERS['openai']['api_key']:
-            return 'openai'
-        elif AI_PROVIDERS['anthropic']['api_key']:
-            return 'anthropic'
-        elif self.test_ollama_connection():
-            return 'ollama'
-        elif AI_PROVIDERS['google']['api_key']:
-            return 'google'
-        else:
-            return 'mock'  # IA simulada como fallback
-    
-    def test_ollama_connection(self) -> bool:
+        for provider in ('openai', 'anthropic', 'ollama', 'google'):
+            if await self.check_provider_health(provider):
+                return provider
+        return 'mock'  # IA simulada como fallback
+
+    async def check_provider_health(self, provider: str) -> bool:
+        """Disponibilidad del proveedor; el resultado vale HEALTH_CHECK_TTL segundos"""
+        config = AI_PROVIDERS.get(provider)
+        if config is None:
+            return False
+        if provider != 'ollama':
+            return bool(config.get('api_key'))
+
+        cached = self._health.get(provider)
+        if cached and time.monotonic() - cached[0] < HEALTH_CHECK_TTL:
+            return cached[1]
+
+        # Las peticiones simultáneas esperan al mismo chequeo
+        task = self._health_checks.get(provider)
+        if task is None:
+            task = asyncio.ensure_future(self.test_ollama_connection())
+            self._health_checks[provider] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done() and self._health_checks.get(provider) is task:
+                del self._health_checks[provider]
+
+    async def test_ollama_connection(self) -> bool:
         """Probar conexión con Ollama local"""
         try:
-            import requests
-            response = requests.get('http://localhost:11434/api/tags', timeout=2)
-            return response.status_code == 200
-        except:
-            return False
-    
+            session = await self.get_session('ollama')
+            async with session.get(f"{AI_PROVIDERS['ollama']['base_url']}/tags",
+                                   timeout=aiohttp.ClientTimeout(total=HEALTH_CHECK_TIMEOUT)) as response:
+                available = response.status == 200
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            available = False
+        self._health['ollama'] = (time.monotonic(), available)
+        return available
+
     def setup_routes(self):
         """Configurar rutas de la API"""
-        
-        @self.app.route('/ai/chat', methods=['POST'])
-        def chat():
-            """Endpoint principal de chat"""
-            try:
-                data = request.get_json()
-                message = data.get('message', '')
-                session_id = data.get('session_id', 'default')
-                action_type = data.get('action_type', 'chat')
-                
-                if not message:
-                    return jsonify({'error': 'Mensaje requerido'}), 400
-                
-                # Procesar según tipo de acción
-                if action_type == 'generate':
-                    response = asyncio.run(self.generate_code(message, session_id))
-                elif action_type == 'analyze':
-                    response = asyncio.run(self.analyze_code(message, session_id))
-                elif action_type == 'optimize':
-                    response = asyncio.run(self.optimize_code(message, session_id))
-                elif action_type == 'explain':
-                    response = asyncio.run(self.explain_code(message, session_id))
-                elif action_type == 'debug':
-                    response = asyncio.run(self.debug_code(message, session_id))
-                else:
-                    response = asyncio.run(self.chat_response(message, session_id))
-                
-                return jsonify({
-                    'response': response,
-                    'provider': self.active_provider,
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-            except Exception as e:
-                self.logger.error(f"Error en chat: {e}")
-                return jsonify({'error': str(e)}), 500
-        
-        @self.app.route('/ai/providers', methods=['GET'])
-        def get_providers():
-            """Obtener proveedores disponibles"""
-            available = []
-            for provider, config in AI_PROVIDERS.items():
-                if provider == 'ollama':
-                    if self.test_ollama_connection():
-                        available.append(provider)
-                elif config.get('api_key'):
-                    available.append(provider)
-            
-            return jsonify({
-                'available_providers': available,
-                'active_provider': self.active_provider
+        self.app.router.add_post('/ai/chat', self.chat)
+        self.app.router.add_post('/ai/chat/stream', self.chat_stream)
+        self.app.router.add_get('/ai/providers', self.get_providers)
+        self.app.router.add_post('/ai/switch-provider', self.switch_provider)
+        self.app.router.add_get('/ai/stats', self.get_stats)
+        self.app.router.add_route('OPTIONS', '/ai/{path:.*}', self.preflight)
+
+    async def add_cors_headers(self, request, response):
+        """Cabeceras CORS en todas las respuestas, también en las de streaming"""
+        response.headers.update(CORS_HEADERS)
+
+    async def preflight(self, request):
+        """Respuesta a las peticiones CORS previas del navegador"""
+        return web.Response()
+
+    async def read_chat_request(self, request) -> Tuple[str, str, str]:
+        """Mensaje, sesión y tipo de acción de una petición de chat"""
+        data = await request.json()
+        return (data.get('message', ''),
+                data.get('session_id', 'default'),
+                data.get('action_type', 'chat'))
+
+    async def chat(self, request):
+        """Endpoint principal de chat"""
+        try:
+            message, session_id, action_type = await self.read_chat_request(request)
+
+            if not message:
+                return web.json_response({'error': 'Mensaje requerido'}, status=400)
+
+            # Procesar según tipo de acción
+            prompt = self.build_prompt(action_type, message)
+            response, cached = await self.complete(prompt, session_id)
+
+            return web.json_response({
+                'response': response,
+                'provider': self.active_provider,
+                'cached': cached,
+                'timestamp': datetime.now().isoformat()
             })
-        
-        @self.app.route('/ai/switch-provider', methods=['POST'])
-        def switch_provider():
-            """Cambiar proveedor de IA"""
-            data = request.get_json()
-            new_provider = data.get('provider')
-            
-            if new_provider in AI_PROVIDERS:
-                self.active_provider = new_provider
-                return jsonify({'success': True, 'active_provider': new_provider})
-            else:
-                return jsonify({'error': 'Proveedor no válido'}), 400
-    
-    async def chat_response(self, message: str, session_id: str) -> str:
-        """Respuesta general de chat"""
+
+        except Exception as e:
+            self.logger.error(f"Error en chat: {e}")
+            return web.json_response({'error': str(e)}, status=500)
+
+    async def chat_stream(self, request):
+        """Chat con la respuesta enviada token a token (Server-Sent Events)"""
+        try:
+            message, session_id, action_type = await self.read_chat_request(request)
+        except Exception as e:
+            return web.json_response({'error': str(e)}, status=400)
+
+        if not message:
+            return web.json_response({'error': 'Mensaje requerido'}, status=400)
+
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache'
+        })
+        await response.prepare(request)
+
+        events = self.stream(self.build_prompt(action_type, message), session_id)
+        try:
+            async for event, data in events:
+                await response.write(sse_event(data, event))
+        except ConnectionResetError:
+            return response  # El cliente cerró la conexión
+        except Exception as e:
+            self.logger.error(f"Error en streaming: {e}")
+            await response.write(sse_event({'error': str(e)}, 'error'))
+        finally:
+            await events.aclose()
+
+        await response.write_eof()
+        return response
+
+    async def get_providers(self, request):
+        """Obtener proveedores disponibles"""
+        checks = await asyncio.gather(*(self.check_provider_health(p) for p in AI_PROVIDERS))
+        available = [provider for provider, ok in zip(AI_PROVIDERS, checks) if ok]
+
+        return web.json_response({
+            'available_providers': available,
+            'active_provider': self.active_provider
+        })
+
+    async def switch_provider(self, request):
+        """Cambiar proveedor de IA"""
+        data = await request.json()
+        new_provider = data.get('provider')
+
+        if new_provider in AI_PROVIDERS:
+            self.active_provider = new_provider
+            return web.json_response({'success': True, 'active_provider': new_provider})
+        else:
+            return web.json_response({'error': 'Proveedor no válido'}, status=400)
+
+    async def get_stats(self, request):
+        """Estadísticas de la caché de respuestas y de los chequeos de salud"""
+        now = time.monotonic()
+        return web.json_response({
+            'response_cache': self.response_cache.stats(),
+            'health_checks': {
+                provider: {'available': ok, 'age_seconds': round(now - checked_at, 3)}
+                for provider, (checked_at, ok) in self._health.items()
+            },
+            'open_sessions': [p for p, s in self._sessions.items() if not s.closed]
+        })
+
+    def build_prompt(self, action_type: str, message: str) -> str:
+        """Prompt para el tipo de acción pedido (chat si no se reconoce)"""
+        builders = {
+            'generate': self.generate_prompt,
+            'analyze': self.analyze_prompt,
+            'optimize': self.optimize_prompt,
+            'explain': self.explain_prompt,
+            'debug': self.debug_prompt,
+        }
+        return builders.get(action_type, self.chat_prompt)(message)
+
+    def chat_prompt(self, message: str) -> str:
+        """Prompt de chat general"""
         prompt = f"""
         {self.vader_context}
         
@@ -192,10 +384,10 @@ class VaderAIBackend:
         redirige amablemente hacia temas de Vader.
         """
         
-        return await self.call_ai_provider(prompt, session_id)
+        return prompt
     
-    async def generate_code(self, description: str, session_id: str) -> str:
-        """Generar código Vader"""
+    def generate_prompt(self, description: str) -> str:
+        """Prompt para generar código Vader"""
         prompt = f"""
         {self.vader_context}
         
@@ -213,10 +405,10 @@ class VaderAIBackend:
         RESPUESTA: Solo código Vader con comentarios, sin explicaciones adicionales.
         """
         
-        return await self.call_ai_provider(prompt, session_id)
+        return prompt
     
-    async def analyze_code(self, code: str, session_id: str) -> str:
-        """Analizar código Vader"""
+    def analyze_prompt(self, code: str) -> str:
+        """Prompt para analizar código Vader"""
         prompt = f"""
         {self.vader_context}
         
@@ -236,10 +428,10 @@ class VaderAIBackend:
         Proporciona un análisis detallado y constructivo.
         """
         
-        return await self.call_ai_provider(prompt, session_id)
+        return prompt
     
-    async def optimize_code(self, code: str, session_id: str) -> str:
-        """Optimizar código Vader"""
+    def optimize_prompt(self, code: str) -> str:
+        """Prompt para optimizar código Vader"""
         prompt = f"""
         {self.vader_context}
         
@@ -259,10 +451,10 @@ class VaderAIBackend:
         RESPUESTA: Código Vader optimizado con explicación de cambios.
         """
         
-        return await self.call_ai_provider(prompt, session_id)
+        return prompt
     
-    async def explain_code(self, code: str, session_id: str) -> str:
-        """Explicar código Vader"""
+    def explain_prompt(self, code: str) -> str:
+        """Prompt para explicar código Vader"""
         prompt = f"""
         {self.vader_context}
         
@@ -282,10 +474,10 @@ class VaderAIBackend:
         Explica de manera clara y educativa, como si fuera para alguien aprendiendo.
         """
         
-        return await self.call_ai_provider(prompt, session_id)
+        return prompt
     
-    async def debug_code(self, code: str, session_id: str) -> str:
-        """Depurar código Vader"""
+    def debug_prompt(self, code: str) -> str:
+        """Prompt para depurar código Vader"""
         prompt = f"""
         {self.vader_context}
         
@@ -305,132 +497,136 @@ class VaderAIBackend:
         RESPUESTA: Código corregido + explicación de errores encontrados.
         """
         
-        return await self.call_ai_provider(prompt, session_id)
+        return prompt
     
-    async def call_ai_provider(self, prompt: str, session_id: str) -> str:
-        """Llamar al proveedor de IA activo"""
+    def cache_key(self, provider: str, prompt: str, session_id: str) -> str:
+        """Clave de caché: el prompt y el historial que recibe el proveedor"""
+        context = self.conversation_history.get(session_id, []) if provider in HISTORY_PROVIDERS else []
+        return ResponseCache.make_key(provider, AI_PROVIDERS[provider].get('model'), prompt, context)
+
+    def remember(self, provider: str, session_id: str, prompt: str, response: str):
+        """Actualizar el historial de la sesión"""
+        if provider not in HISTORY_PROVIDERS:
+            return
+        history = self.conversation_history.setdefault(session_id, [])
+        history.extend([
+            {"role": "user", "content": prompt},
+            {"role": "assistant", "content": response}
+        ])
+        # Limitar historial a últimas 10 interacciones
+        del history[:-MAX_HISTORY_MESSAGES]
+
+    async def complete(self, prompt: str, session_id: str) -> Tuple[str, bool]:
+        """Respuesta completa del proveedor activo y si salió de la caché"""
+        provider = self.active_provider
+        if provider not in AI_PROVIDERS:
+            return self.mock_ai_response(prompt), False
+
+        key = self.cache_key(provider, prompt, session_id)
+        response = self.response_cache.get(key)
+        if response is not None:
+            self.remember(provider, session_id, prompt, response)
+            return response, True
+
         try:
-            if self.active_provider == 'openai':
-                return await self.call_openai(prompt, session_id)
-            elif self.active_provider == 'anthropic':
-                return await self.call_anthropic(prompt, session_id)
-            elif self.active_provider == 'ollama':
-                return await self.call_ollama(prompt, session_id)
-            elif self.active_provider == 'google':
-                return await self.call_google(prompt, session_id)
-            else:
-                return self.mock_ai_response(prompt)
-        
+            response = await self.call_provider(provider, prompt, session_id)
         except Exception as e:
             self.logger.error(f"Error llamando IA: {e}")
-            return f"❌ Error de IA: {str(e)}. Usando respuesta simulada."
-    
-    async def call_openai(self, prompt: str, session_id: str) -> str:
-        """Llamar a OpenAI GPT"""
-        config = AI_PROVIDERS['openai']
-        
-        # Obtener historial de conversación
-        history = self.conversation_history.get(session_id, [])
-        
-        messages = [
-            {"role": "system", "content": self.vader_context},
-            *history,
-            {"role": "user", "content": prompt}
-        ]
-        
-        async with aiohttp.ClientSession() as session:
+            return f"❌ Error de IA: {str(e)}. Usando respuesta simulada.", False
+
+        self.response_cache.put(key, response)
+        self.remember(provider, session_id, prompt, response)
+        return response, False
+
+    async def call_ai_provider(self, prompt: str, session_id: str) -> str:
+        """Llamar al proveedor de IA activo"""
+        response, _ = await self.complete(prompt, session_id)
+        return response
+
+    async def stream(self, prompt: str, session_id: str) -> AsyncIterator[Tuple[Optional[str], Dict[str, Any]]]:
+        """Eventos SSE de una respuesta: los tokens y un evento 'done' final"""
+        provider = self.active_provider
+        done = {'provider': provider, 'cached': False}
+
+        if provider not in AI_PROVIDERS:
+            yield None, {'token': self.mock_ai_response(prompt)}
+            yield 'done', done
+            return
+
+        key = self.cache_key(provider, prompt, session_id)
+        response = self.response_cache.get(key)
+        if response is not None:
+            self.remember(provider, session_id, prompt, response)
+            yield None, {'token': response}
+            yield 'done', {**done, 'cached': True}
+            return
+
+        tokens = []
+        async for token in self.stream_provider(provider, prompt, session_id):
+            tokens.append(token)
+            yield None, {'token': token}
+
+        # Sólo se guardan las respuestas que llegaron completas
+        response = ''.join(tokens)
+        self.response_cache.put(key, response)
+        self.remember(provider, session_id, prompt, response)
+        yield 'done', done
+
+    def build_request(self, provider: str, prompt: str, session_id: str,
+                      stream: bool = False) -> Tuple[str, Dict[str, Any]]:
+        """URL y argumentos de la petición al proveedor"""
+        config = AI_PROVIDERS[provider]
+
+        if provider == 'openai':
+            # Obtener historial de conversación
+            history = self.conversation_history.get(session_id, [])
+            messages = [
+                {"role": "system", "content": self.vader_context},
+                *history,
+                {"role": "user", "content": prompt}
+            ]
             headers = {
                 'Authorization': f"Bearer {config['api_key']}",
                 'Content-Type': 'application/json'
             }
-            
             data = {
                 'model': config['model'],
                 'messages': messages,
                 'max_tokens': 1000,
-                'temperature': 0.7
+                'temperature': 0.7,
+                'stream': stream
             }
-            
-            async with session.post(f"{config['base_url']}/chat/completions", 
-                                  headers=headers, json=data) as response:
-                result = await response.json()
-                
-                if response.status == 200:
-                    ai_response = result['choices'][0]['message']['content']
-                    
-                    # Actualizar historial
-                    if session_id not in self.conversation_history:
-                        self.conversation_history[session_id] = []
-                    
-                    self.conversation_history[session_id].extend([
-                        {"role": "user", "content": prompt},
-                        {"role": "assistant", "content": ai_response}
-                    ])
-                    
-                    # Limitar historial a últimas 10 interacciones
-                    if len(self.conversation_history[session_id]) > 20:
-                        self.conversation_history[session_id] = self.conversation_history[session_id][-20:]
-                    
-                    return ai_response
-                else:
-                    raise Exception(f"OpenAI API error: {result}")
-    
-    async def call_anthropic(self, prompt: str, session_id: str) -> str:
-        """Llamar a Anthropic Claude"""
-        config = AI_PROVIDERS['anthropic']
-        
-        async with aiohttp.ClientSession() as session:
+            return f"{config['base_url']}/chat/completions", {'headers': headers, 'json': data}
+
+        if provider == 'anthropic':
             headers = {
                 'x-api-key': config['api_key'],
                 'Content-Type': 'application/json',
                 'anthropic-version': '2023-06-01'
             }
-            
             data = {
                 'model': config['model'],
                 'max_tokens': 1000,
                 'messages': [
                     {"role": "user", "content": f"{self.vader_context}\n\n{prompt}"}
-                ]
+                ],
+                'stream': stream
             }
-            
-            async with session.post(f"{config['base_url']}/messages", 
-                                  headers=headers, json=data) as response:
-                result = await response.json()
-                
-                if response.status == 200:
-                    return result['content'][0]['text']
-                else:
-                    raise Exception(f"Anthropic API error: {result}")
-    
-    async def call_ollama(self, prompt: str, session_id: str) -> str:
-        """Llamar a Ollama local"""
-        config = AI_PROVIDERS['ollama']
-        
-        async with aiohttp.ClientSession() as session:
+            return f"{config['base_url']}/messages", {'headers': headers, 'json': data}
+
+        if provider == 'ollama':
             data = {
                 'model': config['model'],
                 'prompt': f"{self.vader_context}\n\n{prompt}",
-                'stream': False
+                'stream': stream
             }
-            
-            async with session.post(f"{config['base_url']}/generate", 
-                                  json=data) as response:
-                result = await response.json()
-                
-                if response.status == 200:
-                    return result['response']
-                else:
-                    raise Exception(f"Ollama error: {result}")
-    
-    async def call_google(self, prompt: str, session_id: str) -> str:
-        """Llamar a Google Gemini"""
-        config = AI_PROVIDERS['google']
-        
-        async with aiohttp.ClientSession() as session:
-            url = f"{config['base_url']}/models/{config['model']}:generateContent"
+            return f"{config['base_url']}/generate", {'json': data}
+
+        if provider == 'google':
+            method = 'streamGenerateContent' if stream else 'generateContent'
             params = {'key': config['api_key']}
-            
+            if stream:
+                params['alt'] = 'sse'
             data = {
                 'contents': [{
                     'parts': [{
@@ -438,15 +634,68 @@ class VaderAIBackend:
                     }]
                 }]
             }
-            
-            async with session.post(url, params=params, json=data) as response:
-                result = await response.json()
-                
-                if response.status == 200:
-                    return result['candidates'][0]['content']['parts'][0]['text']
-                else:
-                    raise Exception(f"Google AI error: {result}")
-    
+            return f"{config['base_url']}/models/{config['model']}:{method}", {'params': params, 'json': data}
+
+        raise ValueError(f"Proveedor no válido: {provider}")
+
+    def extract_text(self, provider: str, result: Dict[str, Any]) -> str:
+        """Texto de una respuesta completa del proveedor"""
+        if provider == 'openai':
+            return result['choices'][0]['message']['content']
+        if provider == 'anthropic':
+            return result['content'][0]['text']
+        if provider == 'ollama':
+            return result['response']
+        return result['candidates'][0]['content']['parts'][0]['text']
+
+    def extract_token(self, provider: str, event: Dict[str, Any]) -> str:
+        """Texto de un fragmento de una respuesta en streaming"""
+        if provider == 'openai':
+            choices = event.get('choices') or [{}]
+            return choices[0].get('delta', {}).get('content') or ''
+        if provider == 'anthropic':
+            if event.get('type') == 'content_block_delta':
+                return event['delta'].get('text', '')
+            return ''
+        if provider == 'ollama':
+            return event.get('response', '')
+        candidates = event.get('candidates') or [{}]
+        parts = candidates[0].get('content', {}).get('parts') or [{}]
+        return parts[0].get('text', '')
+
+    async def call_provider(self, provider: str, prompt: str, session_id: str) -> str:
+        """Llamar al proveedor con su sesión compartida"""
+        url, kwargs = self.build_request(provider, prompt, session_id)
+        session = await self.get_session(provider)
+
+        async with session.post(url, **kwargs) as response:
+            result = await response.json(content_type=None)
+
+            if response.status == 200:
+                return self.extract_text(provider, result)
+            else:
+                raise Exception(f"{provider} API error: {result}")
+
+    async def stream_provider(self, provider: str, prompt: str, session_id: str) -> AsyncIterator[str]:
+        """Tokens de la respuesta del proveedor según van llegando"""
+        url, kwargs = self.build_request(provider, prompt, session_id, stream=True)
+        session = await self.get_session(provider)
+
+        async with session.post(url, **kwargs) as response:
+            if response.status != 200:
+                raise Exception(f"{provider} API error: {await response.text()}")
+
+            # SSE (OpenAI, Anthropic, Google) o un objeto JSON por línea (Ollama)
+            async for raw_line in response.content:
+                line = raw_line.decode('utf-8').strip()
+                if line.startswith('data:'):
+                    line = line[5:].strip()
+                if not line.startswith('{'):
+                    continue  # líneas vacías, 'event:' y '[DONE]'
+                token = self.extract_token(provider, json.loads(line))
+                if token:
+                    yield token
+
     def mock_ai_response(self, prompt: str) -> str:
         """Respuesta de IA simulada como fallback"""
         responses = {
@@ -507,8 +756,10 @@ Puedo ayudarte con:
     
     def run(self, host='localhost', port=5001, debug=False):
         """Ejecutar servidor de IA"""
+        if debug:
+            self.logger.setLevel(logging.DEBUG)
         print(f"🚀 Iniciando Vader AI Backend en http://{host}:{port}")
-        self.app.run(host=host, port=port, debug=debug)
+        web.run_app(self.app, host=host, port=port, print=None)
 
 # Punto de entrada
 if __name__ == "__main__":
@@ -5,15 +5,36 @@ Runtime serverless de Vader para ejecución en la nube
 Soporta AWS Lambda, Google Cloud Functions, Azure Functions
 """
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 import json
 import os
 import sys
 import asyncio
+import statistics
 import aiohttp
-from typing import Dict, Any, Optional
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 import boto3
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from vader_expressions import evaluate
+
+# Modo contenedor caliente: runtime, clientes, bucle y sesión HTTP se crean una
+# vez por contenedor y se reutilizan entre invocaciones (VADER_WARM_START=false lo desactiva)
+WARM_START = os.getenv('VADER_WARM_START', 'true').lower() != 'false'
+HTTP_POOL_SIZE = 32
+PROGRAM_CACHE_SIZE = 256
+
+@lru_cache(maxsize=PROGRAM_CACHE_SIZE)
+def parse_program(code: str) -> Tuple[Tuple[int, str], ...]:
+    """Líneas ejecutables (número, línea) de un programa; los programas repetidos no se vuelven a partir"""
+    return tuple((line_num, line.strip()) for line_num, line in enumerate(code.split('\n'), 1)
+                 if line.strip() and not line.strip().startswith('#'))
+
 class VaderCloudRuntime:
     """Runtime de Vader optimizado para entornos serverless"""
     
@@ -23,6 +44,8 @@ class VaderCloudRuntime:
         self.cloud_provider = cloud_provider
         self.debug_mode = os.getenv('VADER_DEBUG', 'false').lower() == 'true'
         self.execution_context = {}
+        self._http_session = None
+        self._http_loop = None
         
         # Inicializar servicios cloud
         self.cloud_services = self._init_cloud_services()
@@ -45,6 +68,27 @@ class VaderCloudRuntime:
         
         return services
     
+    def reset_invocation(self):
+        """Estado propio de cada invocación: no se comparte entre peticiones de un contenedor caliente"""
+        self.variables = {}
+        self.functions = {}
+        self.execution_context = {}
+    
+    async def get_http_session(self) -> aiohttp.ClientSession:
+        """Sesión HTTP con pool de conexiones, reutilizada mientras siga el mismo bucle"""
+        loop = asyncio.get_running_loop()
+        if self._http_session is None or self._http_session.closed or self._http_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, ttl_dns_cache=300)
+            self._http_session = aiohttp.ClientSession(connector=connector)
+            self._http_loop = loop
+        return self._http_session
+    
+    async def close(self):
+        """Cerrar la sesión HTTP"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
+        self._http_session = None
+    
     async def execute_serverless(self, event, context):
         """Punto de entrada para funciones serverless"""
         try:
@@ -94,20 +138,17 @@ class VaderCloudRuntime:
     async def execute_code(self, code: str) -> Dict[str, Any]:
         """Ejecutar código Vader en entorno cloud"""
         output = []
-        lines = code.split('\n')
-        
-        for line_num, line in enumerate(lines, 1):
-            line = line.strip()
-            if line and not line.startswith('#'):
-                try:
-                    result = await self.execute_line(line)
-                    if result:
-                        output.append(result)
-                except Exception as e:
-                    error_msg = f"❌ Error línea {line_num}: {str(e)}"
-                    output.append(error_msg)
-                    if self.debug_mode:
-                        print(error_msg)
+        
+        for line_num, line in parse_program(code):
+            try:
+                result = await self.execute_line(line)
+                if result:
+                    output.append(result)
+            except Exception as e:
+                error_msg = f"❌ Error línea {line_num}: {str(e)}"
+                output.append(error_msg)
+                if self.debug_mode:
+                    print(error_msg)
         
         return {
             'output': output,
@@ -275,17 +316,17 @@ class VaderCloudRuntime:
         method, url = match.groups()
         
         try:
-            async with aiohttp.ClientSession() as session:
-                if method.upper() == 'GET':
-                    async with session.get(url) as response:
-                        data = await response.text()
-                        self.variables['ultima_respuesta'] = data[:500]  # Limitar tamaño
-                        return f"✅ {method} {url}: {response.status}"
-                elif method.upper() == 'POST':
-                    async with session.post(url) as response:
-                        data = await response.text()
-                        self.variables['ultima_respuesta'] = data[:500]
-                        return f"✅ {method} {url}: {response.status}"
+            session = await self.get_http_session()
+            if method.upper() == 'GET':
+                async with session.get(url) as response:
+                    data = await response.text()
+                    self.variables['ultima_respuesta'] = data[:500]  # Limitar tamaño
+                    return f"✅ {method} {url}: {response.status}"
+            elif method.upper() == 'POST':
+                async with session.post(url) as response:
+                    data = await response.text()
+                    self.variables['ultima_respuesta'] = data[:500]
+                    return f"✅ {method} {url}: {response.status}"
         except Exception as e:
             return f"❌ Error en petición HTTP: {e}"
         
@@ -329,60 +370,105 @@ class VaderCloudRuntime:
         return None
     
     def evaluate_expression(self, expr: str):
-        """Evaluar expresión simple"""
-        # Reemplazar variables
-        for var, val in self.variables.items():
-            expr = expr.replace(var, str(val))
-        
-        # Evaluar expresión segura
+        """Evaluar expresión simple con el evaluador compartido (compilado y sin builtins)"""
         try:
-            # Solo permitir operaciones básicas
-            allowed_chars = set('0123456789+-*/.() ')
-            if all(c in allowed_chars or c.isalnum() for c in expr):
-                return eval(expr)
-            else:
-                return expr.strip('"\'')
-        except:
+            return evaluate(expr, self.variables)
+        except Exception:
             return expr.strip('"\'')
 
-# Funciones de entrada para diferentes proveedores cloud
+# Estado del contenedor (módulo): sobrevive entre invocaciones mientras el contenedor siga caliente
+_runtimes: Dict[str, VaderCloudRuntime] = {}
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_container = {
+    'import_ms': (time.perf_counter() - _IMPORT_STARTED) * 1000,
+    'invocations': 0,
+    'cold_starts': 0,
+    'cold_ms': deque(maxlen=100),
+    'warm_ms': deque(maxlen=1000),
+}
 
-def lambda_handler(event, context):
-    """Handler para AWS Lambda"""
-    runtime = VaderCloudRuntime('aws')
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+def get_runtime(cloud_provider: str) -> Tuple[VaderCloudRuntime, bool]:
+    """Runtime del proveedor y si esta invocación es un arranque en frío"""
+    runtime = _runtimes.get(cloud_provider) if WARM_START else None
+    if runtime is None:
+        runtime = VaderCloudRuntime(cloud_provider)
+        if WARM_START:
+            _runtimes[cloud_provider] = runtime
+        return runtime, True
+    runtime.reset_invocation()
+    return runtime, False
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    global _event_loop
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_event_loop)
+    return _event_loop
+
+def _invoke(cloud_provider: str, event, context) -> Dict[str, Any]:
+    """Ejecuta una invocación y anota en las cabeceras si fue en frío o en caliente"""
+    started = time.perf_counter()
+    runtime, cold = get_runtime(cloud_provider)
+    init_ms = (time.perf_counter() - started) * 1000
+    loop = _get_event_loop()
     
     try:
-        return loop.run_until_complete(runtime.execute_serverless(event, context))
+        result = loop.run_until_complete(runtime.execute_serverless(event, context))
     finally:
-        loop.close()
+        if not WARM_START:
+            loop.run_until_complete(runtime.close())
+            loop.close()
+    
+    total_ms = (time.perf_counter() - started) * 1000
+    _container['invocations'] += 1
+    if cold:
+        _container['cold_starts'] += 1
+        _container['cold_ms'].append(total_ms)
+        print(json.dumps({'vader_start': 'cold', 'provider': cloud_provider, 'import_ms': round(_container['import_ms'], 1),
+                          'init_ms': round(init_ms, 1), 'total_ms': round(total_ms, 1)}))
+    else:
+        _container['warm_ms'].append(total_ms)
+    
+    headers = result.setdefault('headers', {})
+    headers['X-Vader-Start'] = 'cold' if cold else 'warm'
+    headers['Server-Timing'] = f"init;dur={init_ms:.1f}, total;dur={total_ms:.1f}"
+    return result
+
+def container_stats() -> Dict[str, Any]:
+    """Tiempos en frío frente a en caliente de este contenedor (ms)"""
+    cold, warm = list(_container['cold_ms']), list(_container['warm_ms'])
+    return {
+        'warm_start': WARM_START,
+        'import_ms': _container['import_ms'],
+        'invocations': _container['invocations'],
+        'cold_starts': _container['cold_starts'],
+        'cold_p50_ms': statistics.median(cold) if cold else None,
+        'warm_p50_ms': statistics.median(warm) if warm else None,
+        'program_cache': parse_program.cache_info()._asdict(),
+    }
+
+# Funciones de entrada para diferentes proveedores cloud
+
+def lambda_handler(event, context):
+    """Handler para AWS Lambda"""
+    return _invoke('aws', event, context)
 
 def azure_main(req):
     """Handler para Azure Functions"""
     import azure.functions as func
     
-    runtime = VaderCloudRuntime('azure')
     event = {'vader_code': req.get_body().decode('utf-8')}
     context = type('Context', (), {'function_name': 'vader-azure'})()
     
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    try:
-        result = loop.run_until_complete(runtime.execute_serverless(event, context))
-        return func.HttpResponse(
-            result['body'],
-            status_code=result['statusCode'],
-            headers=result.get('headers', {})
-        )
-    finally:
-        loop.close()
+    result = _invoke('azure', event, context)
+    return func.HttpResponse(
+        result['body'],
+        status_code=result['statusCode'],
+        headers=result.get('headers', {})
+    )
 
 def gcp_main(request):
     """Handler para Google Cloud Functions"""
-    runtime = VaderCloudRuntime('gcp')
-    
     if request.method == 'POST':
         event = {'vader_code': request.get_json().get('vader_code', '')}
     else:
@@ -390,14 +476,8 @@ def gcp_main(request):
     
     context = type('Context', (), {'function_name': 'vader-gcp'})()
     
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
-    try:
-        result = loop.run_until_complete(runtime.execute_serverless(event, context))
-        return result['body'], result['statusCode'], result.get('headers', {})
-    finally:
-        loop.close()
+    result = _invoke('gcp', event, context)
+    return result['body'], result['statusCode'], result.get('headers', {})
 
 # CLI para testing local
 if __name__ == "__main__":
@@ -413,6 +493,7 @@ if __name__ == "__main__":
         '''
         
         result = await runtime.execute_code(test_code)
+        await runtime.close()
         print("\n📊 Resultado:")
         print(json.dumps(result, indent=2, ensure_ascii=False))
     
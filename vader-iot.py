@@ -6,15 +6,21 @@ Soporta sensores, actuadores, comunicación MQTT, dispositivos inteligentes
 """
 
 import asyncio
+import functools
 import json
+import os
+import sys
 import time
+import zlib
 import logging
 from typing import Dict, Any, Optional, List
 import paho.mqtt.client as mqtt
 import serial
 import requests
 from datetime import datetime
-import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from vader_expressions import evaluate
 
 # Simulación de librerías IoT (instalar según dispositivo)
 try:
@@ -50,9 +56,28 @@ class VaderIoTRuntime:
             'mqtt_port': 1883,
             'mqtt_topic_prefix': f'vader/{device_id}',
             'sensor_read_interval': 1.0,
+            # Las lecturas se agrupan en un solo mensaje por intervalo (o al llenar el lote)
+            'mqtt_batch_interval': 1.0,
+            'mqtt_batch_size': 100,
+            'mqtt_compress_min_bytes': 512,
             'device_type': self.detect_device_type()
         }
         
+        # Bucle asyncio propietario del muestreo y la publicación (ver start)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks = set()
+        self._sampler_task = None
+        self._sampler_wakeup = None
+        self._publisher_task = None
+        self._outbox: List[Dict[str, Any]] = []
+        self.iot_stats = {
+            'samples': 0,
+            'missed_samples': 0,
+            'published_messages': 0,
+            'published_readings': 0,
+            'published_bytes': 0,
+        }
+        
         # Inicializar componentes
         self.setup_logging()
         self.init_gpio()
@@ -114,16 +139,143 @@ class VaderIoTRuntime:
             self.logger.error(f"❌ Error conectando MQTT: {rc}")
     
     def on_mqtt_message(self, client, userdata, msg):
-        """Callback de mensaje MQTT"""
+        """Callback de mensaje MQTT (se llama desde el hilo de paho, no desde el bucle)"""
         try:
             payload = msg.payload.decode('utf-8')
             self.logger.info(f"📨 Mensaje MQTT recibido: {payload}")
             
-            # Ejecutar comando Vader recibido por MQTT
-            asyncio.create_task(self.execute_code(payload))
+            # Ejecutar comando Vader recibido por MQTT en el bucle del runtime
+            if self.loop is None or self.loop.is_closed():
+                self.logger.warning("⚠️ Runtime sin bucle activo, comando MQTT descartado")
+                return
+            asyncio.run_coroutine_threadsafe(self.execute_code(payload), self.loop)
         except Exception as e:
             self.logger.error(f"❌ Error procesando mensaje MQTT: {e}")
     
+    async def start(self):
+        """Asocia el runtime al bucle actual y arranca el muestreo y la publicación por lotes"""
+        self._ensure_sampler()
+        self._ensure_publisher()
+    
+    def _bind_loop(self):
+        """Las tareas y eventos pertenecen a un bucle: se recrean si cambia"""
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self._sampler_wakeup = asyncio.Event()
+            self._sampler_task = None
+            self._publisher_task = None
+    
+    def _spawn(self, coroutine) -> asyncio.Task:
+        """Crea una tarea en el bucle del runtime y la conserva hasta que termine"""
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+    def _ensure_sampler(self):
+        self._bind_loop()
+        if self._sampler_task is None or self._sampler_task.done():
+            self._sampler_task = self._spawn(self._sampling_loop())
+        self._sampler_wakeup.set()
+    
+    def _ensure_publisher(self):
+        self._bind_loop()
+        if self._publisher_task is None or self._publisher_task.done():
+            self._publisher_task = self._spawn(self._publisher_loop())
+    
+    async def _sampling_loop(self):
+        """Lee los sensores configurados según su intervalo
+        
+        Los sensores que vencen en el mismo instante se leen a la vez con
+        gather. Cada sensor se reprograma sobre su horario previsto (sin
+        deriva); si una lectura se retrasa más de un intervalo se cuenta como
+        muestra perdida en lugar de acumular lecturas atrasadas.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            polled = {name: sensor for name, sensor in self.sensors.items() if sensor.get('interval')}
+            for sensor in polled.values():
+                sensor.setdefault('next_due', now)
+            due = [name for name, sensor in polled.items() if sensor['next_due'] <= now]
+            
+            if due:
+                await asyncio.gather(*(self._sample_sensor(name) for name in due))
+                now = loop.time()
+                for name in due:
+                    sensor = self.sensors.get(name)
+                    if sensor is None:
+                        continue
+                    sensor['next_due'] += sensor['interval']
+                    if sensor['next_due'] <= now:
+                        skipped = int((now - sensor['next_due']) // sensor['interval']) + 1
+                        self.iot_stats['missed_samples'] += skipped
+                        sensor['next_due'] += skipped * sensor['interval']
+                continue
+            
+            self._sampler_wakeup.clear()
+            timeout = min((s['next_due'] for s in polled.values()), default=now + 3600) - now
+            try:
+                await asyncio.wait_for(self._sampler_wakeup.wait(), timeout=max(timeout, 0))
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _sample_sensor(self, sensor_name: str):
+        sensor = self.sensors[sensor_name]
+        try:
+            value = await self.read_sensor_value(sensor['pin'], sensor['type'])
+        except Exception as e:
+            self.logger.error(f"❌ Error leyendo sensor {sensor_name}: {e}")
+            return
+        self._record_reading(sensor_name, value)
+    
+    def _record_reading(self, sensor_name: str, value: Any):
+        self.variables[f'sensor_{sensor_name}'] = value
+        self.sensors[sensor_name]['last_value'] = value
+        self.iot_stats['samples'] += 1
+        self.queue_publish(sensor_name, value)
+    
+    def queue_publish(self, sensor_name: str, value: Any):
+        """Encola una lectura para el próximo mensaje MQTT por lotes"""
+        if not self.mqtt_client:
+            return
+        self._outbox.append({'sensor': sensor_name, 'value': value, 'timestamp': time.time()})
+        self._ensure_publisher()
+        if len(self._outbox) >= self.iot_config['mqtt_batch_size']:
+            self.flush_readings()
+    
+    async def _publisher_loop(self):
+        while True:
+            await asyncio.sleep(self.iot_config['mqtt_batch_interval'])
+            self.flush_readings()
+    
+    def flush_readings(self) -> int:
+        """Publica las lecturas pendientes en un único mensaje
+        
+        Va a `<prefijo>/sensors/batch` como JSON; si supera
+        `mqtt_compress_min_bytes` se comprime con zlib y va a
+        `<prefijo>/sensors/batch/zlib`.
+        """
+        if not self._outbox or not self.mqtt_client:
+            return 0
+        readings, self._outbox = self._outbox, []
+        payload = json.dumps({'device_id': self.device_id, 'readings': readings},
+                             separators=(',', ':')).encode('utf-8')
+        topic = f"{self.iot_config['mqtt_topic_prefix']}/sensors/batch"
+        if len(payload) >= self.iot_config['mqtt_compress_min_bytes']:
+            payload = zlib.compress(payload)
+            topic += '/zlib'
+        try:
+            self.mqtt_client.publish(topic, payload)
+        except Exception as e:
+            self.logger.error(f"❌ Error publicando lecturas: {e}")
+            return 0
+        self.iot_stats['published_messages'] += 1
+        self.iot_stats['published_readings'] += len(readings)
+        self.iot_stats['published_bytes'] += len(payload)
+        return len(readings)
+    
     async def execute_code(self, code: str) -> Dict[str, Any]:
         """Ejecutar código Vader IoT"""
         output = []
@@ -206,37 +358,60 @@ class VaderIoTRuntime:
         pin = int(pin)
         
         try:
-            if sensor_type.upper() == "DHT22":
-                value = await self.read_dht22(pin)
-            elif sensor_type.upper() == "ANALOG":
-                value = await self.read_analog(pin)
-            elif sensor_type.upper() == "DIGITAL":
-                value = await self.read_digital(pin)
-            elif sensor_type.upper() == "ULTRASONIC":
-                value = await self.read_ultrasonic(pin)
-            else:
-                # Sensor simulado
-                value = self.simulate_sensor_reading(sensor_type)
+            value = await self.read_sensor_value(pin, sensor_type)
             
-            self.variables[f'sensor_{sensor_name}'] = value
-            self.sensors[sensor_name] = {'pin': pin, 'type': sensor_type, 'last_value': value}
-            
-            # Publicar por MQTT
-            if self.mqtt_client:
-                topic = f"{self.iot_config['mqtt_topic_prefix']}/sensors/{sensor_name}"
-                self.mqtt_client.publish(topic, json.dumps({'value': value, 'timestamp': time.time()}))
+            sensor = self.sensors.setdefault(sensor_name, {})
+            sensor.update({'pin': pin, 'type': sensor_type})
+            # La lectura se publica en el próximo lote MQTT
+            self._record_reading(sensor_name, value)
             
             return f"📊 Sensor {sensor_name}: {value}"
             
         except Exception as e:
             return f"❌ Error leyendo sensor {sensor_name}: {e}"
     
+    async def read_sensor_value(self, pin: int, sensor_type: str) -> Any:
+        """Lee un sensor según su tipo"""
+        if sensor_type.upper() == "DHT22":
+            return await self.read_dht22(pin)
+        elif sensor_type.upper() == "ANALOG":
+            return await self.read_analog(pin)
+        elif sensor_type.upper() == "DIGITAL":
+            return await self.read_digital(pin)
+        elif sensor_type.upper() == "ULTRASONIC":
+            return await self.read_ultrasonic(pin)
+        # Sensor simulado
+        return self.simulate_sensor_reading(sensor_type)
+    
+    def configure_sensor(self, line: str) -> str:
+        """Configurar sensor para muestreo periódico"""
+        # configurar sensor "temperatura" pin=18 tipo="DHT22" cada=2
+        import re
+        match = re.match(r'configurar sensor "([^"]+)" pin=(\d+) tipo="([^"]+)"(?: cada=([\d.]+))?', line)
+        
+        if not match:
+            return "❌ Sintaxis: configurar sensor \"nombre\" pin=X tipo=\"tipo\" [cada=segundos]"
+        
+        sensor_name, pin, sensor_type, interval = match.groups()
+        interval = float(interval) if interval else self.iot_config['sensor_read_interval']
+        if interval <= 0:
+            return "❌ El intervalo de muestreo debe ser mayor que 0"
+        
+        sensor = self.sensors.setdefault(sensor_name, {})
+        sensor.update({'pin': int(pin), 'type': sensor_type, 'interval': interval})
+        sensor.pop('next_due', None)
+        self._ensure_sampler()
+        
+        return f"⚙️ Sensor {sensor_name} configurado: lectura cada {interval} segundos"
+    
     async def read_dht22(self, pin: int) -> Dict[str, float]:
         """Leer sensor DHT22 (temperatura y humedad)"""
         if RASPBERRY_PI:
             try:
                 import Adafruit_DHT
-                humidity, temperature = Adafruit_DHT.read_retry(Adafruit_DHT.DHT22, pin)
+                # read_retry bloquea varios segundos: fuera del bucle
+                humidity, temperature = await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(Adafruit_DHT.read_retry, Adafruit_DHT.DHT22, pin))
                 return {'temperatura': temperature, 'humedad': humidity}
             except ImportError:
                 pass
@@ -281,38 +456,46 @@ class VaderIoTRuntime:
     async def read_ultrasonic(self, pin: int) -> float:
         """Leer sensor ultrasónico HC-SR04"""
         if RASPBERRY_PI:
-            try:
-                trigger_pin = pin
-                echo_pin = pin + 1
-                
-                GPIO.setup(trigger_pin, GPIO.OUT)
-                GPIO.setup(echo_pin, GPIO.IN)
-                
-                # Enviar pulso
-                GPIO.output(trigger_pin, True)
-                time.sleep(0.00001)
-                GPIO.output(trigger_pin, False)
-                
-                # Medir tiempo
-                start_time = time.time()
-                while GPIO.input(echo_pin) == 0:
-                    start_time = time.time()
-                
-                while GPIO.input(echo_pin) == 1:
-                    end_time = time.time()
-                
-                # Calcular distancia
-                duration = end_time - start_time
-                distance = (duration * 34300) / 2  # cm
-                
-                return round(distance, 1)
-            except:
-                pass
+            # La medición espera activamente al eco: en un hilo, sin bloquear el bucle
+            distance = await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(self._measure_ultrasonic, pin))
+            if distance is not None:
+                return distance
         
         # Simulación
         import random
         return round(random.uniform(5.0, 200.0), 1)
     
+    def _measure_ultrasonic(self, pin: int) -> Optional[float]:
+        """Medición HC-SR04 en GPIO (bloqueante); None si falla"""
+        try:
+            trigger_pin = pin
+            echo_pin = pin + 1
+            
+            GPIO.setup(trigger_pin, GPIO.OUT)
+            GPIO.setup(echo_pin, GPIO.IN)
+            
+            # Enviar pulso
+            GPIO.output(trigger_pin, True)
+            time.sleep(0.00001)
+            GPIO.output(trigger_pin, False)
+            
+            # Medir tiempo
+            start_time = time.time()
+            while GPIO.input(echo_pin) == 0:
+                start_time = time.time()
+            
+            while GPIO.input(echo_pin) == 1:
+                end_time = time.time()
+            
+            # Calcular distancia
+            duration = end_time - start_time
+            distance = (duration * 34300) / 2  # cm
+            
+            return round(distance, 1)
+        except:
+            return None
+    
     def simulate_sensor_reading(self, sensor_type: str) -> Any:
         """Simular lectura de sensor"""
         import random
@@ -479,20 +662,22 @@ class VaderIoTRuntime:
         interval, command = match.groups()
         interval = int(interval)
         
-        def repeat_task():
-            while True:
-                try:
-                    asyncio.create_task(self.execute_line(command))
-                    time.sleep(interval)
-                except Exception as e:
-                    self.logger.error(f"❌ Error en tarea repetitiva: {e}")
-        
-        # Ejecutar en hilo separado
-        thread = threading.Thread(target=repeat_task, daemon=True)
-        thread.start()
+        # Tarea en el bucle del runtime (no un hilo aparte)
+        self._spawn(self._repeat_task(interval, command))
         
         return f"🔄 Tarea programada cada {interval} segundos: {command}"
     
+    async def _repeat_task(self, interval: int, command: str):
+        loop = asyncio.get_running_loop()
+        next_run = loop.time()
+        while True:
+            try:
+                await self.execute_line(command)
+            except Exception as e:
+                self.logger.error(f"❌ Error en tarea repetitiva: {e}")
+            next_run = max(next_run + interval, loop.time())
+            await asyncio.sleep(next_run - loop.time())
+    
     # Funciones auxiliares
     def extract_string(self, line: str, command: str) -> str:
         import re
@@ -509,17 +694,18 @@ class VaderIoTRuntime:
         return f"📝 {variable} = {evaluated_value}"
     
     def evaluate_expression(self, expr: str):
-        # Reemplazar variables
-        for var, val in self.variables.items():
-            expr = expr.replace(var, str(val))
-        
+        # Variables resueltas desde el entorno, sin sustituir texto ni usar eval libre
         try:
-            return eval(expr)
-        except:
+            return evaluate(expr, self.variables)
+        except Exception:
             return expr.strip('"\'')
     
     def cleanup(self):
         """Limpiar recursos"""
+        for task in list(self._tasks):
+            task.cancel()
+        self.flush_readings()
+        
         if RASPBERRY_PI:
             GPIO.cleanup()
         
@@ -533,11 +719,12 @@ class VaderIoTRuntime:
 async def main():
     """Función principal para ejecutar en dispositivos IoT"""
     runtime = VaderIoTRuntime()
+    await runtime.start()
     
     # Código de ejemplo
     test_code = '''
-    # Configurar sensores
-    configurar sensor "temperatura" pin=18 tipo="DHT22"
+    # Configurar sensores (muestreo periódico)
+    configurar sensor "temperatura" pin=18 tipo="DHT22" cada=2
     configurar actuador "led" pin=20
     
     # Leer sensores